@@ -0,0 +1,116 @@
+"""
+A microbenchmark comparing cache serializer/compressor pairs.
+
+Payloads mirror what the services actually cache: RAG summaries (long text),
+per-frame detection results from the video pipeline, and CLIP-sized frame
+embeddings. For each codec pair it reports encoded size and mean encode/decode
+time per value.
+
+Usage:
+    python scripts/benchmark_cache_codecs.py [--iterations N]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from insight_engine.services.cache_codecs import (
+    CacheCodec,
+    available_compressors,
+    available_serializers,
+)
+
+SUMMARY_SENTENCES = [
+    "A person walks into the frame carrying a red backpack.",
+    "Two vehicles stop at the intersection while the light is red.",
+    "The camera pans left towards the loading dock.",
+    "A delivery van parks and the driver unloads three boxes.",
+    "No significant activity is observed for the next forty seconds.",
+]
+
+
+def build_payloads(seed: int = 0) -> dict:
+    """Builds representative summary, detection and embedding payloads."""
+    rng = random.Random(seed)
+    summary = " ".join(rng.choice(SUMMARY_SENTENCES) for _ in range(120))
+
+    labels = ["person", "car", "truck", "bicycle", "dog", "backpack"]
+    detections = {
+        "video_id": "3f2b9c1e-5a7d-4e8b-9c0a-1d2e3f4a5b6c",
+        "total_frames": 300,
+        "results": [
+            {
+                "frame_number": frame,
+                "timestamp": round(frame / 30.0, 3),
+                "detections": [
+                    {
+                        "label": rng.choice(labels),
+                        "confidence": round(rng.uniform(0.3, 0.99), 4),
+                        "box": [rng.randint(0, 640) for _ in range(4)],
+                    }
+                    for _ in range(rng.randint(0, 6))
+                ],
+            }
+            for frame in range(300)
+        ],
+    }
+
+    embeddings = np.random.default_rng(seed).standard_normal((32, 512)).astype(np.float32)
+
+    return {
+        "summary": summary,
+        "summary_response": {"summary": summary, "sources": list(range(20))},
+        "detections": detections,
+        "embeddings": embeddings,
+    }
+
+
+def time_codec(codec: CacheCodec, value, iterations: int) -> tuple:
+    """Returns (size_bytes, encode_us, decode_us) for one payload."""
+    encoded = codec.encode(value)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.encode(value)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return len(encoded), encode_us, decode_us
+
+
+def run_benchmark(iterations: int) -> None:
+    """Runs every available serializer/compressor pair over every payload."""
+    payloads = build_payloads()
+    serializers = [s for s in available_serializers() if s not in ("utf8", "numpy")]
+    compressors = available_compressors()
+
+    print(f"Serializers: {serializers}")
+    print(f"Compressors: {compressors}")
+    print(f"Iterations per measurement: {iterations}\n")
+
+    header = f"{'payload':<18} {'serializer':<10} {'compressor':<10} {'bytes':>9} {'encode us':>11} {'decode us':>11}"
+    print(header)
+    print("-" * len(header))
+    for payload_name, value in payloads.items():
+        for serializer in serializers:
+            for compressor in compressors:
+                codec = CacheCodec(serializer=serializer, compressor=compressor)
+                size, encode_us, decode_us = time_codec(codec, value, iterations)
+                print(
+                    f"{payload_name:<18} {serializer:<10} {compressor:<10} "
+                    f"{size:>9} {encode_us:>11.1f} {decode_us:>11.1f}"
+                )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    run_benchmark(args.iterations)
@@ -0,0 +1,94 @@
+"""
+A benchmark of multi-clip extraction from one video.
+
+Random clip windows are cut out of the video twice: once with one ffmpeg
+process per clip, each opening and demuxing the source, and once with a
+single ffmpeg process writing every clip, after merging overlapping and
+adjacent windows. Both use stream copy. The report lists the ffmpeg
+processes spawned, the clips written and the wall time of each approach.
+
+Usage:
+    python scripts/benchmark_clip_extraction.py VIDEO [--clips 50] [--clip-length 3]
+        [--seed 0] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import ffmpeg
+
+from insight_engine.services.clip_generation_service import (
+    merge_clip_windows,
+    multi_clip_output,
+)
+
+
+def timed(func, repeat: int):
+    """Runs ``func`` ``repeat`` times, returning its result and the best time."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def per_clip(video: str, windows, output_dir: str) -> int:
+    """Cuts each window with its own ffmpeg process; returns the process count."""
+    for i, (start, end) in enumerate(windows):
+        (
+            ffmpeg.input(video)
+            .output(os.path.join(output_dir, f"clip_{i+1}.mp4"), ss=start, to=end, c="copy")
+            .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+        )
+    return len(windows)
+
+
+def single_pass(video: str, windows, output_dir: str) -> int:
+    """Merges the windows and cuts them with one ffmpeg process."""
+    merged = merge_clip_windows(windows)
+    output_paths = [os.path.join(output_dir, f"merged_{i+1}.mp4") for i in range(len(merged))]
+    multi_clip_output(video, merged, output_paths).run(
+        capture_stdout=True, capture_stderr=True, overwrite_output=True
+    )
+    return 1
+
+
+def main(args: argparse.Namespace) -> None:
+    duration = float(ffmpeg.probe(args.video)["format"]["duration"])
+    rng = random.Random(args.seed)
+    windows = []
+    for _ in range(args.clips):
+        start = rng.uniform(0, max(0.0, duration - args.clip_length))
+        windows.append((round(start, 3), round(min(duration, start + args.clip_length), 3)))
+    merged = merge_clip_windows(windows)
+
+    print(f"Video: {args.video} ({duration:.1f}s)")
+    print(f"Clips: {len(windows)} of {args.clip_length}s, {len(merged)} after merging")
+    print(f"{'mode':<12} {'processes':>10} {'clips':>6} {'seconds':>9} {'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        processes, baseline = timed(lambda: per_clip(args.video, windows, output_dir), args.repeat)
+        print(f"{'per clip':<12} {processes:>10} {len(windows):>6} {baseline:>9.3f} {1.0:>8.2f}x")
+
+        processes, elapsed = timed(
+            lambda: single_pass(args.video, windows, output_dir), args.repeat
+        )
+        print(
+            f"{'single pass':<12} {processes:>10} {len(merged):>6} {elapsed:>9.3f} "
+            f"{baseline / elapsed:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("video", help="Path to the video to cut clips from.")
+    parser.add_argument("--clips", type=int, default=50)
+    parser.add_argument("--clip-length", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+"""
+A CPU benchmark of batched YOLO inference throughput.
+
+The same frames are run through InferenceService.run_inference_batch at each
+fixed batch size, and frames per second and per-batch latency are reported.
+A final run uses the adaptive batch size to show where it settles for the
+configured latency target. Frames are read from a video when one is given,
+otherwise random frames are used.
+
+Usage:
+    python scripts/benchmark_inference_batching.py [--video VIDEO] [--frames 128]
+        [--batch-sizes 1 2 4 8 16 32] [--size 640]
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from insight_engine.services.inference_service import InferenceService
+
+
+def load_frames(args: argparse.Namespace) -> list:
+    """Reads ``args.frames`` frames from the video, or makes random ones."""
+    if args.video is None:
+        rng = np.random.default_rng(0)
+        return [
+            rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8)
+            for _ in range(args.frames)
+        ]
+    frames = []
+    cap = cv2.VideoCapture(args.video)
+    while len(frames) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def main(args: argparse.Namespace) -> None:
+    service = InferenceService()
+    frames = load_frames(args)
+    # Warm up, so model fusion and allocation are not timed
+    service.run_inference_batch(frames[:2], batch_size=2)
+
+    print(f"Model: {service.model_name}, {len(frames)} frames ({os.cpu_count()} CPU cores)")
+    print(f"{'batch size':<12} {'frames/s':>10} {'ms/batch':>10} {'speedup':>9}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        service.run_inference_batch(frames, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        fps = len(frames) / elapsed
+        baseline = baseline or fps
+        batches = -(-len(frames) // batch_size)
+        print(
+            f"{batch_size:<12} {fps:>10.1f} {elapsed / batches * 1000:>10.1f} "
+            f"{fps / baseline:>8.2f}x"
+        )
+
+    start = time.perf_counter()
+    service.run_inference_batch(frames)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'adaptive':<12} {len(frames) / elapsed:>10.1f} {'':>10} "
+        f"{len(frames) / elapsed / baseline:>8.2f}x  "
+        f"(settled at {service.batch_sizer.size} for a "
+        f"{service.batch_sizer.target_latency_ms:.0f} ms target)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--video", help="Read frames from this video.")
+    parser.add_argument("--frames", type=int, default=128)
+    parser.add_argument("--size", type=int, default=640, help="Random frame size.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    main(parser.parse_args())
@@ -0,0 +1,74 @@
+"""
+A benchmark of keyframe extraction throughput as the worker count grows.
+
+The video is processed once sequentially and once per worker count with
+VideoPreprocessor.extract_keyframes_parallel. Each parallel run is checked to
+select the same keyframes as the sequential run. CPU throttling is disabled
+so the numbers reflect decode and hashing cost only.
+
+Usage:
+    python scripts/benchmark_keyframe_extraction.py VIDEO [--workers 1 2 4 8] [--repeat 3]
+        [--decode-mode full|stride] [--decode-stride N]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from insight_engine.services.preprocessing_service import VideoPreprocessor
+
+
+def timed(func, repeat: int):
+    """Runs ``func`` ``repeat`` times, returning its result and the best time."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(args: argparse.Namespace) -> None:
+    preprocessor = VideoPreprocessor({
+        "HASH_ALGORITHM": args.hash_algorithm,
+        "CPU_THRESHOLD": 100,
+        "SEGMENTS_PER_WORKER": args.segments_per_worker,
+        "DECODE_MODE": args.decode_mode,
+        "DECODE_STRIDE": args.decode_stride,
+    })
+
+    sequential, baseline = timed(
+        lambda: list(preprocessor._iter_keyframes(args.video)), args.repeat
+    )
+    print(f"Video: {args.video} ({os.cpu_count()} CPU cores)")
+    print(f"{'mode':<14} {'seconds':>9} {'speedup':>9} {'keyframes':>10}  identical")
+    print(f"{'sequential':<14} {baseline:>9.3f} {1.0:>8.2f}x {len(sequential):>10}")
+
+    for workers in args.workers:
+        parallel, elapsed = timed(
+            lambda: preprocessor.extract_keyframes_parallel(args.video, workers=workers),
+            args.repeat,
+        )
+        identical = (
+            [number for number, _ in parallel] == [number for number, _ in sequential]
+            and all(np.array_equal(a, b) for (_, a), (_, b) in zip(parallel, sequential))
+        )
+        print(
+            f"{f'{workers} workers':<14} {elapsed:>9.3f} {baseline / elapsed:>8.2f}x "
+            f"{len(parallel):>10}  {'yes' if identical else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("video", help="Path to the video to process.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--segments-per-worker", type=int, default=2)
+    parser.add_argument("--hash-algorithm", default="phash")
+    parser.add_argument("--decode-mode", choices=["full", "stride"], default="full")
+    parser.add_argument("--decode-stride", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,180 @@
+"""
+A benchmark comparing per-query retrieval with batched retrieval.
+
+It loads random vectors into a scratch collection, then answers the same
+query texts once per batch size (1, 8, 32 and 128) by embedding each batch
+with embed_queries and searching it with QdrantGateway.search_batch, and
+once with one embedding call and one search request per query. Throughput
+is reported in queries per second, with the embedding and search time.
+
+By default an embedded in-memory Qdrant is used, which has no network cost
+and so understates the benefit of batching; pass --host to benchmark
+against a real server. The default embeddings model is simulated, with a
+fixed latency per API request (--embed-latency); pass --embeddings gemini
+or --embeddings openai to call a real model (API key required).
+
+Usage:
+    python scripts/benchmark_vector_search_batch.py [--host localhost] [--points 20000]
+        [--embeddings simulated|gemini|openai] [--embed-latency 0.05]
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+from qdrant_client import models
+
+from insight_engine.services.qdrant_gateway import QdrantGateway, QdrantGatewayConfig
+from insight_engine.services.vector_store_service import embed_queries, embed_query
+
+COLLECTION_NAME = "benchmark_search_batch"
+BATCH_SIZES = [1, 8, 32, 128]
+
+
+class SimulatedEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings that wait ``latency`` seconds per API request."""
+
+    latency: float = 0.05
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+
+def create_embeddings(args: argparse.Namespace) -> Embeddings:
+    """The embeddings model selected on the command line."""
+    if args.embeddings == "gemini":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+        return GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    if args.embeddings == "openai":
+        from langchain_community.embeddings import OpenAIEmbeddings
+
+        return OpenAIEmbeddings()
+    return SimulatedEmbeddings(size=args.dimension, latency=args.embed_latency)
+
+
+async def load_points(gateway: QdrantGateway, points: int, dimension: int) -> None:
+    """Creates the scratch collection and uploads random vectors."""
+    await gateway.recreate_collection(COLLECTION_NAME, dimension)
+    rng = np.random.default_rng(0)
+    for start in range(0, points, 1000):
+        count = min(1000, points - start)
+        vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+        await gateway.upsert(
+            COLLECTION_NAME,
+            models.Batch(
+                ids=list(range(start, start + count)),
+                vectors=vectors.tolist(),
+                payloads=[{"video_id": f"video-{i % 50}"} for i in range(start, start + count)],
+            ),
+        )
+
+
+async def run_sequential(
+    gateway: QdrantGateway, embeddings: Embeddings, queries: list, limit: int
+) -> tuple:
+    """
+    Embeds and searches one query at a time; returns the seconds spent
+    embedding and searching.
+    """
+    embed_seconds = search_seconds = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        vector = await embed_query(embeddings, query)
+        embed_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        await gateway.search(COLLECTION_NAME, vector, limit=limit)
+        search_seconds += time.perf_counter() - start
+    return embed_seconds, search_seconds
+
+
+async def run_batched(
+    gateway: QdrantGateway, embeddings: Embeddings, queries: list, batch_size: int, limit: int
+) -> tuple:
+    """
+    Embeds and searches ``batch_size`` queries per request; returns the
+    seconds spent embedding and searching.
+    """
+    embed_seconds = search_seconds = 0.0
+    for offset in range(0, len(queries), batch_size):
+        start = time.perf_counter()
+        vectors = await embed_queries(embeddings, queries[offset:offset + batch_size])
+        embed_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        await gateway.search_batch(COLLECTION_NAME, vectors, limit=limit)
+        search_seconds += time.perf_counter() - start
+    return embed_seconds, search_seconds
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    """Runs the benchmark and prints a throughput table."""
+    if args.host:
+        config = QdrantGatewayConfig(host=args.host, port=args.port, prefer_grpc=args.grpc)
+    else:
+        config = QdrantGatewayConfig(location=":memory:")
+    gateway = QdrantGateway(config)
+    embeddings = create_embeddings(args)
+
+    print(f"Loading {args.points} points of dimension {args.dimension}...")
+    await load_points(gateway, args.points, args.dimension)
+
+    queries = [f"what happens in scene {i} of the video?" for i in range(args.queries)]
+    # A real model's vectors may differ in size from the loaded points
+    dimension = len(await embed_query(embeddings, queries[0]))
+    if dimension != args.dimension:
+        await load_points(gateway, args.points, dimension)
+
+    # Warm up connections and caches
+    await run_batched(gateway, embeddings, queries[:8], 8, args.limit)
+
+    def report(mode: str, embed_seconds: float, search_seconds: float) -> float:
+        elapsed = embed_seconds + search_seconds
+        print(
+            f"{mode:<14} {embed_seconds:>9.3f} {search_seconds:>9.3f} {elapsed:>9.3f} "
+            f"{len(queries) / elapsed:>11.1f} {baseline / elapsed:>8.2f}x"
+        )
+        return elapsed
+
+    print(
+        f"\n{'mode':<14} {'embed s':>9} {'search s':>9} {'total s':>9} "
+        f"{'queries/s':>11} {'speedup':>9}"
+    )
+    embed_seconds, search_seconds = await run_sequential(
+        gateway, embeddings, queries, args.limit
+    )
+    baseline = embed_seconds + search_seconds
+    report("per-query", embed_seconds, search_seconds)
+    for batch_size in BATCH_SIZES:
+        report(
+            f"batch={batch_size}",
+            *await run_batched(gateway, embeddings, queries, batch_size, args.limit),
+        )
+
+    await gateway.client.delete_collection(COLLECTION_NAME)
+    await gateway.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=None, help="Qdrant host; in-memory if omitted")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--grpc", action="store_true", help="Use the gRPC transport")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--embeddings", choices=["simulated", "gemini", "openai"], default="simulated"
+    )
+    parser.add_argument(
+        "--embed-latency", type=float, default=0.05,
+        help="Seconds per request of the simulated embeddings model",
+    )
+    asyncio.run(run_benchmark(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Folds legacy per-video Qdrant collections into the shared document collection.
+
+Every collection other than the shared document collection and the frame
+collection is treated as a per-video collection named after its video ID,
+unless --collections names the sources explicitly. Points are copied with
+their vectors, tagged with video_id, and written under deterministic IDs, so
+the migration can be re-run safely. Sources are only dropped with --drop,
+after the copied points have been counted in the shared collection.
+
+Usage:
+    python scripts/migrate_video_collections.py [--collections ID ...] [--drop] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from insight_engine.config import settings
+from insight_engine.services.qdrant_gateway import close_qdrant_gateway, get_qdrant_gateway
+from insight_engine.tools.collection_migration import migrate_video_collections
+
+
+async def main(args: argparse.Namespace) -> None:
+    gateway = get_qdrant_gateway()
+    exclude = [settings.qdrant.collection, *args.exclude]
+    try:
+        if args.dry_run:
+            sources = args.collections or await gateway.list_collections()
+            skipped = set(exclude) | {args.target}
+            print(f"Would migrate into '{args.target}':")
+            for name in sources:
+                if name not in skipped:
+                    count = await gateway.count(name)
+                    print(f"  {name:<40} {count:>10} points")
+            return
+
+        report = await migrate_video_collections(
+            gateway,
+            args.target,
+            source_collections=args.collections,
+            exclude=exclude,
+            drop_sources=args.drop,
+            batch_size=args.batch_size,
+        )
+        for name, count in report.migrated.items():
+            status = "dropped" if name in report.dropped else "kept"
+            print(f"  {name:<40} {count:>10} points  ({status})")
+        print(
+            f"Migrated {report.total_points} points from "
+            f"{len(report.migrated)} collections into '{args.target}'."
+        )
+    finally:
+        await close_qdrant_gateway()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--target",
+        default=settings.qdrant.documents_collection,
+        help="The shared document collection.",
+    )
+    parser.add_argument(
+        "--collections", nargs="+", default=None,
+        help="Per-video collections to migrate (default: all others).",
+    )
+    parser.add_argument(
+        "--exclude", nargs="+", default=[],
+        help="Further collections that are not per-video collections.",
+    )
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--drop", action="store_true",
+        help="Delete each source collection after a verified copy.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="List the collections that would be migrated.",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -1,6 +1,8 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List
+from langchain_core.documents import Document
 from langchain.schema.runnable import Runnable
+from insight_engine.services.vector_store_service import embed_queries
 from insight_engine.tools.vector_store import VectorStore
 from .rag_utils import create_rag_chain, RAGInput
 from langchain_community.vectorstores import Qdrant
@@ -13,23 +15,31 @@ class SummarizationAgent:
     to produce context-grounded summaries.
     """
 
-    def __init__(self, vector_store: VectorStore, collection_name: str):
+    def __init__(self, vector_store: VectorStore, video_id: str):
         """
         Initializes the SummarizationAgent.
 
         Args:
             vector_store: An instance of the VectorStore service.
-            collection_name: The name of the collection to use.
+            video_id: The video to summarize. Retrieval is a filtered search of
+                      the shared document collection.
         """
         self.vector_store = vector_store
+        self.video_id = video_id
+        self.collection_name = vector_store.collection_name
+        self.embeddings = OpenAIEmbeddings()
         
-        # 1. Create a retriever from the VectorStore instance
+        # 1. Create a retriever from the VectorStore instance. Retrieval goes
+        # through the pooled async client; LangChain still requires a sync one.
         qdrant = Qdrant(
-            client=self.vector_store.client,
-            collection_name=collection_name,
-            embeddings=OpenAIEmbeddings(),
+            client=self.vector_store.gateway.sync_client,
+            async_client=self.vector_store.client,
+            collection_name=self.collection_name,
+            embeddings=self.embeddings,
+        )
+        retriever = qdrant.as_retriever(
+            search_kwargs={"filter": vector_store.video_filter(video_id)}
         )
-        retriever = qdrant.as_retriever()
 
         # 2. Instantiate the language model
         model = ChatGoogleGenerativeAI(model="gemini-pro")
@@ -54,3 +64,47 @@ class SummarizationAgent:
             "question": rag_input.query
         }):
             yield chunk
+
+    async def retrieve_batch(self, queries: List[str], k: int = 4) -> List[List[Document]]:
+        """
+        Retrieves documents for several queries with batched query
+        embeddings and one batched vector search.
+
+        Args:
+            queries: The query texts.
+            k: The number of documents per query, matching the retriever default.
+
+        Returns:
+            One list of documents per query, in input order.
+        """
+        query_vectors = await embed_queries(self.embeddings, queries)
+        batch_results = await self.vector_store.search_batch(
+            self.collection_name, query_vectors, limit=k, video_id=self.video_id
+        )
+        return [
+            [
+                Document(
+                    page_content=point.payload.get("page_content", ""),
+                    metadata=point.payload.get("metadata") or {},
+                )
+                for point in points
+            ]
+            for points in batch_results
+        ]
+
+    async def generate_summaries(self, rag_inputs: List[RAGInput]) -> List[str]:
+        """
+        Answers several queries, batching retrieval and the LLM calls.
+
+        Args:
+            rag_inputs: The queries to answer.
+
+        Returns:
+            One summary per input, in input order.
+        """
+        queries = [rag_input.query for rag_input in rag_inputs]
+        retrieved = await self.retrieve_batch(queries)
+        return await self.rag_chain.abatch([
+            {"context": docs, "question": query}
+            for docs, query in zip(retrieved, queries)
+        ])
@@ -17,6 +17,42 @@ class PreprocessingSettings(BaseSettings):
     target_height: int = 224
     cpu_threshold: int = 85
     throttle_delay: float = 0.5
+    # Keyframe extraction processes; 1 decodes sequentially on one core
+    extraction_workers: int = 1
+    segments_per_worker: int = 2
+    # Decode strategy: full, stride (grab-only skipping), keyframes (I-frames
+    # via PyAV), pyav (every frame via PyAV, exporting codec motion vectors)
+    # or lowres (ffmpeg scale filter); a zero size means target size. The
+    # stride only applies to the stride and lowres modes
+    decode_mode: str = "full"
+    decode_stride: int = 1
+    decode_width: int = 0
+    decode_height: int = 0
+    # Keyframes buffered between the decode thread and streaming consumers
+    keyframe_queue_size: int = 8
+    # Frame slots of the shared-memory ring feeding inference processes
+    frame_ring_slots: int = 16
+    # Frame differencing for motion features, used without codec motion
+    # vectors: thumbnail side and grey level change counted as motion
+    motion_size: int = 64
+    motion_pixel_threshold: int = 16
+
+
+class AdmissionSettings(BaseSettings):
+    # Shared by the preprocessing, inference and clip workers of a process
+    cpu_threshold: float = 85.0
+    memory_threshold: float = 90.0
+    sample_interval: float = 0.5
+    # Concurrent CPU-bound jobs; 0 means one per CPU core
+    max_tokens: int = 0
+    # Longest pause for resource pressure per admitted batch
+    max_wait: float = 0.5
+
+
+class ClipWorkerSettings(BaseSettings):
+    # Clip jobs run at once by a worker; the Pub/Sub subscriber's flow
+    # control leases no more messages than this
+    max_concurrent_jobs: int = 4
 
 
 class InferenceSettings(BaseSettings):
@@ -24,14 +60,60 @@ class InferenceSettings(BaseSettings):
     # The model name will be used by the ultralytics library to
     # automatically download and manage the model.
     model_name: str = "yolov8n.pt"
+    # Batched inference: the batch size adapts between these bounds so one
+    # forward pass stays within the latency target
+    min_batch_size: int = 1
+    max_batch_size: int = 32
+    initial_batch_size: int = 8
+    batch_latency_target_ms: float = 250.0
+    # "ultralytics" or "onnxruntime"; the ONNX backend serves the production
+    # model's registry artifact (default: the quantized export)
+    backend: str = "ultralytics"
+    onnx_model_name: Optional[str] = None
+    onnx_artifact: str = "quantized"
+    # Sessions serving concurrent requests, and threads per session; 0 intra-op
+    # threads divides the CPU cores evenly between the sessions
+    session_pool_size: int = 2
+    intra_op_threads: int = 0
+    inter_op_threads: int = 1
+    input_size: int = 640
+    confidence_threshold: float = 0.25
+    iou_threshold: float = 0.45
+
+
+class EmbeddingSettings(BaseSettings):
+    # Frame embeddings from the registry's ONNX image encoder (CLIP-style).
+    # Opt-in: needs a production model registered under ``model_name``;
+    # disabled, frames are stored with zero vectors
+    enabled: bool = False
+    model_name: str = "clip-image-encoder"
+    artifact: str = "quantized"
+    input_size: int = 224
+    batch_size: int = 32
+    intra_op_threads: int = 0
+    inter_op_threads: int = 1
+    # Embeddings kept by frame content hash, so duplicate frames across
+    # videos are encoded once
+    cache_entries: int = 50000
 
 
 class QdrantSettings(BaseSettings):
     host: str = "localhost"
     port: int = 6333
     collection: str = "video_frames"
+    # Transcript chunks of all videos, filtered by the indexed video_id payload
+    documents_collection: str = "video_documents"
     embedding_dimension: int = 512
     api_key: Optional[str] = None
+    grpc_port: int = 6334
+    prefer_grpc: bool = False
+    timeout: float = 10.0
+    pool_size: int = 8
+    max_concurrent_requests: int = 64
+    # Vector quantization of the frame collection: "none", "scalar" (int8)
+    # or "product"; quantized vectors are kept in RAM, originals on disk
+    quantization: str = "scalar"
+    quantization_always_ram: bool = True
 
     @computed_field
     @property
@@ -60,6 +142,10 @@ class LearnedPolicyConfig(BaseModel):
 class SafetyGuardsConfig(BaseModel):
     enabled: bool = True
     latency_threshold_ms: float = 5.0
+    # Decision latency statistic held under the threshold: "mean", "p50",
+    # "p95" or "p99", over the most recent latency_window_size decisions
+    latency_statistic: str = "mean"
+    latency_window_size: int = 100
     accuracy_drop_threshold: float = 0.10
     monitoring_window_seconds: int = 60
     cooldown_period_minutes: int = 10
@@ -189,7 +275,10 @@ class Settings(BaseSettings):
     security: SecuritySettings = Field(default_factory=SecuritySettings)
     monitoring: MonitoringSettings = Field(default_factory=MonitoringSettings)
     preprocessing: PreprocessingSettings = Field(default_factory=PreprocessingSettings)
+    admission: AdmissionSettings = Field(default_factory=AdmissionSettings)
+    clip_worker: ClipWorkerSettings = Field(default_factory=ClipWorkerSettings)
     inference: InferenceSettings = Field(default_factory=InferenceSettings)
+    embedding: EmbeddingSettings = Field(default_factory=EmbeddingSettings)
     qdrant: QdrantSettings = Field(default_factory=QdrantSettings)
     active_learning: ActiveLearningSettings = Field(
         default_factory=ActiveLearningSettings
@@ -166,6 +166,10 @@ class ConfigurationValidator:
             self.warnings.append(
                 "Very high embedding dimension may impact performance"
             )
+        if settings.qdrant.quantization not in ("none", "scalar", "product"):
+            self.errors.append(
+                f"Unknown Qdrant quantization: {settings.qdrant.quantization}"
+            )
     
     def _validate_external_services(self) -> None:
         """Validate external service configurations."""
@@ -286,7 +290,80 @@ class ConfigurationValidator:
             self.errors.append("Throttle delay cannot be negative")
         elif settings.preprocessing.throttle_delay > 10:
             self.warnings.append("Very high throttle delay may impact performance")
-        
+
+        if settings.preprocessing.extraction_workers < 1:
+            self.errors.append("Extraction workers must be at least 1")
+        elif settings.preprocessing.extraction_workers > (os.cpu_count() or 1):
+            self.warnings.append("More extraction workers than CPU cores")
+
+        if settings.preprocessing.decode_mode not in ("full", "stride", "keyframes", "pyav", "lowres"):
+            self.errors.append(
+                f"Unknown decode mode: {settings.preprocessing.decode_mode}"
+            )
+        if settings.preprocessing.decode_stride < 1:
+            self.errors.append("Decode stride must be at least 1")
+        if settings.preprocessing.keyframe_queue_size < 1:
+            self.errors.append("Keyframe queue size must be at least 1")
+        if settings.preprocessing.frame_ring_slots < 1:
+            self.errors.append("Frame ring slots must be at least 1")
+        if settings.preprocessing.motion_size < 8:
+            self.errors.append("Motion thumbnail size must be at least 8")
+        if not 0 <= settings.preprocessing.motion_pixel_threshold < 255:
+            self.errors.append("Motion pixel threshold must be between 0 and 254")
+
+        # Admission control settings
+        if not (0 < settings.admission.cpu_threshold <= 100):
+            self.errors.append(
+                f"Admission CPU threshold must be between 0 and 100, got: {settings.admission.cpu_threshold}"
+            )
+        if not (0 < settings.admission.memory_threshold <= 100):
+            self.errors.append(
+                f"Admission memory threshold must be between 0 and 100, got: {settings.admission.memory_threshold}"
+            )
+        if settings.admission.sample_interval <= 0:
+            self.errors.append("Admission sample interval must be positive")
+        if settings.admission.max_tokens < 0:
+            self.errors.append("Admission max tokens cannot be negative")
+        if settings.admission.max_wait < 0:
+            self.errors.append("Admission max wait cannot be negative")
+        
+        # Clip worker settings
+        if settings.clip_worker.max_concurrent_jobs < 1:
+            self.errors.append("Clip worker concurrent jobs must be at least 1")
+
+        # Inference batching settings
+        if not (1 <= settings.inference.min_batch_size <= settings.inference.max_batch_size):
+            self.errors.append("Inference batch sizes must satisfy 1 <= min <= max")
+        if settings.inference.batch_latency_target_ms <= 0:
+            self.errors.append("Inference batch latency target must be positive")
+        if settings.inference.backend not in ("ultralytics", "onnxruntime"):
+            self.errors.append(f"Unknown inference backend: {settings.inference.backend}")
+        if settings.inference.session_pool_size < 1:
+            self.errors.append("Inference session pool size must be at least 1")
+        if settings.inference.intra_op_threads < 0 or settings.inference.inter_op_threads < 0:
+            self.errors.append("Inference thread counts cannot be negative")
+
+        # Frame embedding settings
+        if settings.embedding.batch_size < 1:
+            self.errors.append("Embedding batch size must be at least 1")
+        if settings.embedding.input_size < 1:
+            self.errors.append("Embedding input size must be positive")
+        if settings.embedding.cache_entries < 0:
+            self.errors.append("Embedding cache entries cannot be negative")
+        if settings.embedding.intra_op_threads < 0 or settings.embedding.inter_op_threads < 0:
+            self.errors.append("Embedding thread counts cannot be negative")
+
+        # Sampling policy safety guards
+        safety_guards = settings.sampling.safety_guards
+        if safety_guards.latency_threshold_ms <= 0:
+            self.errors.append("Safety guard latency threshold must be positive")
+        if safety_guards.latency_statistic not in ("mean", "p50", "p95", "p99"):
+            self.errors.append(
+                f"Unknown safety guard latency statistic: {safety_guards.latency_statistic}"
+            )
+        if safety_guards.latency_window_size < 2:
+            self.errors.append("Safety guard latency window must hold at least 2 decisions")
+
         # Active learning settings
         if not (0 < settings.active_learning.low_confidence_threshold < 1):
             self.errors.append(
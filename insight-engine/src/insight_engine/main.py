@@ -40,6 +40,7 @@ from insight_engine.services.connection_pool_service import (
     setup_connection_pools,
     shutdown_connection_pools
 )
+from insight_engine.services.qdrant_gateway import close_qdrant_gateway
 
 # Setup structured logging using configuration
 setup_logging()
@@ -285,6 +286,13 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error closing cache services: {e}")
     
+    # Close the shared Qdrant gateway
+    try:
+        await close_qdrant_gateway()
+        logger.info("Qdrant gateway closed")
+    except Exception as e:
+        logger.error(f"Error closing Qdrant gateway: {e}")
+    
     shutdown_duration = (datetime.utcnow() - shutdown_start).total_seconds()
     logger.info(
         "Insight Engine API shutdown complete",
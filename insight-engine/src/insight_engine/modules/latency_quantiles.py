@@ -0,0 +1,105 @@
+"""
+Streaming latency percentiles over a sliding window.
+
+``StreamingQuantiles`` is a windowed, log-bucketed histogram in the manner
+of an HDR histogram: a sample increments the bucket covering its value to
+within a relative ``precision``, and the sample leaving the window
+decrements its own bucket. Recording is O(1) whatever the window size;
+percentiles are read off the cumulative bucket counts when asked for.
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+class StreamingQuantiles:
+    """Percentiles and the mean of the most recent samples."""
+
+    def __init__(
+        self,
+        window_size: int = 1000,
+        min_value: float = 1e-6,
+        max_value: float = 60.0,
+        precision: float = 0.02,
+    ):
+        """
+        Args:
+            window_size: The number of most recent samples summarized.
+            min_value: The smallest distinguished value; smaller samples
+                       share the first bucket.
+            max_value: The largest distinguished value; larger samples
+                       share the last bucket.
+            precision: The relative width of a bucket, bounding the relative
+                       error of reported percentiles.
+        """
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1.")
+        if not 0 < min_value < max_value:
+            raise ValueError("min_value must be positive and below max_value.")
+        if precision <= 0:
+            raise ValueError("precision must be positive.")
+        self.window_size = window_size
+        self._log_min = math.log(min_value)
+        self._log_base = math.log1p(precision)
+        self._bucket_count = int(math.ceil((math.log(max_value) - self._log_min) / self._log_base)) + 1
+        # Geometric midpoints, reported as the value of each bucket
+        self._values = np.exp(self._log_min + (np.arange(self._bucket_count) + 0.5) * self._log_base)
+        self._counts = np.zeros(self._bucket_count, dtype=np.int64)
+        self._window = deque()
+        self._sum = 0.0
+
+    def _bucket(self, value: float) -> int:
+        if value <= 0:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._log_base)
+        return min(max(index, 0), self._bucket_count - 1)
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def record(self, value: float) -> Optional[float]:
+        """
+        Adds a sample.
+
+        Returns:
+            The sample that left the window, if it was full.
+        """
+        evicted = None
+        if len(self._window) == self.window_size:
+            evicted = self._window.popleft()
+            self._counts[self._bucket(evicted)] -= 1
+            self._sum -= evicted
+        self._window.append(value)
+        self._counts[self._bucket(value)] += 1
+        self._sum += value
+        return evicted
+
+    @property
+    def mean(self) -> float:
+        """The mean of the window, or NaN when it is empty."""
+        if not self._window:
+            return math.nan
+        return self._sum / len(self._window)
+
+    def quantile(self, q: float) -> float:
+        """The q-quantile (0 < q <= 1) of the window, or NaN when it is empty."""
+        return self.quantiles([q])[q]
+
+    def quantiles(self, qs: Sequence[float]) -> Dict[float, float]:
+        """Several quantiles of the window, from one pass over the buckets."""
+        count = len(self._window)
+        if count == 0:
+            return {q: math.nan for q in qs}
+        cumulative = np.cumsum(self._counts)
+        ranks = [max(1, math.ceil(q * count)) for q in qs]
+        indices = np.searchsorted(cumulative, ranks)
+        return {q: float(self._values[index]) for q, index in zip(qs, indices)}
+
+    def clear(self) -> None:
+        """Forgets every sample."""
+        self._window.clear()
+        self._counts[:] = 0
+        self._sum = 0.0
@@ -1,19 +1,58 @@
+import math
 import time
 import logging
 from collections import deque
 from typing import Any, Dict, Optional
 
+from prometheus_client import Counter, Gauge
+
+from .latency_quantiles import StreamingQuantiles
 from .sampling_policy import SamplingPolicy
 
 logger = logging.getLogger(__name__)
 
+# Prometheus metrics
+POLICY_DECISION_LATENCY = Gauge(
+    'sampling_policy_decision_latency_seconds',
+    'Percentiles of recent sampling policy decision latencies',
+    ['stream', 'quantile']
+)
+
+POLICY_FALLBACKS = Counter(
+    'sampling_policy_fallbacks_total',
+    'Sampling policy fallback activations',
+    ['stream']
+)
+
+# Latency statistics a guard can enforce, with the quantile they stand for
+LATENCY_STATISTICS = {"mean": None, "p50": 0.5, "p95": 0.95, "p99": 0.99}
+
 
 class PerformanceMonitor:
-    """Monitors the latency of policy decisions."""
+    """
+    Monitors the latency of policy decisions.
 
-    def __init__(self, latency_threshold_ms: float, window_size: int = 100):
+    Latencies go into a streaming quantile estimator, so recording a decision
+    is O(1). The enforced statistic is either the mean or a percentile of
+    the window; a percentile breach is decided exactly, by counting the
+    decisions of the window that exceeded the threshold.
+    """
+
+    def __init__(
+        self,
+        latency_threshold_ms: float,
+        window_size: int = 100,
+        statistic: str = "mean",
+    ):
+        if statistic not in LATENCY_STATISTICS:
+            raise ValueError(
+                f"Unknown latency statistic '{statistic}', expected one of "
+                f"{', '.join(LATENCY_STATISTICS)}."
+            )
         self.latency_threshold_s = latency_threshold_ms / 1000.0
-        self.latencies = deque(maxlen=window_size)
+        self.statistic = statistic
+        self.latencies = StreamingQuantiles(window_size)
+        self._over_threshold = 0  # Decisions of the window above the threshold
         self._start_time = -1.0
 
     def start(self):
@@ -24,19 +63,46 @@ class PerformanceMonitor:
         """Stops the timer and records the latency."""
         if self._start_time > 0:
             latency = time.perf_counter() - self._start_time
-            self.latencies.append(latency)
+            self.record(latency)
             self._start_time = -1.0
 
+    def record(self, latency: float):
+        """Records the latency of one decision, in seconds."""
+        evicted = self.latencies.record(latency)
+        if latency > self.latency_threshold_s:
+            self._over_threshold += 1
+        if evicted is not None and evicted > self.latency_threshold_s:
+            self._over_threshold -= 1
+
+    def reset(self):
+        """Forgets the recorded latencies."""
+        self.latencies.clear()
+        self._over_threshold = 0
+
+    def percentiles(self) -> Dict[str, float]:
+        """The p50, p95 and p99 latencies of the window, in seconds."""
+        values = self.latencies.quantiles([0.5, 0.95, 0.99])
+        return {"p50": values[0.5], "p95": values[0.95], "p99": values[0.99]}
+
     def is_breached(self) -> bool:
-        """Checks if the average latency exceeds the threshold."""
+        """Checks if the monitored latency statistic exceeds the threshold."""
+        count = len(self.latencies)
         # Require the window to be at least half full to make a decision
-        if len(self.latencies) < self.latencies.maxlen / 2:
+        if count < self.latencies.window_size / 2:
             return False
-        avg_latency = sum(self.latencies) / len(self.latencies)
-        if avg_latency > self.latency_threshold_s:
+        q = LATENCY_STATISTICS[self.statistic]
+        if q is None:
+            breached = self.latencies.mean > self.latency_threshold_s
+            observed = self.latencies.mean
+        else:
+            # The q-quantile exceeds the threshold when fewer than ceil(q * n)
+            # decisions stayed within it
+            breached = count - self._over_threshold < math.ceil(q * count)
+            observed = self.latencies.quantile(q) if breached else 0.0
+        if breached:
             logger.warning(
-                f"Performance breach! Average latency "
-                f"({avg_latency*1000:.2f}ms) > threshold "
+                f"Performance breach! {self.statistic} latency "
+                f"({observed*1000:.2f}ms) > threshold "
                 f"({self.latency_threshold_s*1000:.2f}ms)."
             )
             return True
@@ -96,6 +162,11 @@ class SafetyGuard(SamplingPolicy):
     """
     A wrapper policy that enforces safety guarantees (performance, accuracy)
     and falls back to a safe heuristic if the primary policy fails.
+
+    The latency guarantee applies to the mean decision latency by default,
+    or to a percentile with ``latency_statistic`` ("p50", "p95" or "p99").
+    The p50/p95/p99 decision latencies are exported to Prometheus per
+    ``stream`` every ``metrics_interval`` decisions of the primary policy.
     """
 
     def __init__(
@@ -105,10 +176,19 @@ class SafetyGuard(SamplingPolicy):
         latency_threshold_ms: float,
         accuracy_drop_threshold: float,
         cooldown_period_minutes: int,
+        latency_statistic: str = "mean",
+        latency_window_size: int = 100,
+        stream: str = "default",
+        metrics_interval: int = 100,
     ):
         self.primary_policy = primary_policy
         self.fallback_policy = fallback_policy
-        self.perf_monitor = PerformanceMonitor(latency_threshold_ms)
+        self.perf_monitor = PerformanceMonitor(
+            latency_threshold_ms, window_size=latency_window_size, statistic=latency_statistic
+        )
+        self.stream = stream
+        self.metrics_interval = max(1, metrics_interval)
+        self._decisions = 0
         # The accuracy monitor needs to be shared or accessed from the pipeline service
         self.accuracy_monitor: Optional[AccuracyMonitor] = None
 
@@ -121,11 +201,20 @@ class SafetyGuard(SamplingPolicy):
         )
         logger.info(f"Fallback policy is {type(fallback_policy).__name__}.")
         logger.info(f"Cooldown period is {cooldown_period_minutes} minutes.")
+        logger.info(
+            f"Enforcing {latency_statistic} decision latency <= {latency_threshold_ms}ms."
+        )
 
     def set_accuracy_monitor(self, monitor: AccuracyMonitor):
         """Injects the shared accuracy monitor."""
         self.accuracy_monitor = monitor
 
+    def export_metrics(self):
+        """Publishes the decision latency percentiles of the stream."""
+        for name, value in self.perf_monitor.percentiles().items():
+            quantile = str(int(name[1:]) / 100)
+            POLICY_DECISION_LATENCY.labels(stream=self.stream, quantile=quantile).set(value)
+
     def _check_for_breach(self) -> bool:
         """Checks all monitors for a breach condition."""
         if self.perf_monitor.is_breached():
@@ -143,6 +232,8 @@ class SafetyGuard(SamplingPolicy):
             )
             self.is_fallback_active = True
             self.fallback_activation_time = time.time()
+            POLICY_FALLBACKS.labels(stream=self.stream).inc()
+            self.export_metrics()
 
     def _try_recover(self):
         """Checks if the cooldown period has passed, allowing a return to the primary policy."""
@@ -153,7 +244,7 @@ class SafetyGuard(SamplingPolicy):
             self.is_fallback_active = False
             self.fallback_activation_time = -1.0
             # Reset monitors to give the primary policy a clean slate
-            self.perf_monitor.latencies.clear()
+            self.perf_monitor.reset()
             if self.accuracy_monitor:
                 self.accuracy_monitor.candidate_metrics.clear()
 
@@ -182,6 +273,10 @@ class SafetyGuard(SamplingPolicy):
         finally:
             self.perf_monitor.stop()
 
+        self._decisions += 1
+        if self._decisions % self.metrics_interval == 0:
+            self.export_metrics()
+
         if self._check_for_breach():
             self._activate_fallback()
             # On the frame that triggers the breach, use the fallback decision
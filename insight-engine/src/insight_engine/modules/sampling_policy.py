@@ -1,9 +1,15 @@
 import abc
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
 
 import numpy as np
-import onnxruntime
+
+from insight_engine.services.local_cache import LocalCache
+
+try:
+    import onnxruntime
+except ImportError:  # pragma: no cover - optional dependency
+    onnxruntime = None
 
 # A placeholder for a more sophisticated logging setup
 import logging
@@ -32,6 +38,13 @@ class SamplingPolicy(abc.ABC):
         """
         raise NotImplementedError
 
+    def should_process_batch(self, features_list: Sequence[Dict[str, Any]]) -> List[bool]:
+        """
+        Decides for a window of consecutive frames at once. Returns the same
+        decisions as calling ``should_process`` on each frame in order.
+        """
+        return [self.should_process(features) for features in features_list]
+
 
 class FixedRateSamplingPolicy(SamplingPolicy):
     """
@@ -105,6 +118,13 @@ class LearnedSamplingPolicy(SamplingPolicy):
     An intelligent policy that uses a lightweight ML model to decide on frame processing.
     Implements a tiered analysis to balance performance and accuracy.
 
+    ``should_process_batch`` amortizes the expensive tier over a window of
+    frames: the feature extractor runs once over every frame that can reach
+    the semantic check, and the policy model scores all embedding diffs
+    against the current reference in one call. Model inputs are written
+    into reusable buffers, and embeddings are cached by the frames'
+    perceptual hash ('frame_hash' feature).
+
     Design Reference: learned_sampling_design.md
     Assumption: A3.1 - Lightweight models can meet performance budget.
     """
@@ -115,6 +135,7 @@ class LearnedSamplingPolicy(SamplingPolicy):
         feature_extractor_model_path: str,
         motion_threshold: float = 0.1,
         time_threshold_seconds: float = 2.0,
+        embedding_cache_size: int = 1024,
     ):
         logger.info("Initializing LearnedSamplingPolicy...")
         self.policy_session = self._load_model(policy_model_path)
@@ -124,11 +145,28 @@ class LearnedSamplingPolicy(SamplingPolicy):
         self.last_processed_embedding = None
         self.last_processed_time = -1.0
 
+        # Input metadata is read once; sessions with a fixed batch dimension
+        # of 1 are run row by row
+        extractor_input = self.feature_extractor_session.get_inputs()[0]
+        self._extractor_input_name = extractor_input.name
+        self._extractor_batched = extractor_input.shape[0] != 1
+        policy_input = self.policy_session.get_inputs()[0]
+        self._policy_input_name = policy_input.name
+        self._policy_batched = policy_input.shape[0] != 1
+        # Reusable model inputs, grown to the largest window seen
+        self._extractor_buffer: Optional[np.ndarray] = None
+        self._policy_buffer: Optional[np.ndarray] = None
+        self.embedding_cache = LocalCache(max_entries=embedding_cache_size)
+
         self._warm_up_models()
         logger.info("LearnedSamplingPolicy initialized and models warmed up.")
 
-    def _load_model(self, model_path: str) -> onnxruntime.InferenceSession:
+    def _load_model(self, model_path: str) -> "onnxruntime.InferenceSession":
         """Loads an ONNX model and returns an inference session."""
+        if onnxruntime is None:
+            raise ImportError(
+                "LearnedSamplingPolicy requires onnxruntime (pip install onnxruntime)"
+            )
         path = Path(model_path)
         if not path.is_file():
             logger.error(f"Model file not found at path: {model_path}")
@@ -161,54 +199,184 @@ class LearnedSamplingPolicy(SamplingPolicy):
             # Depending on policy, we might want to raise this
             raise
 
+    @staticmethod
+    def _buffer(buffer: Optional[np.ndarray], shape: tuple, dtype: Any) -> np.ndarray:
+        """A prefix view of ``buffer`` with ``shape``, reallocating if it is too small."""
+        if (
+            buffer is None
+            or buffer.shape[0] < shape[0]
+            or buffer.shape[1:] != shape[1:]
+            or buffer.dtype != dtype
+        ):
+            buffer = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def _cache_key(self, features: Dict[str, Any]) -> Optional[str]:
+        frame_hash = features.get("frame_hash")
+        return None if frame_hash is None else str(frame_hash)
+
+    def _extract_embedding(self, features: Dict[str, Any]) -> np.ndarray:
+        """Embeds one frame, reusing the embedding of a frame with the same hash."""
+        key = self._cache_key(features)
+        if key is not None:
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                return cached
+        embedding = self.feature_extractor_session.run(
+            None, {self._extractor_input_name: features["frame_data"]}
+        )[0]
+        if key is not None:
+            self.embedding_cache.set(key, embedding, size=embedding.nbytes)
+        return embedding
+
+    def _extract_embeddings(
+        self, features_list: Sequence[Dict[str, Any]], indices: List[int]
+    ) -> Dict[int, np.ndarray]:
+        """
+        Embeds the frames at ``indices`` with one feature extractor call.
+        Cached frames and repeats of a hash within the window are not sent
+        to the extractor. Each frame's 'frame_data' holds a batch of one;
+        the embeddings keep that leading dimension, as in the per-frame path.
+        """
+        embeddings: Dict[int, np.ndarray] = {}
+        missing = []
+        owners: Dict[str, int] = {}  # Hash -> the frame embedded for it
+        repeats = []  # (frame, frame embedded for the same hash)
+        for index in indices:
+            key = self._cache_key(features_list[index])
+            cached = self.embedding_cache.get(key) if key is not None else None
+            if cached is not None:
+                embeddings[index] = cached
+            elif key is not None and key in owners:
+                repeats.append((index, owners[key]))
+            else:
+                missing.append(index)
+                if key is not None:
+                    owners[key] = index
+
+        if not self._extractor_batched or len(missing) <= 1:
+            for index in missing:
+                embeddings[index] = self._extract_embedding(features_list[index])
+        else:
+            self._extract_window(features_list, missing, embeddings)
+
+        for index, owner in repeats:
+            embeddings[index] = embeddings[owner]
+        return embeddings
+
+    def _extract_window(
+        self,
+        features_list: Sequence[Dict[str, Any]],
+        missing: List[int],
+        embeddings: Dict[int, np.ndarray],
+    ) -> None:
+        """Embeds the frames at ``missing`` in one feature extractor call."""
+        frames = [np.asarray(features_list[index]["frame_data"]) for index in missing]
+        self._extractor_buffer = self._buffer(
+            self._extractor_buffer, (len(frames), *frames[0].shape[1:]), frames[0].dtype
+        )
+        batch = np.concatenate(frames, axis=0, out=self._extractor_buffer[:len(frames)])
+        output = self.feature_extractor_session.run(
+            None, {self._extractor_input_name: batch}
+        )[0]
+        for row, index in enumerate(missing):
+            embedding = output[row:row + 1].copy()
+            embeddings[index] = embedding
+            key = self._cache_key(features_list[index])
+            if key is not None:
+                self.embedding_cache.set(key, embedding, size=embedding.nbytes)
+
+    def _score_policy(self, policy_input: np.ndarray) -> np.ndarray:
+        """Runs the policy model on one input row per frame; returns the probabilities."""
+        if self._policy_batched:
+            logits = self.policy_session.run(
+                None, {self._policy_input_name: policy_input}
+            )[0]
+        else:
+            logits = np.concatenate([
+                self.policy_session.run(
+                    None, {self._policy_input_name: policy_input[row:row + 1]}
+                )[0]
+                for row in range(len(policy_input))
+            ])
+        logits = np.asarray(logits).reshape(len(policy_input), -1)[:, 0]
+        # Assuming output is a single logit, apply sigmoid
+        return 1 / (1 + np.exp(-logits))
+
     def _has_significant_motion(self, features: Dict[str, Any]) -> bool:
         """Tier 1 Check: Analyzes motion vectors."""
         # Placeholder for actual motion vector analysis
         motion_magnitude = features.get("motion_magnitude", 0.0)
         return motion_magnitude > self.motion_threshold
 
+    def _is_due_for_semantic_check(self, timestamp: float) -> bool:
+        return (
+            self.last_processed_time < 0
+            or (timestamp - self.last_processed_time) >= self.time_threshold_seconds
+        )
+
     def _has_significant_semantic_change(self, features: Dict[str, Any]) -> bool:
         """Tier 2 Check: Runs feature extractor and policy model."""
         # This is the expensive path
-        current_frame = features.get("frame_data")
-        if current_frame is None:
+        if features.get("frame_data") is None:
             return False  # Cannot process without frame data
 
         # 1. Extract embedding for the current frame
-        extractor_input_name = self.feature_extractor_session.get_inputs()[0].name
-        current_embedding = self.feature_extractor_session.run(
-            None, {extractor_input_name: current_frame}
-        )[0]
+        current_embedding = self._extract_embedding(features)
 
         if self.last_processed_embedding is None:
             self.last_processed_embedding = current_embedding
             return True  # Always process the first frame with an embedding
 
         # 2. Calculate difference and prepare policy model input
-        embedding_diff = current_embedding - self.last_processed_embedding
-        time_since_last = features.get("timestamp", 0) - self.last_processed_time
-
         # The exact shape and composition of the input depends on the trained model
-        policy_input = np.concatenate(
-            [embedding_diff.flatten(), [time_since_last]]
-        ).astype(np.float32)
-        policy_input = np.expand_dims(policy_input, axis=0)  # Add batch dimension
+        diff = current_embedding.reshape(-1) - self.last_processed_embedding.reshape(-1)
+        self._policy_buffer = self._buffer(
+            self._policy_buffer, (1, diff.size + 1), np.float32
+        )
+        policy_input = self._policy_buffer[:1]
+        policy_input[0, :-1] = diff
+        policy_input[0, -1] = features.get("timestamp", 0) - self.last_processed_time
 
         # 3. Run the policy model
-        policy_input_name = self.policy_session.get_inputs()[0].name
-        decision_logit = self.policy_session.run(
-            None, {policy_input_name: policy_input}
-        )[0]
-
-        # Assuming output is a single logit, apply sigmoid
-        decision_prob = 1 / (1 + np.exp(-decision_logit))
-
-        if decision_prob > 0.5:
+        if self._score_policy(policy_input)[0] > 0.5:
             self.last_processed_embedding = current_embedding
             return True
 
         return False
 
+    def _score_window(
+        self,
+        features_list: Sequence[Dict[str, Any]],
+        embeddings: Dict[int, np.ndarray],
+        start: int,
+    ) -> Dict[int, float]:
+        """
+        Scores every frame from ``start`` up to the next motion frame against
+        the current reference embedding and time, with one policy call.
+        The scores stay valid until a frame is processed.
+        """
+        indices = []
+        for index in range(start, len(features_list)):
+            features = features_list[index]
+            timestamp = features.get("timestamp")
+            if timestamp is None:
+                continue
+            if self._has_significant_motion(features):
+                break
+            if index in embeddings and self._is_due_for_semantic_check(timestamp):
+                indices.append(index)
+
+        reference = self.last_processed_embedding.reshape(-1)
+        self._policy_buffer = self._buffer(
+            self._policy_buffer, (len(indices), reference.size + 1), np.float32
+        )
+        policy_input = self._policy_buffer[:len(indices)]
+        for row, index in enumerate(indices):
+            np.subtract(embeddings[index].reshape(-1), reference, out=policy_input[row, :-1])
+            policy_input[row, -1] = features_list[index]["timestamp"] - self.last_processed_time
+        return dict(zip(indices, self._score_policy(policy_input).tolist()))
+
     def should_process(self, features: Dict[str, Any]) -> bool:
         """
         Applies the tiered analysis to decide if a frame should be processed.
@@ -231,12 +399,73 @@ class LearnedSamplingPolicy(SamplingPolicy):
             return True
 
         # Tier 2: If no motion, check if enough time has passed to warrant a semantic check (expensive)
-        if (
-            self.last_processed_time < 0
-            or (current_time - self.last_processed_time) >= self.time_threshold_seconds
-        ):
+        if self._is_due_for_semantic_check(current_time):
             if self._has_significant_semantic_change(features):
                 self.last_processed_time = current_time
                 return True
 
         return False
+
+    def should_process_batch(self, features_list: Sequence[Dict[str, Any]]) -> List[bool]:
+        """
+        Applies the tiered analysis to a window of consecutive frames.
+
+        Frames are decided in order, exactly as by ``should_process``, but
+        the models run on the window: one extractor call embeds every frame
+        that can still reach the semantic check (the time since the last
+        processed frame only shrinks as frames are processed), and one
+        policy call scores the frames against the current reference. Only
+        when a frame is processed, and the reference moves, are the
+        remaining frames scored again.
+        """
+        candidates = [
+            index
+            for index, features in enumerate(features_list)
+            if features.get("timestamp") is not None
+            and features.get("frame_data") is not None
+            and not self._has_significant_motion(features)
+            and self._is_due_for_semantic_check(features["timestamp"])
+        ]
+        embeddings = self._extract_embeddings(features_list, candidates)
+
+        decisions = []
+        scores: Dict[int, float] = {}
+        for index, features in enumerate(features_list):
+            current_time = features.get("timestamp")
+            if current_time is None:
+                logger.warning(
+                    "Timestamp not found in features. Defaulting to processing frame."
+                )
+                decisions.append(True)
+                continue
+
+            # Tier 1: Check for significant motion (cheap)
+            if self._has_significant_motion(features):
+                self.last_processed_time = current_time
+                self.last_processed_embedding = None
+                scores = {}
+                decisions.append(True)
+                continue
+
+            # Tier 2: Semantic check against the current reference
+            if features.get("frame_data") is None or not self._is_due_for_semantic_check(
+                current_time
+            ):
+                decisions.append(False)
+                continue
+            if index not in embeddings:
+                # Only reachable when timestamps go backwards
+                embeddings[index] = self._extract_embedding(features)
+            embedding = embeddings[index]
+            if self.last_processed_embedding is not None:
+                if index not in scores:
+                    scores = self._score_window(features_list, embeddings, index)
+                if scores[index] <= 0.5:
+                    decisions.append(False)
+                    continue
+            self.last_processed_embedding = embedding
+            self.last_processed_time = current_time
+            scores = {}
+            decisions.append(True)
+
+        return decisions
@@ -71,6 +71,9 @@ class RetryManager:
                     result = await func(*args, **kwargs)
                 else:
                     result = func(*args, **kwargs)
+                    # Lambdas wrapping async calls return an awaitable
+                    if asyncio.iscoroutine(result):
+                        result = await result
                 
                 if attempt > 1:
                     logger.info(
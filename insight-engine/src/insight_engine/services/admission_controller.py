@@ -0,0 +1,356 @@
+"""
+Shared admission control for CPU-bound workers.
+
+This module provides:
+- A background ResourceSampler that publishes CPU and memory pressure, so
+  workers read a cached snapshot instead of calling psutil themselves
+- A TokenLimiter bounding how many CPU-bound jobs run at once across the
+  preprocessing, inference and clip workers of a process
+- An AdmissionController combining the two: work is admitted once pressure
+  is below the thresholds (or a bounded wait has elapsed) and a token is free
+- Prometheus metrics for the time work spends throttled
+
+Callers check admission once per batch of work, not per frame.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+
+import psutil
+from prometheus_client import Counter, Gauge
+
+from insight_engine.config import settings
+from insight_engine.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prometheus metrics
+ADMISSION_THROTTLED_SECONDS = Counter(
+    'admission_throttled_seconds_total',
+    'Time work waited for admission',
+    ['workload', 'reason']
+)
+
+ADMISSION_THROTTLE_EVENTS = Counter(
+    'admission_throttle_events_total',
+    'Number of times work was held back for admission',
+    ['workload', 'reason']
+)
+
+ADMISSION_TOKENS_IN_USE = Gauge(
+    'admission_tokens_in_use',
+    'Admission tokens currently held by running work'
+)
+
+ADMISSION_RESOURCE_PERCENT = Gauge(
+    'admission_resource_percent',
+    'Latest sampled resource utilization',
+    ['resource']
+)
+
+# Interval at which a waiting async caller retries for free tokens
+_TOKEN_POLL_INTERVAL = 0.01
+
+
+@dataclass
+class AdmissionConfig:
+    """Configuration for the shared admission controller."""
+    cpu_threshold: float = 85.0
+    memory_threshold: float = 90.0
+    sample_interval: float = 0.5
+    max_tokens: int = 0  # 0 means one token per CPU core
+    max_wait: float = 0.5  # Longest pause for resource pressure per admission
+
+    @classmethod
+    def from_settings(cls, admission_settings) -> "AdmissionConfig":
+        return cls(
+            cpu_threshold=admission_settings.cpu_threshold,
+            memory_threshold=admission_settings.memory_threshold,
+            sample_interval=admission_settings.sample_interval,
+            max_tokens=admission_settings.max_tokens,
+            max_wait=admission_settings.max_wait,
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_tokens or os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class ResourceSnapshot:
+    """Resource utilization at one point in time."""
+    cpu_percent: float
+    memory_percent: float
+    sampled_at: float
+
+
+class ResourceSampler:
+    """
+    Samples CPU and memory utilization on a daemon thread.
+
+    The thread starts on the first snapshot request. CPU utilization is
+    measured over each sampling interval, so readers never block on it.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._snapshot = ResourceSnapshot(0.0, 0.0, 0.0)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def sample(self) -> ResourceSnapshot:
+        """Takes a sample now and publishes it."""
+        snapshot = ResourceSnapshot(
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=psutil.virtual_memory().percent,
+            sampled_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        ADMISSION_RESOURCE_PERCENT.labels(resource="cpu").set(snapshot.cpu_percent)
+        ADMISSION_RESOURCE_PERCENT.labels(resource="memory").set(snapshot.memory_percent)
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Resource sampling failed: {e}")
+
+    def start(self) -> None:
+        """Starts the sampling thread, if it is not running."""
+        with self._lock:
+            # A forked worker process inherits the thread object but not the thread
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            # The first cpu_percent call only starts the measurement interval
+            psutil.cpu_percent(interval=None)
+            self._snapshot = ResourceSnapshot(
+                0.0, psutil.virtual_memory().percent, time.monotonic()
+            )
+            self._thread = threading.Thread(
+                target=self._run, name="resource-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the sampling thread."""
+        self._stopped.set()
+        with self._lock:
+            if self._thread is not None:
+                self._thread.join(timeout=self.interval * 2)
+                self._thread = None
+
+    def snapshot(self) -> ResourceSnapshot:
+        """Returns the latest published sample."""
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        return self._snapshot
+
+
+class TokenLimiter:
+    """
+    A counting limiter shared by threads and event loops.
+
+    Requests for more tokens than the capacity are reduced to the capacity,
+    so a large batch can always run on its own.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Token capacity must be at least 1")
+        self.capacity = capacity
+        self._available = capacity
+        self._condition = threading.Condition()
+
+    def _clamp(self, tokens: int) -> int:
+        return max(1, min(tokens, self.capacity))
+
+    @property
+    def in_use(self) -> int:
+        return self.capacity - self._available
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Takes tokens if they are free, without waiting."""
+        tokens = self._clamp(tokens)
+        with self._condition:
+            if self._available < tokens:
+                return False
+            self._available -= tokens
+        ADMISSION_TOKENS_IN_USE.inc(tokens)
+        return True
+
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """Waits for tokens, blocking the calling thread."""
+        tokens = self._clamp(tokens)
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._available >= tokens, timeout):
+                return False
+            self._available -= tokens
+        ADMISSION_TOKENS_IN_USE.inc(tokens)
+        return True
+
+    async def acquire_async(self, tokens: int = 1) -> None:
+        """Waits for tokens without blocking the event loop."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(_TOKEN_POLL_INTERVAL)
+
+    def release(self, tokens: int = 1) -> None:
+        """Returns tokens taken with one of the acquire methods."""
+        tokens = self._clamp(tokens)
+        with self._condition:
+            self._available = min(self.capacity, self._available + tokens)
+            self._condition.notify_all()
+        ADMISSION_TOKENS_IN_USE.dec(tokens)
+
+
+class AdmissionController:
+    """
+    Admits CPU-bound work based on sampled resource pressure and a shared
+    token limit.
+
+    The pressure wait is bounded by ``max_wait``: under sustained load work
+    is slowed down, not starved, and the token limit keeps the number of
+    concurrent jobs in check.
+    """
+
+    def __init__(
+        self,
+        config: Optional[AdmissionConfig] = None,
+        sampler: Optional[ResourceSampler] = None,
+    ):
+        self.config = config or AdmissionConfig()
+        self.sampler = sampler or ResourceSampler(self.config.sample_interval)
+        self.limiter = TokenLimiter(self.config.capacity)
+
+    def is_overloaded(self, cpu_threshold: Optional[float] = None) -> bool:
+        """Whether the latest sample is above the CPU or memory threshold."""
+        snapshot = self.sampler.snapshot()
+        threshold = self.config.cpu_threshold if cpu_threshold is None else cpu_threshold
+        return (
+            snapshot.cpu_percent > threshold
+            or snapshot.memory_percent > self.config.memory_threshold
+        )
+
+    def _pauses(self, max_wait: Optional[float]) -> Iterator[float]:
+        """The pauses of one bounded pressure wait."""
+        max_wait = self.config.max_wait if max_wait is None else max_wait
+        if max_wait <= 0:
+            return
+        step = min(self.config.sample_interval, max_wait)
+        steps = math.ceil(max_wait / step)
+        for i in range(steps):
+            yield min(step, max_wait - i * step)
+
+    def _record(self, workload: str, reason: str, seconds: float) -> None:
+        ADMISSION_THROTTLED_SECONDS.labels(workload=workload, reason=reason).inc(seconds)
+        ADMISSION_THROTTLE_EVENTS.labels(workload=workload, reason=reason).inc()
+
+    def wait_for_capacity(
+        self,
+        workload: str,
+        cpu_threshold: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """
+        Pauses the calling thread while resources are under pressure.
+
+        Args:
+            workload: The metric label of the waiting work.
+            cpu_threshold: Overrides the configured CPU threshold.
+            max_wait: Overrides the configured longest pause; 0 skips the
+                pressure check, e.g. for callers that check per batch.
+
+        Returns:
+            The seconds spent waiting.
+        """
+        if max_wait == 0 or not self.is_overloaded(cpu_threshold):
+            return 0.0
+        start = time.monotonic()
+        for pause in self._pauses(max_wait):
+            time.sleep(pause)
+            if not self.is_overloaded(cpu_threshold):
+                break
+        waited = time.monotonic() - start
+        self._record(workload, "pressure", waited)
+        logger.warning(f"Throttled {workload} for {waited:.3f}s under resource pressure")
+        return waited
+
+    async def wait_for_capacity_async(
+        self,
+        workload: str,
+        cpu_threshold: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """The event loop version of ``wait_for_capacity``."""
+        if max_wait == 0 or not self.is_overloaded(cpu_threshold):
+            return 0.0
+        start = time.monotonic()
+        for pause in self._pauses(max_wait):
+            await asyncio.sleep(pause)
+            if not self.is_overloaded(cpu_threshold):
+                break
+        waited = time.monotonic() - start
+        self._record(workload, "pressure", waited)
+        logger.warning(f"Throttled {workload} for {waited:.3f}s under resource pressure")
+        return waited
+
+    @contextmanager
+    def admit(
+        self,
+        workload: str,
+        tokens: int = 1,
+        cpu_threshold: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ) -> Iterator[None]:
+        """Runs a block once resources allow, holding ``tokens`` tokens."""
+        self.wait_for_capacity(workload, cpu_threshold, max_wait)
+        if not self.limiter.try_acquire(tokens):
+            start = time.monotonic()
+            self.limiter.acquire(tokens)
+            self._record(workload, "tokens", time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self.limiter.release(tokens)
+
+    @asynccontextmanager
+    async def admit_async(
+        self,
+        workload: str,
+        tokens: int = 1,
+        cpu_threshold: Optional[float] = None,
+        max_wait: Optional[float] = None,
+    ) -> AsyncIterator[None]:
+        """The event loop version of ``admit``."""
+        await self.wait_for_capacity_async(workload, cpu_threshold, max_wait)
+        if not self.limiter.try_acquire(tokens):
+            start = time.monotonic()
+            await self.limiter.acquire_async(tokens)
+            self._record(workload, "tokens", time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self.limiter.release(tokens)
+
+
+# Shared controller instance
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller, configured from settings."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            AdmissionConfig.from_settings(settings.admission)
+        )
+    return _admission_controller
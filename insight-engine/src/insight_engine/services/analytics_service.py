@@ -1,6 +1,6 @@
 from typing import List
 from qdrant_client.http.models import Filter, FieldCondition, MatchValue
-from video_ai_system.services.vector_db_service import VectorDBService
+from insight_engine.services.vector_db_service import VectorDBService
 
 
 class AnalyticsService:
@@ -27,22 +27,14 @@ class AnalyticsService:
         Returns:
             A list of unique video ID strings.
         """
-        all_points = []
-        next_offset = None
-        while True:
-            points, next_offset = self.db_service.client.scroll(
-                collection_name=self.db_service.collection_name,
-                limit=250,
-                with_payload=["video_path"],
-                with_vectors=False,
-                offset=next_offset,
-            )
-            all_points.extend(points)
-            if next_offset is None:
-                break
-
-        unique_video_ids = {point.payload["video_path"] for point in all_points}
-        return sorted(list(unique_video_ids))
+        unique_video_ids = set()
+        async for point in self.db_service.gateway.scroll_all(
+            self.db_service.collection_name,
+            page_size=250,
+            with_payload=["video_path"],
+        ):
+            unique_video_ids.add(point.payload["video_path"])
+        return sorted(unique_video_ids)
 
     async def get_frames_for_video(self, video_id: str) -> List[dict]:
         """
@@ -54,15 +46,11 @@ class AnalyticsService:
         Returns:
             A list of dictionaries, where each dictionary represents a frame's data.
         """
-        all_points = []
-        next_offset = None
-        while True:
-            points, next_offset = self.db_service.client.scroll(
-                collection_name=self.db_service.collection_name,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False,
-                offset=next_offset,
+        all_points = [
+            point
+            async for point in self.db_service.gateway.scroll_all(
+                self.db_service.collection_name,
+                page_size=1000,
                 scroll_filter=Filter(
                     must=[
                         FieldCondition(
@@ -72,9 +60,7 @@ class AnalyticsService:
                     ]
                 ),
             )
-            all_points.extend(points)
-            if next_offset is None:
-                break
+        ]
 
         # Sort frames by frame number to ensure correct order
         sorted_points = sorted(all_points, key=lambda p: p.payload["frame_number"])
@@ -0,0 +1,392 @@
+"""
+Pluggable serializers and compression codecs for the enhanced cache service.
+
+Every encoded value starts with a single header byte::
+
+    1 0 s s s c c c
+        |     |
+        |     +-- compressor id (3 bits)
+        +-------- serializer id (3 bits)
+
+The ``10`` prefix is a UTF-8 continuation byte, which can never start a valid
+UTF-8 string. Values written by the legacy format (plain UTF-8 text, or zlib
+data behind a ``COMPRESSED:`` prefix) are therefore still recognised, and the
+configured codecs can change without flushing the cache.
+
+msgpack, orjson, zstandard and lz4 are optional; codecs for them are only
+registered when the package is importable.
+"""
+
+import abc
+import json
+import struct
+import zlib
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from insight_engine.exceptions import ConfigurationException
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+HEADER_MARKER = 0x80
+HEADER_MASK = 0xC0
+LEGACY_COMPRESSED_PREFIX = b'COMPRESSED:'
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class Serializer(abc.ABC):
+    """Turns Python values into bytes and back."""
+
+    name: str
+    codec_id: int
+
+    @abc.abstractmethod
+    def dumps(self, value: Any) -> BytesLike:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: memoryview) -> Any:
+        raise NotImplementedError
+
+
+class Compressor(abc.ABC):
+    """Compresses serialized payloads."""
+
+    name: str
+    codec_id: int
+
+    @abc.abstractmethod
+    def compress(self, data: BytesLike, level: Optional[int] = None) -> bytes:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def decompress(self, data: memoryview) -> bytes:
+        raise NotImplementedError
+
+
+class Utf8Serializer(Serializer):
+    """Plain strings, stored as UTF-8 so they round-trip exactly."""
+
+    name = "utf8"
+    codec_id = 0
+
+    def dumps(self, value: Any) -> bytes:
+        return str(value).encode('utf-8')
+
+    def loads(self, data: memoryview) -> str:
+        return str(data, 'utf-8')
+
+
+class JsonSerializer(Serializer):
+    """Standard library JSON; non-JSON types fall back to ``str``."""
+
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode('utf-8')
+
+    def loads(self, data: memoryview) -> Any:
+        return json.loads(bytes(data))
+
+
+class OrjsonSerializer(Serializer):
+    """orjson: JSON-compatible output, several times faster than ``json``."""
+
+    name = "orjson"
+    codec_id = 2
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(
+            value,
+            default=str,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data: memoryview) -> Any:
+        return orjson.loads(data)
+
+
+class NumpySerializer(Serializer):
+    """
+    Raw ndarray buffers with a small dtype/shape preamble.
+
+    Decoding returns a read-only ``np.frombuffer`` view over the cached bytes,
+    so embeddings are not copied again after leaving Redis.
+    """
+
+    name = "numpy"
+    codec_id = 4
+
+    def dumps(self, value: np.ndarray) -> bytes:
+        if value.dtype.hasobject:
+            raise TypeError("Object arrays cannot be cached with the numpy codec")
+        array = np.ascontiguousarray(value)
+        dtype = array.dtype.str.encode('ascii')
+        preamble = struct.pack(
+            f'<B{len(dtype)}sB{array.ndim}Q',
+            len(dtype), dtype, array.ndim, *array.shape
+        )
+        # join() copies the array buffer once, straight into the result
+        return b''.join((preamble, memoryview(array).cast('B')))
+
+    def loads(self, data: memoryview) -> np.ndarray:
+        dtype_len = data[0]
+        dtype = np.dtype(str(data[1:1 + dtype_len], 'ascii'))
+        offset = 1 + dtype_len
+        ndim = data[offset]
+        offset += 1
+        shape = struct.unpack_from(f'<{ndim}Q', data, offset)
+        offset += 8 * ndim
+        return np.frombuffer(data, dtype=dtype, offset=offset).reshape(shape)
+
+
+_NUMPY_SERIALIZER = NumpySerializer()
+_MSGPACK_NDARRAY_EXT = 1
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack with ndarrays (including nested ones) as an extension type."""
+
+    name = "msgpack"
+    codec_id = 3
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, np.ndarray):
+            return msgpack.ExtType(_MSGPACK_NDARRAY_EXT, _NUMPY_SERIALIZER.dumps(value))
+        if isinstance(value, np.generic):
+            return value.item()
+        return str(value)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == _MSGPACK_NDARRAY_EXT:
+            return _NUMPY_SERIALIZER.loads(memoryview(data))
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, data: memoryview) -> Any:
+        return msgpack.unpackb(
+            data, ext_hook=self._ext_hook, raw=False, strict_map_key=False
+        )
+
+
+class NoCompressor(Compressor):
+    name = "none"
+    codec_id = 0
+
+    def compress(self, data: BytesLike, level: Optional[int] = None) -> bytes:
+        return bytes(data)
+
+    def decompress(self, data: memoryview) -> memoryview:
+        return data
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+    codec_id = 1
+
+    def compress(self, data: BytesLike, level: Optional[int] = None) -> bytes:
+        return zlib.compress(data, -1 if level is None else level)
+
+    def decompress(self, data: memoryview) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """Zstandard: better ratio than zlib at a fraction of the CPU cost."""
+
+    name = "zstd"
+    codec_id = 2
+
+    def __init__(self) -> None:
+        self._compressors: Dict[int, Any] = {}
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: BytesLike, level: Optional[int] = None) -> bytes:
+        level = 3 if level is None else level
+        if level not in self._compressors:
+            self._compressors[level] = zstandard.ZstdCompressor(level=level)
+        return self._compressors[level].compress(data)
+
+    def decompress(self, data: memoryview) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """LZ4 frames: the fastest option when ratio matters less than latency."""
+
+    name = "lz4"
+    codec_id = 3
+
+    def compress(self, data: BytesLike, level: Optional[int] = None) -> bytes:
+        return lz4_frame.compress(data, compression_level=level or 0)
+
+    def decompress(self, data: memoryview) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+_SERIALIZERS: Dict[str, Serializer] = {}
+_SERIALIZERS_BY_ID: Dict[int, Serializer] = {}
+_COMPRESSORS: Dict[str, Compressor] = {}
+_COMPRESSORS_BY_ID: Dict[int, Compressor] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """Register a serializer under its name and 3-bit header id."""
+    if not 0 <= serializer.codec_id < 8:
+        raise ValueError(f"Serializer id must fit in 3 bits: {serializer.codec_id}")
+    existing = _SERIALIZERS_BY_ID.get(serializer.codec_id)
+    if existing is not None and existing.name != serializer.name:
+        raise ValueError(
+            f"Serializer id {serializer.codec_id} already used by '{existing.name}'"
+        )
+    _SERIALIZERS[serializer.name] = serializer
+    _SERIALIZERS_BY_ID[serializer.codec_id] = serializer
+
+
+def register_compressor(compressor: Compressor) -> None:
+    """Register a compressor under its name and 3-bit header id."""
+    if not 0 <= compressor.codec_id < 8:
+        raise ValueError(f"Compressor id must fit in 3 bits: {compressor.codec_id}")
+    existing = _COMPRESSORS_BY_ID.get(compressor.codec_id)
+    if existing is not None and existing.name != compressor.name:
+        raise ValueError(
+            f"Compressor id {compressor.codec_id} already used by '{existing.name}'"
+        )
+    _COMPRESSORS[compressor.name] = compressor
+    _COMPRESSORS_BY_ID[compressor.codec_id] = compressor
+
+
+def available_serializers() -> list:
+    return sorted(_SERIALIZERS)
+
+
+def available_compressors() -> list:
+    return sorted(_COMPRESSORS)
+
+
+register_serializer(Utf8Serializer())
+register_serializer(JsonSerializer())
+register_serializer(_NUMPY_SERIALIZER)
+if orjson is not None:
+    register_serializer(OrjsonSerializer())
+if msgpack is not None:
+    register_serializer(MsgpackSerializer())
+
+register_compressor(NoCompressor())
+register_compressor(ZlibCompressor())
+if zstandard is not None:
+    register_compressor(ZstdCompressor())
+if lz4_frame is not None:
+    register_compressor(Lz4Compressor())
+
+
+class CacheCodec:
+    """
+    Encodes cache values with the configured serializer and compressor.
+
+    Strings and ndarrays always use the ``utf8`` and ``numpy`` serializers;
+    everything else uses the configured one. Plain integers are written in the
+    legacy headerless form so Redis INCRBY keeps working on them.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compressor: str = "zlib",
+        compression_threshold: int = 1024,
+        compression_level: Optional[int] = None
+    ):
+        if serializer not in _SERIALIZERS:
+            raise ConfigurationException(
+                f"Unknown or unavailable cache serializer '{serializer}'. "
+                f"Available: {available_serializers()}",
+                config_key="serializer"
+            )
+        if compressor not in _COMPRESSORS:
+            raise ConfigurationException(
+                f"Unknown or unavailable cache compressor '{compressor}'. "
+                f"Available: {available_compressors()}",
+                config_key="compressor"
+            )
+        self.serializer = _SERIALIZERS[serializer]
+        self.compressor = _COMPRESSORS[compressor]
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize, optionally compress, and prefix the header byte."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value).encode('ascii')
+
+        if isinstance(value, str):
+            serializer = _SERIALIZERS['utf8']
+        elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            serializer = _NUMPY_SERIALIZER
+        else:
+            serializer = self.serializer
+
+        payload = serializer.dumps(value)
+        compressor = _COMPRESSORS['none']
+        if (self.compressor.codec_id != 0
+                and len(payload) > self.compression_threshold):
+            compressed = self.compressor.compress(payload, self.compression_level)
+            # Only use compression if it actually reduces size
+            if len(compressed) < len(payload):
+                payload = compressed
+                compressor = self.compressor
+
+        header = HEADER_MARKER | (serializer.codec_id << 3) | compressor.codec_id
+        return b''.join((bytes((header,)), payload))
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a value written by ``encode`` or by the legacy format."""
+        if not data or (data[0] & HEADER_MASK) != HEADER_MARKER:
+            return self._decode_legacy(data)
+
+        header = data[0]
+        serializer = _SERIALIZERS_BY_ID.get((header >> 3) & 0x07)
+        compressor = _COMPRESSORS_BY_ID.get(header & 0x07)
+        if serializer is None or compressor is None:
+            raise ValueError(f"Unsupported cache codec header: {header:#04x}")
+
+        payload = memoryview(data)[1:]
+        if compressor.codec_id != 0:
+            payload = memoryview(compressor.decompress(payload))
+        return serializer.loads(payload)
+
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Any:
+        if data.startswith(LEGACY_COMPRESSED_PREFIX):
+            data = zlib.decompress(data[len(LEGACY_COMPRESSED_PREFIX):])
+
+        try:
+            # Try to decode as JSON first
+            return json.loads(data.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Fall back to string
+            return data.decode('utf-8')
@@ -8,15 +8,24 @@ This module provides a production-ready caching service with:
 - Batch operations and pipeline support
 - JSON serialization and compression
 - Cache invalidation patterns
+- Optional in-process L1 tier kept coherent across replicas via Redis pub/sub
+- Stampede protection (single-flight, Redis leases, XFetch early refresh)
+- Write-behind buffering with batched background flushing
+- Tag-set and SCAN-based invalidation (no blocking KEYS calls)
 """
 
 import asyncio
+import fnmatch
+import itertools
 import json
+import math
+import random
 import time
-import zlib
+import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Any, Callable, Dict, List, Optional, Union, TypeVar, Generic
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TypeVar, Generic
 from dataclasses import dataclass
 from enum import Enum
 
@@ -26,11 +35,47 @@ from pydantic import BaseModel
 
 from insight_engine.logging_config import get_logger
 from insight_engine.exceptions import CacheException, RedisConnectionException
+from insight_engine.services.cache_codecs import CacheCodec
+from insight_engine.services.local_cache import LocalCache
 
 logger = get_logger(__name__)
 
 T = TypeVar('T')
 
+# Suffixes of the bookkeeping keys stored next to a get_or_set value
+LOCK_KEY_SUFFIX = ':__lock'
+DELTA_KEY_SUFFIX = ':__delta'
+
+# Compare-and-delete so a lease is only released by the holder that took it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Adds ARGV[2..] to the tag set KEYS[1] without letting it expire before its
+# members: a persistent member (ARGV[1] <= 0) makes the set persistent, and an
+# expiring one only ever extends the TTL of a set that has one
+REGISTER_TAG_SCRIPT = """
+local created = redis.call('exists', KEYS[1]) == 0
+redis.call('sadd', KEYS[1], unpack(ARGV, 2))
+local ttl = tonumber(ARGV[1])
+if ttl <= 0 then
+    return redis.call('persist', KEYS[1])
+end
+local current = redis.call('ttl', KEYS[1])
+if created or (current >= 0 and current < ttl) then
+    return redis.call('expire', KEYS[1], ttl)
+end
+return 0
+"""
+
+# Members passed to one REGISTER_TAG_SCRIPT call, within Lua's unpack() limit
+TAG_SCRIPT_BATCH_SIZE = 1000
+
+_MISSING = object()
+
 # Prometheus metrics for cache monitoring
 CACHE_OPERATIONS_TOTAL = Counter(
     'cache_operations_total',
@@ -41,13 +86,13 @@ CACHE_OPERATIONS_TOTAL = Counter(
 CACHE_OPERATION_DURATION = Histogram(
     'cache_operation_duration_seconds',
     'Cache operation duration',
-    ['operation', 'cache_name']
+    ['operation', 'cache_name', 'tier']  # tier: l1 (in-process), l2 (redis)
 )
 
 CACHE_HIT_RATIO = Gauge(
     'cache_hit_ratio',
     'Cache hit ratio',
-    ['cache_name']
+    ['cache_name', 'tier']
 )
 
 CACHE_MEMORY_USAGE = Gauge(
@@ -62,6 +107,24 @@ CACHE_CONNECTIONS_ACTIVE = Gauge(
     ['cache_name']
 )
 
+CACHE_INVALIDATION_DURATION = Histogram(
+    'cache_invalidation_duration_seconds',
+    'Time spent invalidating cache keys',
+    ['cache_name', 'method']  # method: tag, pattern
+)
+
+CACHE_INVALIDATED_KEYS_TOTAL = Counter(
+    'cache_invalidated_keys_total',
+    'Total keys removed by tag or pattern invalidation',
+    ['cache_name', 'method']
+)
+
+CACHE_WRITE_BEHIND_PENDING = Gauge(
+    'cache_write_behind_pending',
+    'Writes buffered in memory awaiting a write-behind flush',
+    ['cache_name']
+)
+
 
 class CacheStrategy(Enum):
     """Cache strategy enumeration."""
@@ -85,8 +148,33 @@ class CacheConfig:
     health_check_interval: int = 30
     default_ttl: int = 3600
     compression_threshold: int = 1024  # Compress values larger than 1KB
+    # Value codecs, see cache_codecs for the registered names
+    serializer: str = "json"  # json, orjson, msgpack
+    compressor: str = "zlib"  # none, zlib, zstd, lz4
+    compression_level: Optional[int] = None  # None uses the compressor's default
     circuit_breaker_failure_threshold: int = 5
     circuit_breaker_recovery_timeout: int = 60
+    # In-process L1 tier (disabled by default)
+    local_cache_enabled: bool = False
+    local_cache_max_entries: int = 1024
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    local_cache_ttl: int = 60  # Upper bound on L1 staleness, in seconds
+    invalidation_channel: str = "cache:invalidations"
+    # get_or_set stampede protection
+    strategy: CacheStrategy = CacheStrategy.CACHE_ASIDE
+    lock_timeout: float = 30.0  # Lease held while recomputing a value
+    lock_wait_timeout: float = 10.0  # How long followers wait for the leaseholder
+    lock_poll_interval: float = 0.05
+    early_refresh_beta: float = 1.0  # XFetch beta; 0 disables early refresh
+    # WRITE_BEHIND buffering
+    write_behind_max_pending: int = 10000  # Distinct keys buffered before backpressure
+    write_behind_batch_size: int = 500
+    write_behind_flush_interval: float = 0.1
+    write_behind_put_timeout: float = 5.0  # Max time set() blocks on a full buffer
+    # Tag and pattern invalidation
+    tag_key_prefix: str = "cache:tag:"
+    tag_ttl: int = 86400  # Minimum tag set lifetime; sets holding a persistent key persist
+    invalidation_batch_size: int = 500  # Keys per SCAN/SPOP + UNLINK round trip
 
 
 class CircuitBreakerState(Enum):
@@ -126,6 +214,10 @@ class EnhancedCacheService:
     - JSON serialization with compression
     - Batch operations and pipelining
     - Cache invalidation patterns
+    - Optional in-process L1 tier in front of Redis (L2)
+    
+    When the L1 tier is enabled, every write or invalidation is broadcast on
+    ``config.invalidation_channel`` so other replicas evict their local copy.
     """
     
     def __init__(self, config: CacheConfig, cache_name: str = "default"):
@@ -134,14 +226,41 @@ class EnhancedCacheService:
         self._pool: Optional[redis.ConnectionPool] = None
         self._client: Optional[redis.Redis] = None
         self._circuit_breaker = CircuitBreakerStats()
+        self._codec = CacheCodec(
+            serializer=config.serializer,
+            compressor=config.compressor,
+            compression_threshold=config.compression_threshold,
+            compression_level=config.compression_level
+        )
         self._stats = {
             'hits': 0,
             'misses': 0,
+            'l1_hits': 0,
+            'l1_misses': 0,
             'errors': 0,
             'total_operations': 0
         }
         self._last_health_check = 0
         self._is_healthy = True
+        self._instance_id = uuid.uuid4().hex
+        self._local: Optional[LocalCache] = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._write_buffer: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+        self._write_buffer_space = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_stopping = False
+        # Keys of the batch being written, set once its write has settled
+        self._flushing_keys: set = set()
+        self._flush_settled = asyncio.Event()
+        if config.local_cache_enabled:
+            self._local = LocalCache(
+                max_entries=config.local_cache_max_entries,
+                max_bytes=config.local_cache_max_bytes,
+                default_ttl=config.local_cache_ttl
+            )
         
     async def initialize(self) -> None:
         """Initialize the cache service with connection pool."""
@@ -163,6 +282,13 @@ class EnhancedCacheService:
             # Test connection
             await self._client.ping()
             
+            if self._local is not None:
+                self._invalidation_task = asyncio.create_task(
+                    self._invalidation_listener()
+                )
+            if self.config.strategy == CacheStrategy.WRITE_BEHIND:
+                self._ensure_flusher()
+            
             logger.info(
                 f"Cache service '{self.cache_name}' initialized successfully",
                 extra={
@@ -182,6 +308,32 @@ class EnhancedCacheService:
     
     async def close(self) -> None:
         """Close the cache service and cleanup connections."""
+        if self._flush_task:
+            # Let the flusher finish its current batch rather than cancel it mid-write
+            self._flush_stopping = True
+            self._flush_wakeup.set()
+            try:
+                await self._flush_task
+            except Exception as e:
+                logger.error(f"Write-behind flusher for '{self.cache_name}' failed: {e}")
+            self._flush_task = None
+        if self._write_buffer:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(
+                    f"Dropping {len(self._write_buffer)} buffered writes for "
+                    f"'{self.cache_name}' on close: {e}"
+                )
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        if self._local is not None:
+            self._local.clear()
         if self._client:
             await self._client.close()
         if self._pool:
@@ -243,48 +395,188 @@ class EnhancedCacheService:
             duration = time.time() - start_time
             CACHE_OPERATION_DURATION.labels(
                 operation=operation, 
-                cache_name=self.cache_name
+                cache_name=self.cache_name,
+                tier='l2'
             ).observe(duration)
     
-    def _serialize_value(self, value: Any) -> bytes:
-        """Serialize and optionally compress a value."""
-        if isinstance(value, (str, int, float, bool)):
-            serialized = str(value).encode('utf-8')
+    async def _invalidation_listener(self) -> None:
+        """Background task evicting L1 entries invalidated by other replicas."""
+        backoff = 1.0
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self.config.invalidation_channel)
+                backoff = 1.0
+                async for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self._handle_invalidation(message.get('data'))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                self._local.clear()
+                logger.warning(
+                    f"Cache invalidation listener for '{self.cache_name}' "
+                    f"disconnected, retrying in {backoff}s: {e}"
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+    
+    def _handle_invalidation(self, data: Any) -> None:
+        """Apply an invalidation message published by another replica."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return
+        
+        if (message.get('origin') == self._instance_id
+                or message.get('cache') != self.cache_name):
+            return
+        
+        if message.get('flush'):
+            self._local.clear()
+        if message.get('keys'):
+            self._local.delete_many(message['keys'])
+        if message.get('pattern'):
+            self._local.delete_pattern(message['pattern'])
+    
+    async def _publish_invalidation(
+        self,
+        keys: Optional[List[str]] = None,
+        pattern: Optional[str] = None
+    ) -> None:
+        """Evict keys from the local L1 tier and broadcast to other replicas."""
+        if self._local is None:
+            return
+        
+        if keys:
+            self._local.delete_many(keys)
+        if pattern:
+            self._local.delete_pattern(pattern)
+        
+        message = {'origin': self._instance_id, 'cache': self.cache_name}
+        if keys:
+            message['keys'] = keys
+        if pattern:
+            message['pattern'] = pattern
+        
+        try:
+            await self._client.publish(
+                self.config.invalidation_channel, json.dumps(message)
+            )
+        except Exception as e:
+            # Other replicas fall back to L1 TTL expiry
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+    
+    def _local_get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key in process memory, recording L1 tier metrics.
+        
+        Writes still waiting in the write-behind buffer are served from here
+        so callers always read their own writes.
+        """
+        pending = self._write_buffer.get(key)
+        if self._local is None and pending is None:
+            return None
+        
+        start_time = time.time()
+        if pending is not None:
+            value = self._deserialize_value(pending[0])
         else:
-            serialized = json.dumps(value, default=str).encode('utf-8')
+            value = self._local.get(key)
+        CACHE_OPERATION_DURATION.labels(
+            operation='get',
+            cache_name=self.cache_name,
+            tier='l1'
+        ).observe(time.time() - start_time)
         
-        # Compress if value is large enough
-        if len(serialized) > self.config.compression_threshold:
-            compressed = zlib.compress(serialized)
-            # Only use compression if it actually reduces size
-            if len(compressed) < len(serialized):
-                return b'COMPRESSED:' + compressed
+        if value is None:
+            self._stats['l1_misses'] += 1
+        else:
+            self._stats['l1_hits'] += 1
+            self._stats['hits'] += 1
+        return value
+    
+    def _local_set(
+        self,
+        key: str,
+        data: bytes,
+        ttl: Optional[int] = None,
+        value: Any = None
+    ) -> None:
+        """
+        Populate the L1 tier if enabled.
         
-        return serialized
+        The L1 copy is always decoded from the serialized bytes (unless the
+        caller already holds the decoded value) so both tiers return identical
+        values and later mutation of the caller's object cannot leak in.
+        """
+        if self._local is None:
+            return
+        if value is None:
+            value = self._deserialize_value(data)
+        self._local.set(key, value, len(data), ttl)
+    
+    def _local_set_from_l2(self, key: str, data: bytes, pttl: Optional[int], value: Any) -> None:
+        """
+        Populate the L1 tier with a value read from Redis, expiring it no later
+        than the Redis key (``pttl`` is the key's PTTL in milliseconds).
+        """
+        if pttl == -2:
+            return  # Expired between the read and the PTTL
+        ttl = pttl / 1000.0 if pttl is not None and pttl > 0 else None
+        self._local_set(key, data, ttl, value=value)
+    
+    async def _read_l2(self, keys: List[str]) -> Tuple[List[Optional[bytes]], List[Optional[int]]]:
+        """
+        Read keys from Redis in one round trip. With the L1 tier enabled the
+        keys' PTTLs are pipelined with the read, otherwise they are None.
+        """
+        if self._local is None:
+            if len(keys) == 1:
+                return [await self._client.get(keys[0])], [None]
+            return await self._client.mget(keys), [None] * len(keys)
+        
+        async with self._client.pipeline(transaction=False) as pipe:
+            await pipe.mget(keys)
+            for key in keys:
+                await pipe.pttl(key)
+            results = await pipe.execute()
+        return results[0], results[1:]
+    
+    def _serialize_value(self, value: Any) -> bytes:
+        """Serialize and optionally compress a value with the configured codecs."""
+        return self._codec.encode(value)
     
     def _deserialize_value(self, data: bytes) -> Any:
         """Deserialize and optionally decompress a value."""
-        if data.startswith(b'COMPRESSED:'):
-            data = zlib.decompress(data[11:])  # Remove 'COMPRESSED:' prefix
-        
-        try:
-            # Try to decode as JSON first
-            return json.loads(data.decode('utf-8'))
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            # Fall back to string
-            return data.decode('utf-8')
+        return self._codec.decode(data)
     
     async def get(self, key: str) -> Optional[Any]:
-        """Get a value from cache."""
+        """Get a value from cache, consulting the L1 tier first if enabled."""
+        value = self._local_get(key)
+        if value is not None:
+            self._stats['total_operations'] += 1
+            self._update_hit_ratio()
+            return value
+        
         async with self._circuit_breaker_context('get'):
             try:
-                data = await self._client.get(key)
+                (data,), (pttl,) = await self._read_l2([key])
                 if data is None:
                     self._stats['misses'] += 1
                     return None
                 
                 self._stats['hits'] += 1
-                return self._deserialize_value(data)
+                value = self._deserialize_value(data)
+                self._local_set_from_l2(key, data, pttl, value)
+                return value
                 
             except Exception as e:
                 self._stats['errors'] += 1
@@ -298,9 +590,26 @@ class EnhancedCacheService:
         self, 
         key: str, 
         value: Any, 
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
-        """Set a value in cache with optional TTL."""
+        """
+        Set a value in cache with optional TTL.
+        
+        CACHE_ASIDE and WRITE_THROUGH write to Redis before returning. With
+        WRITE_BEHIND the write is buffered, coalesced with later writes to the
+        same key and flushed in batches by a background task.
+        
+        ``tags`` (e.g. ``["video:123"]``) register the key for later removal
+        with ``invalidate_tags``.
+        """
+        if self.config.strategy == CacheStrategy.WRITE_BEHIND:
+            ttl = ttl or self.config.default_ttl
+            await self._buffer_write(key, self._serialize_value(value), ttl)
+            if tags:
+                await self._register_tags([key], tags, ttl)
+            return True
+        
         async with self._circuit_breaker_context('set'):
             try:
                 ttl = ttl or self.config.default_ttl
@@ -311,6 +620,10 @@ class EnhancedCacheService:
                 else:
                     result = await self._client.set(key, serialized_value)
                 
+                await self._publish_invalidation(keys=[key])
+                self._local_set(key, serialized_value, ttl)
+                if tags:
+                    await self._register_tags([key], tags, ttl)
                 return bool(result)
                 
             except Exception as e:
@@ -320,39 +633,408 @@ class EnhancedCacheService:
             finally:
                 self._stats['total_operations'] += 1
     
+    def _ensure_flusher(self) -> None:
+        """Start the write-behind flush task if it is not running."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._write_behind_loop())
+    
+    async def _buffer_write(self, key: str, data: bytes, ttl: int) -> None:
+        """Queue a write, blocking while the buffer is full (backpressure)."""
+        self._ensure_flusher()
+        if self._local is not None:
+            self._local.delete(key)
+        
+        async with self._write_buffer_space:
+            if (key not in self._write_buffer
+                    and len(self._write_buffer) >= self.config.write_behind_max_pending):
+                self._flush_wakeup.set()
+                CACHE_OPERATIONS_TOTAL.labels(
+                    operation='write_behind',
+                    status='backpressure',
+                    cache_name=self.cache_name
+                ).inc()
+                try:
+                    await asyncio.wait_for(
+                        self._write_buffer_space.wait_for(
+                            lambda: len(self._write_buffer)
+                            < self.config.write_behind_max_pending
+                        ),
+                        timeout=self.config.write_behind_put_timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._stats['errors'] += 1
+                    raise CacheException(
+                        f"Write-behind buffer for '{self.cache_name}' is full",
+                        cache_key=key
+                    )
+            
+            # Coalesce: a newer write replaces the pending one in place
+            self._write_buffer[key] = (data, ttl)
+            self._stats['total_operations'] += 1
+        
+        CACHE_WRITE_BEHIND_PENDING.labels(cache_name=self.cache_name).set(
+            len(self._write_buffer)
+        )
+        if len(self._write_buffer) >= self.config.write_behind_batch_size:
+            self._flush_wakeup.set()
+    
+    async def _write_behind_loop(self) -> None:
+        """Background task flushing the write-behind buffer until ``close()``."""
+        while not self._flush_stopping:
+            try:
+                await asyncio.wait_for(
+                    self._flush_wakeup.wait(),
+                    timeout=self.config.write_behind_flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Failed batches stay buffered; retry on the next tick
+                logger.error(f"Write-behind flush failed for '{self.cache_name}': {e}")
+                if not self._flush_stopping:
+                    await asyncio.sleep(self.config.write_behind_flush_interval)
+    
+    async def flush(self) -> int:
+        """
+        Flush all buffered writes to Redis. Returns the number of keys written.
+        
+        A batch stays in the buffer, and readable from it, until its write
+        succeeds. Entries overwritten while the batch was in flight are kept
+        for the next batch.
+        """
+        flushed = 0
+        async with self._flush_lock:
+            while self._write_buffer:
+                batch = list(itertools.islice(
+                    self._write_buffer.items(), self.config.write_behind_batch_size
+                ))
+                self._flushing_keys = {key for key, _ in batch}
+                self._flush_settled.clear()
+                try:
+                    await self._flush_batch(batch)
+                finally:
+                    self._flushing_keys = set()
+                    self._flush_settled.set()
+                
+                await self._discard_flushed(batch)
+                flushed += len(batch)
+        return flushed
+    
+    async def _flush_batch(self, batch: List[Tuple[str, Tuple[bytes, int]]]) -> None:
+        """Write a batch with one pipelined MSET plus per-key EXPIREs."""
+        async with self._circuit_breaker_context('write_behind_flush'):
+            try:
+                async with self._client.pipeline() as pipe:
+                    await pipe.mset({key: data for key, (data, _) in batch})
+                    for key, (_, ttl) in batch:
+                        if ttl > 0:
+                            await pipe.expire(key, ttl)
+                    await pipe.execute()
+            except Exception as e:
+                self._stats['errors'] += 1
+                raise CacheException(f"Cache WRITE_BEHIND flush failed: {e}")
+        
+        await self._publish_invalidation(keys=[key for key, _ in batch])
+    
+    async def _discard_flushed(self, batch: List[Tuple[str, Tuple[bytes, int]]]) -> None:
+        """Drop written entries from the buffer, unless newer writes replaced them."""
+        async with self._write_buffer_space:
+            for key, entry in batch:
+                if self._write_buffer.get(key) is entry:
+                    del self._write_buffer[key]
+            self._write_buffer_space.notify_all()
+        CACHE_WRITE_BEHIND_PENDING.labels(cache_name=self.cache_name).set(
+            len(self._write_buffer)
+        )
+    
+    async def _wait_for_flush(self, keys: List[str]) -> None:
+        """
+        Wait until no in-flight write-behind batch holds any of ``keys``.
+        
+        Called before writing or removing keys in Redis directly, so a batch
+        landing afterwards cannot overwrite or resurrect them.
+        """
+        while not self._flushing_keys.isdisjoint(keys):
+            await self._flush_settled.wait()
+    
+    async def _flush_pending_key(self, key: str) -> None:
+        """Flush a single buffered key before an operation that reads it in Redis."""
+        if key not in self._write_buffer:
+            return
+        async with self._flush_lock:
+            entry = self._write_buffer.get(key)
+            if entry is not None:
+                await self._flush_batch([(key, entry)])
+                await self._discard_flushed([(key, entry)])
+    
     async def get_or_set(
         self,
         key: str,
         factory: Callable[[], Any],
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        strategy: Optional[CacheStrategy] = None,
+        tags: Optional[List[str]] = None
     ) -> Any:
         """
         Cache-aside pattern: get from cache or set using factory function.
+        
+        Concurrent misses for the same key are coalesced: within a process
+        only one factory call runs per key, and across processes a Redis lease
+        lets a single caller recompute while the others wait for its result.
+        
+        Hot keys are refreshed before they expire using XFetch (probabilistic
+        early expiration weighted by how long the factory took last time).
+        With ``CacheStrategy.REFRESH_AHEAD`` the early refresh runs in the
+        background and the current value is returned immediately; otherwise
+        the caller that wins the draw recomputes inline.
+        """
+        strategy = strategy or self.config.strategy
+        ttl = ttl or self.config.default_ttl
+        
+        value, remaining_ttl, delta = await self._get_with_expiry(key)
+        if value is None:
+            return await self._run_single_flight(key, factory, ttl, tags=tags)
+        
+        if not self._should_refresh_early(remaining_ttl, delta):
+            return value
+        
+        CACHE_OPERATIONS_TOTAL.labels(
+            operation='get_or_set',
+            status='early_refresh',
+            cache_name=self.cache_name
+        ).inc()
+        if strategy == CacheStrategy.REFRESH_AHEAD:
+            self._start_single_flight(key, factory, ttl, stale=value, tags=tags)
+            return value
+        return await self._run_single_flight(key, factory, ttl, stale=value, tags=tags)
+    
+    async def _get_with_expiry(
+        self,
+        key: str
+    ) -> Tuple[Optional[Any], Optional[float], Optional[float]]:
+        """
+        Get a value with its remaining TTL and last recompute time (seconds).
+        
+        L1 hits return no expiry information, so they never trigger an early
+        refresh; the next L2 read will.
         """
-        # Try to get from cache first
-        cached_value = await self.get(key)
-        if cached_value is not None:
-            return cached_value
+        value = self._local_get(key)
+        if value is not None:
+            self._stats['total_operations'] += 1
+            self._update_hit_ratio()
+            return value, None, None
+        
+        async with self._circuit_breaker_context('get'):
+            try:
+                async with self._client.pipeline(transaction=False) as pipe:
+                    await pipe.get(key)
+                    await pipe.pttl(key)
+                    await pipe.get(key + DELTA_KEY_SUFFIX)
+                    data, pttl, delta = await pipe.execute()
+                
+                if data is None:
+                    self._stats['misses'] += 1
+                    return None, None, None
+                
+                self._stats['hits'] += 1
+                value = self._deserialize_value(data)
+                self._local_set_from_l2(key, data, pttl, value)
+                remaining_ttl = pttl / 1000.0 if pttl and pttl > 0 else None
+                return value, remaining_ttl, float(delta) if delta else None
+                
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Cache GET error for key '{key}': {e}")
+                raise CacheException(f"Cache GET failed: {e}")
+            finally:
+                self._stats['total_operations'] += 1
+                self._update_hit_ratio()
+    
+    def _should_refresh_early(
+        self,
+        remaining_ttl: Optional[float],
+        delta: Optional[float]
+    ) -> bool:
+        """XFetch: recompute when ``-delta * beta * ln(rand) >= remaining TTL``."""
+        beta = self.config.early_refresh_beta
+        if beta <= 0 or remaining_ttl is None or not delta:
+            return False
+        # 1 - random() is in (0, 1], so the log is always defined
+        return -delta * beta * math.log(1.0 - random.random()) >= remaining_ttl
+    
+    def _start_single_flight(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: int,
+        stale: Any = _MISSING,
+        tags: Optional[List[str]] = None
+    ) -> asyncio.Task:
+        """Return the in-flight recompute task for a key, starting one if needed."""
+        task = self._inflight.get(key)
+        if task is not None:
+            CACHE_OPERATIONS_TOTAL.labels(
+                operation='get_or_set',
+                status='coalesced',
+                cache_name=self.cache_name
+            ).inc()
+            return task
+        
+        task = asyncio.ensure_future(
+            self._compute_with_lease(key, factory, ttl, stale, tags)
+        )
+        self._inflight[key] = task
+        
+        def _on_done(done: asyncio.Task) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Background refreshes may have nobody awaiting them
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"Factory function failed for key '{key}': {done.exception()}")
+        
+        task.add_done_callback(_on_done)
+        return task
+    
+    async def _run_single_flight(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: int,
+        stale: Any = _MISSING,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Await the shared recompute for a key."""
+        # Shield so one cancelled caller does not cancel the work for the others
+        return await asyncio.shield(
+            self._start_single_flight(key, factory, ttl, stale, tags)
+        )
+    
+    async def _compute_with_lease(
+        self,
+        key: str,
+        factory: Callable[[], Any],
+        ttl: int,
+        stale: Any = _MISSING,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """Recompute a value while holding the cross-process Redis lease."""
+        lock_key = key + LOCK_KEY_SUFFIX
+        token = uuid.uuid4().hex
+        acquired = await self._acquire_lease(lock_key, token)
+        
+        if not acquired:
+            # Another process is recomputing; serve stale data if we have it
+            if stale is not _MISSING:
+                return stale
+            value = await self._wait_for_value(key, lock_key)
+            if value is not None:
+                return value
+            logger.warning(
+                f"Timed out waiting for lease on '{key}', recomputing without it"
+            )
         
-        # Cache miss - generate value and cache it
         try:
+            start_time = time.monotonic()
             if asyncio.iscoroutinefunction(factory):
                 value = await factory()
             else:
                 value = factory()
+            delta = time.monotonic() - start_time
             
-            await self.set(key, value, ttl)
+            await self._set_with_delta(key, value, ttl, delta)
+            if tags:
+                await self._register_tags([key], tags, ttl)
             return value
-            
+        finally:
+            if acquired:
+                await self._release_lease(lock_key, token)
+    
+    async def _acquire_lease(self, lock_key: str, token: str) -> bool:
+        """Try to take the recompute lease for a key."""
+        async with self._circuit_breaker_context('acquire_lease'):
+            try:
+                result = await self._client.set(
+                    lock_key, token, nx=True,
+                    px=int(self.config.lock_timeout * 1000)
+                )
+                return bool(result)
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Cache lease error for key '{lock_key}': {e}")
+                raise CacheException(f"Cache lease acquisition failed: {e}")
+    
+    async def _release_lease(self, lock_key: str, token: str) -> None:
+        """Release a lease we hold; it expires on its own if this fails."""
+        try:
+            await self._client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
         except Exception as e:
-            logger.error(f"Factory function failed for key '{key}': {e}")
-            raise
+            logger.warning(f"Failed to release cache lease '{lock_key}': {e}")
+    
+    async def _wait_for_value(self, key: str, lock_key: str) -> Optional[Any]:
+        """Poll for the leaseholder's result until the lease is released."""
+        CACHE_OPERATIONS_TOTAL.labels(
+            operation='get_or_set',
+            status='lease_wait',
+            cache_name=self.cache_name
+        ).inc()
+        deadline = time.monotonic() + self.config.lock_wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.config.lock_poll_interval)
+            data = await self._client.get(key)
+            if data is not None:
+                return self._deserialize_value(data)
+            if not await self._client.exists(lock_key):
+                # Leaseholder gave up (e.g. its factory failed)
+                return None
+        return None
+    
+    async def _set_with_delta(
+        self,
+        key: str,
+        value: Any,
+        ttl: int,
+        delta: float
+    ) -> None:
+        """Store a recomputed value together with its recompute time."""
+        async with self._circuit_breaker_context('set'):
+            try:
+                serialized_value = self._serialize_value(value)
+                await self._wait_for_flush([key])
+                self._write_buffer.pop(key, None)
+                async with self._client.pipeline(transaction=False) as pipe:
+                    if ttl > 0:
+                        await pipe.setex(key, ttl, serialized_value)
+                        await pipe.setex(key + DELTA_KEY_SUFFIX, ttl, repr(delta))
+                    else:
+                        await pipe.set(key, serialized_value)
+                    await pipe.execute()
+                
+                await self._publish_invalidation(keys=[key])
+                self._local_set(key, serialized_value, ttl)
+                
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Cache SET error for key '{key}': {e}")
+                raise CacheException(f"Cache SET failed: {e}")
+            finally:
+                self._stats['total_operations'] += 1
     
     async def delete(self, key: str) -> bool:
         """Delete a key from cache."""
         async with self._circuit_breaker_context('delete'):
             try:
-                result = await self._client.delete(key)
+                await self._wait_for_flush([key])
+                pending = self._write_buffer.pop(key, None)
+                result = await self._client.delete(key, key + DELTA_KEY_SUFFIX)
+                await self._publish_invalidation(keys=[key])
+                if pending is not None:
+                    return True
                 return bool(result)
                 
             except Exception as e:
@@ -366,6 +1048,8 @@ class EnhancedCacheService:
         """Check if a key exists in cache."""
         async with self._circuit_breaker_context('exists'):
             try:
+                if key in self._write_buffer:
+                    return True
                 result = await self._client.exists(key)
                 return bool(result)
                 
@@ -380,7 +1064,9 @@ class EnhancedCacheService:
         """Increment a counter in cache."""
         async with self._circuit_breaker_context('increment'):
             try:
+                await self._flush_pending_key(key)
                 result = await self._client.incrby(key, amount)
+                await self._publish_invalidation(keys=[key])
                 return int(result)
                 
             except Exception as e:
@@ -394,7 +1080,9 @@ class EnhancedCacheService:
         """Set TTL for an existing key."""
         async with self._circuit_breaker_context('expire'):
             try:
+                await self._flush_pending_key(key)
                 result = await self._client.expire(key, ttl)
+                await self._publish_invalidation(keys=[key])
                 return bool(result)
                 
             except Exception as e:
@@ -405,15 +1093,45 @@ class EnhancedCacheService:
                 self._stats['total_operations'] += 1
     
     async def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching a pattern."""
+        """
+        Invalidate all keys matching a pattern.
+        
+        Walks the keyspace with SCAN and removes matches in UNLINK batches,
+        yielding to the event loop between batches. This is an ad-hoc fallback;
+        prefer ``invalidate_tags`` for keys that are invalidated routinely.
+        """
+        start_time = time.time()
+        removed = 0
         async with self._circuit_breaker_context('invalidate_pattern'):
             try:
-                keys = await self._client.keys(pattern)
-                if keys:
-                    result = await self._client.delete(*keys)
-                    logger.info(f"Invalidated {result} keys matching pattern '{pattern}'")
-                    return result
-                return 0
+                await self._wait_for_flush([
+                    k for k in self._write_buffer if fnmatch.fnmatchcase(k, pattern)
+                ])
+                for pending_key in [
+                    k for k in self._write_buffer if fnmatch.fnmatchcase(k, pattern)
+                ]:
+                    del self._write_buffer[pending_key]
+                await self._publish_invalidation(pattern=pattern)
+                
+                batch = []
+                async for key in self._client.scan_iter(
+                    match=pattern, count=self.config.invalidation_batch_size
+                ):
+                    key = key.decode('utf-8') if isinstance(key, bytes) else key
+                    if key.endswith(DELTA_KEY_SUFFIX):
+                        # Removed together with the key it belongs to
+                        continue
+                    batch.append(key)
+                    if len(batch) >= self.config.invalidation_batch_size:
+                        removed += await self._unlink(batch)
+                        batch = []
+                        await asyncio.sleep(0)
+                if batch:
+                    removed += await self._unlink(batch)
+                
+                if removed:
+                    logger.info(f"Invalidated {removed} keys matching pattern '{pattern}'")
+                return removed
                 
             except Exception as e:
                 self._stats['errors'] += 1
@@ -421,20 +1139,122 @@ class EnhancedCacheService:
                 raise CacheException(f"Cache INVALIDATE_PATTERN failed: {e}")
             finally:
                 self._stats['total_operations'] += 1
+                self._record_invalidation('pattern', start_time, removed)
+    
+    async def _unlink(self, keys: List[str]) -> int:
+        """
+        UNLINK keys together with their get_or_set delta keys in one round
+        trip. Returns the number of ``keys`` removed.
+        """
+        async with self._client.pipeline(transaction=False) as pipe:
+            await pipe.unlink(*keys)
+            await pipe.unlink(*[key + DELTA_KEY_SUFFIX for key in keys])
+            removed, _ = await pipe.execute()
+        return removed
+    
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.config.tag_key_prefix}{tag}"
+    
+    async def _register_tags(self, keys: List[str], tags: List[str], ttl: int) -> None:
+        """
+        Add keys to the Redis sets backing each tag. A set lives at least as
+        long as its longest-lived member, and persists if any member does.
+        """
+        async with self._circuit_breaker_context('register_tags'):
+            try:
+                tag_ttl = max(ttl, self.config.tag_ttl) if ttl > 0 else 0
+                async with self._client.pipeline(transaction=False) as pipe:
+                    for tag in tags:
+                        for start in range(0, len(keys), TAG_SCRIPT_BATCH_SIZE):
+                            await pipe.eval(
+                                REGISTER_TAG_SCRIPT,
+                                1,
+                                self._tag_key(tag),
+                                tag_ttl,
+                                *keys[start:start + TAG_SCRIPT_BATCH_SIZE],
+                            )
+                    await pipe.execute()
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Cache tag registration error for tags {tags}: {e}")
+                raise CacheException(f"Cache tag registration failed: {e}")
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate every key registered under any of the given tags.
+        
+        Members are popped from each tag set in chunks and removed with UNLINK,
+        so large tags never block Redis and concurrent invalidations of the
+        same tag do not duplicate work. Returns the number of keys removed.
+        """
+        start_time = time.time()
+        removed = 0
+        async with self._circuit_breaker_context('invalidate_tags'):
+            try:
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    while True:
+                        members = await self._client.spop(
+                            tag_key, self.config.invalidation_batch_size
+                        )
+                        if not members:
+                            break
+                        keys = [
+                            m.decode('utf-8') if isinstance(m, bytes) else m
+                            for m in members
+                        ]
+                        await self._wait_for_flush(keys)
+                        for key in keys:
+                            self._write_buffer.pop(key, None)
+                        removed += await self._unlink(keys)
+                        await self._publish_invalidation(keys=keys)
+                        await asyncio.sleep(0)
+                
+                logger.info(f"Invalidated {removed} keys for tags {list(tags)}")
+                return removed
+                
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Cache INVALIDATE_TAGS error for tags {list(tags)}: {e}")
+                raise CacheException(f"Cache INVALIDATE_TAGS failed: {e}")
+            finally:
+                self._stats['total_operations'] += 1
+                self._record_invalidation('tag', start_time, removed)
+    
+    def _record_invalidation(self, method: str, start_time: float, removed: int) -> None:
+        """Export invalidation duration and volume."""
+        CACHE_INVALIDATION_DURATION.labels(
+            cache_name=self.cache_name, method=method
+        ).observe(time.time() - start_time)
+        if removed:
+            CACHE_INVALIDATED_KEYS_TOTAL.labels(
+                cache_name=self.cache_name, method=method
+            ).inc(removed)
     
     async def get_multiple(self, keys: List[str]) -> Dict[str, Any]:
         """Get multiple values from cache in a single operation."""
+        result = {}
+        remote_keys = []
+        for key in keys:
+            value = self._local_get(key)
+            if value is not None:
+                result[key] = value
+            else:
+                remote_keys.append(key)
+        
+        if not remote_keys:
+            self._stats['total_operations'] += len(keys)
+            self._update_hit_ratio()
+            return result
+        
         async with self._circuit_breaker_context('get_multiple'):
             try:
-                if not keys:
-                    return {}
+                values, pttls = await self._read_l2(remote_keys)
                 
-                values = await self._client.mget(keys)
-                result = {}
-                
-                for key, value in zip(keys, values):
+                for key, value, pttl in zip(remote_keys, values, pttls):
                     if value is not None:
                         result[key] = self._deserialize_value(value)
+                        self._local_set_from_l2(key, value, pttl, result[key])
                         self._stats['hits'] += 1
                     else:
                         self._stats['misses'] += 1
@@ -452,9 +1272,18 @@ class EnhancedCacheService:
     async def set_multiple(
         self, 
         mapping: Dict[str, Any], 
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
-        """Set multiple values in cache."""
+        """Set multiple values in cache, optionally registering them under tags."""
+        if self.config.strategy == CacheStrategy.WRITE_BEHIND:
+            ttl = ttl or 0
+            for key, value in mapping.items():
+                await self._buffer_write(key, self._serialize_value(value), ttl)
+            if tags and mapping:
+                await self._register_tags(list(mapping.keys()), tags, ttl)
+            return True
+        
         async with self._circuit_breaker_context('set_multiple'):
             try:
                 if not mapping:
@@ -476,7 +1305,13 @@ class EnhancedCacheService:
                             await pipe.expire(key, ttl)
                     
                     results = await pipe.execute()
-                    return all(results)
+                
+                await self._publish_invalidation(keys=list(mapping.keys()))
+                for key, data in serialized_mapping.items():
+                    self._local_set(key, data, ttl)
+                if tags:
+                    await self._register_tags(list(mapping.keys()), tags, ttl or 0)
+                return all(results)
                 
             except Exception as e:
                 self._stats['errors'] += 1
@@ -556,11 +1391,20 @@ class EnhancedCacheService:
         }
     
     def _update_hit_ratio(self) -> None:
-        """Update cache hit ratio metric."""
-        total_requests = self._stats['hits'] + self._stats['misses']
-        if total_requests > 0:
-            hit_ratio = self._stats['hits'] / total_requests
-            CACHE_HIT_RATIO.labels(cache_name=self.cache_name).set(hit_ratio)
+        """Update per-tier cache hit ratio metrics."""
+        l1_lookups = self._stats['l1_hits'] + self._stats['l1_misses']
+        if l1_lookups > 0:
+            CACHE_HIT_RATIO.labels(cache_name=self.cache_name, tier='l1').set(
+                self._stats['l1_hits'] / l1_lookups
+            )
+        
+        # L2 only sees the lookups that missed L1
+        l2_hits = self._stats['hits'] - self._stats['l1_hits']
+        l2_lookups = l2_hits + self._stats['misses']
+        if l2_lookups > 0:
+            CACHE_HIT_RATIO.labels(cache_name=self.cache_name, tier='l2').set(
+                l2_hits / l2_lookups
+            )
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -574,6 +1418,7 @@ class EnhancedCacheService:
             'errors': self._stats['errors'],
             'total_operations': self._stats['total_operations'],
             'hit_ratio': hit_ratio,
+            'l1': self._local.get_stats() if self._local is not None else None,
             'circuit_breaker_state': self._circuit_breaker.state.value,
             'circuit_breaker_failures': self._circuit_breaker.failure_count,
             'is_healthy': self._is_healthy
@@ -607,7 +1452,15 @@ async def get_cache_service(
 
 
 async def close_all_cache_services() -> None:
-    """Close all cache service instances."""
+    """Flush buffered writes and close all cache service instances."""
+    for name, service in _cache_services.items():
+        try:
+            flushed = await service.flush()
+            if flushed:
+                logger.info(f"Flushed {flushed} buffered writes for cache '{name}'")
+        except Exception as e:
+            logger.error(f"Failed to flush cache '{name}' on shutdown: {e}")
+    
     for service in _cache_services.values():
         await service.close()
     _cache_services.clear()
\ No newline at end of file
@@ -1,9 +1,14 @@
 """Service for generating video clips."""
 
+import bisect
 import os
 import ffmpeg
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
+
+# Seconds a clip starts before its keyframe, so rounding of probed keyframe
+# times never drops the keyframe itself
+KEYFRAME_MARGIN = 0.001
 
 
 class ClipGenerationError(Exception):
@@ -12,12 +17,104 @@ class ClipGenerationError(Exception):
     pass
 
 
+def merge_clip_windows(timestamps: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """
+    Sorts clip windows by start time and merges windows that overlap or
+    touch, so no part of the video is cut twice. Empty windows are dropped.
+    """
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(timestamps):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def probe_keyframe_times(video_path: str) -> List[float]:
+    """
+    The presentation times of the first video stream's keyframes, in
+    ascending order, read from packet flags without decoding.
+
+    Raises:
+        ffmpeg.Error: If ffprobe fails.
+    """
+    probe = ffmpeg.probe(
+        video_path, select_streams="v:0", show_entries="packet=pts_time,flags"
+    )
+    return sorted(
+        float(packet["pts_time"])
+        for packet in probe.get("packets", [])
+        if "K" in packet.get("flags", "") and packet.get("pts_time", "N/A") != "N/A"
+    )
+
+
+def snap_to_keyframes(
+    timestamps: Sequence[Tuple[float, float]], keyframe_times: Sequence[float]
+) -> List[Tuple[float, float]]:
+    """
+    Moves each window's start back to the keyframe at or before it.
+
+    Stream-copied clips can only start on a keyframe: cut elsewhere, the
+    video would begin at the next keyframe while the audio begins at the
+    requested start. Without keyframe times the windows are left as they are.
+    """
+    if not keyframe_times:
+        return list(timestamps)
+    snapped = []
+    for start, end in timestamps:
+        index = bisect.bisect_right(keyframe_times, start) - 1
+        if end > start and index >= 0:
+            start = max(0.0, keyframe_times[index] - KEYFRAME_MARGIN)
+        snapped.append((start, end))
+    return snapped
+
+
+def keyframe_aligned_windows(
+    video_path: str, timestamps: Sequence[Tuple[float, float]]
+) -> List[Tuple[float, float]]:
+    """
+    The clip windows to cut from a video: starts snapped back to keyframes,
+    then overlapping or adjacent windows merged.
+
+    Raises:
+        ffmpeg.Error: If ffprobe fails.
+    """
+    return merge_clip_windows(snap_to_keyframes(timestamps, probe_keyframe_times(video_path)))
+
+
+def multi_clip_output(
+    video_path: str, windows: Sequence[Tuple[float, float]], output_paths: Sequence[str]
+):
+    """
+    An ffmpeg command cutting every window out of a video in one process.
+
+    The source is opened and demuxed once, and its packets are stream-copied
+    to one output per window. The -ss/-to of each output refer to the source
+    timeline; a window should start on a keyframe (see
+    ``keyframe_aligned_windows``), since stream copy drops the packets before
+    the first keyframe after -ss. Run the returned node with ``.run()`` or turn it into
+    arguments with ``.compile()``.
+    """
+    source = ffmpeg.input(video_path)
+    return ffmpeg.merge_outputs(*(
+        source.output(output_path, ss=start, to=end, c="copy")
+        for (start, end), output_path in zip(windows, output_paths)
+    ))
+
+
 def generate_clips(
     video_path: str, timestamps: List[Tuple[float, float]], output_dir: str = "clips"
 ) -> List[str]:
     """
     Generates video clips from a source video file based on timestamps.
 
+    Clip starts are moved back to the preceding keyframe, overlapping or
+    adjacent timestamps are merged into one clip, and every clip is cut by a
+    single ffmpeg process.
+
     Args:
         video_path: The path to the source video file.
         timestamps: A list of tuples, where each tuple contains the
@@ -25,10 +122,12 @@ def generate_clips(
         output_dir: The directory where the generated clips will be saved.
 
     Returns:
-        A list of paths to the generated clips.
+        A list of paths to the generated clips, one per merged window, in
+        time order.
 
     Raises:
-        ClipGenerationError: If the video file does not exist or if ffmpeg fails.
+        ClipGenerationError: If the video file does not exist or if ffmpeg or
+                             ffprobe fails.
     """
     # Sanitize the video path to prevent path traversal attacks
     safe_filename = os.path.basename(video_path)
@@ -40,25 +139,29 @@ def generate_clips(
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    clip_paths = []
     base_name = video_file.stem
+    try:
+        windows = keyframe_aligned_windows(str(video_file), timestamps)
+    except ffmpeg.Error as e:
+        raise ClipGenerationError(
+            f"Failed to probe keyframes of {safe_filename}: {e.stderr.decode()}"
+        )
+    if not windows:
+        return []
+    clip_paths = [
+        str(output_path / f"{base_name}_clip_{i+1}.mp4") for i in range(len(windows))
+    ]
 
-    for i, (start_time, end_time) in enumerate(timestamps):
-        output_filename = f"{base_name}_clip_{i+1}.mp4"
-        output_filepath = output_path / output_filename
-
-        try:
-            (
-                ffmpeg.input(str(video_file), ss=start_time)
-                .output(str(output_filepath), to=end_time, c="copy")
-                .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
-            )
-            clip_paths.append(str(output_filepath))
-            print(f"Successfully generated clip: {output_filepath}")
-        except ffmpeg.Error as e:
-            error_message = e.stderr.decode()
-            raise ClipGenerationError(
-                f"Failed to generate clip for timestamp {start_time}-{end_time}: {error_message}"
-            )
+    try:
+        multi_clip_output(str(video_file), windows, clip_paths).run(
+            capture_stdout=True, capture_stderr=True, overwrite_output=True
+        )
+    except ffmpeg.Error as e:
+        error_message = e.stderr.decode()
+        raise ClipGenerationError(
+            f"Failed to generate clips for timestamps {windows}: {error_message}"
+        )
+    for clip_path in clip_paths:
+        print(f"Successfully generated clip: {clip_path}")
 
     return clip_paths
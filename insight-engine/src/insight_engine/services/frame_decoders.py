@@ -0,0 +1,279 @@
+"""
+Decode strategies for video preprocessing.
+
+Keyframe extraction only needs a coarse view of the video: hashing works on
+an 8x8 grid and the model input is 224x224. The decoders in this module
+avoid decoding, converting or scaling frames that would be thrown away:
+
+- ``full``: every frame at full resolution through OpenCV (the default).
+- ``stride``: OpenCV ``grab()`` advances past skipped frames without
+  converting them, and only every ``stride``-th frame is retrieved.
+- ``keyframes``: only I-frames are decoded, through PyAV, and the decoder
+  skips all other frames.
+- ``pyav``: every frame through PyAV, with the codec's motion vectors
+  exported as side data for motion features (see ``motion_features``).
+- ``lowres``: ffmpeg decodes and scales straight to a small size with its
+  scale filter (optionally every ``stride``-th frame), streaming raw BGR.
+
+Every decoder yields ``(frame_number, frame)`` pairs. Frame numbers start at
+1 and refer to the source video, so timestamps stay correct when frames are
+skipped.
+"""
+
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Generator, Optional, Tuple
+
+import cv2
+import ffmpeg
+import numpy as np
+from loguru import logger
+
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.motion_features import motion_from_vectors
+
+try:
+    import av
+except ImportError:  # pragma: no cover - optional dependency
+    av = None
+
+DecodedFrame = Tuple[int, np.ndarray]
+
+
+class FrameDecoder(ABC):
+    """Decodes the frames of a video for preprocessing."""
+
+    name: str
+    # Motion of the last yielded frame, measured from codec motion vectors by
+    # decoders that export them; None when the frame carried no vectors
+    motion_magnitude: Optional[float] = None
+
+    @abstractmethod
+    def frames(self, video_path: str) -> Generator[DecodedFrame, None, None]:
+        """Yields (frame number, BGR frame) pairs."""
+
+
+class OpenCVDecoder(FrameDecoder):
+    """
+    Decodes with OpenCV, retrieving every ``stride``-th frame. Skipped frames
+    are only grabbed, which demuxes and decodes them but skips the colour
+    conversion and copy to a NumPy array.
+    """
+
+    def __init__(self, stride: int = 1):
+        if stride < 1:
+            raise ConfigurationException(
+                "Decode stride must be at least 1", config_key="decode_stride"
+            )
+        self.stride = stride
+        self.name = "full" if stride == 1 else "stride"
+
+    def frames(self, video_path: str) -> Generator[DecodedFrame, None, None]:
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                logger.error(f"Error opening video file: {video_path}")
+                return
+
+            frame_number = 0
+            while cap.isOpened():
+                if frame_number % self.stride:
+                    if not cap.grab():
+                        break
+                    frame_number += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_number += 1
+                yield frame_number, frame
+        finally:
+            cap.release()
+
+
+class PyAVKeyframeDecoder(FrameDecoder):
+    """
+    Decodes only the I-frames of a video with PyAV. The codec is told to
+    skip non-key frames, so their decoding cost is never paid.
+    """
+
+    name = "keyframes"
+
+    def __init__(self, size: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            size: Optional (width, height) the frames are scaled to by swscale.
+        """
+        if av is None:
+            raise ConfigurationException(
+                "Keyframe-only decoding requires PyAV (pip install av)",
+                config_key="decode_mode",
+            )
+        self.size = size
+
+    def frames(self, video_path: str) -> Generator[DecodedFrame, None, None]:
+        try:
+            container = av.open(video_path)
+        except Exception as e:
+            logger.error(f"Error opening video file: {video_path}: {e}")
+            return
+
+        with container:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = "NONKEY"
+            stream.thread_type = "AUTO"
+            fps = float(stream.average_rate or stream.guessed_rate or 0)
+            width, height = self.size or (None, None)
+
+            for decoded in container.decode(stream):
+                frame = decoded.to_ndarray(format="bgr24", width=width, height=height)
+                seconds = decoded.time or 0.0
+                yield int(round(seconds * fps)) + 1, frame
+
+
+class PyAVDecoder(FrameDecoder):
+    """
+    Decodes every frame with PyAV, asking the codec to export its motion
+    vectors. Before each frame is yielded, ``motion_magnitude`` is set from
+    the frame's vectors, or to None for frames without any (I-frames, or
+    codecs that cannot export them).
+    """
+
+    name = "pyav"
+
+    def __init__(self, size: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            size: Optional (width, height) the frames are scaled to by swscale.
+        """
+        if av is None:
+            raise ConfigurationException(
+                "PyAV decoding requires PyAV (pip install av)",
+                config_key="decode_mode",
+            )
+        self.size = size
+        self.motion_magnitude = None
+
+    def frames(self, video_path: str) -> Generator[DecodedFrame, None, None]:
+        try:
+            container = av.open(video_path)
+        except Exception as e:
+            logger.error(f"Error opening video file: {video_path}: {e}")
+            return
+
+        with container:
+            stream = container.streams.video[0]
+            stream.codec_context.options = {"flags2": "+export_mvs"}
+            stream.thread_type = "AUTO"
+            fps = float(stream.average_rate or stream.guessed_rate or 0)
+            width, height = self.size or (None, None)
+
+            for decoded in container.decode(stream):
+                side_data = decoded.side_data.get("MOTION_VECTORS")
+                self.motion_magnitude = (
+                    motion_from_vectors(side_data.to_ndarray(), decoded.width, decoded.height)
+                    if side_data is not None
+                    else None
+                )
+                frame = decoded.to_ndarray(format="bgr24", width=width, height=height)
+                seconds = decoded.time or 0.0
+                yield int(round(seconds * fps)) + 1, frame
+            self.motion_magnitude = None
+
+
+class FFmpegScaledDecoder(FrameDecoder):
+    """
+    Decodes through an ffmpeg subprocess that scales frames to ``size``
+    (and keeps every ``stride``-th frame) before they leave ffmpeg, so
+    full-resolution frames are never converted or copied into Python.
+    """
+
+    name = "lowres"
+
+    def __init__(self, size: Tuple[int, int], stride: int = 1):
+        if stride < 1:
+            raise ConfigurationException(
+                "Decode stride must be at least 1", config_key="decode_stride"
+            )
+        self.size = size
+        self.stride = stride
+
+    def command(self, video_path: str) -> list:
+        """The ffmpeg command line for a video."""
+        width, height = self.size
+        stream = ffmpeg.input(video_path)
+        if self.stride > 1:
+            stream = stream.filter("framestep", self.stride)
+        stream = stream.filter("scale", width, height)
+        stream = stream.output(
+            "pipe:", format="rawvideo", pix_fmt="bgr24", vsync="passthrough"
+        )
+        return ffmpeg.compile(stream.global_args("-loglevel", "error"))
+
+    def frames(self, video_path: str) -> Generator[DecodedFrame, None, None]:
+        width, height = self.size
+        frame_bytes = width * height * 3
+        try:
+            process = subprocess.Popen(
+                self.command(video_path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            logger.error(f"Could not start ffmpeg for {video_path}: {e}")
+            return
+
+        index = 0
+        try:
+            while True:
+                buffer = process.stdout.read(frame_bytes)
+                if len(buffer) < frame_bytes:
+                    break
+                frame = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+                yield index * self.stride + 1, frame
+                index += 1
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            stderr = process.stderr.read().decode(errors="replace")
+            process.stderr.close()
+            if process.wait() not in (0, -9) and stderr:
+                logger.error(f"ffmpeg failed to decode {video_path}: {stderr.strip()}")
+
+
+DECODE_MODES = ("full", "stride", "keyframes", "pyav", "lowres")
+
+
+def create_frame_decoder(
+    mode: str = "full",
+    stride: int = 1,
+    size: Optional[Tuple[int, int]] = None,
+) -> FrameDecoder:
+    """
+    Builds the decoder for a decode mode.
+
+    Args:
+        mode: One of ``DECODE_MODES``.
+        stride: Keep every ``stride``-th frame (``stride`` and ``lowres`` modes).
+        size: (width, height) to decode to (``lowres``, optionally ``keyframes``
+              and ``pyav``).
+    """
+    if mode == "full":
+        return OpenCVDecoder()
+    if mode == "stride":
+        return OpenCVDecoder(stride)
+    if mode == "keyframes":
+        return PyAVKeyframeDecoder(size)
+    if mode == "pyav":
+        return PyAVDecoder(size)
+    if mode == "lowres":
+        if size is None:
+            raise ConfigurationException(
+                "Low-resolution decoding needs a decode size", config_key="decode_width"
+            )
+        return FFmpegScaledDecoder(size, stride)
+    raise ConfigurationException(
+        f"Unknown decode mode '{mode}'. Available: {', '.join(DECODE_MODES)}",
+        config_key="decode_mode",
+    )
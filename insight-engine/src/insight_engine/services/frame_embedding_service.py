@@ -0,0 +1,239 @@
+"""
+Batched image embeddings for keyframes.
+
+This module provides:
+- An ONNX Runtime image encoder (CLIP-style) for the registry's embedding
+  model, run on whole keyframe batches
+- Preprocessing fused into one pass from the uint8 RGB keyframes to the
+  normalized CHW input tensor
+- A process-wide embedding cache keyed by a hash of the frame content, so
+  frames repeated within or across videos are encoded once
+- Prometheus metrics for cache hits and encoder batches
+
+Embeddings are L2-normalized, matching the cosine distance of the frame
+collection.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+from insight_engine.config import settings
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.local_cache import LocalCache
+from insight_engine.services.model_registry_service import ModelRegistryService
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+FRAME_EMBEDDING_CACHE_LOOKUPS = Counter(
+    'frame_embedding_cache_lookups_total',
+    'Frame embedding cache lookups',
+    ['result']
+)
+
+FRAME_EMBEDDING_BATCH_DURATION = Histogram(
+    'frame_embedding_batch_duration_seconds',
+    'Duration of one image encoder pass',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+# CLIP image normalization, in RGB order
+CLIP_MEAN = np.array([0.48145466, 0.4578275, 0.40821073], dtype=np.float32)
+CLIP_STD = np.array([0.26862954, 0.26130258, 0.27577711], dtype=np.float32)
+
+
+def frame_digest(frame: np.ndarray) -> str:
+    """A content hash of a frame, identical for byte-identical frames."""
+    digest = hashlib.blake2b(np.ascontiguousarray(frame).data, digest_size=16)
+    digest.update(str(frame.shape).encode())
+    return digest.hexdigest()
+
+
+def prepare_image_batch(
+    frames: np.ndarray,
+    size: int,
+    mean: np.ndarray = CLIP_MEAN,
+    std: np.ndarray = CLIP_STD,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Turns uint8 RGB frames into a normalized (n, 3, size, size) float32
+    tensor. Scaling to [0, 1] and the mean/std normalization are folded into
+    one multiply-add per channel.
+    """
+    if frames.shape[1:3] != (size, size):
+        frames = np.stack([cv2.resize(frame, (size, size)) for frame in frames])
+    if out is None:
+        out = np.empty((len(frames), 3, size, size), dtype=np.float32)
+    scale = (1 / (255 * std)).astype(np.float32)[:, None, None]
+    bias = (-mean / std).astype(np.float32)[:, None, None]
+    np.multiply(frames.transpose(0, 3, 1, 2), scale, out=out)
+    out += bias
+    return out
+
+
+class OnnxImageEncoder:
+    """Encodes image batches with an ONNX image embedding model."""
+
+    def __init__(
+        self,
+        model_path: str,
+        input_size: int = 224,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1,
+    ):
+        """
+        Args:
+            model_path: The ONNX model file, taking (n, 3, size, size) input.
+            input_size: The square input size, used when the model input
+                        has dynamic spatial dimensions.
+            intra_op_threads: Threads per operator; 0 uses every core.
+            inter_op_threads: Threads running independent operators.
+        """
+        if ort is None:
+            raise ConfigurationException(
+                "Frame embeddings require onnxruntime (pip install onnxruntime)",
+                config_key="embedding.enabled",
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        spatial = model_input.shape[-1]
+        self.input_size = spatial if isinstance(spatial, int) else input_size
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        self._input: Optional[np.ndarray] = None
+        logger.info(
+            f"Loaded image encoder '{model_path}' ({self.dimension}-dimensional embeddings)."
+        )
+
+    def encode(self, frames: np.ndarray) -> np.ndarray:
+        """Embeds uint8 RGB frames into L2-normalized float32 vectors."""
+        size = self.input_size
+        if self._input is None or self._input.shape[0] < len(frames):
+            self._input = np.empty((len(frames), 3, size, size), dtype=np.float32)
+        batch = prepare_image_batch(frames, size, out=self._input[:len(frames)])
+        embeddings = self.session.run(None, {self.input_name: batch})[0]
+        embeddings = embeddings.reshape(len(frames), -1).astype(np.float32, copy=False)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+class FrameEmbeddingService:
+    """
+    Embeds keyframe batches, encoding only frames not seen before.
+
+    Duplicate frames within a batch are encoded once, and embeddings are
+    kept in an LRU cache keyed by frame content, shared by every video the
+    process analyzes.
+    """
+
+    def __init__(self, encoder, cache_entries: int = 50000, batch_size: int = 32):
+        """
+        Args:
+            encoder: An image encoder with ``encode(frames)`` and ``dimension``.
+            cache_entries: Embeddings kept in the cache; 0 disables it.
+            batch_size: The most frames per encoder pass.
+        """
+        self.encoder = encoder
+        self.cache = LocalCache(
+            max_entries=cache_entries,
+            max_bytes=max(1, cache_entries) * encoder.dimension * 4,
+        )
+        self.batch_size = batch_size
+
+    @property
+    def dimension(self) -> int:
+        return self.encoder.dimension
+
+    def embed_batch(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Embeds a batch of uint8 RGB frames.
+
+        Args:
+            frames: A (n, height, width, 3) array of frames.
+
+        Returns:
+            A (n, dimension) float32 array of L2-normalized embeddings.
+        """
+        embeddings = np.empty((len(frames), self.dimension), dtype=np.float32)
+        pending = {}  # Digest -> indices of the frames to encode
+        for index, frame in enumerate(frames):
+            digest = frame_digest(frame)
+            cached = self.cache.get(digest)
+            if cached is not None:
+                embeddings[index] = cached
+            else:
+                pending.setdefault(digest, []).append(index)
+        FRAME_EMBEDDING_CACHE_LOOKUPS.labels(result="hit").inc(
+            len(frames) - sum(len(indices) for indices in pending.values())
+        )
+        FRAME_EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(len(pending))
+
+        digests: List[str] = list(pending)
+        for start in range(0, len(digests), self.batch_size):
+            chunk = digests[start:start + self.batch_size]
+            began = time.perf_counter()
+            vectors = self.encoder.encode(frames[[pending[digest][0] for digest in chunk]])
+            FRAME_EMBEDDING_BATCH_DURATION.observe(time.perf_counter() - began)
+            for digest, vector in zip(chunk, vectors):
+                embeddings[pending[digest]] = vector
+                self.cache.set(digest, vector.copy(), size=vector.nbytes)
+        return embeddings
+
+
+# Shared service instance
+_frame_embedding_service: Optional[FrameEmbeddingService] = None
+
+
+def get_frame_embedding_service(
+    model_registry: Optional[ModelRegistryService] = None,
+) -> FrameEmbeddingService:
+    """
+    Return the process-wide frame embedding service, loading the production
+    embedding model's artifact from the model registry on first use.
+    """
+    global _frame_embedding_service
+    if _frame_embedding_service is None:
+        embedding = settings.embedding
+        registry = model_registry or ModelRegistryService()
+        model_path = registry.get_model_artifact(embedding.model_name, embedding.artifact)
+        if model_path is None:
+            raise ConfigurationException(
+                f"No production model '{embedding.model_name}' in the model registry",
+                config_key="embedding.model_name",
+            )
+        encoder = OnnxImageEncoder(
+            model_path,
+            input_size=embedding.input_size,
+            intra_op_threads=embedding.intra_op_threads,
+            inter_op_threads=embedding.inter_op_threads,
+        )
+        if encoder.dimension != settings.qdrant.embedding_dimension:
+            raise ConfigurationException(
+                f"Embedding model '{embedding.model_name}' produces {encoder.dimension}-"
+                f"dimensional vectors, but the collection expects "
+                f"{settings.qdrant.embedding_dimension}",
+                config_key="qdrant.embedding_dimension",
+            )
+        _frame_embedding_service = FrameEmbeddingService(
+            encoder, cache_entries=embedding.cache_entries, batch_size=embedding.batch_size
+        )
+    return _frame_embedding_service
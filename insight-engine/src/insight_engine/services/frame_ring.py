@@ -0,0 +1,222 @@
+"""
+Shared-memory frame transport between decode and inference processes.
+
+Pickling every transformed frame to send it to another process costs more
+than running the model on it. SharedFrameRing instead keeps a
+fixed number of frame-sized slots in one ``multiprocessing.shared_memory``
+block:
+
+- Producers take a free slot, write the frame into it in place and publish
+  the slot index together with small metadata (frame number, timestamp).
+- Consumers receive the slot index and read the frame as a NumPy view of
+  the shared block, with no copy, then hand the slot back.
+- Only slot indices and metadata cross process boundaries, through two
+  multiprocessing queues: the free slots and the published frames.
+- A producer finding no free slot blocks (or times out), so a slow consumer
+  applies backpressure to decoding instead of letting frames pile up.
+- The ring is created for a fixed number of producers and consumers. Each
+  producer closes its side when done; once the last one has, every
+  consumer receives its own end-of-stream marker.
+
+The ring is handed to worker processes when they start (as a Process
+argument or a pool initializer argument), since multiprocessing queues can
+only be shared by inheritance. The creating process owns the shared block
+and unlinks it in ``unlink``.
+"""
+
+import logging
+import queue
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FrameRef:
+    """A published frame: its slot in the ring and its metadata."""
+    slot: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class SharedFrameRing:
+    """A ring of fixed-size frame slots in shared memory."""
+
+    def __init__(
+        self,
+        slots: int,
+        frame_shape: Tuple[int, ...],
+        dtype: Any = np.float32,
+        context: Any = None,
+        producers: int = 1,
+        consumers: int = 1,
+    ):
+        """
+        Creates the shared block and the slot queues.
+
+        Args:
+            slots: Number of frames that can be in flight at once.
+            frame_shape: The shape of every frame, e.g. (224, 224, 3).
+            dtype: The frame dtype.
+            context: The multiprocessing context the worker processes are
+                     started from. Defaults to the default context.
+            producers: Number of producers that will call ``close_writer``.
+            consumers: Number of consumers that each read until they
+                       receive the end of the stream.
+        """
+        if slots < 1:
+            raise ValueError("A frame ring needs at least one slot")
+        if producers < 1 or consumers < 1:
+            raise ValueError("A frame ring needs at least one producer and one consumer")
+        self.slots = slots
+        self.producers = producers
+        self.consumers = consumers
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+
+        context = context or get_context()
+        self._shm = SharedMemory(create=True, size=self.frame_nbytes * slots)
+        self._owner = True
+        self._free = context.Queue(maxsize=slots)
+        # Room for every slot plus one end marker per consumer
+        self._ready = context.Queue(maxsize=slots + consumers)
+        self._open_writers = context.Value("i", producers)
+        for slot in range(slots):
+            self._free.put(slot)
+        self._frames = self._map_frames()
+        logger.info(
+            f"Created shared frame ring '{self.name}' with {slots} slots of "
+            f"{self.frame_shape} {self.dtype} ({self.frame_nbytes * slots / 2**20:.1f} MiB)"
+        )
+
+    def _map_frames(self) -> np.ndarray:
+        return np.ndarray(
+            (self.slots, *self.frame_shape), dtype=self.dtype, buffer=self._shm.buf
+        )
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # Children attach to the block by name; the mapping itself is not sent
+        del state["_shm"], state["_frames"]
+        state["_owner"] = False
+        state["_shm_name"] = self.name
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        shm_name = state.pop("_shm_name")
+        self.__dict__.update(state)
+        self._shm = SharedMemory(name=shm_name)
+        self._frames = self._map_frames()
+
+    def frame(self, slot: int) -> np.ndarray:
+        """The frame in a slot, as a writable view of the shared block."""
+        return self._frames[slot]
+
+    # --- Producer side ---
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """
+        Takes a free slot to write a frame into, waiting while the ring is full.
+
+        Raises:
+            queue.Full: No slot was released within ``timeout`` seconds.
+        """
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise queue.Full(f"No free frame slot within {timeout}s") from None
+
+    def publish(self, slot: int, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Hands a written slot to the consumers."""
+        self._ready.put(FrameRef(slot, metadata or {}))
+
+    def put(
+        self,
+        frame: np.ndarray,
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """Copies a frame into a free slot and publishes it."""
+        slot = self.acquire(timeout)
+        np.copyto(self._frames[slot], frame, casting="same_kind")
+        self.publish(slot, metadata)
+        return slot
+
+    def close_writer(self) -> None:
+        """
+        Marks the end of one producer's stream. Each producer calls this once;
+        after the last one, every consumer receives None.
+        """
+        with self._open_writers.get_lock():
+            if self._open_writers.value <= 0:
+                raise RuntimeError("Every producer of the frame ring has already closed it")
+            self._open_writers.value -= 1
+            last = self._open_writers.value == 0
+        if last:
+            for _ in range(self.consumers):
+                self._ready.put(None)
+
+    # --- Consumer side ---
+
+    def get(self, timeout: Optional[float] = None) -> Optional[FrameRef]:
+        """
+        Receives the next published frame, or None at the end of the stream.
+        The slot stays reserved until it is released.
+
+        Raises:
+            queue.Empty: Nothing was published within ``timeout`` seconds.
+        """
+        return self._ready.get(timeout=timeout)
+
+    def release(self, slot: int) -> None:
+        """Returns a consumed slot to the producers."""
+        self._free.put(slot)
+
+    @contextmanager
+    def consume(
+        self, timeout: Optional[float] = None
+    ) -> Iterator[Optional[Tuple[np.ndarray, Dict[str, Any]]]]:
+        """
+        Receives the next frame as a zero-copy view with its metadata, and
+        releases its slot when the block exits. Yields None at the end of
+        the stream. The view must not be used after the block.
+        """
+        ref = self.get(timeout)
+        if ref is None:
+            yield None
+            return
+        try:
+            yield self._frames[ref.slot], ref.metadata
+        finally:
+            self.release(ref.slot)
+
+    # --- Lifecycle ---
+
+    def close(self) -> None:
+        """Detaches this process from the shared block."""
+        self._frames = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Frees the shared block. Only the creating process may unlink it."""
+        if not self._owner:
+            raise RuntimeError("Only the process that created the frame ring can unlink it")
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrameRing":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
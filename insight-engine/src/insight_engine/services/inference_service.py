@@ -1,30 +1,205 @@
 import logging
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Sequence
 import numpy as np
+from prometheus_client import Gauge, Histogram
 from ultralytics import YOLO
 from insight_engine.config import settings
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.model_registry_service import ModelRegistryService
+from insight_engine.services.onnx_backend import OnnxDetectionBackend
 
 logger = logging.getLogger(__name__)
 
+# Prometheus metrics
+INFERENCE_BATCH_DURATION = Histogram(
+    'inference_batch_duration_seconds',
+    'Duration of one batched forward pass',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+INFERENCE_BATCH_SIZE = Gauge(
+    'inference_batch_size',
+    'Current adaptive inference batch size'
+)
+
+
+class AdaptiveBatchSizer:
+    """
+    Adapts the inference batch size to a latency target per forward pass.
+
+    The batch grows by one frame while a pass finishes well inside the
+    target and is halved when a pass overshoots it, so it settles at the
+    largest batch that meets the target.
+    """
+
+    # A pass faster than this fraction of the target lets the batch grow
+    GROW_BELOW = 0.8
+
+    def __init__(
+        self,
+        target_latency_ms: float,
+        min_size: int = 1,
+        max_size: int = 32,
+        initial_size: int = 8,
+    ):
+        if not 1 <= min_size <= max_size:
+            raise ValueError("Batch size bounds must satisfy 1 <= min_size <= max_size")
+        self.target_latency_ms = target_latency_ms
+        self.min_size = min_size
+        self.max_size = max_size
+        self.size = min(max(initial_size, min_size), max_size)
+        INFERENCE_BATCH_SIZE.set(self.size)
+
+    def record(self, batch_size: int, latency_ms: float) -> int:
+        """
+        Records the latency of a pass and returns the next batch size.
+        Partial batches smaller than the current size only shrink it.
+        """
+        if latency_ms > self.target_latency_ms:
+            self.size = max(self.min_size, min(self.size, batch_size) // 2)
+        elif batch_size >= self.size and latency_ms < self.target_latency_ms * self.GROW_BELOW:
+            self.size = min(self.max_size, self.size + 1)
+        INFERENCE_BATCH_SIZE.set(self.size)
+        return self.size
+
+
 class InferenceService:
     """
     A service to perform inference using the official ultralytics library.
     This service automatically downloads and caches the specified model.
+
+    With ``settings.inference.backend = "onnxruntime"`` the service instead
+    serves the production model's ONNX artifact from the model registry
+    through a pool of ONNX Runtime sessions.
     """
 
-    def __init__(self):
+    def __init__(self, model_registry: Optional[ModelRegistryService] = None):
         """
         Initializes the InferenceService by loading the specified model
-        using the ultralytics.YOLO class.
+        using the ultralytics.YOLO class, or the ONNX Runtime backend.
+
+        Args:
+            model_registry: The registry resolving ONNX artifacts. Defaults to
+                            the registry at the configured path.
         """
         self.model_name = settings.inference.model_name
-        logger.info(f"Loading model '{self.model_name}' using ultralytics.YOLO.")
+        self.model = None
+        self.onnx_backend: Optional[OnnxDetectionBackend] = None
+        if settings.inference.backend == "onnxruntime":
+            self.onnx_backend = self._load_onnx_backend(model_registry or ModelRegistryService())
+        else:
+            logger.info(f"Loading model '{self.model_name}' using ultralytics.YOLO.")
+            try:
+                # YOLO() will automatically download the model if it's not cached.
+                self.model = YOLO(self.model_name)
+                logger.info(f"Model '{self.model_name}' loaded successfully.")
+            except Exception as e:
+                logger.exception(f"Failed to load model with ultralytics.YOLO: {e}")
+                raise
+        self.batch_sizer = AdaptiveBatchSizer(
+            target_latency_ms=settings.inference.batch_latency_target_ms,
+            min_size=settings.inference.min_batch_size,
+            max_size=settings.inference.max_batch_size,
+            initial_size=settings.inference.initial_batch_size,
+        )
+
+    def _load_onnx_backend(self, model_registry: ModelRegistryService) -> OnnxDetectionBackend:
+        """Loads the registry's ONNX artifact of the production model."""
+        inference = settings.inference
+        registry_name = inference.onnx_model_name or self.model_name
+        model_path = model_registry.get_model_artifact(registry_name, inference.onnx_artifact)
+        if model_path is None:
+            raise ConfigurationException(
+                f"No production model '{registry_name}' in the model registry",
+                config_key="inference.onnx_model_name",
+            )
+        logger.info(
+            f"Loading '{inference.onnx_artifact}' artifact of model '{registry_name}' "
+            f"from '{model_path}' using ONNX Runtime."
+        )
+        self.model_name = registry_name
+        return OnnxDetectionBackend(
+            model_path,
+            pool_size=inference.session_pool_size,
+            intra_op_threads=inference.intra_op_threads,
+            inter_op_threads=inference.inter_op_threads,
+            input_size=inference.input_size,
+            confidence_threshold=inference.confidence_threshold,
+            iou_threshold=inference.iou_threshold,
+        )
+
+    def _label_table(self) -> np.ndarray:
+        """The model's class names as an array indexed by class id."""
+        names = self.model.names
+        table = np.empty(max(names) + 1 if names else 0, dtype=object)
+        for class_id, name in names.items():
+            table[class_id] = name
+        return table
+
+    def _detections_from_result(self, result: Any, labels: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Converts one ultralytics Results object into detection dictionaries.
+        The box, score and class tensors are moved to NumPy once per frame
+        and converted to Python values in bulk.
+        """
+        boxes = result.boxes.cpu().numpy()
+        if len(boxes) == 0:
+            return []
+        xyxy = boxes.xyxy.astype(np.float64).tolist()
+        scores = boxes.conf.astype(np.float64).tolist()
+        names = labels[boxes.cls.astype(np.int64)].tolist()
+        return [
+            {"box": box, "score": score, "label": label}
+            for box, score, label in zip(xyxy, scores, names)
+        ]
+
+    def run_inference_batch(
+        self, frames: Sequence[np.ndarray], batch_size: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Runs inference on many frames, one forward pass per batch.
+
+        Args:
+            frames: Frames represented as NumPy arrays (in BGR format).
+            batch_size: A fixed batch size. Defaults to the adaptive batch
+                        size, which is tuned to the latency target as
+                        batches complete.
+
+        Returns:
+            One list of detection dictionaries per frame, each containing
+            'box', 'label', and 'score'.
+        """
+        for frame in frames:
+            if not isinstance(frame, np.ndarray):
+                logger.error(f"Input must be a NumPy array, but got {type(frame)}")
+                raise TypeError("Input frame must be a NumPy array.")
+
+        labels = self._label_table() if self.onnx_backend is None else None
+        detections: List[List[Dict[str, Any]]] = []
+        start = 0
         try:
-            # YOLO() will automatically download the model if it's not cached.
-            self.model = YOLO(self.model_name)
-            logger.info(f"Model '{self.model_name}' loaded successfully.")
+            while start < len(frames):
+                size = batch_size or self.batch_sizer.size
+                batch = list(frames[start:start + size])
+                began = time.perf_counter()
+                if self.onnx_backend is not None:
+                    detections.extend(self.onnx_backend.run_batch(batch))
+                else:
+                    # A list of frames is letterboxed and stacked into one tensor
+                    # by ultralytics and runs as a single forward pass
+                    results = self.model(batch, verbose=False)
+                    detections.extend(
+                        self._detections_from_result(result, labels) for result in results
+                    )
+                elapsed = time.perf_counter() - began
+                INFERENCE_BATCH_DURATION.observe(elapsed)
+                if batch_size is None:
+                    self.batch_sizer.record(len(batch), elapsed * 1000)
+                start += len(batch)
+            return detections
         except Exception as e:
-            logger.exception(f"Failed to load model with ultralytics.YOLO: {e}")
+            logger.exception(f"An error occurred during inference: {e}")
             raise
 
     def run_inference(self, frame: np.ndarray) -> List[Dict[str, Any]]:
@@ -38,32 +213,4 @@ class InferenceService:
             A list of detection dictionaries, where each dictionary contains
             'box', 'label', and 'score'.
         """
-        if not isinstance(frame, np.ndarray):
-            logger.error(f"Input must be a NumPy array, but got {type(frame)}")
-            raise TypeError("Input frame must be a NumPy array.")
-
-        try:
-            # The ultralytics library returns a list of Results objects.
-            results = self.model(frame, verbose=False)
-
-            # Process the first result object.
-            result = results[0]
-            boxes = result.boxes
-            
-            detections = []
-            for box in boxes:
-                xyxy = box.xyxy[0].tolist()
-                conf = float(box.conf[0])
-                class_id = int(box.cls[0])
-                label = self.model.names[class_id]
-                
-                detections.append({
-                    "box": xyxy,
-                    "score": conf,
-                    "label": label,
-                })
-
-            return detections
-        except Exception as e:
-            logger.exception(f"An error occurred during inference: {e}")
-            raise
+        return self.run_inference_batch([frame], batch_size=1)[0]
@@ -0,0 +1,120 @@
+"""
+Compact keyframe containers.
+
+Keyframes are kept as uint8 RGB frames, a quarter of the memory and
+bandwidth of float32 frames. Frame numbers and timestamps are parallel NumPy
+arrays rather than a list of dictionaries, so a batch of keyframes is three
+contiguous arrays that can be sliced, stacked into a model input or written
+to shared memory as a whole.
+
+Normalization to [0, 1] is deferred to whoever needs it: detection backends
+fuse it into their own letterboxing, and ``normalize_frames`` does it in a
+single pass, into a reusable buffer, for consumers that need float input.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+_INV_255 = np.float32(1 / 255)
+
+
+def normalize_frames(frames: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Scales uint8 frames to float32 in [0, 1].
+
+    The conversion and the scaling run as one NumPy pass, writing into
+    ``out`` when it is given instead of allocating.
+    """
+    if out is None:
+        out = np.empty(frames.shape, dtype=np.float32)
+    return np.multiply(frames, _INV_255, out=out, dtype=np.float32)
+
+
+@dataclass
+class KeyframeBatch:
+    """Keyframes as parallel arrays."""
+    frames: np.ndarray  # (n, height, width, 3) uint8 RGB
+    frame_numbers: np.ndarray  # (n,) int64
+    timestamps: np.ndarray  # (n,) float64, in seconds
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def normalized(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """The frames as float32 in [0, 1]."""
+        return normalize_frames(self.frames, out)
+
+    def bgr(self) -> np.ndarray:
+        """The frames in BGR channel order, as a view without copying."""
+        return self.frames[..., ::-1]
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """The keyframes as 'frame', 'frame_number' and 'timestamp' dictionaries."""
+        for frame, frame_number, timestamp in zip(
+            self.frames, self.frame_numbers.tolist(), self.timestamps.tolist()
+        ):
+            yield {"frame": frame, "frame_number": frame_number, "timestamp": timestamp}
+
+
+class KeyframeBuffer:
+    """
+    Accumulates keyframes into preallocated arrays.
+
+    The arrays double when they fill up. ``clear`` keeps them, so a buffer
+    reused for rolling batches allocates only once. Batches returned by
+    ``batch`` are views and are overwritten by keyframes appended after a
+    ``clear``.
+    """
+
+    def __init__(self, capacity: int = 64, frame_shape: Optional[Tuple[int, ...]] = None):
+        self._capacity = max(1, capacity)
+        self._count = 0
+        self._frames: Optional[np.ndarray] = None
+        if frame_shape is not None:
+            self._allocate(tuple(frame_shape))
+        self._frame_numbers = np.empty(self._capacity, dtype=np.int64)
+        self._timestamps = np.empty(self._capacity, dtype=np.float64)
+
+    def _allocate(self, frame_shape: Tuple[int, ...]) -> None:
+        self._frames = np.empty((self._capacity, *frame_shape), dtype=np.uint8)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name in ("_frames", "_frame_numbers", "_timestamps"):
+            old = getattr(self, name)
+            new = np.empty((self._capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, frame: np.ndarray, frame_number: int, timestamp: float) -> None:
+        """Copies a uint8 frame and its position into the buffer."""
+        if self._frames is None:
+            self._allocate(frame.shape)
+        elif self._count == self._capacity:
+            self._grow()
+        self._frames[self._count] = frame
+        self._frame_numbers[self._count] = frame_number
+        self._timestamps[self._count] = timestamp
+        self._count += 1
+
+    def batch(self) -> KeyframeBatch:
+        """The buffered keyframes, as views of the buffer."""
+        count = self._count
+        frames = (
+            self._frames[:count] if self._frames is not None
+            else np.empty((0, 0, 0, 3), dtype=np.uint8)
+        )
+        return KeyframeBatch(
+            frames=frames,
+            frame_numbers=self._frame_numbers[:count],
+            timestamps=self._timestamps[:count],
+        )
+
+    def clear(self) -> None:
+        """Empties the buffer, keeping its arrays."""
+        self._count = 0
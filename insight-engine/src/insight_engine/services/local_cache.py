@@ -0,0 +1,180 @@
+"""
+In-process LRU/TTL cache used as the L1 tier of the enhanced cache service.
+
+This module provides:
+- An ordered-dict backed LRU bounded by entry count and approximate byte size
+- Per-entry TTL with lazy expiry on access
+- Per-key and glob-pattern eviction for cross-replica invalidation
+"""
+
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+
+@dataclass
+class LocalCacheEntry:
+    """A single L1 cache entry."""
+    value: Any
+    size: int
+    expires_at: Optional[float] = None
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with TTL support.
+
+    Values are stored as already-deserialized objects, so callers must treat
+    returned values as read-only. Sizes are supplied by the caller (usually the
+    length of the serialized payload) and are used only for the byte bound.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, LocalCacheEntry]" = OrderedDict()
+        self._current_bytes = 0
+        # Pub/sub invalidations are handled on the event loop, but sync callers
+        # (e.g. executor threads) may share the instance too.
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not entry.is_expired(time.monotonic())
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            if entry.is_expired(time.monotonic()):
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store ``value`` under ``key``.
+
+        The effective TTL is the smaller of ``ttl`` and the cache default, so the
+        L1 copy never outlives its L2 counterpart. Returns False if the value is
+        too large to fit in the cache at all.
+        """
+        if value is None or size > self.max_bytes or self.max_entries <= 0:
+            return False
+
+        effective_ttl = ttl if ttl and ttl > 0 else None
+        if self.default_ttl is not None:
+            effective_ttl = (
+                min(effective_ttl, self.default_ttl)
+                if effective_ttl is not None else self.default_ttl
+            )
+        expires_at = (
+            time.monotonic() + effective_ttl if effective_ttl is not None else None
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = LocalCacheEntry(
+                value=value, size=size, expires_at=expires_at
+            )
+            self._current_bytes += size
+            self._evict_overflow()
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Evict a single key. Returns True if it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._stats['invalidations'] += 1
+            return True
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Evict several keys, returning how many were present."""
+        return sum(1 for key in keys if self.delete(key))
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Evict all keys matching a Redis-style glob pattern."""
+        with self._lock:
+            matching = [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]
+            for key in matching:
+                self._remove(key)
+            self._stats['invalidations'] += len(matching)
+            return len(matching)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return L1 statistics."""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'entries': len(self._entries),
+            'bytes': self._current_bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hit_ratio': self._stats['hits'] / lookups if lookups > 0 else 0
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._current_bytes -= entry.size
+
+    def _evict_overflow(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self._current_bytes > self.max_bytes
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._current_bytes -= entry.size
+            self._stats['evictions'] += 1
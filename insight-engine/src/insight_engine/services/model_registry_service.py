@@ -191,3 +191,47 @@ class ModelRegistryService:
 
         logger.warning(f"No production model found for '{model_name}'.")
         return None
+
+    def register_optimized_model(self, model_name: str, optimization_results: Dict) -> Dict:
+        """
+        Registers the artifacts produced by ``OptimizationService.run``.
+
+        The quantized ONNX model becomes the version's path; the unquantized
+        model and the benchmark metrics are kept in its metadata.
+
+        Args:
+            model_name: The name of the model.
+            optimization_results: The dictionary returned by ``OptimizationService.run``.
+
+        Returns:
+            The full dictionary of the newly registered model entry.
+        """
+        metadata = {
+            "artifacts": {
+                "onnx": optimization_results["onnx_model_path"],
+                "quantized": optimization_results["quantized_model_path"],
+            },
+            "base_model_metrics": optimization_results.get("base_model_metrics"),
+            "quantized_model_metrics": optimization_results.get("quantized_model_metrics"),
+        }
+        return self.register_model(
+            model_name, optimization_results["quantized_model_path"], metadata
+        )
+
+    def get_model_artifact(self, model_name: str, artifact: str = "quantized") -> Optional[str]:
+        """
+        Resolves the path of an artifact of the production model.
+
+        Args:
+            model_name: The name of the model.
+            artifact: The artifact to look up (e.g. 'quantized' or 'onnx'). Versions
+                      registered without artifacts resolve to their path.
+
+        Returns:
+            The artifact path, or None if there is no production model.
+        """
+        model = self.get_production_model(model_name)
+        if model is None:
+            return None
+        artifacts = model.get("metadata", {}).get("artifacts", {})
+        return artifacts.get(artifact, model.get("path"))
@@ -0,0 +1,95 @@
+"""
+Cheap per-frame motion features for sampling policies.
+
+The ``motion_magnitude`` feature is the fraction of the frame in motion,
+from 0 (static) to 1. It comes from one of two sources:
+
+- Codec motion vectors, exported as frame side data by decoders that
+  support it (see ``PyAVDecoder``). They cost nothing beyond decoding: the
+  area of the blocks displaced by at least a pixel is summed.
+- Frame differencing otherwise, and on frames without motion vectors
+  (I-frames): the frame is downscaled to a small grayscale thumbnail and
+  the share of thumbnail pixels that changed since the previous frame is
+  counted.
+"""
+
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Displacement, in pixels, below which a motion vector counts as static
+MIN_DISPLACEMENT = 1.0
+
+
+def motion_from_vectors(vectors: np.ndarray, width: int, height: int) -> float:
+    """
+    The fraction of a frame covered by moving blocks.
+
+    Args:
+        vectors: FFmpeg motion vectors, a structured array with the fields
+                 'w', 'h', 'motion_x', 'motion_y' and 'motion_scale'.
+        width: The width of the frame the vectors refer to.
+        height: The height of the frame the vectors refer to.
+    """
+    if len(vectors) == 0:
+        return 0.0
+    scale = np.maximum(vectors["motion_scale"], 1).astype(np.float32)
+    displacement = np.hypot(vectors["motion_x"] / scale, vectors["motion_y"] / scale)
+    moving = displacement >= MIN_DISPLACEMENT
+    area = np.sum(
+        vectors["w"][moving].astype(np.int64) * vectors["h"][moving].astype(np.int64)
+    )
+    # Bi-predicted blocks carry one vector per reference
+    return min(1.0, float(area) / (width * height))
+
+
+class MotionEstimator:
+    """
+    Estimates the motion of consecutive frames of one video.
+
+    Keeps the thumbnail of the previous frame, so one estimator serves one
+    frame sequence at a time.
+    """
+
+    def __init__(self, size: int = 64, pixel_threshold: int = 16):
+        """
+        Args:
+            size: The side of the square grayscale thumbnail that is compared.
+            pixel_threshold: The grey level change (0-255) above which a
+                             thumbnail pixel counts as moving; changes below it
+                             are treated as noise and compression artifacts.
+        """
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, (self.size, self.size), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+    def reset(self) -> None:
+        """Forgets the previous frame, e.g. before the next video."""
+        self._previous = None
+
+    def estimate(self, frame: np.ndarray, codec_motion: Optional[float] = None) -> float:
+        """
+        The motion magnitude of a frame relative to the previous one.
+
+        Args:
+            frame: A BGR or grayscale frame.
+            codec_motion: The motion measured from the frame's codec motion
+                          vectors, when the decoder exported them.
+
+        Returns:
+            The fraction of the frame in motion; 0 for the first frame
+            without motion vectors.
+        """
+        thumbnail = self._thumbnail(frame)
+        previous, self._previous = self._previous, thumbnail
+        if codec_motion is not None:
+            return codec_motion
+        if previous is None:
+            return 0.0
+        changed = cv2.absdiff(thumbnail, previous) > self.pixel_threshold
+        return float(np.count_nonzero(changed) / changed.size)
@@ -0,0 +1,305 @@
+"""
+ONNX Runtime backend for YOLO detection models.
+
+This module serves the ONNX (usually quantized) artifacts produced by
+``OptimizationService`` and registered in ``ModelRegistryService``:
+
+- Sessions are created with fixed intra-op and inter-op thread counts, so
+  concurrent requests do not oversubscribe the CPU and latency stays flat.
+- A pool of sessions serves concurrent requests; each request checks out a
+  session for the duration of one forward pass.
+- Inputs and outputs are bound with IOBinding. The batch is letterboxed
+  straight into one contiguous float32 tensor, and outputs are written into
+  preallocated per-session buffers, so no tensor is copied on the way in or
+  out.
+- Post-processing (score filtering, box decoding and class-aware NMS) runs
+  vectorized over the whole batch output.
+
+The expected model output is the YOLOv8 export layout,
+(batch, 4 + classes, anchors), with boxes as center x, center y, width, height.
+"""
+
+import ast
+import logging
+import os
+import queue
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from insight_engine.exceptions import ConfigurationException
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+# Letterbox padding value used by ultralytics
+LETTERBOX_FILL = 114
+
+Letterbox = Tuple[float, float, float]  # scale, x padding, y padding
+
+
+def letterbox_batch(
+    frames: Sequence[np.ndarray], size: int, out: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, List[Letterbox]]:
+    """
+    Letterboxes BGR frames into one (n, 3, size, size) float32 RGB tensor
+    scaled to [0, 1], as ultralytics preprocesses them.
+
+    Args:
+        frames: BGR uint8 frames of any size.
+        size: The square model input size.
+        out: An optional preallocated tensor to write into.
+
+    Returns:
+        The batch tensor and the (scale, x padding, y padding) of each frame,
+        needed to map boxes back to frame coordinates.
+    """
+    if out is None:
+        out = np.empty((len(frames), 3, size, size), dtype=np.float32)
+    canvas = np.empty((size, size, 3), dtype=np.uint8)
+    letterboxes = []
+    for index, frame in enumerate(frames):
+        height, width = frame.shape[:2]
+        scale = min(size / height, size / width)
+        new_width, new_height = round(width * scale), round(height * scale)
+        pad_x, pad_y = (size - new_width) / 2, (size - new_height) / 2
+        left, top = round(pad_x - 0.1), round(pad_y - 0.1)
+
+        canvas.fill(LETTERBOX_FILL)
+        canvas[top:top + new_height, left:left + new_width] = cv2.resize(
+            frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+        # BGR HWC uint8 -> RGB CHW float32, written in place
+        np.multiply(
+            canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1 / 255), out=out[index]
+        )
+        letterboxes.append((scale, left, top))
+    return out, letterboxes
+
+
+def decode_yolo_output(
+    output: np.ndarray,
+    letterboxes: Sequence[Letterbox],
+    frame_shapes: Sequence[Tuple[int, int]],
+    class_names: Sequence[str],
+    confidence_threshold: float = 0.25,
+    iou_threshold: float = 0.45,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Turns a YOLOv8 batch output into detection dictionaries.
+
+    Args:
+        output: The raw output, (batch, 4 + classes, anchors).
+        letterboxes: The letterbox transform of each frame.
+        frame_shapes: The (height, width) of each original frame.
+        class_names: Class names indexed by class id.
+        confidence_threshold: Minimum class score of a detection.
+        iou_threshold: IoU above which NMS suppresses a box of the same class.
+
+    Returns:
+        One list of detections ('box', 'score', 'label') per frame.
+    """
+    predictions = output.transpose(0, 2, 1)  # (batch, anchors, 4 + classes)
+    class_scores = predictions[:, :, 4:]
+    class_ids = class_scores.argmax(axis=-1)
+    scores = np.take_along_axis(class_scores, class_ids[..., None], axis=-1)[..., 0]
+    keep = scores > confidence_threshold
+
+    detections = []
+    for index, (scale, pad_x, pad_y) in enumerate(letterboxes):
+        mask = keep[index]
+        if not mask.any():
+            detections.append([])
+            continue
+        centers = predictions[index, mask, :4]
+        frame_scores = scores[index, mask]
+        frame_classes = class_ids[index, mask]
+
+        # Center/size in letterboxed pixels -> corners in frame pixels
+        half = centers[:, 2:4] / 2
+        boxes = np.concatenate([centers[:, :2] - half, centers[:, :2] + half], axis=1)
+        boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=boxes.dtype)
+        boxes /= scale
+        height, width = frame_shapes[index]
+        np.clip(boxes, 0, [width, height, width, height], out=boxes)
+
+        kept = cv2.dnn.NMSBoxesBatched(
+            np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1).tolist(),
+            frame_scores.tolist(),
+            frame_classes.tolist(),
+            confidence_threshold,
+            iou_threshold,
+        )
+        kept = np.asarray(kept, dtype=np.int64).reshape(-1)
+        kept = kept[np.argsort(-frame_scores[kept], kind="stable")]
+        detections.append([
+            {"box": box, "score": score, "label": class_names[class_id]}
+            for box, score, class_id in zip(
+                boxes[kept].astype(np.float64).tolist(),
+                frame_scores[kept].astype(np.float64).tolist(),
+                frame_classes[kept].tolist(),
+            )
+        ])
+    return detections
+
+
+class _PooledSession:
+    """An inference session and its reusable IOBinding buffers."""
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+        self.output_shape = session.get_outputs()[0].shape
+        self.binding = session.io_binding()
+        # Sized for the largest batch so far; smaller batches use a prefix view
+        self._input: Optional[np.ndarray] = None
+        self._output: Optional[np.ndarray] = None
+
+    def input_buffer(self, batch_size: int, size: int) -> np.ndarray:
+        """A reusable contiguous input tensor for a batch."""
+        if self._input is None or self._input.shape[0] < batch_size:
+            self._input = np.empty((batch_size, 3, size, size), dtype=np.float32)
+        return self._input[:batch_size]
+
+    def run(self, batch: np.ndarray) -> np.ndarray:
+        """Runs one forward pass with bound input and output buffers."""
+        self.binding.clear_binding_inputs()
+        self.binding.clear_binding_outputs()
+        self.binding.bind_cpu_input(self.input_name, batch)
+
+        output_dims = self.output_shape[1:]
+        if all(isinstance(dim, int) for dim in output_dims):
+            batch_size = batch.shape[0]
+            if self._output is None or self._output.shape[0] < batch_size:
+                self._output = np.empty((batch_size, *output_dims), dtype=np.float32)
+            output = self._output[:batch_size]
+            self.binding.bind_ortvalue_output(
+                self.output_name, ort.OrtValue.ortvalue_from_numpy(output)
+            )
+            self.session.run_with_iobinding(self.binding)
+            return output
+
+        # Output size unknown before the run: let ONNX Runtime allocate it
+        self.binding.bind_output(self.output_name, "cpu")
+        self.session.run_with_iobinding(self.binding)
+        return self.binding.get_outputs()[0].numpy()
+
+
+class OnnxDetectionBackend:
+    """Runs a YOLO detection model exported to ONNX on a pool of sessions."""
+
+    def __init__(
+        self,
+        model_path: str,
+        pool_size: int = 2,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1,
+        input_size: int = 640,
+        confidence_threshold: float = 0.25,
+        iou_threshold: float = 0.45,
+    ):
+        """
+        Args:
+            model_path: The ONNX model file.
+            pool_size: Sessions kept for concurrent requests.
+            intra_op_threads: Threads per operator. 0 divides the CPU cores
+                              evenly between the pooled sessions.
+            inter_op_threads: Threads running independent operators.
+            input_size: The square model input size, used when the model
+                        input has dynamic spatial dimensions.
+            confidence_threshold: Minimum class score of a detection.
+            iou_threshold: IoU threshold of the class-aware NMS.
+        """
+        if ort is None:
+            raise ConfigurationException(
+                "The onnxruntime backend requires onnxruntime (pip install onnxruntime)",
+                config_key="inference.backend",
+            )
+        if pool_size < 1:
+            raise ConfigurationException(
+                "Session pool size must be at least 1", config_key="inference.session_pool_size"
+            )
+        self.model_path = model_path
+        self.pool_size = pool_size
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // pool_size)
+        self.inter_op_threads = inter_op_threads
+        self.confidence_threshold = confidence_threshold
+        self.iou_threshold = iou_threshold
+
+        sessions = [_PooledSession(self._create_session()) for _ in range(pool_size)]
+        self._pool: "queue.Queue[_PooledSession]" = queue.Queue()
+        for pooled in sessions:
+            self._pool.put(pooled)
+
+        sample = sessions[0].session
+        spatial = sample.get_inputs()[0].shape[-1]
+        self.input_size = spatial if isinstance(spatial, int) else input_size
+        self.class_names = self._read_class_names(sample)
+        logger.info(
+            f"Loaded ONNX model '{model_path}' with {pool_size} sessions, "
+            f"{self.intra_op_threads} intra-op and {inter_op_threads} inter-op threads."
+        )
+
+    def _create_session(self) -> Any:
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    @staticmethod
+    def _read_class_names(session: Any) -> List[str]:
+        """Class names from the ultralytics export metadata, or the class ids."""
+        classes = session.get_outputs()[0].shape[1]
+        count = classes - 4 if isinstance(classes, int) else 0
+        names_field = session.get_modelmeta().custom_metadata_map.get("names")
+        if names_field:
+            try:
+                names = ast.literal_eval(names_field)
+                return [names[i] for i in range(len(names))]
+            except (ValueError, SyntaxError, KeyError):
+                logger.warning("Could not parse class names from the ONNX metadata.")
+        return [str(i) for i in range(count)]
+
+    @contextmanager
+    def _session(self) -> Iterator[_PooledSession]:
+        """Checks out a session, waiting while all sessions are busy."""
+        pooled = self._pool.get()
+        try:
+            yield pooled
+        finally:
+            self._pool.put(pooled)
+
+    def run_batch(self, frames: Sequence[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """
+        Runs one forward pass over a batch of BGR frames.
+
+        Returns:
+            One list of detection dictionaries per frame, each containing
+            'box', 'label', and 'score'.
+        """
+        if not frames:
+            return []
+        with self._session() as pooled:
+            batch, letterboxes = letterbox_batch(
+                frames, self.input_size, out=pooled.input_buffer(len(frames), self.input_size)
+            )
+            output = pooled.run(batch)
+            return decode_yolo_output(
+                output,
+                letterboxes,
+                [frame.shape[:2] for frame in frames],
+                self.class_names,
+                self.confidence_threshold,
+                self.iou_threshold,
+            )
@@ -1,8 +1,17 @@
+import asyncio
 import logging
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
+import numpy as np
 from insight_engine.config import Settings
+from insight_engine.services.admission_controller import get_admission_controller
+from insight_engine.services.frame_embedding_service import (
+    FrameEmbeddingService,
+    get_frame_embedding_service,
+)
 from insight_engine.services.inference_service import InferenceService
+from insight_engine.services.keyframes import KeyframeBatch, KeyframeBuffer
 from insight_engine.services.preprocessing_service import VideoPreprocessor
+from insight_engine.services.qdrant_gateway import build_quantization_config
 from insight_engine.services.vector_db_service import VectorDBService, FramePoint
 
 logger = logging.getLogger(__name__)
@@ -18,75 +27,134 @@ class PipelineService:
         settings: Settings,
         inference_service: InferenceService,
         vector_db_service: VectorDBService,
+        embedding_service: Optional[FrameEmbeddingService] = None,
     ):
         """
         Initializes the PipelineService.
+
+        Args:
+            embedding_service: Embeds the keyframes stored as frame points.
+                               Defaults to the shared frame embedding service
+                               unless embeddings are disabled in the settings.
         """
         self.settings = settings
         self.inference_service = inference_service
         self.vector_db_service = vector_db_service
+        if embedding_service is None and settings.embedding.enabled:
+            embedding_service = get_frame_embedding_service()
+        self.embedding_service = embedding_service
+        self._collection_ready = False
         # The preprocessor is now created directly within the service
         self.preprocessor = VideoPreprocessor(config=settings.preprocessing.model_dump())
+        self.admission = get_admission_controller()
+        # Keyframes inferred and upserted together; frames are released after
+        # each batch. The inference service splits it into forward passes.
+        self.batch_size = settings.inference.max_batch_size
         logger.info("PipelineService initialized.")
 
-    async def execute_video_analysis_pipeline(self, video_path: str) -> List[Dict[str, Any]]:
+    async def _process_batch(
+        self, video_path: str, batch: KeyframeBatch
+    ) -> List[Dict[str, Any]]:
         """
-        Executes the full video analysis pipeline for a given video file.
-
-        Args:
-            video_path: The path to the video file to be analyzed.
+        Runs inference on a batch of keyframes and upserts their points.
+        The uint8 frames go to inference as BGR views; normalization happens
+        in the model's own input step. Inference and embedding run in worker
+        threads, so the event loop keeps serving requests, and the decode
+        thread keeps filling the keyframe queue, while a batch is computed.
 
         Returns:
-            A list of dictionaries, where each dictionary contains the
-            analysis results for a single frame.
+            The analysis results of the batch, without the frames.
         """
-        logger.info(f"Starting video analysis pipeline for: {video_path}")
-
-        # 1. Preprocess the video to get keyframes
-        # The new preprocessor returns a list of dictionaries with frame data
-        keyframes_data = await self.preprocessor.process_video_with_frame_numbers(video_path)
+        async with self.admission.admit_async("inference"):
+            batch_detections = await asyncio.to_thread(
+                self.inference_service.run_inference_batch, batch.bgr()
+            )
 
-        if not keyframes_data:
-            logger.warning(f"No keyframes extracted from {video_path}. Ending pipeline.")
-            return []
+        if self.embedding_service is not None:
+            async with self.admission.admit_async("embedding"):
+                embeddings = await asyncio.to_thread(
+                    self.embedding_service.embed_batch, batch.frames
+                )
+        else:
+            embeddings = np.zeros(
+                (len(batch), self.settings.qdrant.embedding_dimension), dtype=np.float32
+            )
 
-        all_results = []
+        results = []
         points_to_upsert = []
-
-        # 2. Run inference on each keyframe
-        for frame_data in keyframes_data:
-            frame = frame_data["frame"]
-            frame_number = frame_data["frame_number"]
-            timestamp = frame_data["timestamp"]
-
-            # The new inference service expects a single frame
-            detections = self.inference_service.run_inference(frame)
-
-            # 3. Prepare results for storage and return
+        for frame_number, timestamp, detections, embedding in zip(
+            batch.frame_numbers.tolist(), batch.timestamps.tolist(), batch_detections, embeddings
+        ):
             frame_result = {
                 "video_path": video_path,
                 "frame_number": frame_number,
                 "timestamp": timestamp,
                 "detections": detections,
             }
-            all_results.append(frame_result)
+            results.append(frame_result)
 
             # Create a point for the vector database
-            # Note: The new inference service does not provide embeddings.
-            # We will need to add a separate embedding step here if needed.
-            # For now, we will use a placeholder zero vector.
-            embedding_vector = [0.0] * self.settings.qdrant.embedding_dimension
-            
             point = FramePoint(
-                vector=embedding_vector,
+                vector=embedding.tolist(),
                 payload=frame_result,
             )
             points_to_upsert.append(point)
 
-        # 4. Upsert all points to the vector database in a single batch
-        if points_to_upsert:
-            self.vector_db_service.upsert_points(points_to_upsert)
-            logger.info(f"Upserted {len(points_to_upsert)} points to the vector database.")
+        await self._ensure_collection()
+        await self.vector_db_service.upsert_points(points_to_upsert)
+        return results
+
+    async def _ensure_collection(self) -> None:
+        """
+        Creates the frame collection, with the configured quantization, once.
+        A failure propagates and leaves the collection to be ensured again.
+        """
+        if self._collection_ready:
+            return
+        qdrant = self.settings.qdrant
+        await self.vector_db_service.ensure_collection(
+            qdrant.embedding_dimension,
+            build_quantization_config(qdrant.quantization, qdrant.quantization_always_ram),
+        )
+        self._collection_ready = True
+
+    async def execute_video_analysis_pipeline(self, video_path: str) -> List[Dict[str, Any]]:
+        """
+        Executes the full video analysis pipeline for a given video file.
+
+        Keyframes are streamed from the preprocessor and inferred and upserted
+        in rolling batches, so only one batch of frames is held at a time
+        (plus the preprocessor's bounded queue), however long the video is.
+        The batch buffer is allocated once and reused for every batch.
+
+        Args:
+            video_path: The path to the video file to be analyzed.
+
+        Returns:
+            A list of dictionaries, where each dictionary contains the
+            analysis results for a single frame.
+        """
+        logger.info(f"Starting video analysis pipeline for: {video_path}")
+
+        all_results = []
+        buffer = KeyframeBuffer(capacity=self.batch_size)
+
+        # 1. Stream keyframes from the preprocessor
+        async for frame_data in self.preprocessor.aiter_keyframes(video_path):
+            buffer.append(
+                frame_data["frame"], frame_data["frame_number"], frame_data["timestamp"]
+            )
+            if len(buffer) == self.batch_size:
+                # 2. Run inference and 3. upsert, one batch at a time
+                all_results.extend(await self._process_batch(video_path, buffer.batch()))
+                buffer.clear()
+        if len(buffer):
+            all_results.extend(await self._process_batch(video_path, buffer.batch()))
+
+        if not all_results:
+            logger.warning(f"No keyframes extracted from {video_path}. Ending pipeline.")
+            return []
 
+        logger.info(f"Upserted {len(all_results)} points to the vector database.")
         logger.info(f"Successfully completed analysis for: {video_path}")
         return all_results
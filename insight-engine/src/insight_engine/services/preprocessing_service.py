@@ -2,21 +2,102 @@
 """
 This service handles the preprocessing of video files, including
 keyframe extraction, frame transformation, and resource-aware throttling.
+Throttling goes through the shared admission controller: CPU and memory
+pressure are checked once per batch of frames, and each video job holds
+admission tokens while it runs.
+
+Keyframes can be streamed with ``aiter_keyframes``: a decode thread feeds a
+bounded queue, so memory stays bounded however long the video is. To feed
+inference in other processes, ``write_keyframes_to_ring`` writes them into a
+shared-memory frame ring instead (see ``frame_ring``).
 
 This service was redesigned to use a strategy-driven perceptual hashing
 approach for more robust and configurable keyframe extraction.
+
+Keyframe extraction can also run in parallel: the video is split into frame
+ranges that worker processes decode and hash independently, and the hash
+chains are stitched back together so the result is identical to a single
+sequential pass. Segments are stitched and yielded in order as they finish,
+with only a few segments in flight at a time.
+
+Frames are read through a configurable decode strategy (see
+``frame_decoders``), which can skip frames or decode at low resolution.
+
+For frame sampling policies, ``iter_frame_features`` yields every decoded
+frame with its motion magnitude (see ``motion_features``), perceptual hash
+and model input tensor, and ``sample_frames`` keeps the frames a policy
+selects.
+
+Keyframes are kept as resized uint8 RGB frames. Normalization is left to
+the consumer (see ``keyframes``), which usually fuses it into its own input
+step, and ``collect_keyframes`` gathers them into a compact KeyframeBatch.
 """
 import asyncio
-import time
-from typing import Generator, List, Callable, Dict, Tuple, Any
+import math
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING, AsyncIterator, Deque, Generator, List, Callable, Dict, Optional,
+    Tuple, Any
+)
 from PIL import Image
 import imagehash
 
 import cv2
 import numpy as np
-import psutil
 from loguru import logger
 
+from insight_engine.services.admission_controller import (
+    AdmissionController,
+    get_admission_controller,
+)
+from insight_engine.services.frame_decoders import (
+    FrameDecoder,
+    OpenCVDecoder,
+    create_frame_decoder,
+)
+from insight_engine.services.frame_embedding_service import prepare_image_batch
+from insight_engine.services.frame_ring import SharedFrameRing
+from insight_engine.services.keyframes import KeyframeBatch, KeyframeBuffer
+from insight_engine.services.motion_features import MotionEstimator
+from insight_engine.services.perceptual_hash import (
+    PackedHash,
+    PerceptualHasher,
+    SUPPORTED_ALGORITHMS,
+)
+
+if TYPE_CHECKING:
+    from insight_engine.modules.sampling_policy import SamplingPolicy
+
+# Segments shorter than this cost more in seeking than they save in decoding
+MIN_SEGMENT_FRAMES = 48
+
+# Longer videos are split into more segments so the keyframes a worker holds
+# for one segment stay bounded
+MAX_SEGMENT_FRAMES = 3000
+
+# Frames hashed per vectorized call when a whole segment is available
+HASH_BATCH_SIZE = 32
+
+# Frames decoded between two resource pressure checks
+THROTTLE_INTERVAL_FRAMES = 32
+
+# How often a decode thread blocked on a full keyframe queue checks whether
+# the consumer has gone away
+_QUEUE_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class SegmentResult:
+    """The hashes and locally selected keyframes of one decoded frame range."""
+    start: int  # Zero-based index of the segment's first frame
+    indices: List[int]  # Zero-based indices of the decoded frames
+    hashes: List[PackedHash]
+    keyframes: Dict[int, np.ndarray]  # Frame index -> transformed frame
+
 
 class VideoPreprocessor:
     """
@@ -24,99 +105,444 @@ class VideoPreprocessor:
     plus frame transformation and resource-aware processing.
     """
 
-    def __init__(self, config: Dict[str, any]) -> None:
+    def __init__(
+        self,
+        config: Dict[str, any],
+        admission_controller: Optional[AdmissionController] = None,
+    ) -> None:
         """
         Initializes the preprocessor with configuration.
 
         Args:
             config: A dictionary containing keys like 'HASH_ALGORITHM',
                     'HASH_DISTANCE_THRESHOLD', 'HASH_SIZE', 'TARGET_SIZE',
-                    'CPU_THRESHOLD', 'THROTTLE_DELAY'.
+                    'CPU_THRESHOLD', 'THROTTLE_DELAY', 'EXTRACTION_WORKERS',
+                    'SEGMENTS_PER_WORKER', 'DECODE_MODE', 'DECODE_STRIDE',
+                    'DECODE_WIDTH', 'DECODE_HEIGHT', 'KEYFRAME_QUEUE_SIZE',
+                    'FRAME_RING_SLOTS', 'MOTION_SIZE', 'MOTION_PIXEL_THRESHOLD'.
+                    Lower-case keys, as produced by
+                    ``PreprocessingSettings.model_dump()``, are accepted too.
+            admission_controller: The controller throttling this preprocessor.
+                    Defaults to the process-wide controller.
         """
         self.config = config
+        self.admission = admission_controller or get_admission_controller()
         # Dynamically select the hashing function based on config
         self.hash_algorithm: str = self.config.get("HASH_ALGORITHM", "phash")
         self.hash_func: Callable = getattr(imagehash, self.hash_algorithm)
         self.threshold: int = self.config.get("HASH_DISTANCE_THRESHOLD", 5)
         self.hash_size: int = self.config.get("HASH_SIZE", 8)
+        # Built-in NumPy hashing, bit-compatible with imagehash; other
+        # imagehash functions still go through PIL
+        self.hasher: Optional[PerceptualHasher] = (
+            PerceptualHasher(self.hash_algorithm, self.hash_size)
+            if self.hash_algorithm in SUPPORTED_ALGORITHMS
+            else None
+        )
         self.target_size: tuple = self.config.get("TARGET_SIZE", (224, 224))
-        self.cpu_threshold: int = self.config.get("CPU_THRESHOLD", 85)
-        self.throttle_delay: float = self.config.get("THROTTLE_DELAY", 0.5)
+        self.cpu_threshold: int = self._get_option("CPU_THRESHOLD", 85)
+        self.throttle_delay: float = self._get_option("THROTTLE_DELAY", 0.5)
+        self.workers: int = self._get_option("EXTRACTION_WORKERS", 1)
+        self.segments_per_worker: int = self._get_option("SEGMENTS_PER_WORKER", 2)
+        # Keyframes buffered between the decode thread and async consumers
+        self.queue_size: int = self._get_option("KEYFRAME_QUEUE_SIZE", 8)
+        # Frame slots of the shared-memory ring feeding inference processes
+        self.frame_ring_slots: int = self._get_option("FRAME_RING_SLOTS", 16)
+        # Frame differencing for motion features without codec motion vectors
+        self.motion_size: int = self._get_option("MOTION_SIZE", 64)
+        self.motion_pixel_threshold: int = self._get_option("MOTION_PIXEL_THRESHOLD", 16)
+        decode_size = (
+            self._get_option("DECODE_WIDTH", 0), self._get_option("DECODE_HEIGHT", 0)
+        )
+        self.decoder: FrameDecoder = create_frame_decoder(
+            self._get_option("DECODE_MODE", "full"),
+            stride=self._get_option("DECODE_STRIDE", 1),
+            size=decode_size if all(decode_size) else tuple(self.target_size),
+        )
         logger.info(
-            f"VideoPreprocessor initialized with strategy: {self.hash_algorithm}"
+            f"VideoPreprocessor initialized with strategy: {self.hash_algorithm}, "
+            f"decode mode: {self.decoder.name}"
         )
 
-    def _throttle(self) -> None:
+    def __getstate__(self) -> Dict[str, Any]:
+        # Segment workers receive the preprocessor by pickling; the admission
+        # controller holds locks and threads and stays in the parent process
+        state = self.__dict__.copy()
+        del state["admission"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.admission = get_admission_controller()
+
+    def _get_option(self, key: str, default: Any) -> Any:
+        """Reads a config value by its upper- or lower-case key."""
+        return self.config.get(key, self.config.get(key.lower(), default))
+
+    def _throttle(self) -> float:
         """
-        Pauses execution if CPU usage exceeds the configured threshold.
+        Pauses execution, for at most the throttle delay, while the sampled
+        CPU usage exceeds the configured threshold or memory is under pressure.
+
+        Returns:
+            The seconds spent throttled.
         """
-        cpu_percent = psutil.cpu_percent()
-        if cpu_percent > self.cpu_threshold:
-            logger.warning(
-                f"CPU usage {cpu_percent}% exceeded threshold of {self.cpu_threshold}%. Throttling for {self.throttle_delay}s."
-            )
-            time.sleep(self.throttle_delay)
+        return self.admission.wait_for_capacity(
+            "preprocessing",
+            cpu_threshold=self.cpu_threshold,
+            max_wait=self.throttle_delay,
+        )
+
+    def _admit_job(self):
+        """
+        Admits a video job, holding one admission token per extraction
+        process while it runs.
+        """
+        return self.admission.admit_async(
+            "preprocessing",
+            tokens=max(1, self.workers),
+            cpu_threshold=self.cpu_threshold,
+            max_wait=self.throttle_delay,
+        )
 
     def _transform_frame(self, frame: np.ndarray) -> np.ndarray:
         """
-        Resizes and normalizes a single frame.
+        Resizes a single frame and converts it to RGB. The frame stays
+        uint8; normalization is deferred to the consumer.
         """
         # Resize
         resized_frame = cv2.resize(frame, self.target_size)
         # BGR to RGB
-        rgb_frame = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-        # Normalize to [0, 1]
-        normalized_frame = rgb_frame.astype(np.float32) / 255.0
-        return normalized_frame
+        return cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
 
-    def _compute_hash(self, frame: np.ndarray) -> imagehash.ImageHash:
+    def _compute_hash(self, frame: np.ndarray) -> Any:
         """
         Computes the perceptual hash of a single frame.
         """
+        if self.hasher is not None:
+            return self.hasher.hash(frame)
         # Convert frame from OpenCV BGR to PIL RGB for hashing
         image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
         return self.hash_func(image, hash_size=self.hash_size)
 
-    def _extract_frames(self, video_path: str) -> Generator[tuple[int, np.ndarray], None, None]:
+    def _compute_hashes(self, frames: List[np.ndarray]) -> List[Any]:
         """
-        A generator that extracts frames and their numbers from a video file.
+        Computes the perceptual hashes of a batch of frames in one call.
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            logger.error(f"Error opening video file: {video_path}")
-            return
+        if self.hasher is not None:
+            return self.hasher.hash_frames(frames)
+        return [self._compute_hash(frame) for frame in frames]
 
+    def _is_new_keyframe(self, current_hash: Any, last_keyframe_hash: Any) -> bool:
+        """
+        A frame is a keyframe if it differs enough from the last keyframe.
+        """
+        return (
+            last_keyframe_hash is None
+            or (current_hash - last_keyframe_hash) > self.threshold
+        )
+
+    def _extract_frames(self, video_path: str) -> Generator[tuple[int, np.ndarray], None, None]:
+        """
+        A generator that extracts frames and their numbers from a video file,
+        using the configured decode strategy. Resource pressure is checked
+        once per batch of frames.
+        """
         frame_count = 0
         try:
-            while cap.isOpened():
-                self._throttle()
+            for frame_number, frame in self.decoder.frames(video_path):
+                if frame_count % THROTTLE_INTERVAL_FRAMES == 0:
+                    self._throttle()
+                frame_count += 1
+                yield frame_number, frame
+        finally:
+            logger.info(
+                f"Finished processing {video_path}. Analyzed {frame_count} frames."
+            )
+
+    def _read_segment(
+        self, video_path: str, start: int, end: Optional[int]
+    ) -> Generator[Tuple[int, np.ndarray], None, None]:
+        """
+        Yields zero-based frame indices and frames in ``[start, end)``.
+
+        Seeking makes the decoder restart at the keyframe before ``start`` and
+        decode forward, so the frames are the same as in a sequential read.
+        Frames skipped by the decoder's stride are grabbed but not retrieved;
+        decode modes without a stride read every frame, as they do
+        sequentially.
+        """
+        stride = self.decoder.stride
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                logger.error(f"Error opening video file: {video_path}")
+                return
+            if start:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            index = start
+            while end is None or index < end:
+                if index % stride:
+                    # Skipped by the decode stride: advance without retrieving
+                    if not cap.grab():
+                        break
+                    index += 1
+                    continue
                 ret, frame = cap.read()
                 if not ret:
                     break
-                frame_count += 1
-                yield frame_count, frame
+                yield index, frame
+                index += 1
         finally:
             cap.release()
+
+    def _process_segment(
+        self, video_path: str, start: int, end: Optional[int]
+    ) -> SegmentResult:
+        """
+        Hashes every frame of a segment and keeps the keyframes of the chain
+        that starts at the segment. Runs in a worker process.
+        """
+        indices = []
+        hashes = []
+        keyframes = {}
+        last_keyframe_hash = None
+        batch: List[Tuple[int, np.ndarray]] = []
+
+        def flush():
+            nonlocal last_keyframe_hash
+            batch_hashes = self._compute_hashes([frame for _, frame in batch])
+            for (index, frame), current_hash in zip(batch, batch_hashes):
+                indices.append(index)
+                hashes.append(current_hash)
+                if self._is_new_keyframe(current_hash, last_keyframe_hash):
+                    last_keyframe_hash = current_hash
+                    keyframes[index] = self._transform_frame(frame)
+            batch.clear()
+
+        for index, frame in self._read_segment(video_path, start, end):
+            batch.append((index, frame))
+            if len(batch) == HASH_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        return SegmentResult(
+            start=start, indices=indices, hashes=hashes, keyframes=keyframes
+        )
+
+    def _decode_frames(
+        self, video_path: str, start: int, indices: List[int]
+    ) -> Dict[int, np.ndarray]:
+        """Decodes and transforms selected frames of the segment at ``start``."""
+        wanted = set(indices)
+        return {
+            index: self._transform_frame(frame)
+            for index, frame in self._read_segment(video_path, start, max(wanted) + 1)
+            if index in wanted
+        }
+
+    def _plan_segments(
+        self, total_frames: int, workers: int
+    ) -> List[Tuple[int, Optional[int]]]:
+        """
+        Splits ``total_frames`` into contiguous ranges of at most
+        ``MAX_SEGMENT_FRAMES``. The last range is open ended, since container
+        frame counts are not always exact.
+        """
+        count = max(
+            1,
+            min(workers * self.segments_per_worker, total_frames // MIN_SEGMENT_FRAMES),
+            math.ceil(total_frames / MAX_SEGMENT_FRAMES),
+        )
+        bounds = [round(i * total_frames / count) for i in range(count)] + [None]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def extract_keyframes_parallel(
+        self, video_path: str, workers: Optional[int] = None
+    ) -> List[Tuple[int, np.ndarray]]:
+        """
+        Extracts keyframes by decoding and hashing segments of the video in
+        worker processes. See ``iter_keyframes_parallel``.
+
+        Returns:
+            (frame number, transformed frame) pairs, identical to the output
+            of the sequential path. Frame numbers start at 1.
+        """
+        return list(self.iter_keyframes_parallel(video_path, workers))
+
+    def iter_keyframes_parallel(
+        self,
+        video_path: str,
+        workers: Optional[int] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> Generator[Tuple[int, np.ndarray], None, None]:
+        """
+        Yields keyframes decoded and hashed by worker processes, segment by
+        segment in video order.
+
+        Each worker selects keyframes as if its segment started the video.
+        The hash chains are then replayed in order with the last keyframe
+        hash carried across segment boundaries. After the first frame the two
+        chains agree on, they stay identical, so only frames selected before
+        that point (usually none or one per segment) are decoded again.
+        Per-batch CPU throttling does not apply inside the workers; video jobs
+        instead hold one admission token per worker process.
+
+        At most one segment per worker plus the one being replayed are in
+        flight, so memory does not grow with the video. Setting ``stop``, or
+        closing the generator, cancels the segments not yet started.
+
+        Args:
+            video_path: The video to process.
+            workers: The number of worker processes. Defaults to the
+                     configured number of extraction workers.
+            stop: Checked between segments; once set, no more are yielded.
+
+        Yields:
+            (frame number, transformed frame) pairs, identical to the output
+            of the sequential path. Frame numbers start at 1.
+        """
+        workers = workers or self.workers
+        if not isinstance(self.decoder, OpenCVDecoder):
+            # ffmpeg and PyAV decoders are multi-threaded and cannot seek by frame
+            yield from self._iter_keyframes(video_path, parallel=False)
+            return
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            logger.error(f"Error opening video file: {video_path}")
+            cap.release()
+            return
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        segments = self._plan_segments(total_frames, workers)
+        if workers <= 1 or len(segments) == 1:
+            yield from self._iter_keyframes(video_path, parallel=False)
+            return
+
+        pool_size = min(workers, len(segments))
+        pool = ProcessPoolExecutor(max_workers=pool_size)
+        remaining = iter(segments)
+        in_flight: Deque[Future] = deque()
+
+        def submit_next() -> None:
+            segment = next(remaining, None)
+            if segment is not None:
+                in_flight.append(pool.submit(self._process_segment, video_path, *segment))
+
+        analyzed = 0
+        try:
+            for _ in range(pool_size + 1):
+                submit_next()
+            last_keyframe_hash = None
+            while in_flight:
+                if stop is not None and stop.is_set():
+                    return
+                result = in_flight.popleft().result()
+                submit_next()
+                analyzed += len(result.hashes)
+
+                selected = []
+                for index, current_hash in zip(result.indices, result.hashes):
+                    if self._is_new_keyframe(current_hash, last_keyframe_hash):
+                        last_keyframe_hash = current_hash
+                        selected.append(index)
+                frames = result.keyframes
+                missing = [index for index in selected if index not in frames]
+                if missing:
+                    frames.update(pool.submit(
+                        self._decode_frames, video_path, result.start, missing
+                    ).result())
+                for index in selected:
+                    yield index + 1, frames[index]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
             logger.info(
-                f"Finished processing {video_path}. Analyzed {frame_count} frames."
+                f"Finished processing {video_path}. Analyzed {analyzed} frames "
+                f"in {len(segments)} segments."
             )
 
-    def extract_keyframes(self, video_path: str) -> Generator[np.ndarray, None, None]:
+    def _iter_keyframes(
+        self,
+        video_path: str,
+        parallel: bool = True,
+        stop: Optional[threading.Event] = None,
+    ) -> Generator[Tuple[int, np.ndarray], None, None]:
         """
-        Extracts keyframes from a video file using the configured hashing strategy.
+        Yields (frame number, transformed frame) for each keyframe, in parallel
+        when more than one extraction worker is configured. ``stop`` ends
+        parallel extraction between segments.
         """
+        if parallel and self.workers > 1:
+            yield from self.iter_keyframes_parallel(video_path, stop=stop)
+            return
+
         last_keyframe_hash = None
         for frame_count, frame in self._extract_frames(video_path):
             current_hash = self._compute_hash(frame)
-            if (
-                last_keyframe_hash is None
-                or (current_hash - last_keyframe_hash) > self.threshold
-            ):
+            if self._is_new_keyframe(current_hash, last_keyframe_hash):
                 logger.debug(
                     f"Extracted keyframe at frame {frame_count} (hash diff > {self.threshold})"
                 )
                 last_keyframe_hash = current_hash
-                yield self._transform_frame(frame)
+                yield frame_count, self._transform_frame(frame)
+
+    def iter_frame_features(self, video_path: str) -> Generator[Dict[str, Any], None, None]:
+        """
+        Yields the sampling features of every decoded frame.
+
+        Motion is measured from codec motion vectors when the decoder
+        exports them (the ``pyav`` decode mode), and by differencing small
+        grayscale thumbnails of consecutive frames otherwise.
+
+        Yields:
+            Dictionaries with 'frame' (BGR), 'frame_number', 'timestamp',
+            'motion_magnitude' (the fraction of the frame in motion),
+            'frame_hash' (the perceptual hash keyframe extraction uses) and
+            'frame_data' (the transformed frame as a normalized
+            (1, 3, size, size) float32 tensor at the target width, the
+            input of learned sampling policies).
+        """
+        fps = self._get_fps(video_path) or 0
+        motion = MotionEstimator(self.motion_size, self.motion_pixel_threshold)
+        for frame_number, frame in self._extract_frames(video_path):
+            yield {
+                "frame": frame,
+                "frame_number": frame_number,
+                "timestamp": frame_number / fps if fps > 0 else 0,
+                "motion_magnitude": motion.estimate(frame, self.decoder.motion_magnitude),
+                "frame_hash": self._compute_hash(frame),
+                "frame_data": prepare_image_batch(
+                    self._transform_frame(frame)[None], self.target_size[0]
+                ),
+            }
+
+    def sample_frames(
+        self, video_path: str, policy: "SamplingPolicy", window: int = 16
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Yields the features of the frames a sampling policy selects. Frames
+        are decided in windows with ``should_process_batch``, so policies
+        that batch their models run them once per window.
+        """
+        batch: List[Dict[str, Any]] = []
+        for features in self.iter_frame_features(video_path):
+            batch.append(features)
+            if len(batch) == window:
+                decisions = policy.should_process_batch(batch)
+                yield from (item for item, keep in zip(batch, decisions) if keep)
+                batch = []
+        if batch:
+            decisions = policy.should_process_batch(batch)
+            yield from (item for item, keep in zip(batch, decisions) if keep)
+
+    def extract_keyframes(self, video_path: str) -> Generator[np.ndarray, None, None]:
+        """
+        Extracts keyframes from a video file using the configured hashing strategy.
+        """
+        for _, keyframe in self._iter_keyframes(video_path):
+            yield keyframe
 
     async def process_video(self, video_path: str) -> List[np.ndarray]:
         """
@@ -127,47 +553,174 @@ class VideoPreprocessor:
         def sync_process():
             return list(self.extract_keyframes(video_path))
 
-        keyframes = await loop.run_in_executor(None, sync_process)
+        async with self._admit_job():
+            keyframes = await loop.run_in_executor(None, sync_process)
         logger.info(
             f"Extracted a total of {len(keyframes)} keyframes from {video_path}"
         )
         return keyframes
 
-    async def process_video_with_frame_numbers(self, video_path: str) -> List[Dict]:
+    def _get_fps(self, video_path: str) -> Optional[float]:
+        """The frame rate of a video, or None if it cannot be opened."""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+        return fps
+
+    async def aiter_keyframes(self, video_path: str) -> AsyncIterator[Dict[str, Any]]:
         """
-        Public method that provides keyframes with their frame number and timestamp.
+        Streams keyframes with their frame number and timestamp.
+
+        Frames are decoded and hashed on an executor thread that hands
+        keyframes over through a bounded queue. When consumers fall behind,
+        the decode thread blocks on the full queue, so at most
+        ``keyframe_queue_size`` keyframes are queued at a time; parallel
+        extraction also holds the keyframes of the few segments in flight.
+        The decode thread holds its admission tokens only while it computes,
+        never while it waits for consumers. Closing the iterator early stops
+        decoding, between segments for parallel extraction.
+
+        Yields:
+            Dictionaries with 'frame', 'frame_number' and 'timestamp'.
         """
         loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+        done = object()
+        tokens = max(1, self.workers)
 
-        def sync_process_with_info():
-            keyframes_with_info = []
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return []
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            cap.release()
+        def put(item: Any) -> bool:
+            """Waits for room in the queue; False once the consumer is gone."""
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=_QUEUE_POLL_INTERVAL)
+                    return True
+                except FuturesTimeoutError:
+                    if stopped.is_set():
+                        future.cancel()
+                        return False
 
-            last_keyframe_hash = None
-            for frame_count, frame in self._extract_frames(video_path):
-                current_hash = self._compute_hash(frame)
-                if (
-                    last_keyframe_hash is None
-                    or (current_hash - last_keyframe_hash) > self.threshold
-                ):
-                    last_keyframe_hash = current_hash
-                    timestamp = frame_count / fps if fps > 0 else 0
-                    transformed_frame = self._transform_frame(frame)
-                    keyframes_with_info.append(
-                        {
-                            "frame": transformed_frame,
-                            "frame_number": frame_count,
-                            "timestamp": timestamp,
-                        }
-                    )
-            return keyframes_with_info
-
-        keyframes_with_info = await loop.run_in_executor(None, sync_process_with_info)
+        def produce() -> None:
+            try:
+                fps = self._get_fps(video_path)
+                if fps is None:
+                    return
+                keyframes = self._iter_keyframes(video_path, stop=stopped)
+                while not stopped.is_set():
+                    with self.admission.admit("preprocessing", tokens=tokens, max_wait=0):
+                        keyframe = next(keyframes, None)
+                    if keyframe is None:
+                        break
+                    frame_number, frame = keyframe
+                    item = {
+                        "frame": frame,
+                        "frame_number": frame_number,
+                        "timestamp": frame_number / fps if fps > 0 else 0,
+                    }
+                    if not put(item):
+                        break
+                keyframes.close()
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        producer = loop.run_in_executor(None, produce)
+        count = 0
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                count += 1
+                yield item
+        finally:
+            stopped.set()
+            await producer
+            logger.info(f"Streamed {count} keyframes from {video_path}")
+
+    def create_frame_ring(
+        self,
+        slots: Optional[int] = None,
+        context: Any = None,
+        producers: int = 1,
+        consumers: int = 1,
+    ) -> SharedFrameRing:
+        """
+        Creates a shared-memory ring whose slots fit this preprocessor's
+        transformed frames, for ``producers`` decode processes and
+        ``consumers`` inference processes. Create it before starting them.
+        """
+        width, height = self.target_size
+        return SharedFrameRing(
+            slots or self.frame_ring_slots,
+            (height, width, 3),
+            np.uint8,
+            context,
+            producers=producers,
+            consumers=consumers,
+        )
+
+    def write_keyframes_to_ring(
+        self, video_path: str, ring: SharedFrameRing, timeout: Optional[float] = None
+    ) -> int:
+        """
+        Extracts keyframes into a shared frame ring, for inference workers
+        in other processes. Blocks while every slot is in use, so decoding
+        runs no further ahead of inference than the ring allows. This
+        producer's side is closed when extraction finishes or fails; the
+        consumers see the end of the stream once every producer the ring
+        was created for has closed its side.
+
+        Args:
+            video_path: The video to process.
+            ring: A ring created by ``create_frame_ring``.
+            timeout: Longest wait for a free slot before ``queue.Full`` is raised.
+
+        Returns:
+            The number of keyframes written.
+        """
+        fps = self._get_fps(video_path) or 0
+        count = 0
+        try:
+            for frame_number, frame in self._iter_keyframes(video_path):
+                ring.put(
+                    frame,
+                    {
+                        "video_path": video_path,
+                        "frame_number": frame_number,
+                        "timestamp": frame_number / fps if fps > 0 else 0,
+                    },
+                    timeout=timeout,
+                )
+                count += 1
+        finally:
+            ring.close_writer()
+        logger.info(f"Wrote {count} keyframes from {video_path} to frame ring {ring.name}")
+        return count
+
+    async def collect_keyframes(self, video_path: str) -> KeyframeBatch:
+        """
+        Extracts every keyframe of a video into one KeyframeBatch of uint8
+        frames with parallel frame number and timestamp arrays.
+        """
+        width, height = self.target_size
+        buffer = KeyframeBuffer(frame_shape=(height, width, 3))
+        async for item in self.aiter_keyframes(video_path):
+            buffer.append(item["frame"], item["frame_number"], item["timestamp"])
+        return buffer.batch()
+
+    async def process_video_with_frame_numbers(self, video_path: str) -> List[Dict]:
+        """
+        Public method that provides keyframes with their frame number and timestamp.
+        Prefer ``aiter_keyframes`` for long videos, as this holds every keyframe.
+        """
+        keyframes_with_info = [item async for item in self.aiter_keyframes(video_path)]
         logger.info(
             f"Extracted a total of {len(keyframes_with_info)} keyframes with info from {video_path}"
         )
@@ -0,0 +1,421 @@
+"""
+Shared async access layer for the Qdrant vector database.
+
+This module provides:
+- A single process-wide AsyncQdrantClient with a pooled HTTP/gRPC transport
+- gRPC or HTTP selection, per-request timeouts and a bound on in-flight requests
+- Async search, batch search, upsert, scroll, count and collection management
+- The shared single-collection layout: one collection per vector space with
+  payload indexes on the fields searches are filtered by
+- Scalar or product vector quantization for collections created here
+- Prometheus metrics for every Qdrant call
+
+All vector services share this gateway instead of constructing their own
+synchronous QdrantClient, so vector calls never block the event loop.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from prometheus_client import Counter, Gauge, Histogram
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from insight_engine.config import settings
+from insight_engine.exceptions import QdrantConnectionException
+from insight_engine.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prometheus metrics
+QDRANT_REQUESTS_TOTAL = Counter(
+    'qdrant_requests_total',
+    'Total Qdrant requests',
+    ['operation', 'status']
+)
+
+QDRANT_REQUEST_DURATION = Histogram(
+    'qdrant_request_duration_seconds',
+    'Qdrant request duration',
+    ['operation'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+QDRANT_INFLIGHT_REQUESTS = Gauge(
+    'qdrant_inflight_requests',
+    'Qdrant requests currently in flight'
+)
+
+# Payload indexes of the shared collections. Videos are stored side by side in
+# one collection and every per-video search filters on ``video_id``; marking
+# it as the tenant key lets Qdrant co-locate each video's points.
+VIDEO_PAYLOAD_INDEXES: Dict[str, Any] = {
+    "video_id": models.KeywordIndexParams(
+        type=models.KeywordIndexType.KEYWORD, is_tenant=True
+    ),
+    "user_id": models.PayloadSchemaType.KEYWORD,
+    "timestamp": models.PayloadSchemaType.FLOAT,
+    "label": models.PayloadSchemaType.KEYWORD,
+}
+
+# Extra HNSW links built per indexed payload value, so filtered searches stay
+# on the graph instead of degrading to a scan for small videos.
+PAYLOAD_HNSW_M = 16
+
+
+def build_quantization_config(
+    mode: str, always_ram: bool = True
+) -> Optional[models.QuantizationConfig]:
+    """
+    The collection quantization for a mode: "scalar" stores int8 vectors
+    (4x smaller), "product" compresses them 16x, "none" disables it. With
+    ``always_ram`` only the quantized vectors are held in RAM.
+    """
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=always_ram
+            )
+        )
+    if mode == "product":
+        return models.ProductQuantization(
+            product=models.ProductQuantizationConfig(
+                compression=models.CompressionRatio.X16, always_ram=always_ram
+            )
+        )
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+@dataclass
+class QdrantGatewayConfig:
+    """Qdrant gateway configuration."""
+    host: str = "localhost"
+    port: int = 6333
+    location: Optional[str] = None  # e.g. ":memory:" for an embedded local instance
+    grpc_port: int = 6334
+    prefer_grpc: bool = False
+    api_key: Optional[str] = None
+    timeout: float = 10.0  # Per-request timeout, in seconds
+    pool_size: int = 8  # Pooled HTTP connections or gRPC channels
+    max_concurrent_requests: int = 64
+
+    @classmethod
+    def from_settings(cls, qdrant_settings: Any) -> "QdrantGatewayConfig":
+        return cls(
+            host=qdrant_settings.host,
+            port=qdrant_settings.port,
+            grpc_port=qdrant_settings.grpc_port,
+            prefer_grpc=qdrant_settings.prefer_grpc,
+            api_key=qdrant_settings.api_key,
+            timeout=qdrant_settings.timeout,
+            pool_size=qdrant_settings.pool_size,
+            max_concurrent_requests=qdrant_settings.max_concurrent_requests,
+        )
+
+
+class QdrantGateway:
+    """
+    Async, pooled Qdrant client shared by all vector services.
+
+    The underlying clients are created lazily so the application can start
+    before Qdrant is reachable.
+    """
+
+    def __init__(self, config: Optional[QdrantGatewayConfig] = None):
+        self.config = config or QdrantGatewayConfig()
+        self._client: Optional[AsyncQdrantClient] = None
+        self._sync_client: Optional[QdrantClient] = None
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+
+    def _client_kwargs(self) -> dict:
+        if self.config.location:
+            return dict(location=self.config.location)
+        return dict(
+            host=self.config.host,
+            port=self.config.port,
+            grpc_port=self.config.grpc_port,
+            prefer_grpc=self.config.prefer_grpc,
+            api_key=self.config.api_key,
+            timeout=max(1, int(self.config.timeout)),
+            pool_size=self.config.pool_size,
+        )
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        """The shared async client."""
+        if self._client is None:
+            self._client = AsyncQdrantClient(**self._client_kwargs())
+            logger.info(
+                f"Qdrant gateway connected to {self.config.location or self.config.host} "
+                f"({'gRPC' if self.config.prefer_grpc else 'HTTP'}, "
+                f"pool size {self.config.pool_size})"
+            )
+        return self._client
+
+    @property
+    def sync_client(self) -> QdrantClient:
+        """
+        A synchronous client for third-party integrations (e.g. LangChain)
+        that insist on one. Never call it from async code paths.
+        """
+        if self._sync_client is None:
+            self._sync_client = QdrantClient(**self._client_kwargs())
+        return self._sync_client
+
+    async def _call(self, operation: str, coro_factory) -> Any:
+        """Runs one Qdrant request under the concurrency bound and timeout."""
+        start_time = time.time()
+        status = 'success'
+        async with self._semaphore:
+            QDRANT_INFLIGHT_REQUESTS.inc()
+            try:
+                return await asyncio.wait_for(coro_factory(), timeout=self.config.timeout)
+            except asyncio.TimeoutError:
+                status = 'timeout'
+                raise QdrantConnectionException(
+                    f"Qdrant {operation} timed out after {self.config.timeout}s"
+                )
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                QDRANT_INFLIGHT_REQUESTS.dec()
+                QDRANT_REQUESTS_TOTAL.labels(operation=operation, status=status).inc()
+                QDRANT_REQUEST_DURATION.labels(operation=operation).observe(
+                    time.time() - start_time
+                )
+
+    async def search(
+        self,
+        collection_name: str,
+        query_vector: Sequence[float],
+        limit: int = 5,
+        query_filter: Optional[models.Filter] = None,
+        score_threshold: Optional[float] = None,
+        with_payload: Union[bool, List[str]] = True,
+    ) -> List[models.ScoredPoint]:
+        """Nearest-neighbour search for a single query vector."""
+        response = await self._call('search', lambda: self.client.query_points(
+            collection_name=collection_name,
+            query=list(query_vector),
+            query_filter=query_filter,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=with_payload,
+        ))
+        return response.points
+
+    async def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = 5,
+        query_filter: Union[
+            models.Filter, Sequence[Optional[models.Filter]], None
+        ] = None,
+        score_threshold: Optional[float] = None,
+        with_payload: Union[bool, List[str]] = True,
+    ) -> List[List[models.ScoredPoint]]:
+        """
+        Searches several query vectors in one round trip. Results are returned
+        in the same order as ``query_vectors``.
+
+        ``query_filter`` is either one filter applied to every query or a
+        sequence with one (possibly None) filter per query.
+        """
+        if not query_vectors:
+            return []
+
+        if query_filter is None or isinstance(query_filter, models.Filter):
+            filters = [query_filter] * len(query_vectors)
+        else:
+            filters = list(query_filter)
+            if len(filters) != len(query_vectors):
+                raise ValueError("Expected one filter per query vector")
+
+        requests = [
+            models.QueryRequest(
+                query=list(vector),
+                filter=vector_filter,
+                limit=limit,
+                score_threshold=score_threshold,
+                with_payload=with_payload,
+            )
+            for vector, vector_filter in zip(query_vectors, filters)
+        ]
+        responses = await self._call('search_batch', lambda: self.client.query_batch_points(
+            collection_name=collection_name, requests=requests
+        ))
+        return [response.points for response in responses]
+
+    async def upsert(
+        self,
+        collection_name: str,
+        points: Union[List[models.PointStruct], models.Batch],
+        wait: bool = True,
+    ) -> None:
+        await self._call('upsert', lambda: self.client.upsert(
+            collection_name=collection_name, points=points, wait=wait
+        ))
+
+    async def scroll(
+        self,
+        collection_name: str,
+        limit: int = 100,
+        scroll_filter: Optional[models.Filter] = None,
+        with_payload: Union[bool, List[str]] = True,
+        with_vectors: bool = False,
+        offset: Optional[Any] = None,
+    ) -> Tuple[List[models.Record], Optional[Any]]:
+        """Returns one page of points and the offset of the next page."""
+        return await self._call('scroll', lambda: self.client.scroll(
+            collection_name=collection_name,
+            limit=limit,
+            scroll_filter=scroll_filter,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+            offset=offset,
+        ))
+
+    async def scroll_all(
+        self,
+        collection_name: str,
+        page_size: int = 256,
+        scroll_filter: Optional[models.Filter] = None,
+        with_payload: Union[bool, List[str]] = True,
+        with_vectors: bool = False,
+    ) -> AsyncIterator[models.Record]:
+        """Iterates over every matching point, one page per request."""
+        offset = None
+        while True:
+            points, offset = await self.scroll(
+                collection_name,
+                limit=page_size,
+                scroll_filter=scroll_filter,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+                offset=offset,
+            )
+            for point in points:
+                yield point
+            if offset is None:
+                break
+
+    async def count(
+        self,
+        collection_name: str,
+        count_filter: Optional[models.Filter] = None,
+        exact: bool = True,
+    ) -> int:
+        """Counts the points matching a filter."""
+        result = await self._call('count', lambda: self.client.count(
+            collection_name=collection_name, count_filter=count_filter, exact=exact
+        ))
+        return result.count
+
+    async def list_collections(self) -> List[str]:
+        response = await self._call('list_collections', self.client.get_collections)
+        return [collection.name for collection in response.collections]
+
+    async def get_vector_size(self, collection_name: str) -> int:
+        """Returns the dimensionality of a collection's (unnamed) vectors."""
+        info = await self._call('get_collection', lambda: self.client.get_collection(
+            collection_name
+        ))
+        return info.config.params.vectors.size
+
+    async def ensure_collection(
+        self,
+        collection_name: str,
+        vector_size: int,
+        payload_indexes: Optional[Dict[str, Any]] = None,
+        distance: models.Distance = models.Distance.COSINE,
+        quantization_config: Optional[models.QuantizationConfig] = None,
+    ) -> bool:
+        """
+        Creates a collection if it does not exist yet and makes sure its
+        payload indexes are in place. Existing points are never touched.
+        ``quantization_config`` applies to newly created collections; with
+        it, original vectors are kept on disk.
+
+        Returns:
+            True if the collection was created.
+        """
+        payload_indexes = VIDEO_PAYLOAD_INDEXES if payload_indexes is None else payload_indexes
+        created = False
+        if not await self._call('collection_exists', lambda: self.client.collection_exists(
+            collection_name
+        )):
+            await self._call('create_collection', lambda: self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(
+                    size=vector_size,
+                    distance=distance,
+                    on_disk=True if quantization_config is not None else None,
+                ),
+                hnsw_config=models.HnswConfigDiff(payload_m=PAYLOAD_HNSW_M),
+                quantization_config=quantization_config,
+            ))
+            created = True
+            logger.info(f"Created Qdrant collection '{collection_name}'")
+
+        # Creating an index that already exists is a no-op in Qdrant
+        for field_name, field_schema in payload_indexes.items():
+            await self._call('create_payload_index', lambda: self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
+            ))
+        return created
+
+    async def delete_collection(self, collection_name: str) -> None:
+        await self._call('delete_collection', lambda: self.client.delete_collection(
+            collection_name
+        ))
+
+    async def recreate_collection(
+        self, collection_name: str, vector_size: int,
+        distance: models.Distance = models.Distance.COSINE,
+    ) -> None:
+        """Drops and recreates a collection."""
+        async def recreate():
+            if await self.client.collection_exists(collection_name):
+                await self.client.delete_collection(collection_name)
+            await self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(size=vector_size, distance=distance),
+            )
+        await self._call('recreate_collection', recreate)
+
+    async def close(self) -> None:
+        """Closes the pooled connections."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+# Shared gateway instance
+_qdrant_gateway: Optional[QdrantGateway] = None
+
+
+def get_qdrant_gateway() -> QdrantGateway:
+    """Return the process-wide Qdrant gateway, configured from settings."""
+    global _qdrant_gateway
+    if _qdrant_gateway is None:
+        _qdrant_gateway = QdrantGateway(QdrantGatewayConfig.from_settings(settings.qdrant))
+    return _qdrant_gateway
+
+
+async def close_qdrant_gateway() -> None:
+    """Close the shared gateway, e.g. on application shutdown."""
+    global _qdrant_gateway
+    if _qdrant_gateway is not None:
+        await _qdrant_gateway.close()
+        _qdrant_gateway = None
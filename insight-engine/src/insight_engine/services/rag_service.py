@@ -1,10 +1,22 @@
-from typing import AsyncGenerator, Optional
+import logging
+from typing import AsyncGenerator, AsyncIterator, List, Optional
 
 from fastapi import Depends, HTTPException, status
+from langchain_community.embeddings import OpenAIEmbeddings
 from insight_engine.agents.summarization_agent import SummarizationAgent
 from insight_engine.agents.rag_utils import RAGInput
 from insight_engine.tools.vector_store import VectorStore
 from insight_engine.services.redis_service import RedisService, get_redis_service
+from insight_engine.services.semantic_cache import (
+    SemanticAnswerCache,
+    get_semantic_cache,
+)
+from insight_engine.services.summary_stream_cache import (
+    SummaryStreamCache,
+    get_summary_stream_cache,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class RAGService:
@@ -15,14 +27,68 @@ class RAGService:
     def __init__(
         self,
         redis_service: RedisService = Depends(get_redis_service),
+        semantic_cache: SemanticAnswerCache = Depends(get_semantic_cache),
+        summary_cache: SummaryStreamCache = Depends(get_summary_stream_cache),
     ):
         """
         Initializes the RAG service.
 
         Args:
             redis_service: The RedisService dependency.
+            semantic_cache: Cache of prior answers keyed by query similarity.
+            summary_cache: Chunk-level cache of streamed summaries.
         """
         self.redis_service = redis_service
+        self.semantic_cache = semantic_cache
+        self.summary_cache = summary_cache
+        self._embeddings = None
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        """
+        Lazily creates the query embedder, matching the model used for retrieval.
+        """
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings()
+        return self._embeddings
+
+    async def _embed_query(self, user_query: str) -> Optional[List[float]]:
+        """
+        Embeds a query for the semantic cache. Failures disable the semantic
+        lookup for this request instead of failing it.
+        """
+        if not self.semantic_cache.config.enabled:
+            return None
+        try:
+            return await self.embeddings.aembed_query(user_query)
+        except Exception as e:
+            logger.warning(f"Query embedding for semantic cache failed: {e}")
+            return None
+
+    async def _get_semantic_match(
+        self, video_id: str, query_embedding: Optional[List[float]]
+    ) -> Optional[str]:
+        """
+        Returns the summary stream key of a similar earlier query for the same
+        video, if that summary is still cached.
+        """
+        if query_embedding is None:
+            return None
+
+        hit = self.semantic_cache.lookup(video_id, query_embedding)
+        if hit is None:
+            return None
+
+        if not await self.summary_cache.exists(hit.value):
+            # The answer expired in Redis; drop the stale pointer
+            self.semantic_cache.discard(video_id, hit.query)
+            return None
+
+        logger.debug(
+            f"Semantic cache hit for video {video_id} "
+            f"(similarity {hit.similarity:.3f} to '{hit.query}')"
+        )
+        return hit.value
 
     async def get_summary_stream(
         self, user_query: str, video_id: str, user_id: Optional[str] = None
@@ -30,6 +96,10 @@ class RAGService:
         """
         Retrieves context and generates a summary stream, with caching.
 
+        Summaries are cached chunk by chunk, so cached replies stream with
+        their original chunk boundaries, and concurrent requests for a summary
+        that is still being generated share the one in-flight LLM call.
+
         Args:
             user_query: The user's query.
             video_id: The ID of the video to summarize.
@@ -40,32 +110,30 @@ class RAGService:
         # --- Authorization Check ---
         # Verify that the user is authorized to access the video.
         vector_store = VectorStore()
-        vector_store = VectorStore()
-        video_metadata = await vector_store.get_video_metadata(video_id)
-
-        if not video_metadata or video_metadata.get("user_id") != user_id:
+        if not await vector_store.user_owns_video(video_id, user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User does not have access to this video.",
             )
 
-        cache_key = f"summary:{video_id}:{user_query}"
-        cached_summary = await self.redis_service.get(cache_key)
-
-        if cached_summary:
-            yield cached_summary
-            return
+        cache_key = f"summary_stream:{video_id}:{user_query}"
+        query_embedding = None
+        if not await self.summary_cache.exists(cache_key):
+            query_embedding = await self._embed_query(user_query)
+            match_key = await self._get_semantic_match(video_id, query_embedding)
+            if match_key:
+                async for chunk in self.summary_cache.stream(match_key):
+                    yield chunk
+                return
 
-        summarization_agent = SummarizationAgent(
-            vector_store=vector_store, collection_name=video_id
-        )
-        rag_input = RAGInput(query=user_query)
+        def generate() -> AsyncIterator[str]:
+            summarization_agent = SummarizationAgent(
+                vector_store=vector_store, video_id=video_id
+            )
+            return summarization_agent.generate_summary(RAGInput(query=user_query))
 
-        full_summary = []
-        response_stream = summarization_agent.generate_summary(rag_input)
-        async for chunk in response_stream:
-            full_summary.append(chunk)
+        async for chunk in self.summary_cache.stream(cache_key, generate):
             yield chunk
 
-        # Cache the full response
-        await self.redis_service.set(cache_key, "".join(full_summary))
+        if query_embedding is not None:
+            self.semantic_cache.store(video_id, user_query, query_embedding, cache_key)
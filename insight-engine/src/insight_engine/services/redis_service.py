@@ -1,6 +1,6 @@
 import os
 import redis.asyncio as redis
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 import logging
 from google.api_core import exceptions
 from insight_engine.dependencies import get_secret
@@ -54,6 +54,61 @@ class RedisService:
         result = await self.client.exists(key)
         return bool(result)
 
+    @database_resilient("redis_set_if_absent", fallback=lambda *args, **kwargs: True)
+    async def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        """
+        Sets a value only if the key does not exist (SET NX EX). Used for
+        short-lived ownership leases; if Redis is unavailable every caller is
+        treated as the owner.
+        """
+        return bool(await self.client.set(key, value, nx=True, ex=ttl))
+
+    async def stream_append(
+        self,
+        key: str,
+        fields: Dict[str, str],
+        ttl: Optional[int] = None,
+        refresh: Sequence[str] = (),
+    ) -> str:
+        """
+        Appends an entry to a Redis stream, optionally (re)setting its TTL.
+        Returns the new entry ID.
+
+        ``refresh`` names further keys, such as the stream's producer lease,
+        whose TTL is reset to ``ttl`` in the same round trip.
+
+        Stream calls are made once per chunk, so they go to the client
+        directly rather than through the rate-limited resilience wrapper.
+        Errors are raised (redis.RedisError) instead of being swallowed, so
+        a caller never mistakes a lost entry for a written one.
+        """
+        if ttl is None:
+            return await self.client.xadd(key, fields)
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, fields)
+            for name in (key, *refresh):
+                pipe.expire(name, ttl)
+            entry_id, *_ = await pipe.execute()
+        return entry_id
+
+    async def stream_read(
+        self,
+        key: str,
+        last_id: str = "0",
+        count: Optional[int] = None,
+        block_ms: Optional[int] = None,
+    ) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Reads stream entries after ``last_id``, blocking up to ``block_ms``
+        for new ones when set. Like ``stream_append``, it calls the client
+        directly and raises redis.RedisError on failure.
+        """
+        response = await self.client.xread({key: last_id}, count=count, block=block_ms)
+        if not response:
+            return []
+        return response[0][1]
+
 # Singleton instance for dependency injection
 redis_service = RedisService()
 
@@ -0,0 +1,304 @@
+"""
+Semantic answer cache for the RAG service.
+
+Exact-string caching misses paraphrases ("what happens at the start?" versus
+"what happens in the beginning?"). This module keeps a small per-video index
+of query embeddings and returns the stored value of the closest prior query
+when its cosine similarity clears a configurable threshold.
+
+This module provides:
+- A per-video NumPy index, grown geometrically up to its capacity and scored
+  with a single matrix-vector product
+- Per-entry TTL and LRU eviction within a video, plus LRU eviction across videos
+- Prometheus metrics for hits, misses and best-match similarity
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from prometheus_client import Counter, Gauge, Histogram
+
+from insight_engine.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Prometheus metrics
+SEMANTIC_CACHE_LOOKUPS_TOTAL = Counter(
+    'semantic_cache_lookups_total',
+    'Semantic answer cache lookups',
+    ['cache_name', 'result']
+)
+
+SEMANTIC_CACHE_SIMILARITY = Histogram(
+    'semantic_cache_similarity',
+    'Best cosine similarity found per semantic cache lookup',
+    ['cache_name'],
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0)
+)
+
+SEMANTIC_CACHE_ENTRIES = Gauge(
+    'semantic_cache_entries',
+    'Entries held in the semantic answer cache',
+    ['cache_name']
+)
+
+
+@dataclass
+class SemanticCacheConfig:
+    """Semantic answer cache settings."""
+    enabled: bool = True
+    similarity_threshold: float = 0.92  # Minimum cosine similarity for a hit
+    max_entries_per_video: int = 128
+    max_videos: int = 512
+    ttl: float = 3600.0  # Seconds an entry stays eligible for hits
+
+
+@dataclass
+class SemanticCacheHit:
+    """The closest cached query for a lookup that cleared the threshold."""
+    query: str
+    value: Any
+    similarity: float
+
+
+# Slots allocated for a video's first entry; the index doubles from there
+INITIAL_VIDEO_SLOTS = 4
+
+
+class _VideoIndex:
+    """
+    Embedding matrix plus per-slot metadata for one video. Storage starts
+    small and doubles as entries arrive, up to ``capacity`` slots, so videos
+    with few cached answers stay cheap.
+    """
+
+    def __init__(self, capacity: int, dimension: int):
+        self.capacity = capacity
+        allocated = min(capacity, INITIAL_VIDEO_SLOTS)
+        self.embeddings = np.zeros((allocated, dimension), dtype=np.float32)
+        self.expires_at = np.full(allocated, -np.inf)
+        self.last_used = np.zeros(allocated)
+        self.queries: list = [None] * allocated
+        self.values: list = [None] * allocated
+        self.size = 0
+
+    def _grow(self) -> None:
+        """Double the allocated slots, up to the capacity."""
+        allocated = len(self.queries)
+        extra = min(allocated * 2, self.capacity) - allocated
+        self.embeddings = np.concatenate([
+            self.embeddings,
+            np.zeros((extra, self.embeddings.shape[1]), dtype=np.float32)
+        ])
+        self.expires_at = np.concatenate([self.expires_at, np.full(extra, -np.inf)])
+        self.last_used = np.concatenate([self.last_used, np.zeros(extra)])
+        self.queries.extend([None] * extra)
+        self.values.extend([None] * extra)
+
+    def live_mask(self, now: float) -> np.ndarray:
+        return self.expires_at[:self.size] > now
+
+    def free_slot(self, now: float) -> int:
+        """Return a slot to write into, reusing expired or least recently used ones."""
+        if self.size < self.capacity:
+            # Reuse expired slots before allocating more
+            expired = np.flatnonzero(~self.live_mask(now))
+            if expired.size:
+                return int(expired[0])
+            if self.size == len(self.queries):
+                self._grow()
+            self.size += 1
+            return self.size - 1
+
+        expired = np.flatnonzero(~self.live_mask(now))
+        if expired.size:
+            return int(expired[0])
+        return int(np.argmin(self.last_used))
+
+    def find_query(self, query: str) -> Optional[int]:
+        for slot in range(self.size):
+            if self.queries[slot] == query:
+                return slot
+        return None
+
+    def clear_slot(self, slot: int) -> None:
+        self.expires_at[slot] = -np.inf
+        self.queries[slot] = None
+        self.values[slot] = None
+
+    def live_count(self, now: float) -> int:
+        return int(np.count_nonzero(self.live_mask(now)))
+
+
+class SemanticAnswerCache:
+    """
+    In-process semantic cache of answers, partitioned by video.
+
+    Embeddings are L2-normalised on insert so a lookup is one dot product
+    against the video's matrix. Values are opaque to the cache; the RAG
+    service stores the exact-match cache key so the answer itself stays in
+    Redis and expires there.
+    """
+
+    def __init__(
+        self,
+        config: Optional[SemanticCacheConfig] = None,
+        cache_name: str = "rag_summary"
+    ):
+        self.config = config or SemanticCacheConfig()
+        self.cache_name = cache_name
+        self._videos: "OrderedDict[str, _VideoIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        # Live entry count is computed at scrape time so expiry is reflected
+        SEMANTIC_CACHE_ENTRIES.labels(cache_name=cache_name).set_function(
+            self._count_entries
+        )
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0 or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    def lookup(
+        self,
+        video_id: str,
+        embedding: Sequence[float]
+    ) -> Optional[SemanticCacheHit]:
+        """Return the closest live entry for ``video_id`` above the threshold."""
+        if not self.config.enabled:
+            return None
+
+        query = self._normalize(embedding)
+        best_similarity = None
+        hit = None
+        with self._lock:
+            index = self._videos.get(video_id)
+            if (query is not None and index is not None and index.size
+                    and index.embeddings.shape[1] == query.size):
+                now = time.monotonic()
+                self._videos.move_to_end(video_id)
+                scores = index.embeddings[:index.size] @ query
+                scores[~index.live_mask(now)] = -np.inf
+                slot = int(np.argmax(scores))
+                if np.isfinite(scores[slot]):
+                    best_similarity = float(scores[slot])
+                    if best_similarity >= self.config.similarity_threshold:
+                        index.last_used[slot] = now
+                        hit = SemanticCacheHit(
+                            query=index.queries[slot],
+                            value=index.values[slot],
+                            similarity=best_similarity
+                        )
+
+        if best_similarity is not None:
+            SEMANTIC_CACHE_SIMILARITY.labels(cache_name=self.cache_name).observe(
+                best_similarity
+            )
+        if hit is not None:
+            self._stats['hits'] += 1
+        else:
+            self._stats['misses'] += 1
+        SEMANTIC_CACHE_LOOKUPS_TOTAL.labels(
+            cache_name=self.cache_name, result='hit' if hit is not None else 'miss'
+        ).inc()
+        return hit
+
+    def store(
+        self,
+        video_id: str,
+        query: str,
+        embedding: Sequence[float],
+        value: Any,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """Insert or refresh the entry for ``query`` under ``video_id``."""
+        if not self.config.enabled or self.config.max_entries_per_video <= 0:
+            return False
+
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+
+        with self._lock:
+            now = time.monotonic()
+            index = self._videos.get(video_id)
+            if index is None or index.embeddings.shape[1] != vector.size:
+                index = _VideoIndex(self.config.max_entries_per_video, vector.size)
+                self._videos[video_id] = index
+                self._evict_videos()
+            self._videos.move_to_end(video_id)
+
+            slot = index.find_query(query)
+            if slot is None:
+                was_full = index.size == len(index.queries)
+                slot = index.free_slot(now)
+                if was_full and index.expires_at[slot] > now:
+                    self._stats['evictions'] += 1
+
+            index.embeddings[slot] = vector
+            index.expires_at[slot] = now + (ttl or self.config.ttl)
+            index.last_used[slot] = now
+            index.queries[slot] = query
+            index.values[slot] = value
+
+        return True
+
+    def discard(self, video_id: str, query: str) -> bool:
+        """Drop a single entry, e.g. when the value it points to has expired."""
+        with self._lock:
+            index = self._videos.get(video_id)
+            slot = index.find_query(query) if index is not None else None
+            if slot is None:
+                return False
+            index.clear_slot(slot)
+        return True
+
+    def invalidate_video(self, video_id: str) -> bool:
+        """Forget every entry for ``video_id``."""
+        with self._lock:
+            return self._videos.pop(video_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._videos.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts and occupancy."""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'videos': len(self._videos),
+            'entries': self._count_entries(),
+            'hit_ratio': self._stats['hits'] / lookups if lookups > 0 else 0
+        }
+
+    def _evict_videos(self) -> None:
+        while len(self._videos) > self.config.max_videos:
+            video_id, _ = self._videos.popitem(last=False)
+            self._stats['evictions'] += 1
+            logger.debug(f"Evicted semantic cache index for video {video_id}")
+
+    def _count_entries(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            return sum(index.live_count(now) for index in self._videos.values())
+
+
+# Shared instance for dependency injection
+_semantic_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_semantic_cache() -> SemanticAnswerCache:
+    """Return the process-wide semantic answer cache."""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticAnswerCache()
+    return _semantic_cache
@@ -6,8 +6,9 @@ from langchain.prompts import PromptTemplate
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from insight_engine.services.vector_store_service import (
     VectorStoreService,
+    embed_query,
 )
-from typing import AsyncGenerator, Dict, Any
+from typing import AsyncGenerator, Dict, Any, List
 
 
 class RAGChain:
@@ -66,19 +67,32 @@ class RAGChain:
         
         return "\n---\n".join(context_parts)
 
-    def _get_context(self, question: str) -> str:
+    async def _get_context(self, question: str) -> str:
         """Embeds a query and retrieves formatted context from the vector store."""
-        query_vector = self.embeddings.embed_query(question)
-        search_results = self.vector_store.search(
+        query_vector = await embed_query(self.embeddings, question)
+        search_results = await self.vector_store.search(
             collection_name=self.collection_name, query_vector=query_vector, limit=5
         )
         return self._format_context(search_results)
 
+    async def _get_contexts(self, questions: List[str]) -> List[str]:
+        """
+        Retrieves formatted context for several questions with one batched
+        query embedding call and one batched vector search.
+        """
+        batch_results = await self.vector_store.search_batch(
+            questions,
+            limit=5,
+            collection_name=self.collection_name,
+            embeddings=self.embeddings,
+        )
+        return [self._format_context(results) for results in batch_results]
+
     async def stream(self, question: str) -> AsyncGenerator[str, None]:
         """
         Executes the RAG chain and streams the response.
         """
-        context = self._get_context(question)
+        context = await self._get_context(question)
         if not context:
             yield "I could not find any relevant information to answer your question."
             return
@@ -88,13 +102,33 @@ class RAGChain:
         ):
             yield chunk.content
 
-    def run(self, question: str) -> str:
+    async def run(self, question: str) -> str:
         """
         Executes the RAG chain for a non-streaming response.
         """
-        context = self._get_context(question)
+        context = await self._get_context(question)
         if not context:
             return "I could not find any relevant information to answer your question."
 
-        response = self.chain.invoke({"context": context, "question": question})
+        response = await self.chain.ainvoke({"context": context, "question": question})
         return response.content
+
+    async def run_batch(self, questions: List[str]) -> List[str]:
+        """
+        Answers several questions, batching retrieval and the LLM calls.
+        Answers are returned in the order of ``questions``.
+        """
+        contexts = await self._get_contexts(questions)
+        answers = [
+            None if context else
+            "I could not find any relevant information to answer your question."
+            for context in contexts
+        ]
+        pending = [i for i, context in enumerate(contexts) if context]
+        if pending:
+            responses = await self.chain.abatch([
+                {"context": contexts[i], "question": questions[i]} for i in pending
+            ])
+            for i, response in zip(pending, responses):
+                answers[i] = response.content
+        return answers
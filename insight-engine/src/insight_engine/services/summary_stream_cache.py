@@ -0,0 +1,205 @@
+"""
+Chunk-level caching of streamed summaries in Redis streams.
+
+Each cached summary is a Redis stream holding one entry per generated chunk,
+followed by an end marker. The same stream serves three cases:
+
+- Replay: a completed stream is read back chunk by chunk, so cached replies
+  keep the original chunk boundaries and the first chunk arrives after a
+  single round trip.
+- Attach: while a summary is being generated, other requests for the same key
+  block on the stream and receive chunks as the producer appends them,
+  instead of starting a second LLM call.
+- Produce: the first request takes a short ownership lease and appends chunks
+  as the generator yields them. Every append renews the stream's and the
+  lease's TTL, so only a producer that stalls for ``generation_ttl`` loses
+  them, however long the whole generation takes.
+
+If an append fails, the producer stops caching: it deletes the stream and
+its lease and keeps serving its own request uncached, so a stream with a
+missing chunk is never replayed as complete.
+"""
+
+import logging
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, Optional, Sequence
+
+from redis.exceptions import RedisError
+
+from insight_engine.services.redis_service import RedisService, get_redis_service
+
+logger = logging.getLogger(__name__)
+
+CHUNK_FIELD = "chunk"
+EVENT_FIELD = "event"
+END_EVENT = "end"
+LEASE_KEY_SUFFIX = ":__producer"
+
+
+class SummaryStreamError(Exception):
+    """Raised when an attached stream is abandoned by its producer mid-way."""
+
+
+class SummaryStreamCache:
+    """
+    Caches streamed summaries as Redis streams with single-producer fan-out.
+    """
+
+    def __init__(
+        self,
+        redis_service: RedisService,
+        ttl: int = 3600,
+        generation_ttl: int = 300,
+        block_ms: int = 1000,
+        read_batch_size: int = 64,
+    ):
+        """
+        Initializes the summary stream cache.
+
+        Args:
+            redis_service: The RedisService used for storage.
+            ttl: Lifetime of a completed summary, in seconds.
+            generation_ttl: Lifetime of an in-flight stream and its producer
+                lease, renewed on every chunk; bounds how long a crashed
+                or stalled producer blocks others.
+            block_ms: How long attached readers block per read.
+            read_batch_size: Maximum chunks fetched per read.
+        """
+        self.redis_service = redis_service
+        self.ttl = ttl
+        self.generation_ttl = generation_ttl
+        self.block_ms = block_ms
+        self.read_batch_size = read_batch_size
+
+    async def exists(self, key: str) -> bool:
+        """Returns True if a completed or in-flight stream exists for ``key``."""
+        return await self.redis_service.exists(key)
+
+    async def stream(
+        self,
+        key: str,
+        producer: Optional[Callable[[], AsyncIterator[str]]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Yields the chunks for ``key``, replaying, attaching or producing them.
+
+        Args:
+            key: The cache key of the summary stream.
+            producer: Factory for the chunk generator, called only if this
+                request ends up generating the summary. Without a producer
+                the call only replays or attaches, yielding nothing on a miss.
+        """
+        lease_key = f"{key}{LEASE_KEY_SUFFIX}"
+        if producer is None and not await self.exists(key):
+            return
+
+        while True:
+            if producer is not None:
+                if await self.redis_service.set_if_absent(
+                    lease_key, "1", self.generation_ttl
+                ):
+                    # A finished stream may have appeared since the caller's check
+                    if await self.exists(key):
+                        await self.redis_service.delete(lease_key)
+                    else:
+                        async for chunk in self._produce(key, lease_key, producer):
+                            yield chunk
+                        return
+
+            delivered = 0
+            try:
+                async for chunk in self._follow(key, lease_key):
+                    delivered += 1
+                    yield chunk
+                return
+            except SummaryStreamError:
+                if delivered:
+                    raise
+                if producer is None:
+                    return
+                logger.warning(f"Producer for {key} went away; taking over generation")
+
+    async def _produce(
+        self,
+        key: str,
+        lease_key: str,
+        producer: Callable[[], AsyncIterator[str]],
+    ) -> AsyncGenerator[str, None]:
+        """Generates chunks, appending each to the stream before yielding it."""
+        caching = True
+        completed = False
+        try:
+            async for chunk in producer():
+                if caching:
+                    caching = await self._append(
+                        key, {CHUNK_FIELD: chunk}, self.generation_ttl, refresh=(lease_key,)
+                    )
+                    if not caching:
+                        # Release attached readers now rather than at the end
+                        await self.redis_service.delete(key)
+                        await self.redis_service.delete(lease_key)
+                yield chunk
+
+            if caching:
+                completed = await self._append(key, {EVENT_FIELD: END_EVENT}, self.ttl)
+        finally:
+            if not completed:
+                # Never leave a partial summary behind to be replayed as complete
+                await self.redis_service.delete(key)
+            await self.redis_service.delete(lease_key)
+
+    async def _append(
+        self,
+        key: str,
+        fields: Dict[str, str],
+        ttl: Optional[int],
+        refresh: Sequence[str] = (),
+    ) -> bool:
+        """Appends an entry, returning False if Redis failed to store it."""
+        try:
+            await self.redis_service.stream_append(key, fields, ttl, refresh)
+            return True
+        except RedisError as e:
+            logger.warning(f"Could not append to summary stream {key}, no longer caching it: {e}")
+            return False
+
+    async def _follow(self, key: str, lease_key: str) -> AsyncGenerator[str, None]:
+        """Reads the stream from the start until its end marker."""
+        last_id = "0"
+        while True:
+            entries = await self._read(key, last_id, self.block_ms)
+            if not entries:
+                if await self.redis_service.exists(lease_key):
+                    continue
+                # The producer is gone; catch an end marker written just before
+                # it released the lease, otherwise the stream was abandoned
+                entries = await self._read(key, last_id)
+                if not entries:
+                    raise SummaryStreamError(f"Summary stream {key} was abandoned")
+
+            for entry_id, fields in entries:
+                last_id = entry_id
+                if fields.get(EVENT_FIELD) == END_EVENT:
+                    return
+                if CHUNK_FIELD in fields:
+                    yield fields[CHUNK_FIELD]
+
+
+    async def _read(self, key: str, last_id: str, block_ms: Optional[int] = None):
+        """Reads entries after ``last_id``, treating a Redis failure as an abandoned stream."""
+        try:
+            return await self.redis_service.stream_read(
+                key, last_id, count=self.read_batch_size, block_ms=block_ms
+            )
+        except RedisError as e:
+            raise SummaryStreamError(f"Summary stream {key} could not be read: {e}") from e
+
+
+# Singleton instance for dependency injection
+_summary_stream_cache: Optional[SummaryStreamCache] = None
+
+
+def get_summary_stream_cache() -> SummaryStreamCache:
+    global _summary_stream_cache
+    if _summary_stream_cache is None:
+        _summary_stream_cache = SummaryStreamCache(get_redis_service())
+    return _summary_stream_cache
@@ -1,29 +1,45 @@
-import os
-from typing import List, Optional
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 import logging
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 from insight_engine.resilience import database_resilient
+from insight_engine.services.qdrant_gateway import QdrantGateway, get_qdrant_gateway
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class FramePoint:
+    """A frame embedding and its analysis payload, ready for upsert."""
+    vector: List[float]
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    def to_point_struct(self) -> models.PointStruct:
+        return models.PointStruct(id=self.id, vector=self.vector, payload=self.payload)
+
+
 class VectorDBService:
     """
     A service to interact with the Qdrant vector database.
     """
 
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = 6333):
+    def __init__(
+        self,
+        collection_name: str = "video_frames",
+        gateway: Optional[QdrantGateway] = None,
+    ):
         """
-        Initializes the Qdrant client.
+        Initializes the service on top of the shared Qdrant gateway.
 
         Args:
-            host: The Qdrant host. Defaults to the QDRANT_HOST env variable.
-            port: The Qdrant port. Defaults to 6333.
+            collection_name: The collection holding frame points.
+            gateway: The Qdrant gateway to use. Defaults to the shared gateway.
         """
-        self.host = host or os.environ["QDRANT_HOST"]
-        self.port = port
-        self.client = QdrantClient(host=self.host, port=self.port)
+        self.collection_name = collection_name
+        self.gateway = gateway or get_qdrant_gateway()
 
     @database_resilient("qdrant_search", fallback=lambda *args, **kwargs: [])
     async def similarity_search(
@@ -40,9 +56,40 @@ class VectorDBService:
         Returns:
             A list of search results.
         """
-        return self.client.search(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=True,
+        return await self.gateway.search(collection_name, query_vector, limit=limit)
+
+    @database_resilient("qdrant_ensure_collection")
+    async def ensure_collection(
+        self,
+        vector_size: int,
+        quantization_config: Optional[models.QuantizationConfig] = None,
+    ) -> bool:
+        """
+        Creates the frame collection and its payload indexes if they are
+        missing. Existing frames are kept.
+
+        Args:
+            vector_size: The dimensionality of the frame embeddings.
+            quantization_config: The vector quantization of a new collection.
+
+        Returns:
+            True if the collection was created, False if it already existed.
+            Errors are raised, since frames cannot be stored without it.
+        """
+        return await self.gateway.ensure_collection(
+            self.collection_name, vector_size, quantization_config=quantization_config
+        )
+
+    @database_resilient("qdrant_upsert", fallback=lambda *args, **kwargs: None)
+    async def upsert_points(self, points: List[FramePoint]) -> None:
+        """
+        Upserts frame points into the frame collection in a single request.
+
+        Args:
+            points: The frame points to store.
+        """
+        if not points:
+            return
+        await self.gateway.upsert(
+            self.collection_name, [point.to_point_struct() for point in points]
         )
@@ -2,12 +2,17 @@
 Service for interacting with the Qdrant vector database.
 """
 
+import asyncio
 import uuid
 import logging
-from qdrant_client import QdrantClient, models
-from typing import List, Dict, Any, Optional
+from langchain_community.embeddings import OpenAIEmbeddings
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings, FakeEmbeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from qdrant_client import models
+from typing import List, Dict, Any, Optional, Sequence, Union
 from insight_engine.config import settings
 from insight_engine.resilience import database_resilient
+from insight_engine.services.qdrant_gateway import QdrantGateway, get_qdrant_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -18,37 +23,107 @@ class VectorStoreError(Exception):
     pass
 
 
+PayloadFilter = Union[Dict[str, Any], models.Filter, None]
+
+
+def build_payload_filter(filters: PayloadFilter) -> Optional[models.Filter]:
+    """
+    Builds a Qdrant filter from a ``{field: value}`` mapping. List values
+    match any of their elements; a ready-made Filter is passed through.
+    """
+    if filters is None or isinstance(filters, models.Filter):
+        return filters
+
+    conditions = []
+    for key, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            match = models.MatchAny(any=list(value))
+        else:
+            match = models.MatchValue(value=value)
+        conditions.append(models.FieldCondition(key=key, match=match))
+    return models.Filter(must=conditions)
+
+
+# Models whose query embeddings are their document embeddings, so a batch
+# of queries can go through one aembed_documents call
+SYMMETRIC_EMBEDDINGS = (OpenAIEmbeddings, FakeEmbeddings, DeterministicFakeEmbedding)
+
+# Concurrent aembed_query calls for models that embed queries differently
+# and have no batched query call
+EMBED_QUERY_CONCURRENCY = 8
+
+
+async def embed_queries(embeddings: Embeddings, queries: Sequence[str]) -> List[List[float]]:
+    """
+    Embeds search queries, as queries, in as few API calls as the model allows.
+
+    Models such as Gemini embed documents and queries with different task
+    types, so a plain ``aembed_documents`` call would find other neighbours.
+    Gemini gets one batch call with the ``retrieval_query`` task type, and
+    models with symmetric embeddings one plain batch call. Other models fall
+    back to ``aembed_query`` per query, at most ``EMBED_QUERY_CONCURRENCY``
+    at a time.
+    """
+    queries = list(queries)
+    if isinstance(embeddings, GoogleGenerativeAIEmbeddings):
+        return await embeddings.aembed_documents(queries, task_type="retrieval_query")
+    if isinstance(embeddings, SYMMETRIC_EMBEDDINGS):
+        return await embeddings.aembed_documents(queries)
+
+    semaphore = asyncio.Semaphore(EMBED_QUERY_CONCURRENCY)
+
+    async def embed(query: str) -> List[float]:
+        async with semaphore:
+            return await embeddings.aembed_query(query)
+
+    return list(await asyncio.gather(*(embed(query) for query in queries)))
+
+
+async def embed_query(embeddings: Embeddings, query: str) -> List[float]:
+    """Embeds one search query exactly as ``embed_queries`` would."""
+    return (await embed_queries(embeddings, [query]))[0]
+
+
+def _empty_batch(self, query_vectors=(), *args, **kwargs) -> List[list]:
+    """Fallback for batch searches: one empty result list per query."""
+    return [[] for _ in kwargs.get("query_vectors", query_vectors)]
+
+
 class VectorStoreService:
     """A service to manage interactions with a Qdrant vector database."""
 
-    def __init__(self, collection_name: Optional[str] = None):
+    def __init__(
+        self,
+        collection_name: Optional[str] = None,
+        gateway: Optional[QdrantGateway] = None,
+        embeddings: Optional[Embeddings] = None,
+    ):
         """
         Initializes the VectorStoreService.
 
         Args:
             collection_name: The name of the collection to use. If not provided,
                              it defaults to the value from the global settings.
+            gateway: The Qdrant gateway to use. Defaults to the shared gateway.
+            embeddings: The embedding model used by ``search_batch`` for text queries.
         """
         if not settings.qdrant.url:
             raise VectorStoreError("QDRANT_URL must be set in the environment.")
 
-        self.client = QdrantClient(
-            url=settings.qdrant.url, api_key=settings.qdrant.api_key
-        )
+        self.gateway = gateway or get_qdrant_gateway()
         self.collection_name = collection_name or settings.qdrant.collection
+        self.embeddings = embeddings
 
     @database_resilient("qdrant_create_collection", fallback=lambda *args, **kwargs: None)
     async def create_collection(self, embedding_size: int = 768):
         """
         Creates a new collection if it doesn't already exist with resilience patterns.
+
+        The collection is shared by all videos, so an existing one is kept and
+        only its payload indexes are brought up to date.
         """
-        self.client.recreate_collection(
-            collection_name=self.collection_name,
-            vectors_config=models.VectorParams(
-                size=embedding_size, distance=models.Distance.COSINE
-            ),
-        )
-        logger.info(f"Collection '{self.collection_name}' created successfully.")
+        if await self.gateway.ensure_collection(self.collection_name, embedding_size):
+            logger.info(f"Collection '{self.collection_name}' created successfully.")
 
     @database_resilient("qdrant_upsert", fallback=lambda *args, **kwargs: None)
     async def upsert_documents(
@@ -78,20 +153,79 @@ class VectorStoreService:
         if not points:
             return
 
-        self.client.upsert(collection_name=self.collection_name, points=points, wait=True)
+        await self.gateway.upsert(self.collection_name, points)
         logger.info(f"Upserted {len(points)} points into '{self.collection_name}'.")
 
     @database_resilient("qdrant_search", fallback=lambda *args, **kwargs: [])
     async def search(
-        self, query_vector: List[float], limit: int = 5
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        collection_name: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Searches for similar vectors in the collection with resilience patterns.
         """
-        search_result = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            with_payload=True,
+        search_result = await self.gateway.search(
+            collection_name or self.collection_name, query_vector, limit=limit
         )
         return [{"payload": hit.payload, "score": hit.score} for hit in search_result]
+
+    async def search_batch(
+        self,
+        queries: Sequence[str],
+        limit: int = 5,
+        filters: Union[PayloadFilter, Sequence[PayloadFilter]] = None,
+        collection_name: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Embeds several text queries (see ``embed_queries``) and searches them
+        in one Qdrant batch request. Results are returned in input order.
+
+        Args:
+            queries: The query texts.
+            limit: The maximum number of results per query.
+            filters: One payload filter for all queries, or one per query.
+            collection_name: Overrides the service's collection.
+            embeddings: Overrides the service's embedding model.
+        """
+        if not queries:
+            return []
+
+        embeddings = embeddings or self.embeddings
+        if embeddings is None:
+            raise VectorStoreError("search_batch requires an embeddings model.")
+
+        query_vectors = await embed_queries(embeddings, queries)
+        return await self.search_vectors_batch(
+            query_vectors, limit=limit, filters=filters, collection_name=collection_name
+        )
+
+    @database_resilient("qdrant_search_batch", fallback=_empty_batch)
+    async def search_vectors_batch(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = 5,
+        filters: Union[PayloadFilter, Sequence[PayloadFilter]] = None,
+        collection_name: Optional[str] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Searches several query vectors in one Qdrant batch request with
+        resilience patterns. Results are returned in input order.
+        """
+        if filters is None or isinstance(filters, (dict, models.Filter)):
+            query_filter = build_payload_filter(filters)
+        else:
+            query_filter = [build_payload_filter(f) for f in filters]
+
+        batch_results = await self.gateway.search_batch(
+            collection_name or self.collection_name,
+            query_vectors,
+            limit=limit,
+            query_filter=query_filter,
+        )
+        return [
+            [{"payload": hit.payload, "score": hit.score} for hit in hits]
+            for hits in batch_results
+        ]
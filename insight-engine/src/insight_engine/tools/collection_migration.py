@@ -0,0 +1,163 @@
+"""
+Folds legacy per-video Qdrant collections into the shared document collection.
+
+Older deployments stored each video's documents in a collection named after
+the video ID. This module copies those points into the single collection,
+tagging each one with its ``video_id`` and lifting the indexed fields out of
+LangChain's nested ``metadata`` payload so filtered searches can use them.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from qdrant_client import models
+
+from insight_engine.services.qdrant_gateway import VIDEO_PAYLOAD_INDEXES, QdrantGateway
+from insight_engine.tools.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# Namespace for the IDs of migrated points. IDs are derived from the source
+# collection and point ID, so re-running a migration overwrites instead of
+# duplicating, and points from different videos cannot collide.
+MIGRATION_NAMESPACE = uuid.UUID("6f1c2f9e-3a7b-4c58-9d2e-5b0a8e41c7d3")
+
+
+@dataclass
+class MigrationReport:
+    """Outcome of migrating a set of collections."""
+    migrated: dict = field(default_factory=dict)  # source collection -> points copied
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def total_points(self) -> int:
+        return sum(self.migrated.values())
+
+
+def migrated_point_id(source_collection: str, point_id) -> str:
+    """The deterministic ID of a point copied from a per-video collection."""
+    return str(uuid.uuid5(MIGRATION_NAMESPACE, f"{source_collection}:{point_id}"))
+
+
+def migrated_payload(payload: Optional[dict], video_id: str) -> dict:
+    """
+    Returns the payload of a migrated point with its indexed fields at the top
+    level. Values already present at the top level win over nested metadata.
+    """
+    payload = dict(payload or {})
+    metadata = payload.get("metadata") or {}
+    for key in VIDEO_PAYLOAD_INDEXES:
+        if key not in payload and key in metadata:
+            payload[key] = metadata[key]
+    payload.setdefault("video_id", video_id)
+    return payload
+
+
+async def migrate_video_collection(
+    gateway: QdrantGateway,
+    source_collection: str,
+    target_collection: str,
+    video_id: Optional[str] = None,
+    batch_size: int = 256,
+) -> int:
+    """
+    Copies every point of one per-video collection into the shared collection.
+
+    Args:
+        gateway: The Qdrant gateway.
+        source_collection: The per-video collection to copy from.
+        target_collection: The shared collection, which must already exist.
+        video_id: The video the points belong to. Defaults to the collection name.
+        batch_size: Points read and written per request.
+
+    Returns:
+        The number of points copied.
+    """
+    video_id = video_id or source_collection
+    copied = 0
+    offset = None
+    while True:
+        records, offset = await gateway.scroll(
+            source_collection,
+            limit=batch_size,
+            with_payload=True,
+            with_vectors=True,
+            offset=offset,
+        )
+        if records:
+            await gateway.upsert(target_collection, [
+                models.PointStruct(
+                    id=migrated_point_id(source_collection, record.id),
+                    vector=record.vector,
+                    payload=migrated_payload(record.payload, video_id),
+                )
+                for record in records
+            ])
+            copied += len(records)
+        if offset is None:
+            break
+
+    logger.info(
+        f"Migrated {copied} points from '{source_collection}' into '{target_collection}'"
+    )
+    return copied
+
+
+async def migrate_video_collections(
+    gateway: QdrantGateway,
+    target_collection: str,
+    source_collections: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+    drop_sources: bool = False,
+    batch_size: int = 256,
+) -> MigrationReport:
+    """
+    Folds per-video collections into the shared collection, creating it and
+    its payload indexes if needed.
+
+    Args:
+        gateway: The Qdrant gateway.
+        target_collection: The shared collection.
+        source_collections: The collections to migrate. Defaults to every
+            collection except the target and ``exclude``.
+        exclude: Collections that are not per-video collections, such as the
+            frame collection.
+        drop_sources: Delete each source collection once it has been copied
+            and the copy verified by count.
+        batch_size: Points read and written per request.
+
+    Returns:
+        A report of the copied points and dropped collections.
+    """
+    skipped = set(exclude) | {target_collection}
+    if source_collections is None:
+        source_collections = await gateway.list_collections()
+    sources = [name for name in source_collections if name not in skipped]
+
+    report = MigrationReport()
+    for source in sources:
+        vector_size = await gateway.get_vector_size(source)
+        await gateway.ensure_collection(target_collection, vector_size)
+
+        copied = await migrate_video_collection(
+            gateway, source, target_collection, batch_size=batch_size
+        )
+        report.migrated[source] = copied
+
+        if drop_sources:
+            stored = await gateway.count(
+                target_collection,
+                count_filter=VectorStore.video_filter(source),
+            )
+            if stored < copied:
+                logger.error(
+                    f"Keeping '{source}': only {stored} of {copied} points "
+                    f"found in '{target_collection}'"
+                )
+                continue
+            await gateway.delete_collection(source)
+            report.dropped.append(source)
+
+    return report
@@ -2,46 +2,82 @@
 This module provides an interface to interact with a Qdrant vector store.
 It encapsulates the logic for creating collections, upserting vectors, and performing
 similarity searches, which are essential for the RAG pipeline.
+
+The documents of all videos share one collection. Per-video access is a
+filter on the indexed ``video_id`` payload rather than a collection per video.
 """
 import uuid
 import logging
 from typing import List, Optional
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
+from insight_engine.config import settings
 from insight_engine.resilience import database_resilient
+from insight_engine.services.qdrant_gateway import (
+    QdrantGateway,
+    QdrantGatewayConfig,
+    get_qdrant_gateway,
+)
+from insight_engine.services.vector_store_service import build_payload_filter
 
 logger = logging.getLogger(__name__)
 
 class VectorStore:
     """A client for interacting with a Qdrant vector database."""
 
-    def __init__(self, host: str = "localhost", port: int = 6333):
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        gateway: Optional[QdrantGateway] = None,
+        collection_name: Optional[str] = None,
+    ):
         """
-        Initializes the Qdrant client.
+        Initializes the vector store.
 
         Args:
-            host: The hostname of the Qdrant instance.
-            port: The port number of the Qdrant instance.
+            host: The hostname of a dedicated Qdrant instance. When omitted the
+                  shared, pooled gateway is used. A dedicated gateway is
+                  owned by this store and released by ``close()``.
+            port: The port number of the dedicated Qdrant instance.
+            gateway: An explicit gateway to use instead of the shared one.
+            collection_name: The shared document collection. Defaults to the
+                  value from the global settings.
         """
-        self._host = host
-        self._port = port
-        self._client = None
+        self._owns_gateway = gateway is None and host is not None
+        if self._owns_gateway:
+            gateway = QdrantGateway(QdrantGatewayConfig(host=host, port=port or 6333))
+        self._gateway = gateway
+        self.collection_name = collection_name or settings.qdrant.documents_collection
+
+    async def __aenter__(self) -> "VectorStore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Closes the connections of a dedicated gateway. Shared and explicitly
+        passed gateways are left open for their other users.
+        """
+        if self._owns_gateway and self._gateway is not None:
+            await self._gateway.close()
 
     @property
-    def client(self):
+    def gateway(self) -> QdrantGateway:
         """
-        Lazily initializes and returns the Qdrant client.
-        This ensures the application can start even if Qdrant is not immediately available.
+        The Qdrant gateway, resolved lazily so the application can start even
+        if Qdrant is not immediately available.
         """
-        if self._client is None:
-            try:
-                self._client = QdrantClient(host=self._host, port=self._port)
-            except Exception as e:
-                # In a production environment, you'd want to handle this more gracefully.
-                # For now, we'll re-raise the exception to make the issue visible.
-                print(f"Error connecting to Qdrant: {e}")
-                raise
-        return self._client
+        if self._gateway is None:
+            self._gateway = get_qdrant_gateway()
+        return self._gateway
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        """The pooled async Qdrant client."""
+        return self.gateway.client
 
     @database_resilient("qdrant_recreate_collection", fallback=lambda *args, **kwargs: None)
     async def recreate_collection(self, collection_name: str, vector_size: int):
@@ -52,12 +88,23 @@ class VectorStore:
             collection_name: The name of the collection to create.
             vector_size: The dimensionality of the vectors that will be stored.
         """
-        self.client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=models.VectorParams(size=vector_size, distance=models.Distance.COSINE),
-        )
+        await self.gateway.recreate_collection(collection_name, vector_size)
+
+    @database_resilient("qdrant_ensure_collection", fallback=lambda *args, **kwargs: False)
+    async def ensure_collection(self, vector_size: int) -> bool:
+        """
+        Creates the shared document collection and its payload indexes if
+        they are missing. Existing documents are kept.
+
+        Args:
+            vector_size: The dimensionality of the vectors that will be stored.
 
-    def upsert(self, collection_name: str, vectors: List[List[float]], payloads: List[dict]):
+        Returns:
+            True if the collection was created.
+        """
+        return await self.gateway.ensure_collection(self.collection_name, vector_size)
+
+    async def upsert(self, collection_name: str, vectors: List[List[float]], payloads: List[dict]):
         """
         Upserts (inserts or updates) vectors into a specified collection.
 
@@ -66,22 +113,22 @@ class VectorStore:
             vectors: A list of vector embeddings.
             payloads: A list of metadata dictionaries corresponding to each vector.
         """
-        self.client.upsert(
-            collection_name=collection_name,
-            points=models.Batch(
+        await self.gateway.upsert(
+            collection_name,
+            models.Batch(
                 ids=[str(uuid.uuid4()) for _ in vectors],
                 vectors=vectors,
                 payloads=payloads,
             ),
-            wait=True,
         )
 
-    def search(
+    async def search(
         self,
         collection_name: str,
         query_vector: List[float],
         limit: int = 5,
         score_threshold: Optional[float] = None,
+        video_id: Optional[str] = None,
     ) -> List[models.ScoredPoint]:
         """
         Performs a similarity search in the specified collection.
@@ -91,31 +138,98 @@ class VectorStore:
             query_vector: The vector to search with.
             limit: The maximum number of results to return.
             score_threshold: An optional threshold to filter results by score.
+            video_id: Restricts the search to one video. Omit it to search
+                      across all videos.
 
         Returns:
             A list of ScoredPoint objects representing the search results.
         """
-        return self.client.search(
-            collection_name=collection_name,
-            query_vector=query_vector,
+        return await self.gateway.search(
+            collection_name,
+            query_vector,
             limit=limit,
+            query_filter=self.video_filter(video_id) if video_id else None,
             score_threshold=score_threshold,
         )
 
-    async def get_video_metadata(self, collection_name: str) -> Optional[dict]:
+    async def search_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        score_threshold: Optional[float] = None,
+        video_id: Optional[str] = None,
+    ) -> List[List[models.ScoredPoint]]:
+        """
+        Performs several similarity searches in one batch request.
+
+        Args:
+            collection_name: The name of the collection to search in.
+            query_vectors: The vectors to search with.
+            limit: The maximum number of results per query.
+            score_threshold: An optional threshold to filter results by score.
+            video_id: Restricts every search to one video.
+
+        Returns:
+            One list of ScoredPoint objects per query vector, in input order.
+        """
+        return await self.gateway.search_batch(
+            collection_name,
+            query_vectors,
+            limit=limit,
+            query_filter=self.video_filter(video_id) if video_id else None,
+            score_threshold=score_threshold,
+        )
+
+    @staticmethod
+    def video_filter(video_id: str, user_id: Optional[str] = None) -> models.Filter:
+        """Builds the indexed payload filter selecting one video's points."""
+        conditions = {"video_id": video_id}
+        if user_id is not None:
+            conditions["user_id"] = user_id
+        return build_payload_filter(conditions)
+
+    async def user_owns_video(self, video_id: str, user_id: Optional[str]) -> bool:
+        """
+        Checks that a video exists and belongs to a user.
+
+        This is an exact count over the indexed ``video_id`` and ``user_id``
+        payloads (estimates are not safe for access control), so it stays
+        cheap however many videos share the collection.
+
+        Args:
+            video_id: The ID of the video.
+            user_id: The ID of the requesting user.
+
+        Returns:
+            True if the user has at least one document for the video.
+        """
+        if user_id is None:
+            return False
+        try:
+            return await self.gateway.count(
+                self.collection_name,
+                count_filter=self.video_filter(video_id, user_id),
+            ) > 0
+        except Exception as e:
+            logger.warning(f"Authorization lookup for video {video_id} failed: {e}")
+            return False
+
+    async def get_video_metadata(self, video_id: str) -> Optional[dict]:
         """
-        Retrieves the metadata of the first point in a collection.
+        Retrieves the payload of one of a video's documents.
 
         Args:
-            collection_name: The name of the collection (video_id).
+            video_id: The ID of the video.
 
         Returns:
-            The payload of the first point, or None if not found.
+            The payload of a point of the video, or None if not found.
         """
         try:
-            points, _ = self.client.scroll(
-                collection_name=collection_name,
+            points, _ = await self.gateway.scroll(
+                self.collection_name,
                 limit=1,
+                scroll_filter=self.video_filter(video_id),
                 with_payload=True,
             )
             if points:
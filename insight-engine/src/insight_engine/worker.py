@@ -1,16 +1,26 @@
+import asyncio
+import concurrent.futures
 import json
 import logging
 import os
 import tempfile
+import threading
 from concurrent.futures import TimeoutError
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 import ffmpeg
 from google.cloud import pubsub_v1
 from google.cloud import storage
 
+from insight_engine.config import settings
 from insight_engine.resilience import gcp_resilient
 from insight_engine.resilience.fallbacks import FallbackManager
+from insight_engine.services.admission_controller import get_admission_controller
+from insight_engine.services.clip_generation_service import (
+    keyframe_aligned_windows,
+    merge_clip_windows,
+    multi_clip_output,
+)
 
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO)
@@ -32,7 +42,7 @@ from google.cloud.pubsub_v1.subscriber.message import Message
 async def download_video_from_gcs(source_blob, input_path: str) -> bool:
     """Download video from GCS with resilience patterns."""
     try:
-        source_blob.download_to_filename(input_path)
+        await asyncio.to_thread(source_blob.download_to_filename, input_path)
         return True
     except Exception as e:
         logging.error(f"Failed to download video from GCS: {e}")
@@ -43,7 +53,7 @@ async def download_video_from_gcs(source_blob, input_path: str) -> bool:
 async def upload_clip_to_gcs(clip_blob, output_path: str) -> bool:
     """Upload clip to GCS with resilience patterns."""
     try:
-        clip_blob.upload_from_filename(output_path)
+        await asyncio.to_thread(clip_blob.upload_from_filename, output_path)
         return True
     except Exception as e:
         logging.error(f"Failed to upload clip to GCS: {e}")
@@ -54,13 +64,82 @@ async def upload_clip_to_gcs(clip_blob, output_path: str) -> bool:
 async def check_blob_exists(blob) -> bool:
     """Check if blob exists with resilience patterns."""
     try:
-        return blob.exists()
+        return await asyncio.to_thread(blob.exists)
     except Exception as e:
         logging.error(f"Failed to check blob existence: {e}")
         return False
 
 
-import asyncio
+async def cut_clips(
+    input_path: str, windows: Sequence[Tuple[float, float]], output_paths: Sequence[str]
+) -> None:
+    """
+    Cuts every clip window out of a video with stream copy, in a single
+    ffmpeg subprocess that does not block the event loop.
+
+    Raises:
+        ffmpeg.Error: If ffmpeg fails.
+    """
+    args = multi_clip_output(input_path, windows, output_paths).compile(overwrite_output=True)
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", stdout, stderr)
+
+
+async def _cut_job_clips(
+    job_id: str,
+    input_path: str,
+    windows: Sequence[Tuple[float, float]],
+    output_paths: Sequence[str],
+) -> List[int]:
+    """
+    Cuts a job's clips in one ffmpeg pass. If the pass fails, every window
+    is cut on its own, so a bad window loses only its own clip. Cutting
+    shares the process-wide CPU budget with inference.
+
+    Returns:
+        The indices of the clips that were cut.
+    """
+    admission = get_admission_controller()
+    try:
+        async with admission.admit_async("clip"):
+            await cut_clips(input_path, windows, output_paths)
+        return list(range(len(windows)))
+    except ffmpeg.Error as e:
+        logging.warning(
+            f"[{job_id}] FFmpeg error cutting all clips at once, cutting them one by one: "
+            f"{e.stderr.decode()}"
+        )
+
+    cut = []
+    for i, (window, output_path) in enumerate(zip(windows, output_paths)):
+        try:
+            async with admission.admit_async("clip"):
+                await cut_clips(input_path, [window], [output_path])
+            cut.append(i)
+        except ffmpeg.Error as e:
+            logging.error(f"[{job_id}] FFmpeg error for clip {i+1}: {e.stderr.decode()}")
+    return cut
+
+
+async def _upload_clip(job_id: str, video_id: str, clip_index: int, output_path: str) -> None:
+    """Uploads one cut clip; the clips of a job are uploaded concurrently."""
+    clips_bucket = storage_client.bucket(CLIPS_BUCKET_NAME)
+    destination_blob_name = f"{video_id}/{os.path.basename(output_path)}"
+    clip_blob = clips_bucket.blob(destination_blob_name)
+
+    logging.info(f"[{job_id}] Uploading clip to gs://{CLIPS_BUCKET_NAME}/{destination_blob_name}")
+
+    # Upload with resilience patterns
+    upload_success = await upload_clip_to_gcs(clip_blob, output_path)
+    if not upload_success:
+        logging.error(f"[{job_id}] Failed to upload clip {clip_index} after retries")
+        # Continue with other clips rather than failing the entire job
 
 
 async def _process_clip_job_async(message: Message) -> None:
@@ -106,55 +185,125 @@ async def _process_clip_job_async(message: Message) -> None:
             message.nack()
             return
 
-        for i, (start, end) in enumerate(mock_timestamps):
-            output_filename = f"{video_id}_clip_{i+1}.mp4"
-            output_path = os.path.join(tmpdir, output_filename)
-            
+        # Clip starts move back to keyframes, overlapping windows are
+        # merged, and one ffmpeg process demuxes the video once to cut every clip
+        try:
+            windows = await asyncio.to_thread(keyframe_aligned_windows, input_path, mock_timestamps)
+        except (ffmpeg.Error, OSError) as e:
+            logging.warning(f"[{data['job_id']}] Could not probe keyframes, cutting as requested: {e}")
+            windows = merge_clip_windows(mock_timestamps)
+        output_paths = [
+            os.path.join(tmpdir, f"{video_id}_clip_{i+1}.mp4") for i in range(len(windows))
+        ]
+        for i, (start, end) in enumerate(windows):
             logging.info(f"[{data['job_id']}] Generating clip {i+1}: {start}s - {end}s")
-            
-            try:
-                (
-                    ffmpeg.input(input_path, ss=start)
-                    .output(output_path, to=end, c="copy") # Use stream copy for speed
-                    .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
-                )
-            except ffmpeg.Error as e:
-                logging.error(f"[{data['job_id']}] FFmpeg error: {e.stderr.decode()}")
-                # Decide on error handling: continue, retry, or fail the job
-                continue
-
-            # --- Upload Result to GCS ---
-            clips_bucket = storage_client.bucket(CLIPS_BUCKET_NAME)
-            destination_blob_name = f"{video_id}/{output_filename}"
-            clip_blob = clips_bucket.blob(destination_blob_name)
-
-            logging.info(f"[{data['job_id']}] Uploading clip to gs://{CLIPS_BUCKET_NAME}/{destination_blob_name}")
-            
-            # Upload with resilience patterns
-            upload_success = await upload_clip_to_gcs(clip_blob, output_path)
-            if not upload_success:
-                logging.error(f"[{data['job_id']}] Failed to upload clip {i+1} after retries")
-                # Continue with other clips rather than failing the entire job
+        cut = await _cut_job_clips(data["job_id"], input_path, windows, output_paths)
+        if windows and not cut:
+            # Nothing to deliver: let Pub/Sub retry, and its dead-letter
+            # topic catch videos that never cut
+            logging.error(f"[{data['job_id']}] No clip could be cut; leaving the job to be retried")
+            message.nack()
+            return
+
+        # --- Upload Results to GCS ---
+        await asyncio.gather(*(
+            _upload_clip(data["job_id"], video_id, i + 1, output_paths[i]) for i in cut
+        ))
 
     # --- Acknowledge Message ---
     # Acknowledge the message only after all processing is complete.
-    logging.info(f"[{data['job_id']}] Job completed successfully.")
+    if len(cut) < len(windows):
+        logging.warning(
+            f"[{data['job_id']}] Job completed with {len(cut)} of {len(windows)} clips."
+        )
+    else:
+        logging.info(f"[{data['job_id']}] Job completed successfully.")
     message.ack()
 
 
+class ClipWorkerRuntime:
+    """
+    A long-lived event loop running clip jobs.
+
+    The loop runs on a thread of its own for the lifetime of the worker.
+    Subscriber callbacks, which run on the Pub/Sub client's threads, hand
+    their message to the loop and return. At most ``max_concurrent_jobs``
+    jobs run at once, and ``flow_control`` holds the subscriber to the same
+    limit, so it does not lease messages the runtime cannot start.
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 4):
+        if max_concurrent_jobs < 1:
+            raise ValueError("max_concurrent_jobs must be at least 1.")
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._jobs = asyncio.Semaphore(max_concurrent_jobs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def flow_control(self) -> pubsub_v1.types.FlowControl:
+        """Subscriber flow control matching the job concurrency limit."""
+        return pubsub_v1.types.FlowControl(max_messages=self.max_concurrent_jobs)
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Starts the event loop thread, once; returns the loop."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="clip-worker-loop", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+        return self._loop
+
+    def stop(self) -> None:
+        """Stops the event loop and waits for its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    async def _run_job(self, message: Message) -> None:
+        async with self._jobs:
+            try:
+                await _process_clip_job_async(message)
+            except Exception as e:
+                logging.error(f"Unhandled exception processing message: {e}", exc_info=True)
+                # Do not acknowledge the message, so Pub/Sub retries it.
+                # Configure a dead-letter topic on the subscription to handle persistent failures.
+                message.nack()
+
+    def submit(self, message: Message) -> concurrent.futures.Future:
+        """
+        Schedules a clip job on the runtime's loop without waiting for it.
+        Suitable as the subscriber callback.
+        """
+        return asyncio.run_coroutine_threadsafe(self._run_job(message), self.start())
+
+
+# Shared runtime instance
+_clip_worker_runtime: Optional[ClipWorkerRuntime] = None
+
+
+def get_clip_worker_runtime() -> ClipWorkerRuntime:
+    """Return the process-wide clip worker runtime."""
+    global _clip_worker_runtime
+    if _clip_worker_runtime is None:
+        _clip_worker_runtime = ClipWorkerRuntime(settings.clip_worker.max_concurrent_jobs)
+    return _clip_worker_runtime
+
+
 def process_clip_job(message: Message) -> None:
     """
-    Callback function to process a single clip extraction job from Pub/Sub.
-    This is a sync wrapper around the async implementation.
+    Processes a single clip extraction job from Pub/Sub on the worker
+    runtime, blocking until it completes.
     """
-    try:
-        # Run the async function in the event loop
-        asyncio.run(_process_clip_job_async(message))
-    except Exception as e:
-        logging.error(f"Unhandled exception processing message: {e}", exc_info=True)
-        # Do not acknowledge the message, so Pub/Sub retries it.
-        # Configure a dead-letter topic on the subscription to handle persistent failures.
-        message.nack()
+    get_clip_worker_runtime().submit(message).result()
 
 
 def main() -> None:
@@ -164,11 +313,16 @@ def main() -> None:
     if not PROJECT_ID:
         raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set.")
 
+    runtime = get_clip_worker_runtime()
+    runtime.start()
     subscription_path = subscriber_client.subscription_path(PROJECT_ID, SUBSCRIPTION_ID)
-    logging.info(f"Listening for messages on {subscription_path}...")
+    logging.info(
+        f"Listening for messages on {subscription_path} "
+        f"({runtime.max_concurrent_jobs} concurrent jobs)..."
+    )
 
     streaming_pull_future = subscriber_client.subscribe(
-        subscription_path, callback=process_clip_job
+        subscription_path, callback=runtime.submit, flow_control=runtime.flow_control()
     )
 
     # Wrap in a try/except block to catch exceptions from the subscriber.
@@ -181,6 +335,8 @@ def main() -> None:
     except Exception as e:
         logging.error(f"Subscriber stopped due to an exception: {e}", exc_info=True)
         streaming_pull_future.cancel()
+    finally:
+        runtime.stop()
 
 
 if __name__ == "__main__":
@@ -20,8 +20,8 @@ class TestClipExtractionTasks(AsyncTestCase):
     
     @pytest.mark.integration
     @patch('insight_engine.worker.storage_client')
-    @patch('insight_engine.worker.ffmpeg')
-    def test_process_clip_job_success(self, mock_ffmpeg, mock_storage_client):
+    @patch('insight_engine.worker.cut_clips', new_callable=AsyncMock)
+    def test_process_clip_job_success(self, mock_cut_clips, mock_storage_client):
         """Test successful clip extraction job processing."""
         # Import here to avoid circular import issues
         from insight_engine.worker import process_clip_job
@@ -42,9 +42,6 @@ class TestClipExtractionTasks(AsyncTestCase):
         mock_bucket.blob.return_value = mock_blob
         mock_storage_client.bucket.return_value = mock_bucket
         
-        # Setup mock FFmpeg
-        mock_ffmpeg.input.return_value.output.return_value.run.return_value = None
-        
         # Process the job
         process_clip_job(mock_message)
         
@@ -56,7 +53,7 @@ class TestClipExtractionTasks(AsyncTestCase):
         mock_blob.download_to_filename.assert_called_once()
         
         # Verify FFmpeg was called for clip generation
-        mock_ffmpeg.input.assert_called()
+        mock_cut_clips.assert_awaited()
         
         # Verify clips were uploaded
         clips_bucket_calls = [call for call in mock_storage_client.bucket.call_args_list 
@@ -97,8 +94,8 @@ class TestClipExtractionTasks(AsyncTestCase):
     
     @pytest.mark.integration
     @patch('insight_engine.worker.storage_client')
-    @patch('insight_engine.worker.ffmpeg')
-    def test_process_clip_job_ffmpeg_error(self, mock_ffmpeg, mock_storage_client):
+    @patch('insight_engine.worker.cut_clips', new_callable=AsyncMock)
+    def test_process_clip_job_ffmpeg_error(self, mock_cut_clips, mock_storage_client):
         """Test clip extraction with FFmpeg processing error."""
         # Import here to avoid circular import issues
         from insight_engine.worker import process_clip_job
@@ -121,8 +118,7 @@ class TestClipExtractionTasks(AsyncTestCase):
         
         # Setup mock FFmpeg to raise error
         import ffmpeg
-        mock_ffmpeg.Error = ffmpeg.Error
-        mock_ffmpeg.input.return_value.output.return_value.run.side_effect = ffmpeg.Error(
+        mock_cut_clips.side_effect = ffmpeg.Error(
             "ffmpeg", "", b"FFmpeg processing failed"
         )
         
@@ -133,7 +129,7 @@ class TestClipExtractionTasks(AsyncTestCase):
         mock_message.ack.assert_called_once()
         
         # Should attempt FFmpeg processing
-        mock_ffmpeg.input.assert_called()
+        mock_cut_clips.assert_awaited()
     
     @pytest.mark.integration
     def test_process_clip_job_invalid_message(self):
@@ -361,7 +357,7 @@ class TestTaskIntegration(AsyncTestCase):
         """Test complete video processing pipeline integration."""
         with patch('httpx.AsyncClient') as mock_http_client, \
              patch('insight_engine.worker.storage_client') as mock_storage, \
-             patch('insight_engine.worker.ffmpeg') as mock_ffmpeg:
+             patch('insight_engine.worker.cut_clips', new_callable=AsyncMock) as mock_cut_clips:
             
             # Setup mocks for video analysis
             mock_client_instance = AsyncMock()
@@ -394,7 +390,6 @@ class TestTaskIntegration(AsyncTestCase):
             mock_blob.exists.return_value = True
             mock_bucket.blob.return_value = mock_blob
             mock_storage.bucket.return_value = mock_bucket
-            mock_ffmpeg.input.return_value.output.return_value.run.return_value = None
             
             # Import here to avoid circular import issues
             from insight_engine.services.video_ai_client import run_analysis_job
@@ -423,7 +418,7 @@ class TestTaskIntegration(AsyncTestCase):
             
             # Verify integration
             mock_message.ack.assert_called_once()
-            mock_ffmpeg.input.assert_called()
+            mock_cut_clips.assert_awaited()
             
             # Verify both tasks completed successfully
             assert mock_client_instance.post.called
@@ -212,23 +212,23 @@ class TestQdrantIntegration:
     
     @pytest.mark.integration
     @requires_qdrant
-    def test_vector_store_integration(self):
+    async def test_vector_store_integration(self):
         """Test VectorStore class integration with Qdrant."""
         vector_store = VectorStore(host="localhost", port=6333)
         collection_name = "test_vector_store_integration"
         
         try:
             # Create collection
-            vector_store.recreate_collection(collection_name, 4)
+            await vector_store.recreate_collection(collection_name, 4)
             
             # Insert vectors
             vectors = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]
             payloads = [{"text": "vector 1"}, {"text": "vector 2"}]
             
-            vector_store.upsert(collection_name, vectors, payloads)
+            await vector_store.upsert(collection_name, vectors, payloads)
             
             # Search
-            results = vector_store.search(
+            results = await vector_store.search(
                 collection_name,
                 [1.0, 0.1, 0.0, 0.0],
                 limit=1
@@ -240,9 +240,10 @@ class TestQdrantIntegration:
         finally:
             # Cleanup
             try:
-                vector_store.client.delete_collection(collection_name)
+                await vector_store.client.delete_collection(collection_name)
             except Exception:
                 pass
+            await vector_store.close()
     
     @pytest.mark.integration
     @requires_qdrant
@@ -252,7 +253,7 @@ class TestQdrantIntegration:
         
         try:
             # Create collection
-            service.create_collection(embedding_size=4)
+            await service.create_collection(embedding_size=4)
             
             # The service should work with the created collection
             # This test verifies the service can interact with Qdrant
@@ -261,7 +262,7 @@ class TestQdrantIntegration:
         finally:
             # Cleanup
             try:
-                service.client.delete_collection("test_service_collection")
+                await service.gateway.client.delete_collection("test_service_collection")
             except Exception:
                 pass
 
@@ -283,14 +284,13 @@ class TestDatabaseErrorHandling:
             assert result is None
     
     @pytest.mark.integration
-    def test_qdrant_connection_failure_handling(self):
+    async def test_qdrant_connection_failure_handling(self):
         """Test Qdrant connection failure handling."""
         # Test with invalid Qdrant configuration
-        vector_store = VectorStore(host="invalid-host", port=9999)
-        
-        # Should raise an exception when trying to connect
-        with pytest.raises(Exception):
-            _ = vector_store.client
+        async with VectorStore(host="invalid-host", port=9999) as vector_store:
+            # Should raise an exception on the first request
+            with pytest.raises(Exception):
+                await vector_store.gateway.search("any_collection", [0.0, 0.0])
     
     @pytest.mark.integration
     @requires_redis
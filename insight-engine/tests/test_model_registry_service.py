@@ -148,3 +148,29 @@ def test_get_production_model_multiple_models(service: ModelRegistryService):
     assert prod_y is not None
     assert prod_y["version"] == 2
     assert prod_y["status"] == "production"
+
+
+def test_register_optimized_model_artifacts(service: ModelRegistryService):
+    """Test OptimizationService results are registered with their artifacts."""
+    results = {
+        "onnx_model_path": "out/model.onnx",
+        "quantized_model_path": "out/model.quant.onnx",
+        "base_model_metrics": {"average_latency_ms": 12.0},
+        "quantized_model_metrics": {"average_latency_ms": 5.0},
+    }
+
+    entry = service.register_optimized_model("detector", results)
+    service.activate_model_version("detector", entry["version"])
+
+    assert entry["path"] == "out/model.quant.onnx"
+    assert service.get_model_artifact("detector") == "out/model.quant.onnx"
+    assert service.get_model_artifact("detector", "onnx") == "out/model.onnx"
+
+
+def test_get_model_artifact_falls_back_to_path(service: ModelRegistryService):
+    """Test versions registered without artifacts resolve to their path."""
+    service.register_model("detector", "models/detector.onnx", {})
+    service.activate_model_version("detector", 1)
+
+    assert service.get_model_artifact("detector") == "models/detector.onnx"
+    assert service.get_model_artifact("missing") is None
@@ -0,0 +1,200 @@
+"""Tests for the shared admission controller."""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from insight_engine.services.admission_controller import (
+    ADMISSION_THROTTLED_SECONDS,
+    AdmissionConfig,
+    AdmissionController,
+    ResourceSampler,
+    ResourceSnapshot,
+    TokenLimiter,
+)
+
+
+class FixedSampler(ResourceSampler):
+    """A sampler returning a settable snapshot without touching psutil."""
+
+    def __init__(self, cpu_percent=10.0, memory_percent=10.0):
+        super().__init__(interval=0.1)
+        self.current = ResourceSnapshot(cpu_percent, memory_percent, 0.0)
+
+    def snapshot(self):
+        return self.current
+
+
+@pytest.fixture
+def controller():
+    config = AdmissionConfig(
+        cpu_threshold=80, memory_threshold=90, sample_interval=0.1, max_tokens=2, max_wait=0.3
+    )
+    return AdmissionController(config, FixedSampler())
+
+
+def throttled_seconds(workload, reason):
+    return ADMISSION_THROTTLED_SECONDS.labels(workload=workload, reason=reason)._value.get()
+
+
+class TestResourceSampler:
+    """Test background sampling of resource pressure."""
+
+    @patch("insight_engine.services.admission_controller.psutil")
+    def test_sample_publishes_snapshot(self, mock_psutil):
+        """Test a sample reads CPU and memory once and is served from cache."""
+        mock_psutil.cpu_percent.return_value = 42.0
+        mock_psutil.virtual_memory.return_value.percent = 61.0
+        sampler = ResourceSampler(interval=60)
+
+        sampler.sample()
+        sampler._thread = threading.current_thread()  # Pretend the sampler is running
+        snapshots = [sampler.snapshot() for _ in range(100)]
+
+        assert snapshots[-1].cpu_percent == 42.0
+        assert snapshots[-1].memory_percent == 61.0
+        assert mock_psutil.cpu_percent.call_count == 1
+
+    def test_background_thread_starts_lazily(self):
+        """Test the sampling thread starts on first use and stops cleanly."""
+        sampler = ResourceSampler(interval=0.01)
+        assert sampler._thread is None
+
+        sampler.snapshot()
+        assert sampler._thread.is_alive()
+
+        sampler.stop()
+        assert sampler._thread is None
+
+
+class TestTokenLimiter:
+    """Test the shared concurrency limit."""
+
+    def test_acquire_and_release(self):
+        """Test tokens are taken and returned."""
+        limiter = TokenLimiter(2)
+
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        assert limiter.in_use == 2
+
+        limiter.release()
+        assert limiter.try_acquire()
+
+    def test_oversized_requests_are_clamped(self):
+        """Test a request larger than the capacity can still run alone."""
+        limiter = TokenLimiter(2)
+
+        assert limiter.acquire(8, timeout=0)
+        assert limiter.in_use == 2
+        limiter.release(8)
+        assert limiter.in_use == 0
+
+    def test_acquire_times_out(self):
+        """Test a blocked acquire gives up after its timeout."""
+        limiter = TokenLimiter(1)
+        limiter.acquire()
+
+        assert not limiter.acquire(timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_async_acquire_waits_for_release(self):
+        """Test async waiters are admitted once a thread releases tokens."""
+        limiter = TokenLimiter(1)
+        limiter.acquire()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, limiter.release)
+
+        await asyncio.wait_for(limiter.acquire_async(), timeout=1)
+
+        assert limiter.in_use == 1
+
+    def test_invalid_capacity(self):
+        """Test a limiter needs at least one token."""
+        with pytest.raises(ValueError):
+            TokenLimiter(0)
+
+
+class TestAdmissionController:
+    """Test pressure-based throttling and admission."""
+
+    def test_no_wait_below_thresholds(self, controller):
+        """Test work is admitted immediately when resources are free."""
+        with patch("time.sleep") as mock_sleep:
+            assert controller.wait_for_capacity("preprocessing") == 0.0
+            mock_sleep.assert_not_called()
+
+    def test_pressure_wait_is_bounded(self, controller):
+        """Test the wait under sustained pressure stops after max_wait."""
+        controller.sampler.current = ResourceSnapshot(95.0, 10.0, 0.0)
+
+        with patch("time.sleep") as mock_sleep:
+            controller.wait_for_capacity("preprocessing")
+
+        pauses = [call.args[0] for call in mock_sleep.call_args_list]
+        assert sum(pauses) == pytest.approx(0.3)
+        assert max(pauses) <= 0.1 + 1e-9
+
+    def test_wait_ends_when_pressure_drops(self, controller):
+        """Test waiting stops at the first sample below the thresholds."""
+        controller.sampler.current = ResourceSnapshot(10.0, 95.0, 0.0)
+
+        def relieve(_):
+            controller.sampler.current = ResourceSnapshot(10.0, 10.0, 0.0)
+
+        with patch("time.sleep", side_effect=relieve) as mock_sleep:
+            controller.wait_for_capacity("inference")
+
+        assert mock_sleep.call_count == 1
+
+    def test_cpu_threshold_override(self, controller):
+        """Test callers can apply their own CPU threshold."""
+        controller.sampler.current = ResourceSnapshot(90.0, 10.0, 0.0)
+
+        assert controller.is_overloaded()
+        assert not controller.is_overloaded(cpu_threshold=100)
+
+    def test_throttled_time_is_exported(self, controller):
+        """Test time spent throttled is added to the Prometheus counter."""
+        controller.sampler.current = ResourceSnapshot(95.0, 10.0, 0.0)
+        before = throttled_seconds("export-test", "pressure")
+
+        controller.wait_for_capacity("export-test", max_wait=0.02)
+
+        assert throttled_seconds("export-test", "pressure") >= before + 0.02
+
+    def test_admit_holds_tokens(self, controller):
+        """Test admitted work holds its tokens until the block exits."""
+        with controller.admit("clip", tokens=2):
+            assert controller.limiter.in_use == 2
+            assert not controller.limiter.try_acquire()
+        assert controller.limiter.in_use == 0
+
+    def test_admit_releases_on_error(self, controller):
+        """Test tokens are returned when the admitted work fails."""
+        with pytest.raises(RuntimeError):
+            with controller.admit("clip"):
+                raise RuntimeError("boom")
+        assert controller.limiter.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_async_admission_limits_concurrency(self, controller):
+        """Test concurrent async jobs never exceed the token capacity."""
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            async with controller.admit_async("inference"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+
+        assert peak == 2
+        assert controller.limiter.in_use == 0
@@ -0,0 +1,118 @@
+"""Tests for the cache serializer and compressor codecs."""
+
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.cache_codecs import (
+    CacheCodec,
+    available_compressors,
+    available_serializers,
+)
+
+
+DETECTION_PAYLOAD = {
+    "video_id": "abc",
+    "frames": [
+        {
+            "frame_number": i,
+            "detections": [
+                {"label": "person", "confidence": 0.91, "box": [10, 20, 110, 220]}
+            ],
+        }
+        for i in range(200)
+    ],
+}
+
+# utf8 and numpy are picked per value type rather than configured as defaults
+DEFAULT_SERIALIZERS = [
+    name for name in available_serializers() if name not in ("utf8", "numpy")
+]
+
+
+class TestCacheCodec:
+    """Test encoding and decoding through every available codec pair."""
+
+    @pytest.mark.parametrize("serializer", DEFAULT_SERIALIZERS)
+    @pytest.mark.parametrize("compressor", available_compressors())
+    def test_round_trip(self, serializer, compressor):
+        """Test structured payloads survive every serializer/compressor pair."""
+        codec = CacheCodec(serializer=serializer, compressor=compressor)
+
+        assert codec.decode(codec.encode(DETECTION_PAYLOAD)) == DETECTION_PAYLOAD
+        assert codec.decode(codec.encode([1.5, None, True])) == [1.5, None, True]
+
+    def test_header_byte_identifies_codecs(self):
+        """Test the header encodes serializer and compressor ids."""
+        codec = CacheCodec(serializer="json", compressor="zlib", compression_threshold=16)
+
+        small = codec.encode({"a": 1})
+        large = codec.encode(DETECTION_PAYLOAD)
+
+        assert small[0] == 0x80 | (1 << 3)
+        assert large[0] == 0x80 | (1 << 3) | 1
+        assert json.loads(zlib.decompress(large[1:])) == DETECTION_PAYLOAD
+
+    def test_strings_round_trip_exactly(self):
+        """Test numeric-looking strings are not coerced by the JSON fallback."""
+        codec = CacheCodec()
+
+        assert codec.decode(codec.encode("123")) == "123"
+        assert codec.decode(codec.encode("ünïcode")) == "ünïcode"
+
+    def test_integers_stay_incrementable(self):
+        """Test ints are stored headerless so Redis INCRBY still works."""
+        codec = CacheCodec()
+
+        assert codec.encode(42) == b"42"
+        assert codec.decode(b"43") == 43
+
+    def test_numpy_arrays_decode_as_views(self):
+        """Test ndarrays keep dtype and shape and decode without copying."""
+        codec = CacheCodec(compressor="none")
+        embedding = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+
+        data = codec.encode(embedding)
+        decoded = codec.decode(data)
+
+        np.testing.assert_array_equal(decoded, embedding)
+        assert decoded.dtype == np.float32
+        assert not decoded.flags.owndata
+        assert np.shares_memory(decoded, np.frombuffer(data, dtype=np.uint8))
+
+    def test_numpy_non_contiguous_and_compressed(self):
+        """Test strided arrays are compacted and compressed payloads decode."""
+        codec = CacheCodec(compression_threshold=16)
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)[:, ::2]
+
+        np.testing.assert_array_equal(codec.decode(codec.encode(frame)), frame)
+
+    @pytest.mark.skipif("msgpack" not in available_serializers(), reason="msgpack not installed")
+    def test_msgpack_nested_arrays(self):
+        """Test msgpack carries ndarrays nested inside containers."""
+        codec = CacheCodec(serializer="msgpack")
+        value = {"frame": 7, "embedding": np.ones(8, dtype=np.float16)}
+
+        decoded = codec.decode(codec.encode(value))
+
+        assert decoded["frame"] == 7
+        np.testing.assert_array_equal(decoded["embedding"], value["embedding"])
+
+    def test_legacy_values_still_decode(self):
+        """Test values written before the header byte remain readable."""
+        codec = CacheCodec(serializer="json", compressor="zlib")
+        legacy = json.dumps(DETECTION_PAYLOAD).encode()
+
+        assert codec.decode(legacy) == DETECTION_PAYLOAD
+        assert codec.decode(b"COMPRESSED:" + zlib.compress(legacy)) == DETECTION_PAYLOAD
+        assert codec.decode(b"plain text") == "plain text"
+
+    def test_unknown_codec_rejected(self):
+        """Test configuring an unavailable codec fails fast."""
+        with pytest.raises(ConfigurationException):
+            CacheCodec(serializer="pickle")
+        with pytest.raises(ConfigurationException):
+            CacheCodec(compressor="brotli")
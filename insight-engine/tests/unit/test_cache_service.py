@@ -0,0 +1,511 @@
+"""Tests for the enhanced cache service."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from insight_engine.exceptions import CacheException
+from insight_engine.services import cache_service as cache_module
+from insight_engine.services.cache_service import (
+    CacheConfig,
+    CacheStrategy,
+    EnhancedCacheService,
+    close_all_cache_services,
+)
+from insight_engine.services.local_cache import LocalCache
+
+
+def mock_pipeline(redis_client, result):
+    """Attach a mocked pipeline whose execute() returns ``result``."""
+    pipe = AsyncMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute.return_value = result
+    redis_client.pipeline = MagicMock(return_value=pipe)
+    return pipe
+
+
+class TestLocalCache:
+    """Test the in-process L1 cache."""
+
+    def test_lru_eviction_by_entries(self):
+        """Test least recently used entries are evicted first."""
+        cache = LocalCache(max_entries=2, max_bytes=1024)
+        cache.set("a", 1, size=1)
+        cache.set("b", 2, size=1)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.set("c", 3, size=1)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test the byte bound is enforced."""
+        cache = LocalCache(max_entries=10, max_bytes=100)
+        cache.set("a", "x", size=60)
+        cache.set("b", "y", size=60)
+
+        assert "a" not in cache
+        assert cache.get("b") == "y"
+        assert cache.current_bytes == 60
+
+    def test_oversized_value_rejected(self):
+        """Test values larger than the byte bound are not cached."""
+        cache = LocalCache(max_entries=10, max_bytes=10)
+        assert cache.set("a", "x", size=11) is False
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the smaller of their TTL and the default."""
+        cache = LocalCache(default_ttl=10)
+        with patch("insight_engine.services.local_cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1, size=1, ttl=3600)
+        with patch("insight_engine.services.local_cache.time.monotonic", return_value=109.0):
+            assert cache.get("a") == 1
+        with patch("insight_engine.services.local_cache.time.monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_delete_pattern(self):
+        """Test glob-pattern eviction."""
+        cache = LocalCache()
+        cache.set("summary:1:a", 1, size=1)
+        cache.set("summary:1:b", 2, size=1)
+        cache.set("summary:2:a", 3, size=1)
+
+        assert cache.delete_pattern("summary:1:*") == 2
+        assert cache.get("summary:2:a") == 3
+
+
+class TestEnhancedCacheServiceTwoTier:
+    """Test the L1/L2 behaviour of EnhancedCacheService."""
+
+    @pytest.fixture
+    def cache_service(self, mock_redis_client):
+        """Create a cache service with the L1 tier enabled and a mocked Redis."""
+        service = EnhancedCacheService(
+            CacheConfig(local_cache_enabled=True), cache_name="test_two_tier"
+        )
+        service._client = mock_redis_client
+        return service
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, cache_service, mock_redis_client):
+        """Test a value read from Redis is served from L1 afterwards."""
+        pipe = mock_pipeline(
+            mock_redis_client, [[json.dumps({"summary": "text"}).encode()], 30_000]
+        )
+
+        assert await cache_service.get("summary:1") == {"summary": "text"}
+        assert await cache_service.get("summary:1") == {"summary": "text"}
+
+        pipe.mget.assert_awaited_once_with(["summary:1"])
+        pipe.pttl.assert_awaited_once_with("summary:1")
+        stats = cache_service.get_stats()
+        assert stats["hits"] == 2
+        assert stats["l1"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_set_populates_l1_and_broadcasts(self, cache_service, mock_redis_client):
+        """Test writes populate L1 and publish an invalidation for other replicas."""
+        mock_redis_client.setex.return_value = True
+
+        await cache_service.set("key", {"a": 1}, ttl=60)
+        assert await cache_service.get("key") == {"a": 1}
+
+        mock_redis_client.get.assert_not_awaited()
+        channel, payload = mock_redis_client.publish.await_args.args
+        assert channel == cache_service.config.invalidation_channel
+        assert json.loads(payload)["keys"] == ["key"]
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_evicts_l1(self, cache_service, mock_redis_client):
+        """Test invalidations from another replica evict the local copy."""
+        mock_redis_client.setex.return_value = True
+        await cache_service.set("key", "value")
+
+        cache_service._handle_invalidation(json.dumps({
+            "origin": "other-replica",
+            "cache": cache_service.cache_name,
+            "keys": ["key"],
+        }))
+
+        pipe = mock_pipeline(mock_redis_client, [[None], -2])
+        assert await cache_service.get("key") is None
+        pipe.mget.assert_awaited_once_with(["key"])
+
+    @pytest.mark.asyncio
+    async def test_l1_copy_expires_with_its_redis_key(self, cache_service, mock_redis_client):
+        """Test L1 entries read from Redis never outlive the key's remaining TTL."""
+        mock_pipeline(mock_redis_client, [[b'"short"', b'"long"', b'"forever"'], 500, 600_000, -1])
+
+        with patch("insight_engine.services.local_cache.time.monotonic", return_value=100.0):
+            await cache_service.get_multiple(["short", "long", "forever"])
+
+        expiry = {key: entry.expires_at for key, entry in cache_service._local._entries.items()}
+        assert expiry["short"] == pytest.approx(100.5)
+        # Capped by local_cache_ttl, also for keys without an expiry
+        assert expiry["long"] == pytest.approx(160.0)
+        assert expiry["forever"] == pytest.approx(160.0)
+
+    @pytest.mark.asyncio
+    async def test_own_invalidation_ignored(self, cache_service, mock_redis_client):
+        """Test a replica ignores the invalidations it published itself."""
+        mock_redis_client.setex.return_value = True
+        await cache_service.set("key", "value")
+
+        cache_service._handle_invalidation(json.dumps({
+            "origin": cache_service._instance_id,
+            "cache": cache_service.cache_name,
+            "keys": ["key"],
+        }))
+
+        assert await cache_service.get("key") == "value"
+
+    @pytest.mark.asyncio
+    async def test_l1_disabled_by_default(self, mock_redis_client):
+        """Test the service reads through to Redis when L1 is disabled."""
+        service = EnhancedCacheService(CacheConfig(), cache_name="test_l2_only")
+        service._client = mock_redis_client
+        mock_redis_client.get.return_value = b"value"
+
+        await service.get("key")
+        await service.get("key")
+
+        assert mock_redis_client.get.await_count == 2
+        assert service.get_stats()["l1"] is None
+
+
+class TestGetOrSetStampedeProtection:
+    """Test single-flight, leases and early refresh in get_or_set."""
+
+    @pytest.fixture
+    def cache_service(self, mock_redis_client):
+        """Create a cache service with a mocked Redis."""
+        service = EnhancedCacheService(
+            CacheConfig(lock_poll_interval=0.001, lock_wait_timeout=1.0),
+            cache_name="test_get_or_set"
+        )
+        service._client = mock_redis_client
+        return service
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_call_factory_once(self, cache_service, mock_redis_client):
+        """Test concurrent misses in one process share a single factory call."""
+        mock_pipeline(mock_redis_client, [None, -2, None])
+        mock_redis_client.set.return_value = True
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"summary": "text"}
+
+        results = await asyncio.gather(
+            *[cache_service.get_or_set("summary:1", factory, ttl=60) for _ in range(10)]
+        )
+
+        assert calls == 1
+        assert all(result == {"summary": "text"} for result in results)
+        mock_redis_client.eval.assert_awaited_once()  # lease released
+        assert cache_service._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_leaseholder(self, cache_service, mock_redis_client):
+        """Test a caller that loses the lease waits for the holder's result."""
+        mock_pipeline(mock_redis_client, [None, -2, None])
+        mock_redis_client.set.return_value = None  # lease held elsewhere
+        mock_redis_client.get.side_effect = [None, json.dumps("computed").encode()]
+        mock_redis_client.exists.return_value = True
+        factory = MagicMock(return_value="local")
+
+        assert await cache_service.get_or_set("key", factory) == "computed"
+        factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_recomputes_when_leaseholder_gives_up(self, cache_service, mock_redis_client):
+        """Test a caller recomputes if the lease disappears without a value."""
+        mock_pipeline(mock_redis_client, [None, -2, None])
+        mock_redis_client.set.return_value = None
+        mock_redis_client.get.return_value = None
+        mock_redis_client.exists.return_value = False
+
+        assert await cache_service.get_or_set("key", lambda: "local") == "local"
+
+    def test_xfetch_early_refresh_probability(self, cache_service):
+        """Test the XFetch draw favours refresh as expiry approaches."""
+        with patch("insight_engine.services.cache_service.random.random", return_value=0.5):
+            # -ln(0.5) * delta ~= 0.69 * delta
+            assert cache_service._should_refresh_early(remaining_ttl=0.5, delta=1.0)
+            assert not cache_service._should_refresh_early(remaining_ttl=10.0, delta=1.0)
+            assert not cache_service._should_refresh_early(remaining_ttl=0.5, delta=None)
+
+        cache_service.config.early_refresh_beta = 0
+        assert not cache_service._should_refresh_early(remaining_ttl=0.0, delta=1.0)
+
+    @pytest.mark.asyncio
+    async def test_refresh_ahead_serves_stale_and_refreshes(self, cache_service, mock_redis_client):
+        """Test REFRESH_AHEAD returns the cached value and refreshes in background."""
+        mock_pipeline(mock_redis_client, [json.dumps("old").encode(), 1000, b"10.0"])
+        mock_redis_client.set.return_value = True
+        factory = AsyncMock(return_value="new")
+
+        with patch("insight_engine.services.cache_service.random.random", return_value=0.5):
+            result = await cache_service.get_or_set(
+                "key", factory, ttl=60, strategy=CacheStrategy.REFRESH_AHEAD
+            )
+
+        assert result == "old"
+        await asyncio.gather(*cache_service._inflight.values())
+        factory.assert_awaited_once()
+
+
+class TestWriteBehind:
+    """Test the WRITE_BEHIND caching strategy."""
+
+    @pytest.fixture
+    def cache_service(self, mock_redis_client):
+        """Create a write-behind cache service with a long flush interval."""
+        service = EnhancedCacheService(
+            CacheConfig(
+                strategy=CacheStrategy.WRITE_BEHIND,
+                write_behind_flush_interval=60,
+                write_behind_max_pending=2,
+                write_behind_put_timeout=0.01,
+            ),
+            cache_name="test_write_behind"
+        )
+        service._client = mock_redis_client
+        yield service
+        if service._flush_task:
+            service._flush_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_writes_are_coalesced_and_readable(self, cache_service, mock_redis_client):
+        """Test repeated writes to a key coalesce and are visible before flushing."""
+        pipe = mock_pipeline(mock_redis_client, [True, True])
+
+        for count in range(3):
+            await cache_service.set("counter", count, ttl=30)
+
+        assert await cache_service.get("counter") == 2
+        mock_redis_client.setex.assert_not_awaited()
+        mock_redis_client.get.assert_not_awaited()
+
+        assert await cache_service.flush() == 1
+        pipe.mset.assert_awaited_once_with({"counter": b"2"})
+        pipe.expire.assert_awaited_once_with("counter", 30)
+        assert cache_service._write_buffer == {}
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_applies_backpressure(self, cache_service, mock_redis_client):
+        """Test set() fails once the buffer stays full past the put timeout."""
+        pipe = mock_pipeline(mock_redis_client, None)
+        pipe.execute.side_effect = ConnectionError("redis down")
+
+        await cache_service.set("a", 1)
+        await cache_service.set("b", 2)
+        await cache_service.set("a", 3)  # coalesced, no new slot needed
+
+        with pytest.raises(CacheException):
+            await cache_service.set("c", 4)
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_batch_buffered(self, cache_service, mock_redis_client):
+        """Test a failed flush keeps the writes buffered for the next attempt."""
+        pipe = mock_pipeline(mock_redis_client, None)
+        pipe.execute.side_effect = ConnectionError("redis down")
+        await cache_service.set("a", 1)
+
+        with pytest.raises(CacheException):
+            await cache_service.flush()
+
+        assert list(cache_service._write_buffer) == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_in_flight_batch_stays_readable_and_deletes_wait(
+        self, cache_service, mock_redis_client
+    ):
+        """Test a batch being written is still read and deleted consistently."""
+        pipe = mock_pipeline(mock_redis_client, [True])
+        release = asyncio.Event()
+        order = []
+
+        async def execute():
+            await release.wait()
+            order.append("mset")
+            return [True]
+
+        async def delete(*keys):
+            order.append("delete")
+            return 1
+
+        pipe.execute.side_effect = execute
+        mock_redis_client.delete.side_effect = delete
+        await cache_service.set("a", "value", ttl=30)
+
+        flush = asyncio.create_task(cache_service.flush())
+        await asyncio.sleep(0)
+        assert await cache_service.get("a") == "value"
+        mock_redis_client.get.assert_not_awaited()
+
+        deleting = asyncio.create_task(cache_service.delete("a"))
+        await asyncio.sleep(0)
+        assert order == []  # the delete waits for the in-flight MSET
+        release.set()
+        await asyncio.gather(flush, deleting)
+
+        assert order == ["mset", "delete"]
+        assert cache_service._write_buffer == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_does_not_restore_deleted_keys(
+        self, cache_service, mock_redis_client
+    ):
+        """Test a key deleted while its batch fails is not written later."""
+        pipe = mock_pipeline(mock_redis_client, None)
+        release = asyncio.Event()
+
+        async def execute():
+            await release.wait()
+            raise ConnectionError("redis down")
+
+        pipe.execute.side_effect = execute
+        await cache_service.set("a", 1)
+        await cache_service.set("b", 2)
+
+        flush = asyncio.create_task(cache_service.flush())
+        await asyncio.sleep(0)
+        deleting = asyncio.create_task(cache_service.delete("a"))
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(CacheException):
+            await flush
+        await deleting
+
+        assert list(cache_service._write_buffer) == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_in_flight_batch(self, cache_service, mock_redis_client):
+        """Test close() lets the flusher finish its batch instead of cancelling it."""
+        pipe = mock_pipeline(mock_redis_client, [True])
+        release = asyncio.Event()
+
+        async def execute():
+            await release.wait()
+            return [True]
+
+        pipe.execute.side_effect = execute
+        await cache_service.set("a", "value", ttl=30)
+        cache_service._flush_wakeup.set()
+        while not cache_service._flushing_keys:
+            await asyncio.sleep(0)
+
+        closing = asyncio.create_task(cache_service.close())
+        await asyncio.sleep(0)
+        release.set()
+        await closing
+
+        pipe.mset.assert_awaited_once_with({"a": cache_service._serialize_value("value")})
+        assert cache_service._write_buffer == {}
+        mock_redis_client.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_close_all_flushes_buffered_writes(self, cache_service, mock_redis_client):
+        """Test shutdown flushes pending writes before closing connections."""
+        pipe = mock_pipeline(mock_redis_client, [True])
+        await cache_service.set("a", "value", ttl=30)
+
+        with patch.dict(cache_module._cache_services, {"wb": cache_service}, clear=True):
+            await close_all_cache_services()
+
+        pipe.mset.assert_awaited_once_with({"a": cache_service._serialize_value("value")})
+        pipe.expire.assert_awaited_once_with("a", 30)
+        mock_redis_client.close.assert_awaited_once()
+
+
+class TestInvalidation:
+    """Test tag-based and SCAN-based invalidation."""
+
+    @pytest.fixture
+    def cache_service(self, mock_redis_client):
+        """Create a cache service with small invalidation batches."""
+        service = EnhancedCacheService(
+            CacheConfig(invalidation_batch_size=2), cache_name="test_invalidation"
+        )
+        service._client = mock_redis_client
+        return service
+
+    @pytest.mark.asyncio
+    async def test_set_registers_tags(self, cache_service, mock_redis_client):
+        """Test tagged writes add the key to each tag set."""
+        pipe = mock_pipeline(mock_redis_client, [1, True])
+        mock_redis_client.setex.return_value = True
+
+        await cache_service.set("summary:abc:q", "text", ttl=60, tags=["video:abc"])
+
+        pipe.eval.assert_awaited_once_with(
+            cache_module.REGISTER_TAG_SCRIPT,
+            1,
+            "cache:tag:video:abc",
+            cache_service.config.tag_ttl,
+            "summary:abc:q",
+        )
+
+    @pytest.mark.asyncio
+    async def test_persistent_keys_keep_their_tag_set(self, cache_service, mock_redis_client):
+        """Test tagging keys without a TTL asks for a persistent tag set."""
+        pipe = mock_pipeline(mock_redis_client, [True])
+
+        await cache_service.set_multiple({"a": 1, "b": 2}, tags=["video:abc"])
+
+        assert pipe.eval.await_args.args[2:] == ("cache:tag:video:abc", 0, "a", "b")
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_delta_key(self, cache_service, mock_redis_client):
+        """Test deleting a key also deletes its get_or_set recompute time."""
+        mock_redis_client.delete.return_value = 2
+
+        assert await cache_service.delete("summary:1")
+
+        mock_redis_client.delete.assert_awaited_once_with("summary:1", "summary:1:__delta")
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags_unlinks_in_chunks(self, cache_service, mock_redis_client):
+        """Test tag members are popped and unlinked chunk by chunk, with their delta keys."""
+        mock_redis_client.spop.side_effect = [[b"k1", b"k2"], [b"k3"], []]
+        pipe = mock_pipeline(mock_redis_client, None)
+        pipe.execute.side_effect = [[2, 1], [1, 0]]
+
+        assert await cache_service.invalidate_tags("video:abc") == 3
+
+        mock_redis_client.spop.assert_awaited_with("cache:tag:video:abc", 2)
+        assert [c.args for c in pipe.unlink.await_args_list] == [
+            ("k1", "k2"), ("k1:__delta", "k2:__delta"), ("k3",), ("k3:__delta",)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_pattern_uses_scan(self, cache_service, mock_redis_client):
+        """Test pattern invalidation scans in batches instead of calling KEYS."""
+        async def scan_iter(match, count):
+            for key in [b"summary:1", b"summary:1:__delta", b"summary:2", b"summary:3"]:
+                yield key
+
+        mock_redis_client.scan_iter = MagicMock(side_effect=scan_iter)
+        pipe = mock_pipeline(mock_redis_client, None)
+        pipe.execute.side_effect = [[2, 1], [1, 0]]
+
+        assert await cache_service.invalidate_pattern("summary:*") == 3
+
+        mock_redis_client.scan_iter.assert_called_once_with(match="summary:*", count=2)
+        mock_redis_client.keys.assert_not_called()
+        assert [c.args for c in pipe.unlink.await_args_list] == [
+            ("summary:1", "summary:2"),
+            ("summary:1:__delta", "summary:2:__delta"),
+            ("summary:3",),
+            ("summary:3:__delta",),
+        ]
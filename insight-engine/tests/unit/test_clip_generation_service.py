@@ -0,0 +1,153 @@
+"""Tests for single-pass multi-clip extraction."""
+
+import shutil
+import subprocess
+from unittest.mock import patch
+
+import ffmpeg
+import pytest
+
+from insight_engine.services.clip_generation_service import (
+    ClipGenerationError,
+    generate_clips,
+    merge_clip_windows,
+    multi_clip_output,
+    probe_keyframe_times,
+    snap_to_keyframes,
+)
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="requires the ffmpeg and ffprobe binaries",
+)
+
+
+class TestMergeClipWindows:
+    """Test clip windows are merged before cutting."""
+
+    def test_overlapping_and_adjacent_windows_merge(self):
+        windows = [(10.0, 15.0), (0.0, 5.0), (4.0, 6.0), (6.0, 8.0), (14.0, 14.5)]
+
+        assert merge_clip_windows(windows) == [(0.0, 8.0), (10.0, 15.0)]
+
+    def test_disjoint_windows_are_kept_in_time_order(self):
+        assert merge_clip_windows([(3.0, 4.0), (1.0, 2.0)]) == [(1.0, 2.0), (3.0, 4.0)]
+
+    def test_empty_windows_are_dropped(self):
+        assert merge_clip_windows([(2.0, 2.0), (5.0, 4.0)]) == []
+
+
+class TestSnapToKeyframes:
+    """Test clip starts move back to the preceding keyframe."""
+
+    def test_starts_snap_back(self):
+        windows = snap_to_keyframes([(3.0, 3.5), (4.0, 5.0), (9.5, 10.0)], [0.0, 2.0, 4.0, 6.0])
+
+        assert windows == [(1.999, 3.5), (3.999, 5.0), (5.999, 10.0)]
+
+    def test_snapped_windows_merge(self):
+        windows = snap_to_keyframes([(2.5, 3.0), (3.5, 4.0)], [0.0, 2.0])
+
+        assert merge_clip_windows(windows) == [(1.999, 4.0)]
+
+    def test_without_keyframes_windows_are_kept(self):
+        assert snap_to_keyframes([(3.0, 4.0)], []) == [(3.0, 4.0)]
+
+
+class TestMultiClipOutput:
+    """Test every clip comes from one ffmpeg invocation."""
+
+    def test_one_input_many_outputs(self):
+        args = multi_clip_output(
+            "video.mp4", [(1.0, 2.0), (3.5, 4.0)], ["a.mp4", "b.mp4"]
+        ).compile(overwrite_output=True)
+
+        assert args.count("-i") == 1
+        assert args[args.index("a.mp4") - 4:args.index("a.mp4")] == ["-ss", "1.0", "-to", "2.0"]
+        assert args[args.index("b.mp4") - 4:args.index("b.mp4")] == ["-ss", "3.5", "-to", "4.0"]
+        assert args.count("copy") == 2
+
+
+class TestGenerateClips:
+    """Test clip generation runs ffmpeg once per video."""
+
+    @pytest.fixture
+    def video(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "video.mp4").write_bytes(b"")
+        return "video.mp4"
+
+    def test_single_ffmpeg_run(self, video, tmp_path):
+        with patch("ffmpeg.nodes.OutputStream.run", autospec=True) as run, patch(
+            "insight_engine.services.clip_generation_service.probe_keyframe_times",
+            return_value=[],
+        ):
+            paths = generate_clips(
+                video, [(5.0, 10.0), (0.0, 2.0), (8.0, 12.0)], output_dir=str(tmp_path / "clips")
+            )
+
+        assert run.call_count == 1
+        assert [path.rsplit("/", 1)[-1] for path in paths] == [
+            "video_clip_1.mp4", "video_clip_2.mp4"
+        ]
+
+    def test_ffmpeg_failure(self, video, tmp_path):
+        with patch(
+            "ffmpeg.nodes.OutputStream.run",
+            side_effect=ffmpeg.Error("ffmpeg", b"", b"Invalid data"),
+        ), patch(
+            "insight_engine.services.clip_generation_service.probe_keyframe_times",
+            return_value=[],
+        ):
+            with pytest.raises(ClipGenerationError, match="Invalid data"):
+                generate_clips(video, [(0.0, 1.0)], output_dir=str(tmp_path / "clips"))
+
+
+def _packets(path, stream):
+    """The (pts_time, flags) of a stream's packets, in presentation order."""
+    probe = ffmpeg.probe(path, select_streams=stream, show_entries="packet=pts_time,flags")
+    return sorted(
+        (float(packet["pts_time"]), packet["flags"]) for packet in probe["packets"]
+    )
+
+
+@requires_ffmpeg
+class TestKeyframeAlignedClips:
+    """Test real clips start on a keyframe with audio and video aligned."""
+
+    @pytest.fixture
+    def video(self, tmp_path, monkeypatch):
+        """A 10 s, 25 fps video with a keyframe every 2 s and an audio track."""
+        monkeypatch.chdir(tmp_path)
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error",
+                "-f", "lavfi", "-i", "testsrc=duration=10:size=160x120:rate=25",
+                "-f", "lavfi", "-i", "sine=frequency=440:duration=10",
+                "-c:v", "mpeg4", "-g", "50", "-keyint_min", "50", "-sc_threshold", "0",
+                "-c:a", "aac", "-shortest", "video.mp4",
+            ],
+            check=True,
+        )
+        return "video.mp4"
+
+    def test_probe_keyframe_times(self, video):
+        assert probe_keyframe_times(video) == pytest.approx([0.0, 2.0, 4.0, 6.0, 8.0], abs=0.05)
+
+    def test_short_windows_keep_their_video(self, video, tmp_path):
+        """Test windows shorter than the GOP start on the preceding keyframe."""
+        paths = generate_clips(
+            video, [(3.0, 4.5), (6.5, 7.5)], output_dir=str(tmp_path / "clips")
+        )
+
+        assert len(paths) == 2
+        for path, expected_duration in zip(paths, (2.5, 1.5)):
+            video_packets = _packets(path, "v:0")
+            audio_packets = _packets(path, "a:0")
+            first_pts, first_flags = video_packets[0]
+            assert "K" in first_flags
+            assert first_pts == pytest.approx(audio_packets[0][0], abs=0.05)
+            duration = float(ffmpeg.probe(path)["format"]["duration"])
+            assert duration == pytest.approx(expected_duration, abs=0.15)
+            # Every frame of the window is there, not only those after the next keyframe
+            assert len(video_packets) >= expected_duration * 25 - 2
@@ -0,0 +1,221 @@
+"""Tests for the clip worker runtime."""
+
+import asyncio
+import contextlib
+import importlib
+import json
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import ffmpeg
+import pytest
+
+
+@pytest.fixture(scope="module")
+def worker():
+    """The worker module, imported without Google Cloud credentials."""
+    with patch("google.cloud.storage.Client"), patch("google.cloud.pubsub_v1.SubscriberClient"):
+        sys.modules.pop("insight_engine.worker", None)
+        module = importlib.import_module("insight_engine.worker")
+    yield module
+    sys.modules.pop("insight_engine.worker", None)
+
+
+@pytest.fixture
+def runtime(worker):
+    runtime = worker.ClipWorkerRuntime(max_concurrent_jobs=3)
+    yield runtime
+    runtime.stop()
+
+
+class Concurrency:
+    """Records the most coroutines inside ``track`` at once."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def track(self, duration=0.05):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            self.current -= 1
+
+
+def make_message(video_id="video-1"):
+    message = MagicMock()
+    message.data = json.dumps(
+        {"job_id": "job-1", "video_id": video_id, "object_query": "person"}
+    ).encode("utf-8")
+    return message
+
+
+class TestClipWorkerRuntime:
+    """Test jobs share one event loop under a concurrency limit."""
+
+    def test_jobs_are_bounded_and_share_one_loop(self, worker, runtime):
+        """Test no more than max_concurrent_jobs run at once, all on the runtime's loop."""
+        concurrency = Concurrency()
+        threads = set()
+
+        async def job(message):
+            threads.add(threading.current_thread().name)
+            await concurrency.track()
+
+        with patch.object(worker, "_process_clip_job_async", job):
+            futures = [runtime.submit(MagicMock()) for _ in range(10)]
+            for future in futures:
+                future.result(timeout=5)
+
+        assert concurrency.peak == 3
+        assert threads == {"clip-worker-loop"}
+
+    def test_failed_job_is_nacked(self, worker, runtime):
+        """Test an exception in a job nacks its message without stopping the runtime."""
+        message = MagicMock()
+        message.data = b"not json"
+
+        runtime.submit(message).result(timeout=5)
+
+        message.nack.assert_called_once()
+        message.ack.assert_not_called()
+
+    def test_flow_control_matches_the_job_limit(self, runtime):
+        assert runtime.flow_control().max_messages == 3
+
+    def test_requires_a_job(self, worker):
+        with pytest.raises(ValueError):
+            worker.ClipWorkerRuntime(max_concurrent_jobs=0)
+
+
+class TestClipJob:
+    """Test a job cuts its clips in one ffmpeg pass and uploads them concurrently."""
+
+    @pytest.fixture
+    def storage_client(self, worker):
+        client = MagicMock()
+        with patch.object(worker, "storage_client", client), patch.object(
+            worker, "get_admission_controller"
+        ) as get_controller:
+            get_controller.return_value.admit_async = lambda kind: contextlib.AsyncExitStack()
+            yield client
+
+    def test_clips_are_cut_in_one_pass(self, worker, runtime, storage_client):
+        calls = []
+        concurrency = Concurrency()
+
+        async def cut_clips(input_path, windows, output_paths):
+            calls.append((windows, output_paths))
+
+        async def upload(clip_blob, output_path):
+            await concurrency.track()
+            return True
+
+        message = make_message()
+
+        with patch.object(worker, "cut_clips", cut_clips), patch.object(
+            worker, "upload_clip_to_gcs", upload
+        ), patch.object(
+            worker, "keyframe_aligned_windows", return_value=[(4.0, 8.5), (12.0, 15.0)]
+        ) as aligned:
+            runtime.submit(message).result(timeout=5)
+
+        assert len(calls) == 1
+        assert aligned.call_args.args[1] == [(5.0, 8.5), (12.2, 15.0)]
+        windows, output_paths = calls[0]
+        assert windows == [(4.0, 8.5), (12.0, 15.0)]
+        assert [path.rsplit("/", 1)[-1] for path in output_paths] == [
+            "video-1_clip_1.mp4", "video-1_clip_2.mp4"
+        ]
+        assert concurrency.peak == 2
+        storage_client.bucket.return_value.blob.assert_any_call("video-1/video-1_clip_2.mp4")
+        message.ack.assert_called_once()
+
+    def test_probe_failure_cuts_requested_windows(self, worker, runtime, storage_client):
+        calls = []
+
+        async def cut_clips(input_path, windows, output_paths):
+            calls.append(windows)
+
+        with patch.object(worker, "cut_clips", cut_clips), patch.object(
+            worker, "keyframe_aligned_windows",
+            side_effect=ffmpeg.Error("ffprobe", b"", b"Invalid data"),
+        ):
+            runtime.submit(make_message()).result(timeout=5)
+
+        assert calls == [[(5.0, 8.5), (12.2, 15.0)]]
+
+    def test_failed_pass_falls_back_to_one_clip_at_a_time(
+        self, worker, runtime, storage_client
+    ):
+        """Test a bad window loses only its own clip when the single pass fails."""
+        calls = []
+        uploads = []
+
+        async def cut_clips(input_path, windows, output_paths):
+            calls.append(windows)
+            if len(windows) > 1 or windows == [(12.2, 15.0)]:
+                raise ffmpeg.Error("ffmpeg", b"", b"Invalid data")
+
+        async def upload(clip_blob, output_path):
+            uploads.append(output_path.rsplit("/", 1)[-1])
+            return True
+
+        message = make_message()
+
+        with patch.object(worker, "cut_clips", cut_clips), patch.object(
+            worker, "upload_clip_to_gcs", upload
+        ), patch.object(
+            worker, "keyframe_aligned_windows", return_value=[(5.0, 8.5), (12.2, 15.0)]
+        ):
+            runtime.submit(message).result(timeout=5)
+
+        assert calls == [[(5.0, 8.5), (12.2, 15.0)], [(5.0, 8.5)], [(12.2, 15.0)]]
+        assert uploads == ["video-1_clip_1.mp4"]
+        message.ack.assert_called_once()
+
+    def test_job_without_clips_is_nacked(self, worker, runtime, storage_client):
+        """Test a job whose clips all fail to cut is retried, not acked."""
+        async def cut_clips(input_path, windows, output_paths):
+            raise ffmpeg.Error("ffmpeg", b"", b"Invalid data")
+
+        blob = storage_client.bucket.return_value.blob.return_value
+        message = make_message()
+
+        with patch.object(worker, "cut_clips", cut_clips):
+            runtime.submit(message).result(timeout=5)
+
+        blob.upload_from_filename.assert_not_called()
+        message.nack.assert_called_once()
+        message.ack.assert_not_called()
+
+
+class TestCutClips:
+    """Test ffmpeg runs as one asynchronous subprocess."""
+
+    @pytest.mark.asyncio
+    async def test_ffmpeg_failure_raises(self, worker):
+        calls = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def fake_exec(*args, **kwargs):
+            calls.append(args)
+            return await create_subprocess_exec(
+                "sh", "-c", "echo 'No such file' >&2; exit 1", **kwargs
+            )
+
+        with patch("asyncio.create_subprocess_exec", fake_exec):
+            with pytest.raises(ffmpeg.Error) as error:
+                await worker.cut_clips(
+                    "in.mp4", [(5.0, 8.5), (12.2, 15.0)], ["a.mp4", "b.mp4"]
+                )
+
+        assert b"No such file" in error.value.stderr
+        assert len(calls) == 1
+        args = calls[0]
+        assert args[0] == "ffmpeg"
+        assert args.count("-i") == 1
+        assert "a.mp4" in args and "b.mp4" in args
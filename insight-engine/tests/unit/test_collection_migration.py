@@ -0,0 +1,82 @@
+"""Tests for folding per-video collections into the shared collection."""
+
+import pytest
+from qdrant_client import models
+
+from insight_engine.services.qdrant_gateway import QdrantGateway, QdrantGatewayConfig
+from insight_engine.tools.collection_migration import (
+    migrate_video_collections,
+    migrated_payload,
+)
+from insight_engine.tools.vector_store import VectorStore
+
+TARGET = "video_documents"
+
+
+@pytest.fixture
+async def gateway():
+    """A gateway around an embedded in-memory Qdrant."""
+    gateway = QdrantGateway(QdrantGatewayConfig(location=":memory:"))
+    yield gateway
+    await gateway.close()
+
+
+async def create_video_collection(gateway, video_id, points, user_id="user-1"):
+    await gateway.recreate_collection(video_id, 2)
+    await gateway.upsert(video_id, [
+        models.PointStruct(
+            id=i,
+            vector=[1.0, float(i)],
+            payload={"page_content": f"chunk {i}", "metadata": {"user_id": user_id}},
+        )
+        for i in range(points)
+    ])
+
+
+class TestCollectionMigration:
+    """Test copying, tagging and dropping per-video collections."""
+
+    def test_payload_lifts_indexed_metadata(self):
+        """Test indexed fields nested by LangChain are copied to the top level."""
+        payload = migrated_payload(
+            {"page_content": "x", "metadata": {"user_id": "u", "timestamp": 4.0, "source": "s"}},
+            "video-1",
+        )
+
+        assert payload["video_id"] == "video-1"
+        assert payload["user_id"] == "u"
+        assert payload["timestamp"] == 4.0
+        assert "source" not in payload
+        assert payload["metadata"]["source"] == "s"
+
+    @pytest.mark.asyncio
+    async def test_folds_collections_with_video_filter(self, gateway):
+        """Test every point lands in the target and is reachable by video filter."""
+        await create_video_collection(gateway, "video-1", 3)
+        await create_video_collection(gateway, "video-2", 2, user_id="user-2")
+        await create_video_collection(gateway, "video_frames", 1)
+
+        report = await migrate_video_collections(
+            gateway, TARGET, exclude=["video_frames"], batch_size=2
+        )
+
+        assert report.migrated == {"video-1": 3, "video-2": 2}
+        store = VectorStore(gateway=gateway, collection_name=TARGET)
+        assert await store.user_owns_video("video-1", "user-1")
+        assert not await store.user_owns_video("video-1", "user-2")
+        assert await store.user_owns_video("video-2", "user-2")
+        hits = await store.search(TARGET, [1.0, 0.0], limit=10, video_id="video-2")
+        assert len(hits) == 2
+        assert {hit.payload["video_id"] for hit in hits} == {"video-2"}
+
+    @pytest.mark.asyncio
+    async def test_rerun_is_idempotent_and_drop_removes_sources(self, gateway):
+        """Test re-running overwrites instead of duplicating, then drops sources."""
+        await create_video_collection(gateway, "video-1", 3)
+
+        await migrate_video_collections(gateway, TARGET)
+        report = await migrate_video_collections(gateway, TARGET, drop_sources=True)
+
+        assert await gateway.count(TARGET) == 3
+        assert report.dropped == ["video-1"]
+        assert await gateway.list_collections() == [TARGET]
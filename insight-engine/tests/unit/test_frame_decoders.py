@@ -0,0 +1,158 @@
+"""Tests for the preprocessing decode strategies."""
+
+import io
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.frame_decoders import (
+    FFmpegScaledDecoder,
+    OpenCVDecoder,
+    PyAVDecoder,
+    create_frame_decoder,
+)
+from insight_engine.services.preprocessing_service import VideoPreprocessor
+
+
+@pytest.fixture
+def sample_video(tmp_path):
+    """Write a 120-frame video whose content changes every 30 frames."""
+    path = str(tmp_path / "sample.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (96, 64))
+    rng = np.random.default_rng(0)
+    for i in range(120):
+        if i % 30 == 0:
+            scene = cv2.GaussianBlur(
+                rng.integers(0, 255, (64, 96, 3), dtype=np.uint8), (9, 9), 0
+            )
+        writer.write(np.roll(scene, i % 30, axis=1))
+    writer.release()
+    return path
+
+
+class TestOpenCVDecoder:
+    """Test full and grab-only strided decoding."""
+
+    def test_stride_retrieves_every_nth_frame(self, sample_video):
+        """Test strided decoding yields the same frames as a full decode."""
+        full = dict(OpenCVDecoder().frames(sample_video))
+        strided = list(OpenCVDecoder(stride=7).frames(sample_video))
+
+        assert [number for number, _ in strided] == list(range(1, 121, 7))
+        for number, frame in strided:
+            np.testing.assert_array_equal(frame, full[number])
+
+    def test_stride_with_parallel_segments(self, sample_video):
+        """Test segment workers honour the stride and match the sequential path."""
+        preprocessor = VideoPreprocessor({"DECODE_MODE": "stride", "DECODE_STRIDE": 3})
+        sequential = list(preprocessor._iter_keyframes(sample_video))
+
+        parallel = preprocessor.extract_keyframes_parallel(sample_video, workers=2)
+
+        assert [number for number, _ in parallel] == [number for number, _ in sequential]
+        assert all((number - 1) % 3 == 0 for number, _ in parallel)
+
+    def test_invalid_stride(self):
+        """Test a stride below one is rejected."""
+        with pytest.raises(ConfigurationException):
+            OpenCVDecoder(stride=0)
+
+
+class TestFFmpegScaledDecoder:
+    """Test low-resolution decoding through ffmpeg."""
+
+    def test_command_scales_and_steps_inside_ffmpeg(self):
+        """Test scaling and frame skipping happen in the ffmpeg filter graph."""
+        command = FFmpegScaledDecoder((224, 224), stride=5).command("video.mp4")
+        joined = " ".join(command)
+
+        assert "framestep=5" in joined
+        assert "scale=224:224" in joined
+        assert command[command.index("-pix_fmt") + 1] == "bgr24"
+
+    @patch("insight_engine.services.frame_decoders.subprocess.Popen")
+    def test_frames_are_read_from_the_raw_pipe(self, mock_popen):
+        """Test raw BGR frames are split off the pipe with source frame numbers."""
+        frames = [np.full((4, 6, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+        process = MagicMock()
+        process.stdout = io.BytesIO(b"".join(frame.tobytes() for frame in frames))
+        process.stderr = io.BytesIO(b"")
+        process.poll.return_value = 0
+        process.wait.return_value = 0
+        mock_popen.return_value = process
+
+        decoded = list(FFmpegScaledDecoder((6, 4), stride=2).frames("video.mp4"))
+
+        assert [number for number, _ in decoded] == [1, 3, 5]
+        for (_, frame), expected in zip(decoded, frames):
+            np.testing.assert_array_equal(frame, expected)
+
+
+class TestPyAVDecoder:
+    """Test motion vector export of the PyAV decoder."""
+
+    def test_motion_follows_frame_side_data(self):
+        """Test each yielded frame carries the motion of its own vectors."""
+        vectors = np.zeros(1, dtype=[
+            ("w", "u1"), ("h", "u1"), ("motion_x", "i4"), ("motion_y", "i4"), ("motion_scale", "u2"),
+        ])
+        vectors[0] = (16, 16, 8, 0, 4)  # A 16x16 block moved 2 pixels
+        side_data = MagicMock()
+        side_data.to_ndarray.return_value = vectors
+
+        def decoded_frame(time, side):
+            frame = MagicMock(width=32, height=32, time=time)
+            frame.side_data.get.return_value = side
+            frame.to_ndarray.return_value = np.zeros((32, 32, 3), dtype=np.uint8)
+            return frame
+
+        container = MagicMock()
+        container.__enter__.return_value = container
+        container.streams.video = [MagicMock(average_rate=10)]
+        container.decode.return_value = [decoded_frame(0.0, None), decoded_frame(0.1, side_data)]
+
+        with patch("insight_engine.services.frame_decoders.av") as av:
+            av.open.return_value = container
+            decoder = PyAVDecoder()
+            motion = [
+                (number, decoder.motion_magnitude) for number, _ in decoder.frames("video.mp4")
+            ]
+
+        assert motion == [(1, None), (2, 0.25)]
+        assert container.streams.video[0].codec_context.options == {"flags2": "+export_mvs"}
+
+
+class TestCreateFrameDecoder:
+    """Test decode mode selection."""
+
+    def test_modes(self):
+        """Test each mode maps to its decoder."""
+        assert create_frame_decoder("full").name == "full"
+        assert create_frame_decoder("stride", stride=4).stride == 4
+        assert isinstance(create_frame_decoder("lowres", size=(224, 224)), FFmpegScaledDecoder)
+
+    @patch("insight_engine.services.frame_decoders.av", None)
+    def test_keyframes_require_pyav(self):
+        """Test keyframe-only decoding reports the missing optional dependency."""
+        with pytest.raises(ConfigurationException):
+            create_frame_decoder("keyframes")
+
+    @patch("insight_engine.services.frame_decoders.av", None)
+    def test_pyav_requires_pyav(self):
+        """Test motion vector decoding reports the missing optional dependency."""
+        with pytest.raises(ConfigurationException):
+            create_frame_decoder("pyav")
+
+    def test_unknown_mode(self):
+        """Test unknown modes are rejected."""
+        with pytest.raises(ConfigurationException):
+            create_frame_decoder("gpu")
+
+    def test_preprocessor_lowres_defaults_to_target_size(self):
+        """Test low-resolution decoding defaults to the model input size."""
+        preprocessor = VideoPreprocessor({"decode_mode": "lowres", "TARGET_SIZE": (160, 120)})
+
+        assert preprocessor.decoder.size == (160, 120)
@@ -0,0 +1,122 @@
+"""Tests for batched frame embeddings and the embedding cache."""
+
+import numpy as np
+import pytest
+from qdrant_client import models
+
+from insight_engine.services.frame_embedding_service import (
+    CLIP_MEAN,
+    CLIP_STD,
+    FrameEmbeddingService,
+    frame_digest,
+    prepare_image_batch,
+)
+from insight_engine.services.qdrant_gateway import build_quantization_config
+
+
+class FakeEncoder:
+    """An encoder embedding each frame as its first pixel, counting frames encoded."""
+    dimension = 3
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, frames):
+        self.batches.append(len(frames))
+        return frames[:, 0, 0, :].astype(np.float32)
+
+
+def make_frames(*values):
+    return np.stack([np.full((8, 8, 3), value, dtype=np.uint8) for value in values])
+
+
+class TestPrepareImageBatch:
+    """Test the fused preprocessing of uint8 frames."""
+
+    def test_matches_reference_normalization(self):
+        """Test the folded multiply-add equals scaling then mean/std normalization."""
+        frames = np.random.default_rng(0).integers(0, 256, (2, 8, 8, 3), dtype=np.uint8)
+
+        batch = prepare_image_batch(frames, 8)
+
+        expected = ((frames / 255.0 - CLIP_MEAN) / CLIP_STD).transpose(0, 3, 1, 2)
+        assert batch.shape == (2, 3, 8, 8)
+        assert batch.dtype == np.float32
+        np.testing.assert_allclose(batch, expected, atol=1e-5)
+
+    def test_resizes_to_input_size(self):
+        """Test frames of another size are resized to the model input."""
+        assert prepare_image_batch(make_frames(10, 20), 4).shape == (2, 3, 4, 4)
+
+
+class TestFrameEmbeddingService:
+    """Test batching and caching of frame embeddings."""
+
+    def test_embeds_every_frame(self):
+        """Test embeddings come back in frame order."""
+        service = FrameEmbeddingService(FakeEncoder())
+
+        embeddings = service.embed_batch(make_frames(1, 2, 3))
+
+        assert embeddings.tolist() == [[1.0] * 3, [2.0] * 3, [3.0] * 3]
+
+    def test_duplicate_frames_are_encoded_once(self):
+        """Test repeated frames in a batch share one encoder input."""
+        encoder = FakeEncoder()
+        service = FrameEmbeddingService(encoder)
+
+        embeddings = service.embed_batch(make_frames(5, 5, 6, 5))
+
+        assert encoder.batches == [2]
+        assert embeddings[:, 0].tolist() == [5.0, 5.0, 6.0, 5.0]
+
+    def test_cached_frames_are_not_reencoded(self):
+        """Test frames seen in an earlier batch, e.g. another video, come from the cache."""
+        encoder = FakeEncoder()
+        service = FrameEmbeddingService(encoder)
+        service.embed_batch(make_frames(1, 2))
+
+        embeddings = service.embed_batch(make_frames(2, 3))
+
+        assert encoder.batches == [2, 1]
+        assert embeddings[:, 0].tolist() == [2.0, 3.0]
+
+    def test_encoder_batches_are_bounded(self):
+        """Test misses are encoded in chunks of the batch size."""
+        encoder = FakeEncoder()
+        service = FrameEmbeddingService(encoder, batch_size=2)
+
+        service.embed_batch(make_frames(1, 2, 3, 4, 5))
+
+        assert encoder.batches == [2, 2, 1]
+
+    def test_disabled_cache(self):
+        """Test a zero-entry cache encodes every batch."""
+        encoder = FakeEncoder()
+        service = FrameEmbeddingService(encoder, cache_entries=0)
+        service.embed_batch(make_frames(1))
+        service.embed_batch(make_frames(1))
+
+        assert encoder.batches == [1, 1]
+
+    def test_digest_distinguishes_content(self):
+        """Test the cache key depends on the frame content."""
+        first, second = make_frames(1, 2)
+
+        assert frame_digest(first) == frame_digest(first.copy())
+        assert frame_digest(first) != frame_digest(second)
+
+
+class TestQuantizationConfig:
+    """Test the collection quantization modes."""
+
+    def test_modes(self):
+        assert build_quantization_config("none") is None
+        assert build_quantization_config("scalar").scalar.type == models.ScalarType.INT8
+        product = build_quantization_config("product", always_ram=False)
+        assert product.product.compression == models.CompressionRatio.X16
+        assert product.product.always_ram is False
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            build_quantization_config("binary")
@@ -0,0 +1,184 @@
+"""Tests for the shared-memory frame ring."""
+
+import multiprocessing
+import queue
+
+import cv2
+import numpy as np
+import pytest
+
+from insight_engine.services.frame_ring import SharedFrameRing
+from insight_engine.services.preprocessing_service import VideoPreprocessor
+
+fork_only = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+
+
+def _produce(ring, count):
+    """Writes frames whose values are their index, then ends the stream."""
+    for index in range(count):
+        slot = ring.acquire(timeout=5)
+        ring.frame(slot)[:] = index
+        ring.publish(slot, {"frame_number": index})
+    ring.close_writer()
+    ring.close()
+
+
+def _consume(ring, results):
+    """Reads frames until the end of the stream, then reports their numbers."""
+    received = []
+    while True:
+        with ring.consume(timeout=5) as item:
+            if item is None:
+                break
+            received.append(item[1]["frame_number"])
+            del item
+    results.put(received)
+    ring.close()
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing(2, (4, 4, 3))
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+class TestSharedFrameRing:
+    """Test slot handling within one process."""
+
+    def test_round_trip_is_zero_copy(self, ring):
+        """Test a consumer reads the frame as a view of the shared block."""
+        frame = np.full((4, 4, 3), 0.5, dtype=np.float32)
+
+        slot = ring.put(frame, {"frame_number": 7})
+        with ring.consume(timeout=1) as (view, metadata):
+            np.testing.assert_array_equal(view, frame)
+            assert np.shares_memory(view, ring.frame(slot))
+            assert metadata == {"frame_number": 7}
+            del view
+
+    def test_full_ring_applies_backpressure(self, ring):
+        """Test a producer cannot run further ahead than the slot count."""
+        frame = np.zeros((4, 4, 3), dtype=np.float32)
+        ring.put(frame)
+        ring.put(frame)
+
+        with pytest.raises(queue.Full):
+            ring.acquire(timeout=0.05)
+
+        with ring.consume(timeout=1):
+            pass
+        ring.put(frame, timeout=1)
+
+    def test_end_of_stream(self, ring):
+        """Test consumers receive None once the writer is closed."""
+        ring.close_writer()
+
+        with ring.consume(timeout=1) as item:
+            assert item is None
+
+    def test_stream_ends_after_the_last_producer(self):
+        """Test every consumer gets an end marker, but only once all producers closed."""
+        with SharedFrameRing(2, (4, 4, 3), producers=2, consumers=3) as ring:
+            ring.close_writer()
+            with pytest.raises(queue.Empty):
+                ring.get(timeout=0.05)
+
+            ring.close_writer()
+            assert [ring.get(timeout=1) for _ in range(3)] == [None, None, None]
+            with pytest.raises(RuntimeError):
+                ring.close_writer()
+
+    def test_empty_ring_times_out(self, ring):
+        """Test a consumer waiting on an empty ring gives up after the timeout."""
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=0.05)
+
+    def test_requires_a_slot(self):
+        """Test a ring without slots is rejected."""
+        with pytest.raises(ValueError):
+            SharedFrameRing(0, (4, 4, 3))
+
+
+@fork_only
+class TestCrossProcessTransport:
+    """Test frames written by a decode process reach the consumer."""
+
+    def test_producer_process(self):
+        """Test every frame arrives in order through a ring smaller than the stream."""
+        context = multiprocessing.get_context("fork")
+        with SharedFrameRing(3, (8, 8, 3), context=context) as ring:
+            producer = context.Process(target=_produce, args=(ring, 20))
+            producer.start()
+
+            received = []
+            while True:
+                with ring.consume(timeout=5) as item:
+                    if item is None:
+                        break
+                    view, metadata = item
+                    assert np.all(view == metadata["frame_number"])
+                    received.append(metadata["frame_number"])
+                    del view, item
+            producer.join(timeout=5)
+
+        assert received == list(range(20))
+        assert producer.exitcode == 0
+
+    def test_several_producers_and_consumers(self):
+        """Test every consumer process ends, and only after every producer finished."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        with SharedFrameRing(3, (8, 8, 3), context=context, producers=2, consumers=3) as ring:
+            processes = [
+                context.Process(target=_produce, args=(ring, 10)) for _ in range(2)
+            ] + [
+                context.Process(target=_consume, args=(ring, results)) for _ in range(3)
+            ]
+            for process in processes:
+                process.start()
+            received = [number for _ in range(3) for number in results.get(timeout=10)]
+            for process in processes:
+                process.join(timeout=5)
+
+        assert sorted(received) == sorted(list(range(10)) * 2)
+        assert all(process.exitcode == 0 for process in processes)
+
+    def test_preprocessor_writes_keyframes(self, tmp_path):
+        """Test keyframes written by a decode process match in-process extraction."""
+        path = str(tmp_path / "scenes.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (160, 120))
+        rng = np.random.default_rng(0)
+        for i in range(120):
+            if i % 40 == 0:
+                scene = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+            writer.write(scene)
+        writer.release()
+
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100, "MAX_WORKERS": 1})
+        expected = list(preprocessor._iter_keyframes(path))
+        context = multiprocessing.get_context("fork")
+
+        with preprocessor.create_frame_ring(slots=2, context=context) as ring:
+            producer = context.Process(
+                target=preprocessor.write_keyframes_to_ring, args=(path, ring)
+            )
+            producer.start()
+
+            received = []
+            while True:
+                with ring.consume(timeout=10) as item:
+                    if item is None:
+                        break
+                    view, metadata = item
+                    received.append((metadata["frame_number"], view.copy()))
+                    del view, item
+            producer.join(timeout=10)
+
+        assert [number for number, _ in received] == [number for number, _ in expected]
+        for (_, frame), (_, expected_frame) in zip(received, expected):
+            np.testing.assert_array_equal(frame, expected_frame)
@@ -0,0 +1,161 @@
+"""Tests for batched inference and adaptive batch sizing."""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from insight_engine.config import settings
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.inference_service import AdaptiveBatchSizer, InferenceService
+
+
+class FakeBoxes:
+    """The NumPy view of ultralytics Boxes."""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.cls = np.asarray(cls, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+    def __len__(self):
+        return len(self.conf)
+
+
+def fake_result(count):
+    """A Results object with ``count`` boxes of alternating classes."""
+    result = MagicMock()
+    result.boxes = FakeBoxes(
+        [[i, i, i + 10, i + 10] for i in range(count)],
+        [0.5 + i / 100 for i in range(count)],
+        [i % 2 for i in range(count)],
+    )
+    return result
+
+
+@pytest.fixture
+def inference_service():
+    with patch("insight_engine.services.inference_service.YOLO") as mock_yolo:
+        model = mock_yolo.return_value
+        model.names = {0: "person", 1: "car"}
+        model.side_effect = lambda frames, verbose=False: [fake_result(3) for _ in frames]
+        yield InferenceService()
+
+
+class TestBatchedInference:
+    """Test one forward pass per batch and vectorized post-processing."""
+
+    def test_one_forward_pass_per_batch(self, inference_service):
+        """Test frames are split into batches of the requested size."""
+        frames = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(10)]
+
+        detections = inference_service.run_inference_batch(frames, batch_size=4)
+
+        assert len(detections) == 10
+        assert [len(call.args[0]) for call in inference_service.model.call_args_list] == [4, 4, 2]
+
+    def test_detections_are_plain_python(self, inference_service):
+        """Test boxes, scores and labels come back as Python values."""
+        detections = inference_service.run_inference(np.zeros((64, 64, 3), dtype=np.uint8))
+
+        assert [d["label"] for d in detections] == ["person", "car", "person"]
+        assert detections[1]["box"] == [1.0, 1.0, 11.0, 11.0]
+        assert isinstance(detections[1]["score"], float)
+        assert detections[1]["score"] == pytest.approx(0.51)
+
+    def test_frames_without_detections(self, inference_service):
+        """Test frames without boxes give empty detection lists."""
+        inference_service.model.side_effect = lambda frames, verbose=False: [
+            fake_result(0) for _ in frames
+        ]
+
+        assert inference_service.run_inference_batch([np.zeros((8, 8, 3))] * 2) == [[], []]
+
+    def test_rejects_non_array_frames(self, inference_service):
+        """Test inputs are validated before any forward pass."""
+        with pytest.raises(TypeError):
+            inference_service.run_inference_batch([np.zeros((8, 8, 3)), "frame"])
+        inference_service.model.assert_not_called()
+
+
+class TestAdaptiveBatchSizer:
+    """Test batch size adaptation to the latency target."""
+
+    def test_grows_while_under_target(self):
+        """Test fast full batches grow the batch by one frame."""
+        sizer = AdaptiveBatchSizer(target_latency_ms=100, initial_size=4, max_size=6)
+
+        for _ in range(5):
+            sizer.record(sizer.size, latency_ms=10)
+
+        assert sizer.size == 6
+
+    def test_halves_when_over_target(self):
+        """Test a slow batch halves the batch size, down to the minimum."""
+        sizer = AdaptiveBatchSizer(target_latency_ms=100, initial_size=16, min_size=2)
+
+        assert sizer.record(16, latency_ms=150) == 8
+        assert sizer.record(8, latency_ms=150) == 4
+        assert sizer.record(4, latency_ms=150) == 2
+        assert sizer.record(2, latency_ms=150) == 2
+
+    def test_partial_batches_do_not_grow(self):
+        """Test a fast partial batch says nothing about larger batches."""
+        sizer = AdaptiveBatchSizer(target_latency_ms=100, initial_size=8)
+
+        assert sizer.record(3, latency_ms=10) == 8
+
+    def test_adapts_during_inference(self, inference_service):
+        """Test slow forward passes shrink the batches of later passes."""
+        inference_service.batch_sizer = AdaptiveBatchSizer(
+            target_latency_ms=100, initial_size=8
+        )
+        frames = [np.zeros((8, 8, 3), dtype=np.uint8)] * 12
+
+        with patch("insight_engine.services.inference_service.time.perf_counter",
+                   side_effect=[0.0, 0.5, 1.0, 1.01]):
+            inference_service.run_inference_batch(frames)
+
+        assert [len(call.args[0]) for call in inference_service.model.call_args_list] == [8, 4]
+
+
+class TestOnnxBackendSelection:
+    """Test the ONNX Runtime backend is selected through InferenceSettings."""
+
+    @pytest.fixture
+    def onnx_settings(self):
+        with patch.object(settings.inference, "backend", "onnxruntime"), \
+                patch.object(settings.inference, "onnx_model_name", "detector"):
+            yield settings.inference
+
+    @patch("insight_engine.services.inference_service.YOLO")
+    @patch("insight_engine.services.inference_service.OnnxDetectionBackend")
+    def test_serves_registry_artifact(self, mock_backend, mock_yolo, onnx_settings):
+        """Test the quantized artifact of the production model is loaded."""
+        registry = MagicMock()
+        registry.get_model_artifact.return_value = "models/detector/model.quant.onnx"
+        mock_backend.return_value.run_batch.side_effect = lambda frames: [[] for _ in frames]
+
+        service = InferenceService(model_registry=registry)
+        detections = service.run_inference_batch([np.zeros((8, 8, 3))] * 3, batch_size=2)
+
+        registry.get_model_artifact.assert_called_once_with("detector", "quantized")
+        assert mock_backend.call_args.args[0] == "models/detector/model.quant.onnx"
+        assert mock_backend.call_args.kwargs["pool_size"] == onnx_settings.session_pool_size
+        mock_yolo.assert_not_called()
+        assert detections == [[], [], []]
+        assert mock_backend.return_value.run_batch.call_count == 2
+
+    def test_missing_production_model(self, onnx_settings):
+        """Test a missing registry entry is a configuration error."""
+        registry = MagicMock()
+        registry.get_model_artifact.return_value = None
+
+        with pytest.raises(ConfigurationException):
+            InferenceService(model_registry=registry)
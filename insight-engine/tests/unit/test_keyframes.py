@@ -0,0 +1,83 @@
+"""Tests for the compact keyframe containers."""
+
+import numpy as np
+
+from insight_engine.services.keyframes import KeyframeBuffer, normalize_frames
+
+
+class TestNormalizeFrames:
+    """Test deferred normalization."""
+
+    def test_scales_to_unit_range(self):
+        """Test uint8 frames map to float32 in [0, 1]."""
+        frames = np.array([[[[0, 51, 255]]]], dtype=np.uint8)
+
+        normalized = normalize_frames(frames)
+
+        assert normalized.dtype == np.float32
+        np.testing.assert_allclose(normalized.ravel(), [0.0, 0.2, 1.0], rtol=1e-6)
+
+    def test_writes_into_buffer(self):
+        """Test a preallocated output is reused."""
+        frames = np.full((2, 4, 4, 3), 255, dtype=np.uint8)
+        out = np.zeros(frames.shape, dtype=np.float32)
+
+        assert normalize_frames(frames, out=out) is out
+        assert (out == 1.0).all()
+
+
+class TestKeyframeBuffer:
+    """Test keyframe accumulation into parallel arrays."""
+
+    def test_batch_holds_parallel_arrays(self):
+        """Test frames, frame numbers and timestamps line up."""
+        buffer = KeyframeBuffer(capacity=4)
+        for number in range(3):
+            buffer.append(np.full((2, 2, 3), number, dtype=np.uint8), number * 30, number * 1.0)
+
+        batch = buffer.batch()
+
+        assert len(batch) == 3
+        assert batch.frames.shape == (3, 2, 2, 3)
+        assert batch.frames.dtype == np.uint8
+        assert batch.frame_numbers.tolist() == [0, 30, 60]
+        assert batch.timestamps.tolist() == [0.0, 1.0, 2.0]
+        assert [record["frame_number"] for record in batch.records()] == [0, 30, 60]
+
+    def test_grows_past_capacity(self):
+        """Test appending beyond the initial capacity keeps earlier keyframes."""
+        buffer = KeyframeBuffer(capacity=2)
+        for number in range(5):
+            buffer.append(np.full((2, 2, 3), number, dtype=np.uint8), number, 0.0)
+
+        batch = buffer.batch()
+
+        assert batch.frames[:, 0, 0, 0].tolist() == [0, 1, 2, 3, 4]
+        assert batch.frame_numbers.tolist() == [0, 1, 2, 3, 4]
+
+    def test_clear_reuses_arrays(self):
+        """Test rolling batches are written into the same memory."""
+        buffer = KeyframeBuffer(capacity=2, frame_shape=(2, 2, 3))
+        buffer.append(np.zeros((2, 2, 3), dtype=np.uint8), 1, 0.0)
+        first = buffer.batch()
+
+        buffer.clear()
+        buffer.append(np.ones((2, 2, 3), dtype=np.uint8), 2, 0.0)
+
+        assert len(buffer) == 1
+        assert np.shares_memory(first.frames, buffer.batch().frames)
+
+    def test_bgr_is_a_view(self):
+        """Test BGR frames are a reversed channel view of the RGB frames."""
+        buffer = KeyframeBuffer(capacity=1)
+        buffer.append(np.array([[[1, 2, 3]]], dtype=np.uint8), 0, 0.0)
+        batch = buffer.batch()
+
+        bgr = batch.bgr()
+
+        assert bgr[0, 0, 0].tolist() == [3, 2, 1]
+        assert np.shares_memory(bgr, batch.frames)
+
+    def test_empty_buffer(self):
+        """Test an empty buffer yields an empty batch."""
+        assert len(KeyframeBuffer().batch()) == 0
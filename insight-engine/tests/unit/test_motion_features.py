@@ -0,0 +1,175 @@
+"""Tests for motion features and their use in frame sampling."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from insight_engine.modules.sampling_policy import (
+    HeuristicSamplingPolicy,
+    LearnedSamplingPolicy,
+)
+from insight_engine.services.motion_features import MotionEstimator, motion_from_vectors
+from insight_engine.services.preprocessing_service import VideoPreprocessor
+
+VECTOR_DTYPE = [
+    ("w", "u1"), ("h", "u1"), ("motion_x", "i4"), ("motion_y", "i4"), ("motion_scale", "u2"),
+]
+
+
+def moving_square(offset, size=(64, 96)):
+    frame = np.full((*size, 3), 40, dtype=np.uint8)
+    cv2.rectangle(frame, (offset, 16), (offset + 24, 40), (255, 255, 255), -1)
+    return frame
+
+
+class FakeSession:
+    """An ONNX session stand-in applying ``fn`` and recording the rows it ran on."""
+
+    def __init__(self, fn, shape):
+        self.fn = fn
+        self.shape = shape
+        self.rows = 0
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=self.shape)]
+
+    def run(self, output_names, feeds):
+        self.rows += len(feeds["input"])
+        return [self.fn(feeds["input"])]
+
+
+class TestMotionFromVectors:
+    """Test motion measured from codec motion vectors."""
+
+    def test_counts_area_of_moving_blocks(self):
+        """Test only blocks displaced by a pixel or more count as moving."""
+        vectors = np.array([
+            (16, 16, 8, 0, 4),   # 2 pixels: moving
+            (16, 16, 1, 1, 4),   # A third of a pixel: static
+            (8, 8, 0, -3, 1),    # 3 pixels: moving
+        ], dtype=VECTOR_DTYPE)
+
+        assert motion_from_vectors(vectors, 32, 32) == pytest.approx((256 + 64) / 1024)
+
+    def test_no_vectors(self):
+        assert motion_from_vectors(np.zeros(0, dtype=VECTOR_DTYPE), 32, 32) == 0.0
+
+
+class TestMotionEstimator:
+    """Test motion measured by frame differencing."""
+
+    def test_static_frames_have_no_motion(self):
+        """Test identical frames, and the first frame, measure zero."""
+        estimator = MotionEstimator()
+        frame = moving_square(10)
+
+        assert estimator.estimate(frame) == 0.0
+        assert estimator.estimate(frame.copy()) == 0.0
+
+    def test_moving_content_is_measured(self):
+        """Test a moving object registers as a share of the frame."""
+        estimator = MotionEstimator()
+        estimator.estimate(moving_square(10))
+
+        motion = estimator.estimate(moving_square(40))
+
+        assert type(motion) is float
+        assert 0.05 < motion < 0.5
+
+    def test_small_changes_are_noise(self):
+        """Test grey level changes under the pixel threshold are ignored."""
+        estimator = MotionEstimator(pixel_threshold=16)
+        frame = moving_square(10)
+        estimator.estimate(frame)
+
+        assert estimator.estimate(cv2.add(frame, np.full_like(frame, 8))) == 0.0
+
+    def test_codec_motion_takes_precedence(self):
+        """Test motion vectors are used when the decoder provides them."""
+        estimator = MotionEstimator()
+        estimator.estimate(moving_square(10))
+
+        assert estimator.estimate(moving_square(40), codec_motion=0.02) == 0.02
+
+    def test_reset(self):
+        """Test the first frame after a reset measures zero."""
+        estimator = MotionEstimator()
+        estimator.estimate(moving_square(10))
+        estimator.reset()
+
+        assert estimator.estimate(moving_square(40)) == 0.0
+
+
+class TestPreprocessorMotionFeatures:
+    """Test motion features of decoded frames."""
+
+    @pytest.fixture
+    def video(self, tmp_path):
+        """A video that is static for 20 frames, then has a moving square for 20."""
+        path = str(tmp_path / "motion.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (96, 64))
+        for i in range(40):
+            writer.write(moving_square(4 if i < 20 else 4 + (i - 20) * 3))
+        writer.release()
+        return path
+
+    def test_frame_features_carry_motion(self, video):
+        """Test static frames measure no motion and moving frames do."""
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100})
+
+        features = list(preprocessor.iter_frame_features(video))
+
+        assert [item["frame_number"] for item in features] == list(range(1, 41))
+        assert features[10]["timestamp"] == pytest.approx(1.1)
+        assert max(item["motion_magnitude"] for item in features[:20]) < 0.01
+        assert min(item["motion_magnitude"] for item in features[21:]) > 0.02
+
+    def test_heuristic_policy_skips_static_frames(self, video):
+        """Test tier-1 sampling keeps only the frames in motion."""
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100})
+        policy = HeuristicSamplingPolicy(motion_threshold=0.02)
+
+        sampled = list(preprocessor.sample_frames(video, policy, window=8))
+
+        assert [item["frame_number"] for item in sampled] == list(range(22, 41))
+
+    def test_learned_policy_runs_on_sampled_frames(self, tmp_path):
+        """Test the learned policy's semantic tier sees real frame tensors and hashes."""
+        path = str(tmp_path / "cut.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (96, 64))
+        rng = np.random.default_rng(0)
+        dark = rng.integers(0, 128, (8, 12, 3), dtype=np.uint8)
+        bright = rng.integers(128, 256, (8, 12, 3), dtype=np.uint8)
+        for i in range(40):
+            scene = dark if i < 20 else bright
+            writer.write(cv2.resize(scene, (96, 64), interpolation=cv2.INTER_NEAREST))
+        writer.release()
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100, "TARGET_SIZE": (32, 32)})
+        # Embeds a frame as its mean per channel; processes frames whose
+        # embedding moved from the reference
+        extractor = FakeSession(lambda x: x.mean(axis=(2, 3)), ["N", 3, 32, 32])
+        policy_model = FakeSession(
+            lambda x: np.abs(x[:, :-1]).sum(axis=1, keepdims=True) - 0.1, ["N", 4]
+        )
+        with patch.object(
+            LearnedSamplingPolicy, "_load_model", side_effect=[policy_model, extractor]
+        ):
+            policy = LearnedSamplingPolicy(
+                "policy.onnx", "extractor.onnx", motion_threshold=0.5,
+                time_threshold_seconds=1.0,
+            )
+        extractor.rows = 0
+
+        sampled = list(preprocessor.sample_frames(path, policy, window=8))
+
+        assert all(item["frame_data"].shape == (1, 3, 32, 32) for item in sampled)
+        assert all(item["frame_hash"] is not None for item in sampled)
+        # The first frame and the first semantic check after the cut's
+        # motion frame start a new reference; the static frames in between
+        # match it
+        assert [item["frame_number"] for item in sampled] == [1, 21, 31]
+        # Frames of one static scene share a hash, so each scene is embedded once
+        assert extractor.rows == 2
@@ -0,0 +1,209 @@
+"""Tests for the ONNX Runtime detection backend."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from insight_engine.exceptions import ConfigurationException
+from insight_engine.services.onnx_backend import (
+    LETTERBOX_FILL,
+    OnnxDetectionBackend,
+    decode_yolo_output,
+    letterbox_batch,
+)
+
+CLASS_NAMES = ["person", "car"]
+
+
+def yolo_output(predictions, anchors=8):
+    """A (1, 4 + classes, anchors) output holding the given predictions."""
+    output = np.zeros((1, 4 + len(CLASS_NAMES), anchors), dtype=np.float32)
+    for anchor, (cx, cy, w, h, class_id, score) in enumerate(predictions):
+        output[0, :4, anchor] = [cx, cy, w, h]
+        output[0, 4 + class_id, anchor] = score
+    return output
+
+
+class TestLetterbox:
+    """Test the batch tensor matches ultralytics preprocessing."""
+
+    def test_wide_frame_is_padded_vertically(self):
+        """Test a 2:1 frame is scaled to the width and centered with padding."""
+        frame = np.zeros((32, 64, 3), dtype=np.uint8)
+        frame[..., 2] = 255  # Red in BGR
+
+        batch, letterboxes = letterbox_batch([frame], 64)
+
+        assert batch.shape == (1, 3, 64, 64)
+        assert batch.dtype == np.float32
+        assert letterboxes == [(1.0, 0, 16)]
+        np.testing.assert_allclose(batch[0, :, :16], LETTERBOX_FILL / 255)
+        np.testing.assert_allclose(batch[0, 0, 16:48], 1.0)  # Red channel first
+        np.testing.assert_allclose(batch[0, 2, 16:48], 0.0)
+
+    def test_writes_into_preallocated_tensor(self):
+        """Test a provided tensor is filled in place."""
+        out = np.empty((2, 3, 32, 32), dtype=np.float32)
+        frames = [np.full((16, 16, 3), 255, dtype=np.uint8)] * 2
+
+        batch, _ = letterbox_batch(frames, 32, out=out)
+
+        assert batch is out
+        np.testing.assert_allclose(out, 1.0)
+
+
+class TestDecodeYoloOutput:
+    """Test vectorized score filtering, box decoding and NMS."""
+
+    def test_nms_is_class_aware(self):
+        """Test overlapping boxes are suppressed within a class only."""
+        output = yolo_output([
+            (32, 32, 20, 20, 0, 0.9),
+            (33, 32, 20, 20, 0, 0.8),  # Same class, overlaps: suppressed
+            (32, 33, 20, 20, 1, 0.7),  # Other class, overlaps: kept
+            (10, 10, 4, 4, 0, 0.1),  # Below the confidence threshold
+        ])
+
+        [detections] = decode_yolo_output(output, [(1.0, 0, 0)], [(64, 64)], CLASS_NAMES)
+
+        assert [(d["label"], round(d["score"], 2)) for d in detections] == [
+            ("person", 0.9), ("car", 0.7)
+        ]
+        assert detections[0]["box"] == [22.0, 22.0, 42.0, 42.0]
+
+    def test_boxes_map_back_to_frame_coordinates(self):
+        """Test letterbox padding and scale are undone and boxes are clipped."""
+        output = yolo_output([(32, 26, 16, 8, 1, 0.6), (2, 18, 8, 4, 0, 0.5)])
+
+        [detections] = decode_yolo_output(output, [(0.5, 0, 16)], [(64, 128)], CLASS_NAMES)
+
+        boxes = {d["label"]: d["box"] for d in detections}
+        assert boxes["car"] == [48.0, 12.0, 80.0, 28.0]
+        assert boxes["person"] == [0.0, 0.0, 12.0, 8.0]
+
+    def test_frames_without_detections(self):
+        """Test frames whose scores are all below the threshold give no detections."""
+        output = np.concatenate([yolo_output([]), yolo_output([(8, 8, 4, 4, 0, 0.9)])])
+
+        detections = decode_yolo_output(
+            output, [(1.0, 0, 0)] * 2, [(16, 16)] * 2, CLASS_NAMES
+        )
+
+        assert detections[0] == []
+        assert len(detections[1]) == 1
+
+
+class FakeBinding:
+    """An IOBinding writing a fixed prediction into the bound output."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def clear_binding_inputs(self):
+        pass
+
+    def clear_binding_outputs(self):
+        pass
+
+    def bind_cpu_input(self, name, array):
+        self.input = array
+
+    def bind_ortvalue_output(self, name, value):
+        self.output = value
+
+
+class FakeSession:
+    """An ONNX Runtime session with a static (batch, 6, 8) output."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        self.options = kwargs.get("sess_options")
+
+    def get_inputs(self):
+        return [MagicMock(shape=["batch", 3, 64, 64])]
+
+    def get_outputs(self):
+        output = MagicMock(shape=["batch", 4 + len(CLASS_NAMES), 8])
+        output.name = "output0"
+        return [output]
+
+    def get_modelmeta(self):
+        return MagicMock(custom_metadata_map={"names": "{0: 'person', 1: 'car'}"})
+
+    def io_binding(self):
+        return FakeBinding(self)
+
+    def run_with_iobinding(self, binding):
+        with FakeSession.lock:
+            FakeSession.active += 1
+            FakeSession.peak = max(FakeSession.peak, FakeSession.active)
+        time.sleep(0.02)
+        binding.output[:] = yolo_output([(32, 32, 20, 20, 1, 0.9)])
+        with FakeSession.lock:
+            FakeSession.active -= 1
+
+
+@pytest.fixture
+def fake_ort():
+    with patch("insight_engine.services.onnx_backend.ort") as ort:
+        ort.InferenceSession.side_effect = FakeSession
+        ort.OrtValue.ortvalue_from_numpy.side_effect = lambda array: array
+        FakeSession.active = FakeSession.peak = 0
+        yield ort
+
+
+class TestOnnxDetectionBackend:
+    """Test session configuration, pooling and IOBinding."""
+
+    def test_sessions_use_configured_threads(self, fake_ort):
+        """Test each pooled session gets the configured thread counts."""
+        backend = OnnxDetectionBackend("model.onnx", pool_size=3, intra_op_threads=2)
+
+        assert fake_ort.InferenceSession.call_count == 3
+        options = fake_ort.SessionOptions.return_value
+        assert options.intra_op_num_threads == 2
+        assert options.inter_op_num_threads == 1
+        assert backend.input_size == 64
+        assert backend.class_names == ["person", "car"]
+
+    def test_outputs_are_bound_to_reused_buffers(self, fake_ort):
+        """Test outputs land in a per-session buffer reused across requests."""
+        backend = OnnxDetectionBackend("model.onnx", pool_size=1)
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        first = backend.run_batch([frame, frame])
+        pooled = backend._pool.queue[0]
+        buffer = pooled._output
+        second = backend.run_batch([frame])
+
+        assert pooled._output is buffer
+        assert [d["label"] for d in first[0]] == ["car"]
+        assert len(first) == 2 and len(second) == 1
+
+    def test_pool_bounds_concurrent_requests(self, fake_ort):
+        """Test concurrent requests never use more sessions than the pool holds."""
+        backend = OnnxDetectionBackend("model.onnx", pool_size=2)
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        threads = [
+            threading.Thread(target=backend.run_batch, args=([frame],)) for _ in range(6)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert FakeSession.peak == 2
+        assert backend._pool.qsize() == 2
+
+    @patch("insight_engine.services.onnx_backend.ort", None)
+    def test_requires_onnxruntime(self):
+        """Test the backend reports the missing optional dependency."""
+        with pytest.raises(ConfigurationException):
+            OnnxDetectionBackend("model.onnx")
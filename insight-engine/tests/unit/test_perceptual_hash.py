@@ -0,0 +1,106 @@
+"""Tests for vectorized perceptual hashing."""
+
+import cv2
+import imagehash
+import numpy as np
+import pytest
+from PIL import Image
+
+from insight_engine.services.perceptual_hash import (
+    PerceptualHasher,
+    bgr_to_luma,
+    hamming_distances,
+    resize_luma,
+)
+
+ALGORITHMS = ["phash", "dhash", "dhash_vertical", "average_hash", "whash"]
+
+
+def reference_hash(frame, algorithm, hash_size):
+    """The hash imagehash computes for a BGR frame, as the preprocessor used to."""
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return getattr(imagehash, algorithm)(image, hash_size=hash_size)
+
+
+@pytest.fixture
+def frames():
+    """Noise, smooth and uniform frames of one size."""
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (90, 160, 3), dtype=np.uint8)
+    return [
+        noise,
+        cv2.GaussianBlur(noise, (15, 15), 0),
+        np.zeros((90, 160, 3), dtype=np.uint8),
+        np.full((90, 160, 3), 128, dtype=np.uint8),
+    ]
+
+
+class TestPerceptualHasher:
+    """Test bit-compatibility with imagehash and the packed representation."""
+
+    @pytest.mark.parametrize("algorithm", ALGORITHMS)
+    @pytest.mark.parametrize("hash_size", [8, 16])
+    def test_matches_imagehash(self, frames, algorithm, hash_size):
+        """Test every supported algorithm reproduces imagehash bit for bit."""
+        hasher = PerceptualHasher(algorithm, hash_size)
+
+        for frame in frames:
+            expected = reference_hash(frame, algorithm, hash_size)
+            actual = hasher.hash(frame)
+            assert str(actual) == str(expected)
+            assert actual - hasher.hash(frame) == 0
+
+    def test_hamming_distance_matches_imagehash(self, frames):
+        """Test popcount distances equal imagehash's bit differences."""
+        hasher = PerceptualHasher("phash", 8)
+        first, second = frames[0], frames[1]
+
+        expected = reference_hash(first, "phash", 8) - reference_hash(second, "phash", 8)
+
+        assert hasher.hash(first) - hasher.hash(second) == expected
+
+    def test_batch_matches_single_frames(self, frames):
+        """Test hashing a batch, including mixed frame sizes, equals per-frame hashing."""
+        hasher = PerceptualHasher("dhash", 8)
+        batch = frames + [cv2.resize(frames[0], (64, 48))]
+
+        packed = hasher.hash_batch(batch)
+
+        assert packed.shape == (len(batch), 1)
+        assert packed.dtype == np.uint64
+        for words, frame in zip(packed, batch):
+            np.testing.assert_array_equal(words, hasher.hash(frame).words)
+
+    def test_vectorized_distances(self, frames):
+        """Test distances of a whole batch to one reference hash."""
+        hasher = PerceptualHasher("phash", 8)
+        packed = hasher.hash_batch(frames)
+
+        distances = hamming_distances(packed, packed[1])
+
+        assert distances[1] == 0
+        assert list(distances) == [
+            hasher.hash(frame) - hasher.hash(frames[1]) for frame in frames
+        ]
+
+    def test_hash_sizes_not_filling_a_word(self, frames):
+        """Test hashes of 25 bits pack and print like imagehash."""
+        hasher = PerceptualHasher("average_hash", 5)
+
+        assert str(hasher.hash(frames[1])) == str(reference_hash(frames[1], "average_hash", 5))
+
+    def test_luma_and_resize_match_pil(self, frames):
+        """Test the building blocks reproduce PIL's convert("L") and LANCZOS resize."""
+        image = Image.fromarray(cv2.cvtColor(frames[0], cv2.COLOR_BGR2RGB)).convert("L")
+        luma = bgr_to_luma(frames[0])
+
+        np.testing.assert_array_equal(luma, np.asarray(image))
+        np.testing.assert_array_equal(
+            resize_luma(luma, (37, 21)),
+            np.asarray(image.resize((37, 21), Image.LANCZOS)),
+        )
+
+    def test_unsupported_algorithm(self):
+        """Test unknown algorithms are rejected."""
+        with pytest.raises(ValueError):
+            PerceptualHasher("colorhash")
@@ -0,0 +1,184 @@
+"""Tests for the streaming video analysis pipeline."""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from qdrant_client import models
+
+from insight_engine.config import EmbeddingSettings
+from insight_engine.services.pipeline_service import PipelineService
+
+BATCH_SIZE = 8
+
+
+@pytest.fixture
+def pipeline():
+    settings = MagicMock()
+    settings.preprocessing.model_dump.return_value = {}
+    settings.qdrant.embedding_dimension = 4
+    settings.qdrant.quantization = "scalar"
+    settings.qdrant.quantization_always_ram = True
+    settings.inference.max_batch_size = BATCH_SIZE
+    inference_service = MagicMock()
+    inference_service.run_inference_batch.side_effect = lambda frames: [
+        [{"label": "car", "score": 0.9}] for _ in frames
+    ]
+    vector_db_service = MagicMock()
+    vector_db_service.upsert_points = AsyncMock()
+    vector_db_service.ensure_collection = AsyncMock()
+    embedding_service = MagicMock()
+    embedding_service.embed_batch.side_effect = lambda frames: np.repeat(
+        frames[:, 0, 0, :1].astype(np.float32), 4, axis=1
+    )
+    return PipelineService(settings, inference_service, vector_db_service, embedding_service)
+
+
+def stream_keyframes(count, outstanding):
+    """An async keyframe stream tracking how many frames are alive at once."""
+    async def stream(video_path):
+        for number in range(1, count + 1):
+            outstanding.append(number)
+            yield {
+                "frame": np.full((4, 4, 3), number, dtype=np.uint8),
+                "frame_number": number,
+                "timestamp": number / 10,
+            }
+    return stream
+
+
+class TestPipelineService:
+    """Test rolling batch inference and upserts."""
+
+    @pytest.mark.asyncio
+    async def test_upserts_in_rolling_batches(self, pipeline):
+        """Test every batch is inferred in one call and upserted before the next is read."""
+        produced = []
+        upserted_before_next_frame = []
+
+        async def record_upsert(points):
+            upserted_before_next_frame.append((len(points), len(produced)))
+
+        pipeline.vector_db_service.upsert_points.side_effect = record_upsert
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(20, produced)
+
+        results = await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        assert [r["frame_number"] for r in results] == list(range(1, 21))
+        assert all("frame" not in r for r in results)
+        assert upserted_before_next_frame == [
+            (BATCH_SIZE, BATCH_SIZE),
+            (BATCH_SIZE, 2 * BATCH_SIZE),
+            (20 - 2 * BATCH_SIZE, 20),
+        ]
+        assert pipeline.inference_service.run_inference_batch.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_inference_receives_uint8_bgr_frames(self, pipeline):
+        """Test frames reach inference unnormalized, in BGR order."""
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(3, [])
+        seen = []
+        pipeline.inference_service.run_inference_batch.side_effect = lambda frames: (
+            seen.append(np.array(frames)) or [[] for _ in frames]
+        )
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        frames = seen[0]
+        assert frames.dtype == np.uint8
+        assert frames.shape == (3, 4, 4, 3)
+        assert [int(frame[0, 0, 0]) for frame in frames] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_points_carry_frame_embeddings(self, pipeline):
+        """Test every point is stored with its frame's embedding."""
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(10, [])
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        points = [
+            point
+            for call in pipeline.vector_db_service.upsert_points.call_args_list
+            for point in call.args[0]
+        ]
+        assert [point.vector for point in points] == [[float(n)] * 4 for n in range(1, 11)]
+        assert pipeline.embedding_service.embed_batch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_models_run_off_the_event_loop(self, pipeline):
+        """Test inference and embedding run in worker threads, not on the loop thread."""
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(3, [])
+        threads = []
+        infer = pipeline.inference_service.run_inference_batch.side_effect
+        embed = pipeline.embedding_service.embed_batch.side_effect
+        pipeline.inference_service.run_inference_batch.side_effect = lambda frames: (
+            threads.append(threading.get_ident()) or infer(frames)
+        )
+        pipeline.embedding_service.embed_batch.side_effect = lambda frames: (
+            threads.append(threading.get_ident()) or embed(frames)
+        )
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_collection_is_created_once_with_quantization(self, pipeline):
+        """Test the frame collection is ensured before the first upsert only."""
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(20, [])
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        pipeline.vector_db_service.ensure_collection.assert_awaited_once()
+        vector_size, quantization = pipeline.vector_db_service.ensure_collection.call_args.args
+        assert vector_size == 4
+        assert quantization.scalar.type == models.ScalarType.INT8
+
+    @pytest.mark.asyncio
+    async def test_collection_failure_raises_and_is_retried(self, pipeline):
+        """Test a failed collection check aborts the run and is repeated by the next one."""
+        pipeline.vector_db_service.ensure_collection.side_effect = [
+            ConnectionError("qdrant unavailable"),
+            True,
+        ]
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(2, [])
+
+        with pytest.raises(ConnectionError):
+            await pipeline.execute_video_analysis_pipeline("video.mp4")
+        assert not pipeline._collection_ready
+        pipeline.vector_db_service.upsert_points.assert_not_called()
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+        assert pipeline._collection_ready
+        assert pipeline.vector_db_service.ensure_collection.await_count == 2
+
+    def test_embeddings_are_opt_in(self):
+        """Test the default settings build a pipeline without a registered encoder."""
+        settings = MagicMock()
+        settings.embedding = EmbeddingSettings()
+        settings.preprocessing.model_dump.return_value = {}
+
+        pipeline = PipelineService(settings, MagicMock(), MagicMock())
+
+        assert pipeline.embedding_service is None
+
+    @pytest.mark.asyncio
+    async def test_zero_vectors_without_embeddings(self, pipeline):
+        """Test frames are stored with zero vectors when embeddings are disabled."""
+        pipeline.embedding_service = None
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(2, [])
+
+        await pipeline.execute_video_analysis_pipeline("video.mp4")
+
+        points = pipeline.vector_db_service.upsert_points.call_args.args[0]
+        assert [point.vector for point in points] == [[0.0] * 4, [0.0] * 4]
+
+    @pytest.mark.asyncio
+    async def test_no_keyframes(self, pipeline):
+        """Test a video without keyframes ends the pipeline without upserts."""
+        pipeline.preprocessor.aiter_keyframes = stream_keyframes(0, [])
+
+        assert await pipeline.execute_video_analysis_pipeline("video.mp4") == []
+        pipeline.vector_db_service.upsert_points.assert_not_called()
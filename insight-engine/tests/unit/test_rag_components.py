@@ -5,171 +5,270 @@ This module tests vector store operations, embedding generation,
 and RAG pipeline components.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 import numpy as np
 from typing import List, Dict, Any
+from langchain_community.embeddings import OpenAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from insight_engine.tools.vector_store import VectorStore
-from insight_engine.services.vector_store_service import VectorStoreService
+from insight_engine.services.qdrant_gateway import QdrantGateway, QdrantGatewayConfig
+from insight_engine.services.vector_store_service import (
+    EMBED_QUERY_CONCURRENCY,
+    VectorStoreService,
+    build_payload_filter,
+    embed_queries,
+)
 from insight_engine.exceptions import QdrantConnectionException, ValidationException
 
 
+class TestQdrantGateway:
+    """Test the shared async Qdrant gateway."""
+
+    @pytest.fixture
+    def gateway(self):
+        """Create a gateway around a mocked async client."""
+        gateway = QdrantGateway(QdrantGatewayConfig(timeout=0.5, max_concurrent_requests=2))
+        gateway._client = AsyncMock()
+        return gateway
+
+    @patch('insight_engine.services.qdrant_gateway.AsyncQdrantClient')
+    def test_client_lazy_initialization(self, mock_async_client):
+        """Test the pooled client is created once, on first use."""
+        gateway = QdrantGateway(QdrantGatewayConfig(prefer_grpc=True, pool_size=4))
+
+        assert gateway._client is None
+        assert gateway.client is gateway.client
+        mock_async_client.assert_called_once()
+        kwargs = mock_async_client.call_args[1]
+        assert kwargs["prefer_grpc"] is True
+        assert kwargs["pool_size"] == 4
+
+    @pytest.mark.asyncio
+    async def test_search(self, gateway):
+        """Test single searches go through query_points."""
+        hits = [MagicMock(), MagicMock()]
+        gateway._client.query_points.return_value = MagicMock(points=hits)
+
+        results = await gateway.search("frames", [0.1, 0.2], limit=3, score_threshold=0.8)
+
+        assert results == hits
+        kwargs = gateway._client.query_points.call_args[1]
+        assert kwargs["collection_name"] == "frames"
+        assert kwargs["limit"] == 3
+        assert kwargs["score_threshold"] == 0.8
+
+    @pytest.mark.asyncio
+    async def test_search_batch_preserves_order(self, gateway):
+        """Test batch search sends one request and returns results in input order."""
+        gateway._client.query_batch_points.return_value = [
+            MagicMock(points=["a"]), MagicMock(points=["b"])
+        ]
+
+        results = await gateway.search_batch("frames", [[1.0, 0.0], [0.0, 1.0]], limit=2)
+
+        assert results == [["a"], ["b"]]
+        requests = gateway._client.query_batch_points.call_args[1]["requests"]
+        assert [r.query for r in requests] == [[1.0, 0.0], [0.0, 1.0]]
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_connection_exception(self, gateway):
+        """Test slow requests are cut off at the configured timeout."""
+        async def slow_query(**kwargs):
+            await asyncio.sleep(5)
+
+        gateway._client.query_points.side_effect = slow_query
+
+        with pytest.raises(QdrantConnectionException):
+            await gateway.search("frames", [0.1])
+
+    @pytest.mark.asyncio
+    async def test_ensure_collection_creates_payload_indexes(self, gateway):
+        """Test a missing collection is created with every payload index."""
+        gateway._client.collection_exists.return_value = False
+
+        assert await gateway.ensure_collection("documents", 768)
+
+        gateway._client.create_collection.assert_awaited_once()
+        indexed = {
+            call.kwargs["field_name"]
+            for call in gateway._client.create_payload_index.await_args_list
+        }
+        assert indexed == {"video_id", "user_id", "timestamp", "label"}
+
+    @pytest.mark.asyncio
+    async def test_ensure_collection_keeps_existing_points(self, gateway):
+        """Test an existing collection is never dropped or recreated."""
+        gateway._client.collection_exists.return_value = True
+
+        assert not await gateway.ensure_collection("documents", 768)
+
+        gateway._client.create_collection.assert_not_awaited()
+        gateway._client.delete_collection.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_scroll_all_pages(self, gateway):
+        """Test scroll_all follows offsets until exhausted."""
+        gateway._client.scroll.side_effect = [(["p1", "p2"], "next"), (["p3"], None)]
+
+        points = [p async for p in gateway.scroll_all("frames", page_size=2)]
+
+        assert points == ["p1", "p2", "p3"]
+        assert gateway._client.scroll.call_args_list[1][1]["offset"] == "next"
+
+
 class TestVectorStore:
     """Test VectorStore client functionality."""
     
     @pytest.fixture
-    def vector_store(self):
+    def gateway(self):
+        """Create a mocked gateway."""
+        return AsyncMock(spec=QdrantGateway)
+
+    @pytest.fixture
+    def vector_store(self, gateway):
         """Create VectorStore instance."""
-        return VectorStore(host="localhost", port=6333)
-    
-    def test_vector_store_initialization(self, vector_store):
-        """Test VectorStore initialization."""
-        assert vector_store._host == "localhost"
-        assert vector_store._port == 6333
-        assert vector_store._client is None  # Lazy initialization
+        return VectorStore(gateway=gateway)
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_client_lazy_initialization(self, mock_qdrant_client, vector_store):
-        """Test lazy client initialization."""
-        mock_client_instance = MagicMock()
-        mock_qdrant_client.return_value = mock_client_instance
-        
-        # First access should initialize client
-        client = vector_store.client
-        
-        assert client is mock_client_instance
-        mock_qdrant_client.assert_called_once_with(host="localhost", port=6333)
-        
-        # Second access should return same client
-        client2 = vector_store.client
-        assert client2 is mock_client_instance
-        assert mock_qdrant_client.call_count == 1  # Still only called once
-    
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_client_initialization_error(self, mock_qdrant_client, vector_store):
-        """Test client initialization error handling."""
-        mock_qdrant_client.side_effect = Exception("Connection failed")
-        
-        with pytest.raises(Exception) as exc_info:
-            _ = vector_store.client
-        
-        assert "Connection failed" in str(exc_info.value)
+    def test_dedicated_host_creates_own_gateway(self):
+        """Test an explicit host gets a dedicated gateway."""
+        vector_store = VectorStore(host="qdrant.internal", port=6334)
+
+        assert vector_store.gateway.config.host == "qdrant.internal"
+        assert vector_store.gateway.config.port == 6334
+        assert vector_store.gateway._client is None  # Lazy initialization
+
+    @pytest.mark.asyncio
+    async def test_close_releases_only_a_dedicated_gateway(self, gateway):
+        """Test closing a store closes the gateway it created, never a shared one."""
+        async with VectorStore(gateway=gateway):
+            pass
+        gateway.close.assert_not_awaited()
+
+        with patch('insight_engine.tools.vector_store.QdrantGateway') as mock_gateway:
+            mock_gateway.return_value.close = AsyncMock()
+            async with VectorStore(host="qdrant.internal") as vector_store:
+                assert vector_store.gateway is mock_gateway.return_value
+        mock_gateway.return_value.close.assert_awaited_once()
+
+    @patch('insight_engine.tools.vector_store.get_qdrant_gateway')
+    def test_default_uses_shared_gateway(self, mock_get_gateway):
+        """Test VectorStore instances share the process-wide gateway."""
+        first, second = VectorStore(), VectorStore()
+
+        assert first.gateway is second.gateway is mock_get_gateway.return_value
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_recreate_collection(self, mock_qdrant_client, vector_store):
+    @pytest.mark.asyncio
+    async def test_recreate_collection(self, vector_store, gateway):
         """Test collection recreation."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
-        vector_store.recreate_collection("test_collection", 512)
+        await vector_store.recreate_collection("test_collection", 512)
         
-        mock_client.recreate_collection.assert_called_once()
-        call_args = mock_client.recreate_collection.call_args
-        assert call_args[1]["collection_name"] == "test_collection"
+        gateway.recreate_collection.assert_awaited_once_with("test_collection", 512)
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_upsert_vectors(self, mock_qdrant_client, vector_store):
+    @pytest.mark.asyncio
+    async def test_upsert_vectors(self, vector_store, gateway):
         """Test vector upserting."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
         vectors = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
         payloads = [{"text": "first"}, {"text": "second"}]
         
-        vector_store.upsert("test_collection", vectors, payloads)
+        await vector_store.upsert("test_collection", vectors, payloads)
         
-        mock_client.upsert.assert_called_once()
-        call_args = mock_client.upsert.call_args
-        assert call_args[1]["collection_name"] == "test_collection"
-        assert call_args[1]["wait"] is True
+        gateway.upsert.assert_awaited_once()
+        collection, batch = gateway.upsert.call_args[0]
+        assert collection == "test_collection"
+        assert batch.payloads == payloads
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_search_vectors(self, mock_qdrant_client, vector_store):
+    @pytest.mark.asyncio
+    async def test_search_vectors(self, vector_store, gateway):
         """Test vector searching."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
-        # Mock search results
         mock_results = [MagicMock(), MagicMock()]
-        mock_client.search.return_value = mock_results
+        gateway.search.return_value = mock_results
         
         query_vector = [0.1, 0.2, 0.3]
-        results = vector_store.search("test_collection", query_vector, limit=5)
+        results = await vector_store.search("test_collection", query_vector, limit=5)
         
         assert results == mock_results
-        mock_client.search.assert_called_once_with(
-            collection_name="test_collection",
-            query_vector=query_vector,
-            limit=5,
-            score_threshold=None
+        gateway.search.assert_awaited_once_with(
+            "test_collection", query_vector, limit=5, query_filter=None, score_threshold=None
         )
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_search_vectors_with_threshold(self, mock_qdrant_client, vector_store):
+    @pytest.mark.asyncio
+    async def test_search_vectors_with_threshold(self, vector_store, gateway):
         """Test vector searching with score threshold."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
         query_vector = [0.1, 0.2, 0.3]
-        vector_store.search("test_collection", query_vector, limit=3, score_threshold=0.8)
+        await vector_store.search("test_collection", query_vector, limit=3, score_threshold=0.8)
         
-        mock_client.search.assert_called_once_with(
-            collection_name="test_collection",
-            query_vector=query_vector,
-            limit=3,
-            score_threshold=0.8
+        gateway.search.assert_awaited_once_with(
+            "test_collection", query_vector, limit=3, query_filter=None, score_threshold=0.8
         )
+
+    @pytest.mark.asyncio
+    async def test_search_within_video_uses_payload_filter(self, vector_store, gateway):
+        """Test per-video searches filter the shared collection on video_id."""
+        await vector_store.search("documents", [0.1, 0.2], video_id="video-1")
+
+        query_filter = gateway.search.call_args[1]["query_filter"]
+        assert query_filter == build_payload_filter({"video_id": "video-1"})
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
     @pytest.mark.asyncio
-    async def test_get_video_metadata_success(self, mock_qdrant_client, vector_store):
+    async def test_get_video_metadata_success(self, vector_store, gateway):
         """Test successful video metadata retrieval."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
-        # Mock scroll results
         mock_point = MagicMock()
         mock_point.payload = {"title": "Test Video", "duration": 120}
-        mock_client.scroll.return_value = ([mock_point], None)
+        gateway.scroll.return_value = ([mock_point], None)
         
-        metadata = await vector_store.get_video_metadata("video_collection")
+        metadata = await vector_store.get_video_metadata("video-1")
         
         assert metadata == {"title": "Test Video", "duration": 120}
-        mock_client.scroll.assert_called_once_with(
-            collection_name="video_collection",
+        gateway.scroll.assert_awaited_once_with(
+            vector_store.collection_name,
             limit=1,
-            with_payload=True
+            scroll_filter=build_payload_filter({"video_id": "video-1"}),
+            with_payload=True,
         )
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
     @pytest.mark.asyncio
-    async def test_get_video_metadata_not_found(self, mock_qdrant_client, vector_store):
+    async def test_get_video_metadata_not_found(self, vector_store, gateway):
         """Test video metadata retrieval when not found."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
+        gateway.scroll.return_value = ([], None)
         
-        # Mock empty scroll results
-        mock_client.scroll.return_value = ([], None)
-        
-        metadata = await vector_store.get_video_metadata("video_collection")
+        metadata = await vector_store.get_video_metadata("video-1")
         
         assert metadata is None
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
     @pytest.mark.asyncio
-    async def test_get_video_metadata_error(self, mock_qdrant_client, vector_store):
+    async def test_get_video_metadata_error(self, vector_store, gateway):
         """Test video metadata retrieval with error."""
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
-        
-        # Mock scroll error
-        mock_client.scroll.side_effect = Exception("Collection not found")
+        gateway.scroll.side_effect = Exception("Collection not found")
         
-        metadata = await vector_store.get_video_metadata("nonexistent_collection")
+        metadata = await vector_store.get_video_metadata("video-1")
         
         assert metadata is None
 
+    @pytest.mark.asyncio
+    async def test_user_owns_video_counts_indexed_filter(self, vector_store, gateway):
+        """Test authorization is an exact count filtered on video_id and user_id."""
+        gateway.count.return_value = 3
+
+        assert await vector_store.user_owns_video("video-1", "user-1")
+        gateway.count.assert_awaited_once_with(
+            vector_store.collection_name,
+            count_filter=build_payload_filter({"video_id": "video-1", "user_id": "user-1"}),
+        )
+
+    @pytest.mark.asyncio
+    async def test_user_owns_video_denies_unknown_and_anonymous(self, vector_store, gateway):
+        """Test missing matches, anonymous users and lookup errors are denied."""
+        gateway.count.return_value = 0
+        assert not await vector_store.user_owns_video("video-1", "user-2")
+        assert not await vector_store.user_owns_video("video-1", None)
+
+        gateway.count.side_effect = Exception("Qdrant unavailable")
+        assert not await vector_store.user_owns_video("video-1", "user-1")
+
 
 class TestVectorStoreService:
     """Test VectorStoreService functionality."""
@@ -201,18 +300,117 @@ class TestVectorStoreService:
         
         assert service.collection_name == "custom_collection"
     
-    @patch('insight_engine.services.vector_store_service.QdrantClient')
     @patch('insight_engine.services.vector_store_service.settings')
-    def test_create_collection(self, mock_settings_module, mock_qdrant_client, mock_settings):
+    @pytest.mark.asyncio
+    async def test_create_collection(self, mock_settings_module, mock_settings):
         """Test collection creation."""
         mock_settings_module.return_value = mock_settings
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
+        gateway = AsyncMock(spec=QdrantGateway)
         
-        service = VectorStoreService()
-        service.create_collection(embedding_size=768)
+        service = VectorStoreService(gateway=gateway)
+        await service.create_collection(embedding_size=768)
         
-        mock_client.recreate_collection.assert_called_once()
+        gateway.ensure_collection.assert_awaited_once_with(service.collection_name, 768)
+        gateway.recreate_collection.assert_not_awaited()
+
+    @patch('insight_engine.services.vector_store_service.settings')
+    @pytest.mark.asyncio
+    async def test_search_batch_embeds_queries_and_keeps_order(self, mock_settings_module):
+        """Test batch search embeds every query as a query and keeps input order."""
+        gateway = AsyncMock(spec=QdrantGateway)
+        gateway.search_batch.return_value = [
+            [MagicMock(payload={"text": "first"}, score=0.9)],
+            [MagicMock(payload={"text": "second"}, score=0.7)],
+        ]
+        embeddings = AsyncMock()
+        embeddings.aembed_query.side_effect = lambda text: {"q1": [1.0, 0.0], "q2": [0.0, 1.0]}[text]
+        service = VectorStoreService(gateway=gateway, embeddings=embeddings)
+
+        results = await service.search_batch(
+            ["q1", "q2"], limit=3, filters={"video_id": "abc"}
+        )
+
+        assert embeddings.aembed_query.await_count == 2
+        embeddings.aembed_documents.assert_not_awaited()
+        assert [r[0]["payload"]["text"] for r in results] == ["first", "second"]
+        args, kwargs = gateway.search_batch.call_args
+        assert args[1] == [[1.0, 0.0], [0.0, 1.0]]
+        assert kwargs["limit"] == 3
+        assert kwargs["query_filter"].must[0].key == "video_id"
+
+    @pytest.mark.asyncio
+    async def test_batch_and_single_query_embeddings_match(self):
+        """Test batched queries get the vectors of the single-query path, not document vectors."""
+
+        class TaskTypedEmbeddings:
+            """Embeds documents and queries differently, like Gemini task types."""
+
+            async def aembed_documents(self, texts):
+                return [[float(len(text)), 1.0] for text in texts]
+
+            async def aembed_query(self, text):
+                return [float(len(text)), -1.0]
+
+        embeddings = TaskTypedEmbeddings()
+        questions = ["what happens first?", "who is speaking?"]
+
+        batched = await embed_queries(embeddings, questions)
+
+        assert batched == [await embeddings.aembed_query(q) for q in questions]
+
+    @pytest.mark.asyncio
+    async def test_gemini_queries_embed_in_one_query_typed_call(self):
+        """Test Gemini embeds a query batch in one call with the query task type."""
+        embeddings = AsyncMock(spec=GoogleGenerativeAIEmbeddings)
+        embeddings.aembed_documents.return_value = [[1.0], [2.0]]
+
+        assert await embed_queries(embeddings, ["q1", "q2"]) == [[1.0], [2.0]]
+
+        embeddings.aembed_documents.assert_awaited_once_with(
+            ["q1", "q2"], task_type="retrieval_query"
+        )
+        embeddings.aembed_query.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_symmetric_queries_embed_in_one_call(self):
+        """Test models embedding queries like documents use one batch call."""
+        embeddings = AsyncMock(spec=OpenAIEmbeddings)
+        embeddings.aembed_documents.return_value = [[1.0], [2.0]]
+
+        assert await embed_queries(embeddings, ["q1", "q2"]) == [[1.0], [2.0]]
+
+        embeddings.aembed_documents.assert_awaited_once_with(["q1", "q2"])
+
+    @pytest.mark.asyncio
+    async def test_per_query_embedding_concurrency_is_capped(self):
+        """Test the per-query fallback never runs more than the cap at once."""
+        running = 0
+        peak = 0
+
+        async def aembed_query(text):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return [float(len(text))]
+
+        embeddings = MagicMock()
+        embeddings.aembed_query = aembed_query
+        queries = [f"query {i}" for i in range(128)]
+
+        vectors = await embed_queries(embeddings, queries)
+
+        assert vectors == [[float(len(q))] for q in queries]
+        assert peak == EMBED_QUERY_CONCURRENCY
+
+    def test_build_payload_filter(self):
+        """Test payload filters are built from plain mappings."""
+        query_filter = build_payload_filter({"video_id": "abc", "label": ["car", "person"]})
+
+        assert query_filter.must[0].match.value == "abc"
+        assert query_filter.must[1].match.any == ["car", "person"]
+        assert build_payload_filter(None) is None
 
 
 class TestEmbeddingGeneration:
@@ -422,26 +620,25 @@ class TestRAGPerformance:
 class TestRAGIntegration:
     """Integration tests for RAG components."""
     
-    @patch('insight_engine.tools.vector_store.QdrantClient')
-    def test_end_to_end_rag_flow(self, mock_qdrant_client):
+    @pytest.mark.asyncio
+    async def test_end_to_end_rag_flow(self):
         """Test end-to-end RAG flow."""
-        # Mock Qdrant client
-        mock_client = MagicMock()
-        mock_qdrant_client.return_value = mock_client
+        # Mock Qdrant gateway
+        gateway = AsyncMock(spec=QdrantGateway)
         
         # Mock search results
         mock_results = [
             MagicMock(payload={"text": "Machine learning is discussed", "timestamp": 10.0}, score=0.9),
             MagicMock(payload={"text": "Neural networks are explained", "timestamp": 25.0}, score=0.8),
         ]
-        mock_client.search.return_value = mock_results
+        gateway.search.return_value = mock_results
         
         # Initialize vector store
-        vector_store = VectorStore()
+        vector_store = VectorStore(gateway=gateway)
         
         # Simulate RAG query
         query_embedding = [0.1] * 384
-        results = vector_store.search("video_collection", query_embedding, limit=5)
+        results = await vector_store.search("video_collection", query_embedding, limit=5)
         
         # Verify results
         assert len(results) == 2
@@ -0,0 +1,188 @@
+"""Tests for streaming latency percentiles and the SafetyGuard latency modes."""
+
+import math
+
+import numpy as np
+import pytest
+
+from insight_engine.modules.latency_quantiles import StreamingQuantiles
+from insight_engine.modules.safety_guard import (
+    POLICY_DECISION_LATENCY,
+    POLICY_FALLBACKS,
+    PerformanceMonitor,
+    SafetyGuard,
+)
+from insight_engine.modules.sampling_policy import SamplingPolicy
+
+
+class ConstantPolicy(SamplingPolicy):
+    """A policy always returning the same decision."""
+
+    def __init__(self, decision):
+        self.decision = decision
+
+    def should_process(self, features):
+        return self.decision
+
+
+class TestStreamingQuantiles:
+    """Test percentile estimation over a sliding window."""
+
+    def test_percentiles_within_precision(self):
+        """Test reported percentiles are within the bucket precision of the exact ones."""
+        rng = np.random.default_rng(0)
+        samples = rng.lognormal(mean=-6, sigma=1, size=5000)
+        estimator = StreamingQuantiles(window_size=5000, precision=0.02)
+        for sample in samples:
+            estimator.record(sample)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = np.quantile(samples, q, method="inverted_cdf")
+            assert estimator.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert estimator.mean == pytest.approx(samples.mean())
+
+    def test_window_forgets_old_samples(self):
+        """Test only the most recent samples are summarized."""
+        estimator = StreamingQuantiles(window_size=10)
+        for _ in range(10):
+            estimator.record(1.0)
+        evicted = [estimator.record(0.001) for _ in range(10)]
+
+        assert evicted == [1.0] * 10
+        assert len(estimator) == 10
+        assert estimator.quantile(0.99) == pytest.approx(0.001, rel=0.02)
+        assert estimator.mean == pytest.approx(0.001)
+
+    def test_out_of_range_samples_are_clamped(self):
+        """Test samples outside the tracked range land in the edge buckets."""
+        estimator = StreamingQuantiles(window_size=4, min_value=1e-3, max_value=1.0)
+        for sample in (0.0, 1e-9, 5.0, 100.0):
+            estimator.record(sample)
+
+        assert estimator.quantile(0.5) < 2e-3
+        assert estimator.quantile(1.0) > 0.9
+
+    def test_empty_window(self):
+        estimator = StreamingQuantiles()
+
+        assert math.isnan(estimator.quantile(0.5))
+        assert math.isnan(estimator.mean)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            StreamingQuantiles(window_size=0)
+        with pytest.raises(ValueError):
+            StreamingQuantiles(min_value=1.0, max_value=0.5)
+
+
+class TestPerformanceMonitor:
+    """Test the latency statistics a monitor enforces."""
+
+    def test_p99_catches_tail_latency_the_mean_hides(self):
+        """Test a few slow decisions breach p99 but not the mean."""
+        latencies = [0.001] * 97 + [0.050] * 3
+        mean_monitor = PerformanceMonitor(5.0, window_size=100, statistic="mean")
+        p99_monitor = PerformanceMonitor(5.0, window_size=100, statistic="p99")
+        for latency in latencies:
+            mean_monitor.record(latency)
+            p99_monitor.record(latency)
+
+        assert not mean_monitor.is_breached()
+        assert p99_monitor.is_breached()
+
+    def test_p99_within_budget(self):
+        """Test a single slow decision in a hundred stays within the p99 budget."""
+        monitor = PerformanceMonitor(5.0, window_size=100, statistic="p99")
+        for latency in [0.001] * 99 + [0.050]:
+            monitor.record(latency)
+
+        assert not monitor.is_breached()
+
+    def test_slow_decisions_leave_the_window(self):
+        """Test a breach clears once the slow decisions are evicted."""
+        monitor = PerformanceMonitor(5.0, window_size=20, statistic="p95")
+        for _ in range(20):
+            monitor.record(0.050)
+        assert monitor.is_breached()
+
+        for _ in range(20):
+            monitor.record(0.001)
+        assert not monitor.is_breached()
+
+    def test_half_full_window_required(self):
+        monitor = PerformanceMonitor(5.0, window_size=100, statistic="p99")
+        for _ in range(49):
+            monitor.record(1.0)
+
+        assert not monitor.is_breached()
+
+    def test_percentiles_report(self):
+        monitor = PerformanceMonitor(5.0, window_size=100)
+        for latency in np.linspace(0.001, 0.1, 100):
+            monitor.record(latency)
+
+        percentiles = monitor.percentiles()
+        assert percentiles["p50"] == pytest.approx(0.05, rel=0.05)
+        assert percentiles["p99"] == pytest.approx(0.099, rel=0.05)
+
+    def test_unknown_statistic(self):
+        with pytest.raises(ValueError):
+            PerformanceMonitor(5.0, statistic="p90")
+
+
+class TestSafetyGuard:
+    """Test the guard fails over on the enforced latency statistic."""
+
+    def make_guard(self, stream, **kwargs):
+        return SafetyGuard(
+            ConstantPolicy(True),
+            ConstantPolicy(False),
+            latency_threshold_ms=5.0,
+            accuracy_drop_threshold=0.1,
+            cooldown_period_minutes=10,
+            latency_window_size=10,
+            stream=stream,
+            **kwargs,
+        )
+
+    def test_fails_over_on_p99(self, monkeypatch):
+        """Test a slow tail activates the fallback policy in p99 mode."""
+        guard = self.make_guard("p99-stream", latency_statistic="p99")
+        latencies = iter([0.001] * 4 + [0.050] + [0.001] * 10)
+        monkeypatch.setattr(
+            guard.perf_monitor, "stop", lambda: guard.perf_monitor.record(next(latencies))
+        )
+        fallbacks_before = POLICY_FALLBACKS.labels(stream="p99-stream")._value.get()
+
+        decisions = [guard.should_process({"timestamp": float(i)}) for i in range(5)]
+
+        assert decisions == [True] * 4 + [False]
+        assert guard.is_fallback_active
+        assert POLICY_FALLBACKS.labels(stream="p99-stream")._value.get() == fallbacks_before + 1
+        assert POLICY_DECISION_LATENCY.labels(
+            stream="p99-stream", quantile="0.99"
+        )._value.get() == pytest.approx(0.050, rel=0.02)
+
+    def test_mean_mode_tolerates_the_same_tail(self, monkeypatch):
+        guard = self.make_guard("mean-stream")
+        latencies = iter([0.001] * 9 + [0.030])
+        monkeypatch.setattr(
+            guard.perf_monitor, "stop", lambda: guard.perf_monitor.record(next(latencies))
+        )
+
+        decisions = [guard.should_process({"timestamp": float(i)}) for i in range(10)]
+
+        assert decisions == [True] * 10
+        assert not guard.is_fallback_active
+
+    def test_exports_percentiles_periodically(self):
+        """Test the percentiles of a stream are published every metrics_interval decisions."""
+        guard = self.make_guard("export-stream", metrics_interval=3)
+        for i in range(3):
+            guard.should_process({"timestamp": float(i)})
+
+        for quantile in ("0.5", "0.95", "0.99"):
+            value = POLICY_DECISION_LATENCY.labels(
+                stream="export-stream", quantile=quantile
+            )._value.get()
+            assert 0 < value < 1
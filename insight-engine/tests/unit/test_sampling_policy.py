@@ -0,0 +1,139 @@
+"""Tests for batched decisions of the learned sampling policy."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from insight_engine.modules.sampling_policy import (
+    FixedRateSamplingPolicy,
+    LearnedSamplingPolicy,
+)
+
+
+class FakeSession:
+    """An ONNX session stand-in applying ``fn`` row-wise and recording batch sizes."""
+
+    def __init__(self, fn, width, batch_dim="N"):
+        self.fn = fn
+        self.width = width
+        self.batch_dim = batch_dim
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input", shape=[self.batch_dim, self.width])]
+
+    def run(self, output_names, feeds):
+        batch = feeds["input"]
+        self.batches.append(len(batch))
+        return [self.fn(np.asarray(batch, dtype=np.float32))]
+
+
+def make_policy(batch_dim="N"):
+    """A policy embedding frames as 2x their first 3 values, processing frames whose embedding moved."""
+    extractor = FakeSession(lambda x: x[:, :3] * 2, width=4, batch_dim=batch_dim)
+    policy_model = FakeSession(
+        lambda x: (np.abs(x[:, :-1]).sum(axis=1, keepdims=True) - 1.0) * 4 + 0.01 * x[:, -1:],
+        width=4,
+        batch_dim=batch_dim,
+    )
+    with patch.object(
+        LearnedSamplingPolicy, "_load_model", side_effect=[policy_model, extractor]
+    ):
+        policy = LearnedSamplingPolicy(
+            "policy.onnx", "extractor.onnx", motion_threshold=0.5, time_threshold_seconds=1.0
+        )
+    extractor.batches.clear()
+    policy_model.batches.clear()
+    return policy, extractor, policy_model
+
+
+def make_features(count, seed=0):
+    """A random frame sequence with motion, missing data and repeated frames."""
+    rng = np.random.default_rng(seed)
+    features = []
+    for index in range(count):
+        scene = int(rng.integers(0, 6))
+        item = {
+            "timestamp": index * 0.4,
+            "motion_magnitude": float(rng.choice([0.0, 0.1, 0.9], p=[0.6, 0.3, 0.1])),
+            "frame_data": np.full((1, 4), scene * 0.3, dtype=np.float32),
+            "frame_hash": f"scene-{scene}",
+        }
+        if rng.random() < 0.05:
+            item["frame_data"] = None
+        if rng.random() < 0.03:
+            del item["timestamp"]
+        features.append(item)
+    return features
+
+
+class TestLearnedSamplingPolicyBatch:
+    """Test the batch decision API against the per-frame path."""
+
+    @pytest.mark.parametrize("window", [1, 7, 32, 200])
+    def test_batch_matches_per_frame_decisions(self, window):
+        """Test windows of any size decide exactly like frame-by-frame calls."""
+        features = make_features(200)
+        per_frame, _, _ = make_policy()
+        batched, _, _ = make_policy()
+
+        expected = [per_frame.should_process(item) for item in features]
+        actual = []
+        for start in range(0, len(features), window):
+            actual.extend(batched.should_process_batch(features[start:start + window]))
+
+        assert actual == expected
+        assert batched.last_processed_time == per_frame.last_processed_time
+
+    def test_models_run_once_per_window(self):
+        """Test a window without processed frames costs one call per model."""
+        policy, extractor, policy_model = make_policy()
+        policy.last_processed_time = 0.0
+        policy.last_processed_embedding = np.zeros((1, 3), dtype=np.float32)
+        features = [
+            {
+                "timestamp": 5.0 + index,
+                "frame_data": np.full((1, 4), 0.01 + index * 0.001, dtype=np.float32),
+            }
+            for index in range(8)
+        ]
+
+        assert policy.should_process_batch(features) == [False] * 8
+        assert extractor.batches == [8]
+        assert policy_model.batches == [8]
+
+    def test_embeddings_are_cached_by_frame_hash(self):
+        """Test frames with a known perceptual hash are not re-embedded."""
+        policy, extractor, _ = make_policy()
+        features = [
+            {"timestamp": float(index) * 2, "frame_data": np.ones((1, 4), np.float32), "frame_hash": "same"}
+            for index in range(4)
+        ]
+
+        policy.should_process_batch(features[:2])
+        policy.should_process_batch(features[2:])
+
+        assert sum(extractor.batches) == 1
+
+    def test_fixed_batch_models_run_row_by_row(self):
+        """Test models exported with a batch dimension of 1 still decide the same."""
+        features = make_features(60, seed=1)
+        per_frame, _, _ = make_policy()
+        batched, extractor, _ = make_policy(batch_dim=1)
+
+        expected = [per_frame.should_process(item) for item in features]
+
+        assert batched.should_process_batch(features) == expected
+        assert set(extractor.batches) == {1}
+
+
+class TestDefaultBatchDecisions:
+    """Test the batch API of policies without a batched implementation."""
+
+    def test_fixed_rate_policy(self):
+        policy = FixedRateSamplingPolicy(rate_fps=1)
+        features = [{"timestamp": t} for t in (0.0, 0.5, 1.0, 1.2, 2.1)]
+
+        assert policy.should_process_batch(features) == [True, False, True, False, True]
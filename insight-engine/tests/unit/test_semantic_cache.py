@@ -0,0 +1,119 @@
+"""Tests for the semantic answer cache."""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from insight_engine.services.semantic_cache import (
+    SemanticAnswerCache,
+    SemanticCacheConfig,
+)
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticAnswerCache:
+    """Test similarity lookup, scoping and eviction."""
+
+    def test_similar_query_hits(self):
+        """Test a paraphrase above the threshold returns the stored value."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(similarity_threshold=0.9))
+        cache.store("v1", "what happens at the start?", [1.0, 0.1, 0.0], "summary:v1:a")
+
+        hit = cache.lookup("v1", [1.0, 0.15, 0.0])
+
+        assert hit is not None
+        assert hit.value == "summary:v1:a"
+        assert hit.query == "what happens at the start?"
+        assert hit.similarity > 0.99
+
+    def test_dissimilar_query_misses(self):
+        """Test lookups below the threshold miss and are counted."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(similarity_threshold=0.9))
+        cache.store("v1", "q", [1.0, 0.0], "k")
+
+        assert cache.lookup("v1", [0.0, 1.0]) is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_entries_are_scoped_per_video(self):
+        """Test an answer for one video is never returned for another."""
+        cache = SemanticAnswerCache()
+        cache.store("v1", "q", [1.0, 0.0], "k")
+
+        assert cache.lookup("v2", [1.0, 0.0]) is None
+
+    def test_expired_entries_are_ignored(self):
+        """Test entries past their TTL no longer produce hits."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(ttl=10))
+        with patch("insight_engine.services.semantic_cache.time.monotonic", return_value=0):
+            cache.store("v1", "q", [1.0, 0.0], "k")
+        with patch("insight_engine.services.semantic_cache.time.monotonic", return_value=11):
+            assert cache.lookup("v1", [1.0, 0.0]) is None
+
+    def test_lru_eviction_within_video(self):
+        """Test the least recently used entry is replaced when a video is full."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(max_entries_per_video=2))
+        cache.store("v1", "a", unit(1, 0, 0), "ka")
+        cache.store("v1", "b", unit(0, 1, 0), "kb")
+        assert cache.lookup("v1", unit(1, 0, 0)).value == "ka"  # "b" is now LRU
+
+        cache.store("v1", "c", unit(0, 0, 1), "kc")
+
+        assert cache.lookup("v1", unit(0, 1, 0)) is None
+        assert cache.lookup("v1", unit(1, 0, 0)).value == "ka"
+        assert cache.get_stats()["entries"] == 2
+
+    def test_video_index_grows_with_its_entries(self):
+        """Test a video's matrix starts small and doubles up to the entry limit."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(max_entries_per_video=10))
+        cache.store("v1", "q0", unit(1, 0), "k0")
+        index = cache._videos["v1"]
+        assert index.embeddings.shape == (4, 2)
+
+        for i in range(1, 10):
+            cache.store("v1", f"q{i}", unit(1, i), f"k{i}")
+        assert index.embeddings.shape == (10, 2)
+        assert cache.lookup("v1", unit(1, 0)).value == "k0"
+
+        cache.store("v1", "q10", unit(0, 1), "k10")
+        assert index.embeddings.shape == (10, 2)
+        assert cache.get_stats()["entries"] == 10
+
+    def test_lru_eviction_across_videos(self):
+        """Test whole video indexes are evicted beyond max_videos."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(max_videos=1))
+        cache.store("v1", "q", [1.0, 0.0], "k1")
+        cache.store("v2", "q", [1.0, 0.0], "k2")
+
+        assert cache.lookup("v1", [1.0, 0.0]) is None
+        assert cache.lookup("v2", [1.0, 0.0]).value == "k2"
+
+    def test_restore_same_query_replaces_entry(self):
+        """Test storing an existing query updates it in place."""
+        cache = SemanticAnswerCache()
+        cache.store("v1", "q", [1.0, 0.0], "old")
+        cache.store("v1", "q", [1.0, 0.0], "new")
+
+        assert cache.lookup("v1", [1.0, 0.0]).value == "new"
+        assert cache.get_stats()["entries"] == 1
+
+    def test_discard_and_invalidate(self):
+        """Test single entries and whole videos can be dropped."""
+        cache = SemanticAnswerCache()
+        cache.store("v1", "q", [1.0, 0.0], "k")
+        cache.store("v2", "q", [1.0, 0.0], "k")
+
+        assert cache.discard("v1", "q")
+        assert cache.lookup("v1", [1.0, 0.0]) is None
+        assert cache.invalidate_video("v2")
+        assert cache.get_stats()["entries"] == 0
+
+    def test_disabled_cache_is_inert(self):
+        """Test a disabled cache neither stores nor returns entries."""
+        cache = SemanticAnswerCache(SemanticCacheConfig(enabled=False))
+
+        assert not cache.store("v1", "q", [1.0, 0.0], "k")
+        assert cache.lookup("v1", [1.0, 0.0]) is None
@@ -0,0 +1,171 @@
+"""Tests for chunk-level caching of streamed summaries."""
+
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from insight_engine.services.redis_service import RedisService
+from insight_engine.services.summary_stream_cache import (
+    SummaryStreamCache,
+    SummaryStreamError,
+)
+
+
+@pytest.fixture
+def redis_service():
+    """A RedisService backed by an in-memory fake Redis."""
+    service = RedisService.__new__(RedisService)
+    service.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return service
+
+
+@pytest.fixture
+def summary_cache(redis_service):
+    return SummaryStreamCache(redis_service, block_ms=50)
+
+
+def chunk_producer(chunks, calls, delay=0.0, fail_after=None):
+    """Returns a producer factory that records how often it was invoked."""
+    def factory():
+        calls.append(1)
+
+        async def generate():
+            for i, chunk in enumerate(chunks):
+                if fail_after is not None and i == fail_after:
+                    raise RuntimeError("LLM failed")
+                await asyncio.sleep(delay)
+                yield chunk
+        return generate()
+    return factory
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestSummaryStreamCache:
+    """Test replay, attach and produce paths."""
+
+    @pytest.mark.asyncio
+    async def test_replay_keeps_chunk_boundaries(self, summary_cache):
+        """Test a cached summary replays as the original chunks."""
+        calls = []
+        producer = chunk_producer(["The ", "video ", "starts."], calls)
+
+        first = await collect(summary_cache.stream("summary_stream:v:q", producer))
+        second = await collect(summary_cache.stream("summary_stream:v:q", producer))
+
+        assert first == second == ["The ", "video ", "starts."]
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_producer(self, summary_cache):
+        """Test requests for an in-flight key attach instead of regenerating."""
+        calls = []
+        producer = chunk_producer(["a", "b", "c", "d"], calls, delay=0.02)
+
+        results = await asyncio.gather(*[
+            collect(summary_cache.stream("summary_stream:v:q", producer))
+            for _ in range(3)
+        ])
+
+        assert results == [["a", "b", "c", "d"]] * 3
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_not_cached(self, summary_cache, redis_service):
+        """Test a producer error leaves no partial summary behind."""
+        calls = []
+        producer = chunk_producer(["a", "b"], calls, fail_after=1)
+
+        with pytest.raises(RuntimeError):
+            await collect(summary_cache.stream("summary_stream:v:q", producer))
+
+        assert not await redis_service.client.exists("summary_stream:v:q")
+        assert not await redis_service.client.exists("summary_stream:v:q:__producer")
+
+    @pytest.mark.asyncio
+    async def test_attached_reader_fails_when_producer_dies_mid_stream(self, summary_cache):
+        """Test readers that already received chunks surface an abandoned stream."""
+        producer = chunk_producer(["a", "b", "c"], [], delay=0.03, fail_after=2)
+
+        async def attach():
+            await asyncio.sleep(0.01)
+            return await collect(summary_cache.stream("summary_stream:v:q", producer))
+
+        owner, follower = await asyncio.gather(
+            collect(summary_cache.stream("summary_stream:v:q", producer)),
+            attach(),
+            return_exceptions=True,
+        )
+
+        assert isinstance(owner, RuntimeError)
+        assert isinstance(follower, SummaryStreamError)
+
+    @pytest.mark.asyncio
+    async def test_replay_only_miss_yields_nothing(self, summary_cache):
+        """Test streaming without a producer is a no-op for unknown keys."""
+        assert await collect(summary_cache.stream("summary_stream:v:missing")) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_append_stops_caching(self, summary_cache, redis_service, monkeypatch):
+        """Test a lost chunk is never replayed: the stream is dropped and the request still completes."""
+        calls = []
+        producer = chunk_producer(["a", "b", "c"], calls)
+        stream_append = redis_service.stream_append
+        appends = []
+
+        async def flaky_append(key, fields, ttl=None, refresh=()):
+            appends.append(fields)
+            if len(appends) == 2:
+                raise RedisConnectionError("connection reset")
+            return await stream_append(key, fields, ttl, refresh)
+
+        monkeypatch.setattr(redis_service, "stream_append", flaky_append)
+
+        assert await collect(summary_cache.stream("summary_stream:v:q", producer)) == ["a", "b", "c"]
+        assert len(appends) == 2
+        assert not await redis_service.client.exists("summary_stream:v:q")
+        assert not await redis_service.client.exists("summary_stream:v:q:__producer")
+
+        monkeypatch.setattr(redis_service, "stream_append", stream_append)
+        assert await collect(summary_cache.stream("summary_stream:v:q", producer)) == ["a", "b", "c"]
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_every_chunk_renews_stream_and_lease(self, redis_service):
+        """Test a generation longer than generation_ttl keeps its stream and lease alive."""
+        summary_cache = SummaryStreamCache(redis_service, generation_ttl=300, block_ms=50)
+        key = "summary_stream:v:q"
+        ttls = []
+
+        def factory():
+            async def generate():
+                for chunk in ["a", "b", "c"]:
+                    yield chunk
+                    ttls.append((
+                        await redis_service.client.ttl(key),
+                        await redis_service.client.ttl(f"{key}:__producer"),
+                    ))
+                    # Age both keys as a slow LLM would between chunks
+                    await redis_service.client.expire(key, 1)
+                    await redis_service.client.expire(f"{key}:__producer", 1)
+            return generate()
+
+        assert await collect(summary_cache.stream(key, factory)) == ["a", "b", "c"]
+        assert ttls == [(300, 300)] * 3
+        assert await redis_service.client.ttl(key) == summary_cache.ttl
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_not_rate_limited(self, summary_cache):
+        """Test per-chunk stream calls bypass the rate-limited resilience wrapper."""
+        chunks = [f"{i} " for i in range(100)]
+        producer = chunk_producer(chunks, [])
+
+        results = await asyncio.wait_for(asyncio.gather(*[
+            collect(summary_cache.stream(f"summary_stream:v:{i}", producer)) for i in range(5)
+        ]), timeout=5)
+
+        assert results == [chunks] * 5
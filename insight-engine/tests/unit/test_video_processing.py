@@ -5,12 +5,15 @@ This module tests video preprocessing, keyframe extraction,
 and video analysis components.
 """
 
+import asyncio
+import threading
 import pytest
 from unittest.mock import MagicMock, patch, AsyncMock
 import numpy as np
 from PIL import Image
 import cv2
 
+from insight_engine.services.admission_controller import ResourceSnapshot
 from insight_engine.services.preprocessing_service import VideoPreprocessor
 from insight_engine.exceptions import VideoProcessingException, ValidationException
 
@@ -56,38 +59,49 @@ class TestVideoPreprocessor:
         assert preprocessor.cpu_threshold == 85
         assert preprocessor.throttle_delay == 0.5
     
-    @patch('insight_engine.services.preprocessing_service.psutil.cpu_percent')
-    def test_throttle_when_cpu_high(self, mock_cpu_percent, video_preprocessor):
-        """Test throttling when CPU usage is high."""
-        mock_cpu_percent.return_value = 90  # Above threshold
-        
-        with patch('time.sleep') as mock_sleep:
+    def test_throttle_when_cpu_high(self, video_preprocessor):
+        """Test throttling when sampled CPU usage is high."""
+        snapshot = ResourceSnapshot(cpu_percent=90.0, memory_percent=10.0, sampled_at=0.0)
+
+        with patch.object(video_preprocessor.admission.sampler, 'snapshot', return_value=snapshot), \
+                patch('time.sleep') as mock_sleep:
             video_preprocessor._throttle()
             mock_sleep.assert_called_once_with(0.5)
     
-    @patch('insight_engine.services.preprocessing_service.psutil.cpu_percent')
-    def test_no_throttle_when_cpu_normal(self, mock_cpu_percent, video_preprocessor):
-        """Test no throttling when CPU usage is normal."""
-        mock_cpu_percent.return_value = 50  # Below threshold
-        
-        with patch('time.sleep') as mock_sleep:
+    def test_no_throttle_when_cpu_normal(self, video_preprocessor):
+        """Test no throttling when sampled CPU usage is normal."""
+        snapshot = ResourceSnapshot(cpu_percent=50.0, memory_percent=10.0, sampled_at=0.0)
+
+        with patch.object(video_preprocessor.admission.sampler, 'snapshot', return_value=snapshot), \
+                patch('time.sleep') as mock_sleep:
             video_preprocessor._throttle()
             mock_sleep.assert_not_called()
+
+    def test_throttle_checked_once_per_batch(self, video_preprocessor):
+        """Test resource pressure is checked per batch of frames, not per frame."""
+        frames = [(i, np.zeros((8, 8, 3), dtype=np.uint8)) for i in range(1, 71)]
+        video_preprocessor.decoder = MagicMock()
+        video_preprocessor.decoder.frames.return_value = iter(frames)
+
+        with patch.object(video_preprocessor, '_throttle') as mock_throttle:
+            assert len(list(video_preprocessor._extract_frames("test_video.mp4"))) == 70
+            assert mock_throttle.call_count == 3
     
     def test_transform_frame(self, video_preprocessor):
-        """Test frame transformation (resize and normalize)."""
+        """Test frame transformation (resize and convert to RGB)."""
         # Create a sample frame (BGR format as OpenCV uses)
-        original_frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        original_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        original_frame[..., 0] = 200  # Blue
         
         transformed = video_preprocessor._transform_frame(original_frame)
         
         # Check dimensions
         assert transformed.shape == (224, 224, 3)
-        # Check normalization (values should be between 0 and 1)
-        assert transformed.min() >= 0.0
-        assert transformed.max() <= 1.0
-        # Check data type
-        assert transformed.dtype == np.float32
+        # Frames stay uint8; normalization is deferred to the consumer
+        assert transformed.dtype == np.uint8
+        # Check channel order (blue is last in RGB)
+        assert (transformed[..., 2] == 200).all()
+        assert (transformed[..., 0] == 0).all()
     
     def test_compute_hash(self, video_preprocessor):
         """Test perceptual hash computation."""
@@ -226,6 +240,162 @@ class TestVideoPreprocessor:
                     assert all("frame" in item for item in result)
 
 
+class TestStreamingKeyframes:
+    """Test the bounded async keyframe stream."""
+
+    @pytest.fixture
+    def preprocessor(self):
+        preprocessor = VideoPreprocessor({"KEYFRAME_QUEUE_SIZE": 2})
+        preprocessor._get_fps = MagicMock(return_value=10.0)
+        return preprocessor
+
+    def keyframe_source(self, count, produced):
+        """Yields ``count`` keyframes, recording how many were produced."""
+        for number in range(1, count + 1):
+            produced.append(number)
+            yield number, np.full((4, 4, 3), number, dtype=np.uint8)
+
+    @pytest.mark.asyncio
+    async def test_streams_frame_numbers_and_timestamps(self, preprocessor):
+        """Test keyframes arrive in order with their timestamps."""
+        produced = []
+        with patch.object(preprocessor, '_iter_keyframes', return_value=self.keyframe_source(5, produced)):
+            items = [item async for item in preprocessor.aiter_keyframes("video.mp4")]
+
+        assert [item["frame_number"] for item in items] == [1, 2, 3, 4, 5]
+        assert items[1]["timestamp"] == 0.2
+
+    @pytest.mark.asyncio
+    async def test_collect_keyframes_into_batch(self, preprocessor):
+        """Test keyframes are gathered into parallel uint8, frame number and timestamp arrays."""
+        preprocessor.target_size = (4, 4)
+        with patch.object(preprocessor, '_iter_keyframes', return_value=self.keyframe_source(3, [])):
+            batch = await preprocessor.collect_keyframes("video.mp4")
+
+        assert len(batch) == 3
+        assert batch.frames.dtype == np.uint8
+        assert batch.frame_numbers.tolist() == [1, 2, 3]
+        np.testing.assert_allclose(batch.timestamps, [0.1, 0.2, 0.3])
+        assert batch.frames[:, 0, 0, 0].tolist() == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_decode_thread_is_bounded_by_the_queue(self, preprocessor):
+        """Test the producer stops running ahead of a slow consumer."""
+        produced = []
+        with patch.object(preprocessor, '_iter_keyframes', return_value=self.keyframe_source(50, produced)):
+            stream = preprocessor.aiter_keyframes("video.mp4")
+            await stream.__anext__()
+            await asyncio.sleep(0.3)
+
+            # One consumed, two queued and one blocked on the full queue
+            assert len(produced) <= 4
+            await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_closing_early_stops_decoding(self, preprocessor):
+        """Test breaking out of the stream stops the decode thread."""
+        produced = []
+        with patch.object(preprocessor, '_iter_keyframes', return_value=self.keyframe_source(1000, produced)):
+            async for _ in preprocessor.aiter_keyframes("video.mp4"):
+                break
+
+        assert len(produced) < 10
+
+    @pytest.mark.asyncio
+    async def test_decode_errors_reach_the_consumer(self, preprocessor):
+        """Test exceptions raised while decoding are re-raised by the stream."""
+        def failing_source():
+            yield 1, np.zeros((4, 4, 3), dtype=np.uint8)
+            raise VideoProcessingException("decode failed")
+
+        with patch.object(preprocessor, '_iter_keyframes', return_value=failing_source()):
+            with pytest.raises(VideoProcessingException):
+                async for _ in preprocessor.aiter_keyframes("video.mp4"):
+                    pass
+
+
+class TestParallelKeyframeExtraction:
+    """Test segment-parallel keyframe extraction."""
+
+    @pytest.fixture
+    def sample_video(self, tmp_path):
+        """Write a short video with a scene change every 40 frames."""
+        path = str(tmp_path / "scenes.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (160, 120))
+        rng = np.random.default_rng(0)
+        for i in range(240):
+            if i % 40 == 0:
+                scene = cv2.GaussianBlur(
+                    rng.integers(0, 255, (120, 160, 3), dtype=np.uint8), (15, 15), 0
+                )
+            writer.write(np.roll(scene, i % 40 * 2, axis=1))
+        writer.release()
+        return path
+
+    def test_plan_segments_covers_every_frame(self):
+        """Test segments are contiguous and the last one is open ended."""
+        preprocessor = VideoPreprocessor({"SEGMENTS_PER_WORKER": 2})
+
+        segments = preprocessor._plan_segments(1000, workers=4)
+
+        assert len(segments) == 8
+        assert segments[0][0] == 0
+        assert segments[-1][1] is None
+        assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+
+    def test_long_videos_are_split_into_bounded_segments(self):
+        """Test segment length is capped however few workers there are."""
+        preprocessor = VideoPreprocessor({"SEGMENTS_PER_WORKER": 2})
+
+        segments = preprocessor._plan_segments(100_000, workers=2)
+
+        assert len(segments) == 34
+        assert all(end - start <= 3000 for start, end in segments[:-1])
+
+    def test_short_videos_are_not_split(self):
+        """Test videos too short to be worth seeking stay in one segment."""
+        preprocessor = VideoPreprocessor({})
+
+        assert preprocessor._plan_segments(60, workers=8) == [(0, None)]
+
+    @pytest.mark.parametrize("decode_config", [
+        {},
+        {"DECODE_MODE": "stride", "DECODE_STRIDE": 2},
+        # The full decoder ignores the stride, so segment reads must too
+        {"DECODE_MODE": "full", "DECODE_STRIDE": 2},
+    ])
+    def test_parallel_matches_sequential(self, sample_video, decode_config):
+        """Test the parallel path selects the same keyframes as the sequential one."""
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100, **decode_config})
+        sequential = list(preprocessor._iter_keyframes(sample_video))
+
+        parallel = preprocessor.extract_keyframes_parallel(sample_video, workers=2)
+
+        assert [number for number, _ in parallel] == [number for number, _ in sequential]
+        for (_, expected), (_, actual) in zip(sequential, parallel):
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_stop_ends_parallel_extraction_between_segments(self, sample_video):
+        """Test a set stop event ends the stream at the next segment boundary."""
+        preprocessor = VideoPreprocessor({"CPU_THRESHOLD": 100, "SEGMENTS_PER_WORKER": 2})
+        stop = threading.Event()
+        first_segment = preprocessor._plan_segments(240, workers=2)[0]
+
+        stream = preprocessor.iter_keyframes_parallel(sample_video, workers=2, stop=stop)
+        numbers = [next(stream)[0]]
+        stop.set()
+        numbers.extend(number for number, _ in stream)
+
+        assert all(number <= first_segment[1] for number in numbers)
+
+    def test_lower_case_settings_keys(self):
+        """Test PreprocessingSettings.model_dump() keys configure the workers."""
+        preprocessor = VideoPreprocessor({"extraction_workers": 4, "cpu_threshold": 90})
+
+        assert preprocessor.workers == 4
+        assert preprocessor.cpu_threshold == 90
+
+
 class TestVideoValidation:
     """Test video validation utilities."""
     
@@ -303,7 +473,7 @@ class TestVideoProcessingIntegration:
         transformed = preprocessor._transform_frame(test_frame)
         
         assert transformed.shape == (224, 224, 3)
-        assert 0.0 <= transformed.min() <= transformed.max() <= 1.0
+        assert transformed.dtype == np.uint8
     
     def test_error_handling_in_processing(self):
         """Test error handling in video processing."""